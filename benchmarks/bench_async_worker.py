@@ -0,0 +1,90 @@
+"""Compare judge throughput of the sync and async worker execution modes.
+
+Runs the same number of judge calls against a local stub judge server,
+first one at a time as a sync prefork child would, then through the
+per-process AsyncEvaluationExecutor, and prints evaluations/sec for each.
+
+With ``--batch-items`` above 1, the async run also sends evaluations
+sharing criteria as multi-item judge requests, and the prompt tokens the
+stub received are printed for each mode.
+
+Usage:
+    poetry run python -m benchmarks.bench_async_worker --count 500 --concurrency 32
+    poetry run python -m benchmarks.bench_async_worker --count 500 --batch-items 8
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ.setdefault("OPENAI_MODEL", "stub-judge")
+
+from aieb_evaluation_svc.core.config import settings  # noqa: E402
+from aieb_evaluation_svc.services.judge import judge  # noqa: E402
+from aieb_evaluation_svc.services.rate_limit import (  # noqa: E402
+    AdaptiveConcurrency,
+    TokenBucketLimiter,
+    set_judge_concurrency,
+    set_judge_rate_limiter,
+)
+from aieb_evaluation_svc.worker.async_executor import AsyncEvaluationExecutor  # noqa: E402
+from benchmarks.stub_judge import StubJudgeServer  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=200, help="judge calls per mode")
+    parser.add_argument("--concurrency", type=int, default=settings.WORKER_ASYNC_CONCURRENCY)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub judge latency in seconds")
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute the stub judge allows")
+    parser.add_argument("--batch-items", type=int, default=1, help="evaluations per multi-item judge request")
+    parser.add_argument("--batch-wait", type=float, default=settings.JUDGE_BATCH_MAX_WAIT_SECONDS)
+    args = parser.parse_args()
+
+    # Budget the stub's limit from this process only; start the adaptive limit at its floor
+    set_judge_rate_limiter(TokenBucketLimiter(args.rpm, 0, settings.JUDGE_RATE_LIMIT_MAX_WAIT_SECONDS, "bench"))
+    concurrency = AdaptiveConcurrency(
+        settings.JUDGE_CONCURRENCY_INITIAL,
+        settings.JUDGE_CONCURRENCY_MIN,
+        args.concurrency,
+        settings.JUDGE_LATENCY_TOLERANCE,
+    )
+    set_judge_concurrency(concurrency)
+
+    # A realistic criteria document, so that its share of the prompt tokens shows
+    criteria = "Be correct, complete and polite. " * 40
+    requests = [(criteria, f"prompt {i}", f"output {i}") for i in range(args.count)]
+
+    with StubJudgeServer(latency=args.latency, rpm=args.rpm) as server:
+        settings.OPENAI_BASE_URL = server.base_url
+
+        start = time.perf_counter()
+        for request in requests:
+            judge(*request)
+        sync_elapsed = time.perf_counter() - start
+        sync_tokens, server.prompt_tokens = server.prompt_tokens, 0
+
+        executor = AsyncEvaluationExecutor(args.concurrency, batch_items=args.batch_items, batch_wait=args.batch_wait)
+        try:
+            start = time.perf_counter()
+            outcomes = executor.judge_many(requests)
+            async_elapsed = time.perf_counter() - start
+        finally:
+            executor.close()
+
+    failures = sum(isinstance(outcome, BaseException) for outcome in outcomes)
+    print(f"judge latency:    {args.latency * 1000:.0f} ms")
+    print(f"async concurrency: {args.concurrency}")
+    print(f"sync mode:        {args.count / sync_elapsed:8.1f} evaluations/sec per process")
+    print(f"async mode:       {args.count / async_elapsed:8.1f} evaluations/sec per process")
+    print(f"batch items:      {args.batch_items}")
+    print(f"sync tokens:      {sync_tokens:8d} ({sync_tokens / args.count:.0f} prompt tokens/evaluation)")
+    print(f"async tokens:     {server.prompt_tokens:8d} ({server.prompt_tokens / args.count:.0f} prompt tokens/evaluation)")
+    print(f"async failures:   {failures}")
+    print(f"throttled (429):  {server.throttled}")
+    print(f"adaptive limit:   {concurrency.limit:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Load test of request latency with the legacy and async session dependencies.
+
+Serves the same query from two routes of an in-process FastAPI app:
+``/before`` builds a session factory per request and runs the query on the
+sync engine inside an ``async def`` handler, as the old ``get_db`` did;
+``/after`` uses the pooled ``AsyncSession`` dependency. Each route is hit
+with many concurrent requests while a DB-free ``/ping`` route is probed at
+the same time, and p50/p99 latency and throughput are printed for both.
+
+A blocked event loop shows up as ``/ping`` latency tracking the query time.
+On SQLite the query itself is CPU bound, so point ``--database-url`` at a
+local Postgres to see the effect of network round trips. With the legacy
+dependency, concurrency above the sync pool capacity (15) deadlocks: the
+handler blocks the loop waiting for a connection that only the loop can
+release.
+
+Usage:
+    PYTHONPATH=src poetry run python -m benchmarks.bench_db_session --rows 50000 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import datetime
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ.setdefault("OPENAI_MODEL", "stub-judge")
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlalchemy import create_engine, func, insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+
+from aieb_evaluation_svc.models import Agent, Base, Evaluation, EvaluationCriteria  # noqa: E402
+from aieb_evaluation_svc.models.base import engine_options, to_async_url  # noqa: E402
+
+
+def seed(database_url: str, rows: int) -> uuid.UUID:
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        agent = Agent(name="bench-agent")
+        session.add(agent)
+        session.flush()
+        criteria = EvaluationCriteria(agent_id=agent.id, version=1, criteria_content="Be correct.")
+        session.add(criteria)
+        session.flush()
+        now = datetime.datetime.utcnow()
+        session.execute(insert(Evaluation), [
+            {"id": uuid.uuid4(), "criteria_id": criteria.id, "status": "pending",
+             "agent_prompt": f"prompt {i}", "created_at": now}
+            for i in range(rows)
+        ])
+        session.commit()
+        criteria_id = criteria.id
+    engine.dispose()
+    return criteria_id
+
+
+def build_app(database_url: str, criteria_id: uuid.UUID) -> FastAPI:
+    engine = create_engine(database_url)
+    async_engine = create_async_engine(to_async_url(database_url), **engine_options(database_url))
+    async_session_local = async_sessionmaker(async_engine, expire_on_commit=False)
+    query = select(func.count()).select_from(Evaluation).where(
+        Evaluation.criteria_id == criteria_id, Evaluation.status == "pending"
+    )
+
+    def legacy_get_db():
+        # The old dependency used scoped_session, whose thread-local registry
+        # made close() from the threadpool miss the session used by the
+        # handler and leak connections; a plain session keeps the pool alive.
+        session = sessionmaker(bind=engine)()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    async def get_async_db():
+        async with async_session_local() as session:
+            yield session
+
+    app = FastAPI()
+
+    @app.get("/before")
+    async def before(db: Session = Depends(legacy_get_db)) -> int:
+        return db.execute(query).scalar_one()
+
+    @app.get("/after")
+    async def after(db: AsyncSession = Depends(get_async_db)) -> int:
+        return (await db.execute(query)).scalar_one()
+
+    @app.get("/ping")
+    async def ping() -> str:
+        return "pong"
+
+    return app
+
+
+async def load(app: FastAPI, path: str, requests: int, concurrency: int) -> tuple[list[float], list[float], float]:
+    latencies = []
+    ping_latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def one() -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(path)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        async def probe() -> None:
+            # Timing starts before the sleep so time spent waiting for a
+            # blocked loop to wake the probe is counted as ping latency
+            interval = 0.005
+            while not done.is_set():
+                start = time.perf_counter()
+                await asyncio.sleep(interval)
+                await client.get("/ping")
+                ping_latencies.append(time.perf_counter() - start - interval)
+
+        prober = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await prober
+        return latencies, ping_latencies, elapsed
+
+
+def report(label: str, latencies: list[float], ping_latencies: list[float], elapsed: float) -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    ping_quantiles = statistics.quantiles(ping_latencies, n=100)
+    print(
+        f"{label:<7} query p50={quantiles[49] * 1000:7.1f} ms p99={quantiles[98] * 1000:7.1f} ms "
+        f"{len(latencies) / elapsed:7.1f} req/s | "
+        f"ping p50={ping_quantiles[49] * 1000:6.1f} ms p99={ping_quantiles[98] * 1000:6.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000, help="evaluation rows to seed")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--database-url", help="empty database to seed, defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{tmp}/bench.db"
+        criteria_id = seed(database_url, args.rows)
+        app = build_app(database_url, criteria_id)
+
+        print(f"rows={args.rows} requests={args.requests} concurrency={args.concurrency}")
+        for label, path in (("before", "/before"), ("after", "/after")):
+            report(label, *asyncio.run(load(app, path, args.requests, args.concurrency)))
+
+
+if __name__ == "__main__":
+    main()
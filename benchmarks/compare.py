@@ -0,0 +1,70 @@
+"""Compare two benchmark suite result files and flag regressions.
+
+A benchmark regresses when its throughput drops, or its p99 latency
+grows, by more than the threshold. The exit status is 1 if any benchmark
+regressed, so the comparison can gate CI.
+
+Usage:
+    PYTHONPATH=src poetry run python -m benchmarks.compare baseline.json candidate.json --threshold 0.1
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Sequence
+
+
+def load_results(path: str) -> Dict[str, Dict[str, Any]]:
+    with open(path) as f:
+        return {result["name"]: result for result in json.load(f)["results"]}
+
+
+def compare(
+    baseline: Dict[str, Dict[str, Any]], candidate: Dict[str, Dict[str, Any]], threshold: float
+) -> List[Dict[str, Any]]:
+    """Compare the benchmarks present in both runs.
+
+    Args:
+        baseline: Results by name from the reference run
+        candidate: Results by name from the run under test
+        threshold: Relative change treated as a regression, e.g. 0.1 for 10%
+
+    Returns:
+        One row per benchmark with relative changes and a regression flag
+    """
+    rows = []
+    for name in baseline.keys() & candidate.keys():
+        before, after = baseline[name], candidate[name]
+        throughput_change = after["throughput"] / before["throughput"] - 1
+        p99_change = after["p99_ms"] / before["p99_ms"] - 1
+        rows.append({
+            "name": name,
+            "unit": after["unit"],
+            "baseline": before["throughput"],
+            "candidate": after["throughput"],
+            "throughput_change": throughput_change,
+            "p99_change": p99_change,
+            "regressed": throughput_change < -threshold or p99_change > threshold,
+        })
+    return sorted(rows, key=lambda row: row["name"])
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative change treated as a regression")
+    args = parser.parse_args(argv)
+
+    rows = compare(load_results(args.baseline), load_results(args.candidate), args.threshold)
+    for row in rows:
+        print(
+            f"{row['name']:14s} {row['baseline']:10.1f} -> {row['candidate']:10.1f} {row['unit']:16s} "
+            f"{row['throughput_change']:+7.1%}  p99 {row['p99_change']:+7.1%}"
+            f"{'  REGRESSION' if row['regressed'] else ''}"
+        )
+    return 1 if any(row["regressed"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
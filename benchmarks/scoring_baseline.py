@@ -0,0 +1,83 @@
+"""Per-row pure-Python scoring of deterministic checks.
+
+The reference the vectorized scorers in
+``aieb_evaluation_svc.services.deterministic_scoring`` are benchmarked
+and tested against: every output is scored on its own with plain string
+operations and ``collections.Counter``.
+"""
+
+import json
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+
+from aieb_evaluation_svc.services.deterministic_scoring import (
+    BLEU_MAX_ORDER,
+    TOKEN,
+    Check,
+    matches_schema,
+)
+
+
+def ngrams(tokens: List[str], order: int) -> Counter:
+    return Counter(tuple(tokens[i:i + order]) for i in range(len(tokens) - order + 1))
+
+
+def score_check(check: Check, output: str) -> float:
+    """Score one output against one check."""
+    params = check.params
+    folded = output if params.get("case_sensitive", False) else output.lower()
+    if check.type == "exact_match":
+        expected = params["expected"].strip()
+        return float(folded.strip() == (expected if params.get("case_sensitive", False) else expected.lower()))
+    if check.type == "regex":
+        pattern = re.compile(params["pattern"], 0 if params.get("case_sensitive", True) else re.IGNORECASE)
+        match = pattern.fullmatch if params.get("fullmatch", False) else pattern.search
+        return float(match(output) is not None)
+    if check.type == "keywords":
+        keywords = params["keywords"]
+        if not keywords:
+            return 1.0
+        found = [
+            (keyword if params.get("case_sensitive", False) else keyword.lower()) in folded
+            for keyword in keywords
+        ]
+        return float(all(found)) if params.get("all", False) else sum(found) / len(found)
+    if check.type == "length":
+        within = len(output) >= params.get("min_chars", 0)
+        return float(within and (params.get("max_chars") is None or len(output) <= params["max_chars"]))
+    if check.type == "json_schema":
+        try:
+            return float(matches_schema(json.loads(output), params.get("schema", {})))
+        except json.JSONDecodeError:
+            return 0.0
+    tokens = TOKEN.findall(output.lower())
+    reference = TOKEN.findall(params["reference"].lower())
+    if check.type == "rouge_1":
+        matches = sum((ngrams(tokens, 1) & ngrams(reference, 1)).values())
+        total = len(tokens) + len(reference)
+        return 2 * matches / total if total else 0.0
+    if check.type == "bleu":
+        if not tokens:
+            return 0.0
+        max_order = params.get("max_order", BLEU_MAX_ORDER)
+        log_precision = 0.0
+        for order in range(1, max_order + 1):
+            matches = sum((ngrams(tokens, order) & ngrams(reference, order)).values())
+            total = max(len(tokens) - order + 1, 0)
+            smoothing = 0 if order == 1 else 1
+            if matches + smoothing == 0:
+                return 0.0
+            log_precision += math.log((matches + smoothing) / (total + smoothing)) / max_order
+        brevity = min(0.0, 1 - len(reference) / len(tokens))
+        return math.exp(log_precision + brevity)
+    raise ValueError(f"Unknown check type {check.type}")
+
+
+def score_outputs(checks: Sequence[Check], outputs: Sequence[Optional[str]]) -> List[Dict[str, Any]]:
+    """Score every output against every check, one row at a time."""
+    return [
+        {check.key: score_check(check, output or "") for check in checks}
+        for output in outputs
+    ]
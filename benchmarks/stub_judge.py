@@ -0,0 +1,128 @@
+"""Local OpenAI-compatible stub judge server for offline benchmarks.
+
+The server answers ``POST /chat/completions`` after a fixed latency with a
+verdict the judge client can parse, or one verdict per item for
+multi-item requests. It keeps connections alive so that pooled clients
+are measured the way they behave against the real API, and counts the
+prompt tokens it was sent (about four characters per token).
+
+Like the real provider it can enforce request and token limits per
+period, answering ``429`` with a ``Retry-After`` header once a budget is
+spent; each budget refills continuously over the period.
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Token usage reported for, and charged to, every request
+USAGE = {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+
+# Items of a multi-item judge request
+ITEM_HEADING = re.compile(r"^## Item \d+$", re.MULTILINE)
+
+
+class StubJudgeHandler(BaseHTTPRequestHandler):
+    """Request handler returning a canned chat completion."""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        retry_after = self.server.take(USAGE["total_tokens"])
+        if retry_after:
+            body = json.dumps({"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}}).encode()
+            self.send_response(429)
+            self.send_header("Retry-After", f"{retry_after:.3f}")
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        time.sleep(self.server.latency)
+
+        prompt = "".join(message["content"] for message in request.get("messages", []))
+        with self.server._lock:
+            self.server.prompt_tokens += len(prompt) // 4
+        verdict = {"scores": {"accuracy": 1.0}, "rationale": "stub"}
+        items = len(ITEM_HEADING.findall(prompt))
+        if items:
+            verdict = {"items": [{"id": i, **verdict} for i in range(items)]}
+        body = json.dumps({
+            "model": request.get("model", "stub"),
+            "choices": [{"message": {"role": "assistant", "content": json.dumps(verdict)}}],
+            "usage": USAGE,
+        }).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class StubJudgeServer(ThreadingHTTPServer):
+    """Threaded stub judge server with a configurable response latency."""
+    daemon_threads = True
+    # The default backlog of 5 drops bursts of concurrent connects into SYN retries
+    request_queue_size = 128
+
+    def __init__(self, latency: float = 0.05, port: int = 0, rpm: int = 0, tpm: int = 0, period: float = 60.0):
+        """Bind the server on localhost.
+
+        Args:
+            latency: Seconds to wait before answering each request
+            port: Port to bind, 0 picks a free port
+            rpm: Requests allowed per period, 0 for no limit
+            tpm: Tokens allowed per period, 0 for no limit
+            period: Seconds over which the budgets refill completely
+        """
+        super().__init__(("127.0.0.1", port), StubJudgeHandler)
+        self.latency = latency
+        self.rpm = rpm
+        self.tpm = tpm
+        self.period = period
+        self.served = 0
+        self.throttled = 0
+        self.prompt_tokens = 0
+        self._budget = {"requests": float(rpm), "tokens": float(tpm), "updated": time.monotonic()}
+        self._lock = threading.Lock()
+
+    def take(self, tokens: int) -> float:
+        """Charge one request; return 0, or the seconds to wait if a budget is spent."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._budget["updated"]
+            self._budget["updated"] = now
+            retry_after = 0.0
+            for name, limit, cost in (("requests", self.rpm, 1), ("tokens", self.tpm, tokens)):
+                if limit <= 0:
+                    continue
+                self._budget[name] = min(limit, self._budget[name] + elapsed * limit / self.period)
+                if self._budget[name] < cost:
+                    retry_after = max(retry_after, (cost - self._budget[name]) * self.period / limit)
+            if retry_after:
+                self.throttled += 1
+                return retry_after
+            self._budget["requests"] -= 1
+            self._budget["tokens"] -= tokens
+            self.served += 1
+            return 0.0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def __enter__(self) -> "StubJudgeServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,369 @@
+"""Offline benchmark suite for dispatch, persistence and worker throughput.
+
+Everything runs in one process without external services: Celery
+publishes to the in-memory kombu transport (or runs tasks eagerly), the
+database is a temporary SQLite file unless ``--database-url`` points at a
+local Postgres, and judge calls go to the stub judge server. Redis-backed
+caches and status events are replaced by in-process equivalents.
+
+Measured:
+    bulk_insert        rows/sec of ``create_evaluations_bulk``
+    api_dispatch       requests/sec of ``POST /api/evaluations:batch``
+    worker_sync        evaluations/sec of the ``evaluate`` task
+    worker_async       evaluations/sec of the ``evaluate_batch`` task
+    worker_threaded    evaluations/sec of ``evaluate`` tasks run from a
+                       thread pool, sharing completion writer flushes
+    storage_<codec>    rows/sec fetched with large payloads stored with
+                       each compression codec, plus stored bytes per row
+    scoring_vectorized outputs/sec scored by the NumPy deterministic checks
+    scoring_python     outputs/sec scored by per-row pure-Python checks
+
+Each result carries p50/p99 latency of its unit of work. Results are
+written as JSON so runs from different commits can be compared with
+``benchmarks.compare``.
+
+Usage:
+    PYTHONPATH=src poetry run python -m benchmarks.suite --output bench-results.json
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+_tmpdir = tempfile.mkdtemp(prefix="aieb-bench-")
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ.setdefault("OPENAI_MODEL", "stub-judge")
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--database-url", default=f"sqlite:///{_tmpdir}/bench.db")
+    parser.add_argument("--only", nargs="+", help="run only these benchmarks")
+    parser.add_argument("--rows", type=int, default=20000, help="rows for bulk_insert")
+    parser.add_argument("--insert-batch", type=int, default=1000, help="rows per bulk insert")
+    parser.add_argument("--requests", type=int, default=200, help="requests for api_dispatch")
+    parser.add_argument("--items-per-request", type=int, default=10)
+    parser.add_argument("--api-concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=5, help="unmeasured requests before api_dispatch")
+    parser.add_argument("--evaluations", type=int, default=200, help="evaluations per worker benchmark")
+    parser.add_argument("--worker-threads", type=int, default=16, help="threads for worker_threaded")
+    parser.add_argument("--judge-latency", type=float, default=0.01, help="stub judge latency in seconds")
+    parser.add_argument("--storage-rows", type=int, default=500, help="rows per storage benchmark")
+    parser.add_argument("--payload-kb", type=int, default=200, help="agent_output size for storage benchmarks")
+    parser.add_argument("--scoring-rows", type=int, default=20000, help="outputs per scoring benchmark")
+    parser.add_argument("--scoring-batch", type=int, default=500, help="outputs scored per call")
+    return parser.parse_args(argv)
+
+
+def summarize(name: str, units: int, unit: str, elapsed: float, latencies: Sequence[float]) -> Dict[str, Any]:
+    """Build one result record.
+
+    Args:
+        name: Benchmark name
+        units: Units of work done, e.g. rows or requests
+        unit: Unit label used for the throughput
+        elapsed: Wall-clock seconds for all units
+        latencies: Seconds per measured operation
+
+    Returns:
+        Result record with throughput and p50/p99 latency in milliseconds
+    """
+    latencies_ms = np.asarray(latencies) * 1000
+    return {
+        "name": name,
+        "throughput": units / elapsed,
+        "unit": f"{unit}/sec",
+        "count": units,
+        "elapsed_seconds": elapsed,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Sequence[str] | None = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    # The engines are created at import time from DATABASE_URL
+    os.environ["DATABASE_URL"] = args.database_url
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    import httpx
+    from sqlalchemy import func, select
+
+    from aieb_evaluation_svc.app import app
+    from aieb_evaluation_svc.core.config import settings
+    from aieb_evaluation_svc.models import Agent, Base, EvaluationCriteria
+    from aieb_evaluation_svc.models.base import SessionLocal, engine
+    from aieb_evaluation_svc.models.compression import zstandard
+    from aieb_evaluation_svc.models.evaluation import Evaluation
+    from aieb_evaluation_svc.schemas.evaluation import EvaluationItem
+    from aieb_evaluation_svc.services.criteria_cache import CriteriaCache, set_criteria_cache
+    from aieb_evaluation_svc.services.deterministic_scoring import parse_checks, score_outputs
+    from aieb_evaluation_svc.services.evaluation_service import create_evaluations_bulk
+    from aieb_evaluation_svc.services.rate_limit import TokenBucketLimiter, set_judge_rate_limiter
+    from aieb_evaluation_svc.services.single_flight import InFlightRegistry, set_in_flight_registry
+    from aieb_evaluation_svc.services.status_events import StatusEventPublisher, set_status_publisher
+    from aieb_evaluation_svc.worker.async_executor import shutdown_async_executor
+    from aieb_evaluation_svc.worker.celery_app import celery_app, evaluate, evaluate_batch
+    from aieb_evaluation_svc.worker.completion_writer import shutdown_completion_writer
+    from benchmarks import scoring_baseline
+    from benchmarks.stub_judge import StubJudgeServer
+
+    class NullStatusPublisher(StatusEventPublisher):
+        def __init__(self):
+            super().__init__(redis_client=None)
+
+        def publish_many(self, events):
+            pass
+
+    settings.JUDGE_CACHE_ENABLED = False
+    set_criteria_cache(CriteriaCache(settings.CRITERIA_CACHE_MAX_ENTRIES))
+    set_status_publisher(NullStatusPublisher())
+    # Every benchmark item is distinct; keep the in-flight registry off Redis
+    set_in_flight_registry(InFlightRegistry(settings.SINGLE_FLIGHT_TTL_SECONDS))
+    # The stub judge has no rate limits; judge calls still go through adaptive concurrency
+    set_judge_rate_limiter(TokenBucketLimiter(0, 0, settings.JUDGE_RATE_LIMIT_MAX_WAIT_SECONDS, "bench"))
+    celery_app.conf.update(broker_url="memory://", result_backend="cache+memory://")
+
+    Base.metadata.create_all(engine)
+    with SessionLocal() as session:
+        agent = Agent(name=f"bench-agent-{time.time_ns()}")
+        session.add(agent)
+        session.flush()
+        criteria = EvaluationCriteria(agent_id=agent.id, version=1, criteria_content="Be correct. " * 200)
+        session.add(criteria)
+        session.commit()
+        criteria_id = criteria.id
+        agent_id = agent.id
+
+    def items(count: int, label: str) -> List[EvaluationItem]:
+        return [
+            EvaluationItem(criteria_id=criteria_id, agent_prompt=f"{label} prompt {i}", agent_output=f"output {i}")
+            for i in range(count)
+        ]
+
+    def bulk_insert() -> Dict[str, Any]:
+        latencies = []
+        start = time.perf_counter()
+        with SessionLocal() as session:
+            for offset in range(0, args.rows, args.insert_batch):
+                batch = items(min(args.insert_batch, args.rows - offset), f"insert {offset}")
+                batch_start = time.perf_counter()
+                create_evaluations_bulk(session, batch)
+                latencies.append(time.perf_counter() - batch_start)
+        return summarize("bulk_insert", args.rows, "rows", time.perf_counter() - start, latencies)
+
+    def api_dispatch() -> Dict[str, Any]:
+        body = {"items": [item.model_dump(mode="json") for item in items(args.items_per_request, "api")]}
+
+        async def run() -> Tuple[float, List[float]]:
+            latencies: List[float] = []
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                async def worker(requests: Iterator[int], measured: bool) -> None:
+                    for _ in requests:
+                        request_start = time.perf_counter()
+                        response = await client.post("/api/evaluations:batch", json=body)
+                        response.raise_for_status()
+                        if measured:
+                            latencies.append(time.perf_counter() - request_start)
+
+                # Warm up connection pools and lazily built state before measuring
+                await worker(iter(range(args.warmup)), measured=False)
+                remaining = iter(range(args.requests))
+                start = time.perf_counter()
+                await asyncio.gather(*(worker(remaining, measured=True) for _ in range(args.api_concurrency)))
+            return time.perf_counter() - start, latencies
+
+        elapsed, latencies = asyncio.run(run())
+        result = summarize("api_dispatch", args.requests, "requests", elapsed, latencies)
+        result["items_per_request"] = args.items_per_request
+        return result
+
+    def pending_ids(label: str) -> List[str]:
+        with SessionLocal() as session:
+            return [str(i) for i in create_evaluations_bulk(session, items(args.evaluations, label))]
+
+    def worker_sync() -> Dict[str, Any]:
+        ids = pending_ids("sync")
+        latencies = []
+        start = time.perf_counter()
+        for evaluation_id in ids:
+            task_start = time.perf_counter()
+            evaluate.apply(args=(evaluation_id,), throw=True)
+            latencies.append(time.perf_counter() - task_start)
+        return summarize("worker_sync", len(ids), "evaluations", time.perf_counter() - start, latencies)
+
+    def worker_async() -> Dict[str, Any]:
+        ids = pending_ids("async")
+        size = settings.WORKER_ASYNC_CONCURRENCY
+        latencies = []
+        start = time.perf_counter()
+        for offset in range(0, len(ids), size):
+            task_start = time.perf_counter()
+            evaluate_batch.apply(args=(ids[offset:offset + size],), throw=True)
+            latencies.append(time.perf_counter() - task_start)
+        result = summarize("worker_async", len(ids), "evaluations", time.perf_counter() - start, latencies)
+        result["batch_size"] = size
+        return result
+
+    def worker_threaded() -> Dict[str, Any]:
+        ids = pending_ids("threaded")
+
+        def run(evaluation_id: str) -> float:
+            task_start = time.perf_counter()
+            evaluate.apply(args=(evaluation_id,), throw=True)
+            return time.perf_counter() - task_start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.worker_threads) as pool:
+            latencies = list(pool.map(run, ids))
+        result = summarize("worker_threaded", len(ids), "evaluations", time.perf_counter() - start, latencies)
+        result["threads"] = args.worker_threads
+        return result
+
+    def transcript(rng: np.random.Generator, size: int) -> str:
+        # Agent transcripts repeat a working vocabulary, which is what makes them compress
+        words = rng.choice(vocabulary, size=size // 6)
+        return " ".join(words.tolist())[:size]
+
+    vocabulary = np.array([
+        "the", "agent", "called", "tool", "search", "returned", "result", "error", "retry", "user",
+        "asked", "answer", "because", "function", "file", "line", "value", "should", "check", "output",
+    ] + [f"token{i}" for i in range(200)])
+
+    def storage(codec: str) -> Dict[str, Any]:
+        settings.STORAGE_COMPRESSION_CODEC = codec
+        rng = np.random.default_rng(0)
+        with SessionLocal() as session:
+            storage_criteria = EvaluationCriteria(agent_id=agent_id, version=time.time_ns(), criteria_content="storage")
+            session.add(storage_criteria)
+            session.commit()
+            raw_bytes = 0
+            for offset in range(0, args.storage_rows, 100):
+                batch = []
+                for i in range(offset, min(offset + 100, args.storage_rows)):
+                    output = transcript(rng, args.payload_kb * 1024)
+                    raw_bytes += len(output)
+                    batch.append(Evaluation(
+                        criteria_id=storage_criteria.id, status="completed", agent_prompt=f"storage prompt {i}",
+                        agent_output=output, results={"scores": {"accuracy": 1.0}, "rationale": output[:2000]},
+                    ))
+                session.add_all(batch)
+                session.commit()
+            stored_bytes = session.scalar(
+                select(func.sum(
+                    func.length(Evaluation.agent_prompt)
+                    + func.length(Evaluation.agent_output)
+                    + func.length(Evaluation.results)
+                )).where(Evaluation.criteria_id == storage_criteria.id)
+            )
+
+        latencies = []
+        start = time.perf_counter()
+        with SessionLocal() as session:
+            query = (
+                select(Evaluation)
+                .where(Evaluation.criteria_id == storage_criteria.id)
+                .execution_options(yield_per=100)
+            )
+            page_start = time.perf_counter()
+            for partition in session.scalars(query).partitions():
+                assert all(len(evaluation.agent_output) > 0 for evaluation in partition)
+                latencies.append(time.perf_counter() - page_start)
+                page_start = time.perf_counter()
+        result = summarize(f"storage_{codec}", args.storage_rows, "rows", time.perf_counter() - start, latencies)
+        result["stored_bytes_per_row"] = stored_bytes / args.storage_rows
+        result["compression_ratio"] = raw_bytes / stored_bytes
+        return result
+
+    scoring_checks, _ = parse_checks("""```checks
+{"type": "exact_match", "expected": "the answer is correct"}
+{"type": "regex", "pattern": "error \\\\d+"}
+{"type": "keywords", "keywords": ["search", "retry", "token7", "answer"]}
+{"type": "length", "max_chars": 1500}
+{"type": "json_schema", "schema": {"type": "object", "required": ["answer"]}}
+{"type": "rouge_1", "reference": "the agent called the search tool and returned the answer to the user"}
+{"type": "bleu", "reference": "the agent called the search tool and returned the answer to the user"}
+```""")
+
+    def scoring(name: str, score: Callable[[Sequence[Any], Sequence[str]], List[Dict[str, Any]]]) -> Dict[str, Any]:
+        rng = np.random.default_rng(0)
+        outputs = [transcript(rng, int(size)) for size in rng.integers(200, 2000, args.scoring_rows)]
+        latencies = []
+        start = time.perf_counter()
+        for offset in range(0, len(outputs), args.scoring_batch):
+            batch_start = time.perf_counter()
+            score(scoring_checks, outputs[offset:offset + args.scoring_batch])
+            latencies.append(time.perf_counter() - batch_start)
+        result = summarize(name, len(outputs), "outputs", time.perf_counter() - start, latencies)
+        result["batch_size"] = args.scoring_batch
+        return result
+
+    benchmarks: Dict[str, Callable[[], Dict[str, Any]]] = {
+        "bulk_insert": bulk_insert,
+        "api_dispatch": api_dispatch,
+        "worker_sync": worker_sync,
+        "worker_async": worker_async,
+        "worker_threaded": worker_threaded,
+        "scoring_vectorized": lambda: scoring("scoring_vectorized", score_outputs),
+        "scoring_python": lambda: scoring("scoring_python", scoring_baseline.score_outputs),
+    }
+    codecs = ["none", "zlib"] + (["zstd"] if zstandard is not None else [])
+    default_codec = settings.STORAGE_COMPRESSION_CODEC
+    for codec in codecs:
+        benchmarks[f"storage_{codec}"] = lambda codec=codec: storage(codec)
+    selected = args.only or list(benchmarks)
+
+    results = []
+    with StubJudgeServer(latency=args.judge_latency) as server:
+        settings.OPENAI_BASE_URL = server.base_url
+        for name in selected:
+            result = benchmarks[name]()
+            settings.STORAGE_COMPRESSION_CODEC = default_codec
+            results.append(result)
+            print(
+                f"{name:14s} {result['throughput']:10.1f} {result['unit']:16s} "
+                f"p50 {result['p50_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms"
+                + (f"  {result['stored_bytes_per_row'] / 1024:8.1f} KiB/row" if "stored_bytes_per_row" in result else "")
+            )
+    shutdown_async_executor()
+    shutdown_completion_writer()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "database": engine.url.get_backend_name(),
+        "judge_latency_seconds": args.judge_latency,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
-from aieb_evaluation_svc.config import settings
+from aieb_evaluation_svc.core.config import settings
 
 config = context.config
 
@@ -0,0 +1,40 @@
+"""Add evaluation batch and dispatch columns
+
+Revision ID: 9a4f2c6e1b73
+Revises: 5c0e7a1d9b42
+Create Date: 2026-10-18 19:41:27.730164
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4f2c6e1b73'
+down_revision: Union[str, None] = '5c0e7a1d9b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('evaluation', sa.Column('batch_id', sa.UUID(), nullable=True))
+    op.add_column('evaluation', sa.Column('dispatched_at', sa.DateTime(), nullable=True))
+    # Every existing evaluation was published when it was created
+    op.execute('UPDATE evaluation SET dispatched_at = created_at')
+    op.create_index(
+        'ix_evaluation_undispatched_created_at_id', 'evaluation', ['created_at', 'id'], unique=False,
+        postgresql_where=sa.text('dispatched_at IS NULL'),
+        sqlite_where=sa.text('dispatched_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_evaluation_undispatched_created_at_id', table_name='evaluation',
+        postgresql_where=sa.text('dispatched_at IS NULL'),
+        sqlite_where=sa.text('dispatched_at IS NULL'),
+    )
+    op.drop_column('evaluation', 'dispatched_at')
+    op.drop_column('evaluation', 'batch_id')
@@ -0,0 +1,39 @@
+"""Add evaluation carried_from and carried_items columns
+
+Revision ID: a7c3e9d1f482
+Revises: f4b7d2c9e016
+Create Date: 2026-10-19 01:06:52.841290
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e9d1f482'
+down_revision: Union[str, None] = 'f4b7d2c9e016'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('evaluation', sa.Column('carried_from', sa.UUID(), nullable=True))
+    # Compressed JSON, like the other payload columns
+    op.add_column('evaluation', sa.Column('carried_items', sa.LargeBinary(), nullable=True))
+    op.create_index(
+        'ix_evaluation_carried_from', 'evaluation', ['carried_from'], unique=False,
+        postgresql_where=sa.text('carried_from IS NOT NULL'),
+        sqlite_where=sa.text('carried_from IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_evaluation_carried_from', table_name='evaluation',
+        postgresql_where=sa.text('carried_from IS NOT NULL'),
+        sqlite_where=sa.text('carried_from IS NOT NULL'),
+    )
+    op.drop_column('evaluation', 'carried_items')
+    op.drop_column('evaluation', 'carried_from')
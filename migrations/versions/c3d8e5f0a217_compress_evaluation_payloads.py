@@ -0,0 +1,135 @@
+"""Compress evaluation payload columns
+
+Revision ID: c3d8e5f0a217
+Revises: 9a4f2c6e1b73
+Create Date: 2026-10-18 21:06:53.512840
+
+"""
+import json
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d8e5f0a217'
+down_revision: Union[str, None] = '9a4f2c6e1b73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PAYLOAD_COLUMNS = ('agent_prompt', 'agent_output', 'results')
+
+# Rows rewritten per round trip
+BATCH_SIZE = 500
+
+# Frozen copy of the blob format of aieb_evaluation_svc.models.compression as
+# of this revision, so later codec changes do not change what it writes
+MARKER_NONE, MARKER_ZLIB, MARKER_ZSTD = 0, 1, 2
+ZLIB_LEVEL = 6
+MIN_BYTES = 256
+
+
+def encode_payload(data: bytes) -> bytes:
+    # zlib needs no optional package, and the models read every marker
+    if len(data) < MIN_BYTES:
+        return bytes([MARKER_NONE]) + data
+    return bytes([MARKER_ZLIB]) + zlib.compress(data, ZLIB_LEVEL)
+
+
+def decode_payload(blob) -> bytes:
+    blob = bytes(blob)
+    marker, body = blob[0], blob[1:]
+    if marker == MARKER_NONE:
+        return body
+    if marker == MARKER_ZLIB:
+        return zlib.decompress(body)
+    if marker == MARKER_ZSTD:
+        if zstandard is None:
+            raise RuntimeError('Downgrading zstd-compressed payloads requires the zstandard package')
+        return zstandard.ZstdDecompressor().decompress(body)
+    raise RuntimeError(f'Unknown codec marker: {marker}')
+
+
+def _to_text(value):
+    # Drivers return JSON columns parsed on some backends and as text on others
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (bytes, memoryview)):
+        return decode_payload(value).decode('utf-8')
+    return json.dumps(value)
+
+
+def _compress(value):
+    text = _to_text(value)
+    return None if text is None else encode_payload(text.encode('utf-8'))
+
+
+def _copy_columns(source_suffix: str, target_suffix: str, convert) -> None:
+    """Rewrite every row's payload columns in keyset-ordered batches."""
+    bind = op.get_bind()
+    evaluation = sa.table(
+        'evaluation',
+        sa.column('id'),
+        *(sa.column(f'{name}{source_suffix}') for name in PAYLOAD_COLUMNS),
+        *(sa.column(f'{name}{target_suffix}') for name in PAYLOAD_COLUMNS),
+    )
+    update = (
+        evaluation.update()
+        .where(evaluation.c.id == sa.bindparam('row_id'))
+        .values({f'{name}{target_suffix}': sa.bindparam(f'new_{name}') for name in PAYLOAD_COLUMNS})
+    )
+    last_id = None
+    while True:
+        query = sa.select(
+            evaluation.c.id, *(evaluation.c[f'{name}{source_suffix}'] for name in PAYLOAD_COLUMNS)
+        ).order_by(evaluation.c.id).limit(BATCH_SIZE)
+        if last_id is not None:
+            query = query.where(evaluation.c.id > last_id)
+        rows = bind.execute(query).all()
+        if not rows:
+            break
+        bind.execute(update, [
+            {'row_id': row[0], **{f'new_{name}': convert(value) for name, value in zip(PAYLOAD_COLUMNS, row[1:])}}
+            for row in rows
+        ])
+        last_id = rows[-1][0]
+
+
+def _swap_columns(new_suffix: str, column_types, nullable_prompt: bool) -> None:
+    with op.batch_alter_table('evaluation') as batch_op:
+        for name in PAYLOAD_COLUMNS:
+            batch_op.drop_column(name)
+    with op.batch_alter_table('evaluation') as batch_op:
+        for name in PAYLOAD_COLUMNS:
+            batch_op.alter_column(
+                f'{name}{new_suffix}',
+                new_column_name=name,
+                existing_type=column_types[name],
+                nullable=nullable_prompt if name == 'agent_prompt' else True,
+            )
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('evaluation') as batch_op:
+        for name in PAYLOAD_COLUMNS:
+            batch_op.add_column(sa.Column(f'{name}_compressed', sa.LargeBinary(), nullable=True))
+
+    _copy_columns('', '_compressed', _compress)
+    _swap_columns('_compressed', {name: sa.LargeBinary() for name in PAYLOAD_COLUMNS}, nullable_prompt=False)
+
+
+def downgrade() -> None:
+    column_types = {'agent_prompt': sa.Text(), 'agent_output': sa.Text(), 'results': sa.JSON()}
+    with op.batch_alter_table('evaluation') as batch_op:
+        for name in PAYLOAD_COLUMNS:
+            batch_op.add_column(sa.Column(f'{name}_plain', column_types[name], nullable=True))
+
+    _copy_columns('', '_plain', _to_text)
+    _swap_columns('_plain', column_types, nullable_prompt=False)
@@ -0,0 +1,36 @@
+"""Add evaluation duplicate_of column
+
+Revision ID: e6b1d4a8f350
+Revises: c3d8e5f0a217
+Create Date: 2026-10-18 21:12:04.518377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b1d4a8f350'
+down_revision: Union[str, None] = 'c3d8e5f0a217'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('evaluation', sa.Column('duplicate_of', sa.UUID(), nullable=True))
+    op.create_index(
+        'ix_evaluation_duplicate_of', 'evaluation', ['duplicate_of'], unique=False,
+        postgresql_where=sa.text('duplicate_of IS NOT NULL'),
+        sqlite_where=sa.text('duplicate_of IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_evaluation_duplicate_of', table_name='evaluation',
+        postgresql_where=sa.text('duplicate_of IS NOT NULL'),
+        sqlite_where=sa.text('duplicate_of IS NOT NULL'),
+    )
+    op.drop_column('evaluation', 'duplicate_of')
@@ -0,0 +1,55 @@
+"""Add evaluation run table
+
+Revision ID: f4b7d2c9e016
+Revises: e6b1d4a8f350
+Create Date: 2026-10-18 23:41:27.305118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b7d2c9e016'
+down_revision: Union[str, None] = 'e6b1d4a8f350'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('evaluation_run',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('total', sa.BigInteger(), nullable=False),
+    sa.Column('completed', sa.BigInteger(), nullable=False),
+    sa.Column('failed', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('resumed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # SQLite cannot alter constraints, so the table is rebuilt there
+    with op.batch_alter_table('evaluation') as batch_op:
+        batch_op.add_column(sa.Column('run_id', sa.UUID(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_evaluation_run_id_evaluation_run', 'evaluation_run', ['run_id'], ['id']
+        )
+    op.create_index(
+        'ix_evaluation_run_status', 'evaluation', ['run_id', 'status'], unique=False,
+        postgresql_where=sa.text('run_id IS NOT NULL'),
+        sqlite_where=sa.text('run_id IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_evaluation_run_status', table_name='evaluation',
+        postgresql_where=sa.text('run_id IS NOT NULL'),
+        sqlite_where=sa.text('run_id IS NOT NULL'),
+    )
+    with op.batch_alter_table('evaluation') as batch_op:
+        batch_op.drop_constraint('fk_evaluation_run_id_evaluation_run', type_='foreignkey')
+        batch_op.drop_column('run_id')
+    op.drop_table('evaluation_run')
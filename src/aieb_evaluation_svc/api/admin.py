@@ -0,0 +1,63 @@
+"""FastAPI endpoints for operational introspection and maintenance."""
+
+import logging
+import uuid
+from typing import Dict, Optional
+
+from fastapi import APIRouter, HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from aieb_evaluation_svc.api.celery_tasks import TaskDispatchResponse
+from aieb_evaluation_svc.services.criteria_cache import get_criteria_cache
+from aieb_evaluation_svc.services.judge_cache import get_judge_cache
+from aieb_evaluation_svc.worker.celery_app import recompute_score_aggregates_task
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Create router
+admin_router = APIRouter()
+
+
+@admin_router.get("/admin/cache-stats")
+async def get_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Return hit, miss and eviction counters of the in-process caches.
+
+    Returns:
+        Mapping of cache name to its counters
+    """
+    return {
+        "judge_cache": get_judge_cache().stats(),
+        "criteria_cache": get_criteria_cache().stats(),
+    }
+
+
+@admin_router.post("/admin/score-aggregates:recompute", response_model=TaskDispatchResponse)
+async def recompute_score_aggregates(
+    agent_id: Optional[uuid.UUID] = None, criteria_version: Optional[int] = None
+) -> TaskDispatchResponse:
+    """Dispatch a rebuild of the score aggregates from completed evaluations.
+
+    Args:
+        agent_id: Only rebuild this agent's aggregates
+        criteria_version: Only rebuild this criteria version's aggregates
+
+    Returns:
+        TaskDispatchResponse containing the task ID
+
+    Raises:
+        HTTPException: If task dispatch fails
+    """
+    try:
+        logger.info(f"Dispatching score aggregate recompute for agent={agent_id} version={criteria_version}")
+        async_result = await run_in_threadpool(
+            recompute_score_aggregates_task.delay, None if agent_id is None else str(agent_id), criteria_version
+        )
+        return TaskDispatchResponse(task_id=async_result.id)
+
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to dispatch task"
+        )
@@ -1,12 +1,15 @@
 """FastAPI endpoints for triggering Celery tasks."""
 
 import logging
+import math
 from typing import Any
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
-from aieb_evaluation_svc.worker.celery_app import add
+from aieb_evaluation_svc.services.backpressure import admission_delay
+from aieb_evaluation_svc.worker.celery_app import INTERACTIVE_LANE, add
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -20,6 +23,24 @@ class TaskDispatchResponse(BaseModel):
     task_id: str
 
 
+async def reject_if_backlogged(lane: str) -> None:
+    """Refuse a submission while the broker queues it would join are backed up.
+
+    Args:
+        lane: Scheduling lane of the submission
+
+    Raises:
+        HTTPException: 429 Too Many Requests with a ``Retry-After`` header
+    """
+    delay = await run_in_threadpool(admission_delay, lane)
+    if delay is not None:
+        raise HTTPException(
+            status_code=429,
+            detail=f"The {lane} queue is backed up, retry later",
+            headers={"Retry-After": str(math.ceil(delay))},
+        )
+
+
 @celery_tasks_router.get("/test-celery-task", response_model=TaskDispatchResponse)
 async def trigger_test_celery_task(x: int, y: int) -> TaskDispatchResponse:
     """Trigger the Celery add test task.
@@ -32,8 +53,9 @@ async def trigger_test_celery_task(x: int, y: int) -> TaskDispatchResponse:
         TaskDispatchResponse containing the task ID
         
     Raises:
-        HTTPException: If task dispatch fails
+        HTTPException: If the interactive queue is backed up or task dispatch fails
     """
+    await reject_if_backlogged(INTERACTIVE_LANE)
     try:
         logger.info(f"Dispatching add task with x={x}, y={y}")
         
@@ -0,0 +1,176 @@
+"""FastAPI endpoints for evaluation runs."""
+
+import logging
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from aieb_evaluation_svc.api.celery_tasks import reject_if_backlogged
+from aieb_evaluation_svc.models.base import get_async_db
+from aieb_evaluation_svc.models.evaluation_run import EvaluationRun
+from aieb_evaluation_svc.schemas.evaluation import (
+    CriteriaReevaluationResponse,
+    EvaluationRunCreate,
+    EvaluationRunResponse,
+    EvaluationRunResumeResponse,
+)
+from aieb_evaluation_svc.services.evaluation_service import (
+    load_criteria,
+    load_previous_version,
+    reevaluated_items,
+    resume_run,
+)
+from aieb_evaluation_svc.worker.bulk_lane import release_bulk_backlog_task
+from aieb_evaluation_svc.worker.celery_app import BULK_LANE
+from aieb_evaluation_svc.worker.reevaluation import reevaluate_criteria_task
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Create router
+evaluation_runs_router = APIRouter()
+
+
+async def get_run_or_404(db: AsyncSession, run_id: uuid.UUID) -> EvaluationRun:
+    """Load a run, or raise 404 Not Found."""
+    run = await db.get(EvaluationRun, run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Evaluation run not found")
+    return run
+
+
+@evaluation_runs_router.post("/evaluation-runs", response_model=EvaluationRunResponse)
+async def create_evaluation_run(
+    request: EvaluationRunCreate,
+    db: AsyncSession = Depends(get_async_db),
+) -> EvaluationRunResponse:
+    """Create an empty evaluation run.
+
+    Evaluations are added to it by submitting batches with its ``run_id``.
+
+    Args:
+        request: Optional run name
+        db: Database session
+
+    Returns:
+        EvaluationRunResponse of the new run
+    """
+    run = EvaluationRun(name=request.name)
+    db.add(run)
+    await db.commit()
+    await db.refresh(run)
+    logger.info(f"Created evaluation run {run.id}")
+    return EvaluationRunResponse.model_validate(run)
+
+
+@evaluation_runs_router.get("/evaluation-runs/{run_id}", response_model=EvaluationRunResponse)
+async def get_evaluation_run(
+    run_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db),
+) -> EvaluationRunResponse:
+    """Return a run's progress.
+
+    Read from the run's counters alone, so the cost does not grow with
+    the number of evaluations in the run.
+
+    Args:
+        run_id: Run ID
+        db: Database session
+
+    Returns:
+        EvaluationRunResponse with total, completed, failed and pending counts
+
+    Raises:
+        HTTPException: If the run does not exist
+    """
+    return EvaluationRunResponse.model_validate(await get_run_or_404(db, run_id))
+
+
+@evaluation_runs_router.post("/evaluation-runs/{run_id}:resume", response_model=EvaluationRunResumeResponse)
+async def resume_evaluation_run(
+    run_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db),
+) -> EvaluationRunResumeResponse:
+    """Re-enqueue every evaluation of a run that has not finished.
+
+    Use it after workers or the broker restarted and lost task messages.
+    The evaluations go back into the bulk lane backlog, which is released
+    at once and then in fair shares as bulk tasks finish.
+
+    Args:
+        run_id: Run ID
+        db: Database session
+
+    Returns:
+        EvaluationRunResumeResponse with the number of re-enqueued evaluations
+
+    Raises:
+        HTTPException: If the run does not exist
+    """
+    await get_run_or_404(db, run_id)
+    requeued = await db.run_sync(resume_run, run_id)
+    if requeued:
+        await run_in_threadpool(release_bulk_backlog_task.delay)
+    return EvaluationRunResumeResponse(run_id=run_id, requeued=requeued)
+
+
+@evaluation_runs_router.post(
+    "/evaluation-criteria/{criteria_id}:reevaluate", response_model=CriteriaReevaluationResponse
+)
+async def reevaluate_criteria(
+    criteria_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db),
+) -> CriteriaReevaluationResponse:
+    """Re-evaluate the outputs of the previous criteria version against this one.
+
+    The versions are diffed rubric item by rubric item. Each finished
+    evaluation of the previous version gets a new evaluation in which
+    only the changed and added items are judged; unchanged items keep
+    their previous verdicts. The new evaluations are created by a bulk
+    task and added to a new run, whose progress is read from
+    ``GET /evaluation-runs/{run_id}``.
+
+    Args:
+        criteria_id: The new criteria version
+        db: Database session
+
+    Returns:
+        CriteriaReevaluationResponse with the run and task IDs and the item diff
+
+    Raises:
+        HTTPException: If the criteria does not exist, is the agent's first
+            version, the bulk lane is backed up, or the task cannot be dispatched
+    """
+    criteria = (await db.run_sync(load_criteria, [criteria_id])).get(criteria_id)
+    if criteria is None:
+        raise HTTPException(status_code=404, detail="Criteria not found")
+    previous = await db.run_sync(load_previous_version, criteria)
+    if previous is None:
+        raise HTTPException(status_code=422, detail=f"Criteria version {criteria.version} has no previous version")
+    await reject_if_backlogged(BULK_LANE)
+
+    unchanged = reevaluated_items(previous, criteria)
+    run_id = uuid.uuid4()
+    db.add(EvaluationRun(id=run_id, name=f"Re-evaluation against criteria version {criteria.version}"))
+    await db.commit()
+    try:
+        async_result = await run_in_threadpool(reevaluate_criteria_task.delay, str(criteria_id), str(run_id))
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to dispatch task"
+        )
+    logger.info(
+        f"Re-evaluating version {previous.version} against version {criteria.version} in run {run_id}: "
+        f"{len(unchanged)} of {len(criteria.rubric)} rubric items unchanged"
+    )
+    return CriteriaReevaluationResponse(
+        run_id=run_id,
+        task_id=async_result.id,
+        previous_criteria_id=previous.id,
+        changed_items=[item.key for item in criteria.rubric if item.key not in unchanged],
+        unchanged_items=[item.key for item in criteria.rubric if item.key in unchanged],
+    )
@@ -0,0 +1,446 @@
+"""FastAPI endpoints for submitting evaluations."""
+
+import asyncio
+import datetime
+import hashlib
+import logging
+import time
+import uuid
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from aieb_evaluation_svc.api.celery_tasks import reject_if_backlogged
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.models.archived_evaluation import ArchivedEvaluation
+from aieb_evaluation_svc.models.base import get_async_db, get_async_session_factory
+from aieb_evaluation_svc.models.evaluation import Evaluation
+from aieb_evaluation_svc.models.evaluation_run import EvaluationRun
+from aieb_evaluation_svc.schemas.evaluation import (
+    EvaluationBatchRequest,
+    EvaluationBatchResponse,
+    EvaluationDetail,
+    EvaluationListResponse,
+    EvaluationStatus,
+    EvaluationStatusRequest,
+    EvaluationStatusResponse,
+    EvaluationSummary,
+)
+from aieb_evaluation_svc.services.evaluation_service import (
+    attach_duplicates,
+    complete_attached,
+    create_evaluations_bulk,
+    dispatch_evaluations,
+    item_judge_keys,
+    load_criteria,
+    lookup_cached_results,
+    publish_created_events,
+    return_to_backlog,
+    select_lane,
+)
+from aieb_evaluation_svc.services.evaluation_archive import find_archived
+from aieb_evaluation_svc.services.evaluation_export import EXPORT_FORMATS, stream_export
+from aieb_evaluation_svc.services.evaluation_query import (
+    EvaluationFilters,
+    InvalidCursorError,
+    build_list_query,
+    etag_matches,
+    evaluation_etag,
+    split_page,
+)
+from aieb_evaluation_svc.services.single_flight import (
+    IdempotencyStore,
+    get_idempotency_store,
+    get_in_flight_registry,
+)
+from aieb_evaluation_svc.worker.bulk_lane import release_bulk_backlog_task
+from aieb_evaluation_svc.worker.celery_app import INTERACTIVE_LANE
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Create router
+evaluations_router = APIRouter()
+
+# How often a retry polls for the response of the request holding its idempotency key
+IDEMPOTENCY_POLL_SECONDS = 0.1
+
+
+async def replay_idempotent(
+    store: IdempotencyStore, key: str, fingerprint: str
+) -> Optional[EvaluationBatchResponse]:
+    """Reserve an idempotency key, or wait for the response of the request holding it.
+
+    Args:
+        store: Idempotency store
+        key: Client-supplied idempotency key
+        fingerprint: Digest of the request body
+
+    Returns:
+        The stored response to replay, or None if the caller now owns the key
+
+    Raises:
+        HTTPException: If the key was used with another body, or its
+            original request is still running after
+            ``settings.IDEMPOTENCY_WAIT_SECONDS``
+    """
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    while True:
+        record = await run_in_threadpool(store.begin, key, fingerprint)
+        if record is None:
+            return None
+        if record["fingerprint"] != fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+        if record["response"] is not None:
+            logger.info(f"Replaying response for idempotency key {key}")
+            return EvaluationBatchResponse.model_validate(record["response"])
+        if time.monotonic() >= deadline:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+        await asyncio.sleep(IDEMPOTENCY_POLL_SECONDS)
+
+
+@evaluations_router.post("/evaluations:batch", response_model=EvaluationBatchResponse)
+async def create_evaluation_batch(
+    request: EvaluationBatchRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    db: AsyncSession = Depends(get_async_db),
+) -> EvaluationBatchResponse:
+    """Create many evaluations and dispatch their tasks in one request.
+
+    Items whose verdict is already in the judge cache are stored as
+    completed and never reach the broker. Items identical to an evaluation
+    already in flight, in this batch or another, are stored as its
+    followers and receive its outcome instead of a task of their own.
+    Interactive batches are published at once; bulk batches join the
+    per-agent fair-share backlog, which a release task publishes in shares.
+    Items submitted with a ``run_id`` are added to that evaluation run.
+    If an interactive batch cannot be published, its evaluations stay
+    pending and join the bulk backlog.
+    While the broker queue of the batch's lane is backed up, new batches
+    are refused with 429 Too Many Requests and a ``Retry-After`` header;
+    replays of an ``Idempotency-Key`` are still answered.
+
+    A retry carrying the same ``Idempotency-Key`` header and body gets the
+    first request's response without creating anything.
+
+    Args:
+        request: Items to evaluate
+        idempotency_key: Optional client-chosen key naming this submission
+        db: Database session
+
+    Returns:
+        EvaluationBatchResponse containing the batch ID, lane, group ID and evaluation IDs
+
+    Raises:
+        HTTPException: If the batch is too large, references unknown
+            criteria or an unknown run, its lane is backed up, it reuses an
+            idempotency key, or the tasks cannot be dispatched
+    """
+    if len(request.items) > settings.EVALUATION_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds {settings.EVALUATION_BATCH_MAX_ITEMS} items"
+        )
+
+    criteria_ids = {item.criteria_id for item in request.items}
+    criteria = await db.run_sync(load_criteria, criteria_ids)
+    missing = sorted(criteria_ids - criteria.keys(), key=str)
+    if missing:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown criteria_id: {', '.join(str(m) for m in missing)}"
+        )
+    if request.run_id is not None and await db.get(EvaluationRun, request.run_id) is None:
+        raise HTTPException(status_code=422, detail=f"Unknown run_id: {request.run_id}")
+    idempotency = get_idempotency_store()
+    fingerprint = hashlib.sha256(request.model_dump_json().encode()).hexdigest()
+    if idempotency_key is not None:
+        # Retries come when queues are deep, so replays are never shed
+        replayed = await replay_idempotent(idempotency, idempotency_key, fingerprint)
+        if replayed is not None:
+            return replayed
+    # Checked before any work, with the lane the batch gets if nothing is deduplicated
+    try:
+        await reject_if_backlogged(select_lane(len(request.items), request.lane))
+    except HTTPException:
+        if idempotency_key is not None:
+            await run_in_threadpool(idempotency.abort, idempotency_key)
+        raise
+
+    claimed_keys = []
+    # Committed as dispatched but not yet published
+    undispatched = []
+    try:
+        logger.info(f"Creating batch of {len(request.items)} evaluations")
+        keys = item_judge_keys(request.items, criteria)
+        # Redis and broker clients are blocking, keep them off the event loop
+        cached_results = await run_in_threadpool(lookup_cached_results, keys)
+        evaluation_ids, duplicate_of, claimed_keys = await run_in_threadpool(
+            attach_duplicates, keys, cached_results
+        )
+        batch_id = uuid.uuid4()
+        pending_ids = [
+            evaluation_id
+            for evaluation_id, cached, leader in zip(evaluation_ids, cached_results, duplicate_of)
+            if cached is None and leader is None
+        ]
+        lane = select_lane(len(pending_ids), request.lane)
+        await db.run_sync(
+            create_evaluations_bulk,
+            request.items,
+            cached_results,
+            batch_id,
+            lane,
+            evaluation_ids,
+            duplicate_of,
+            request.run_id,
+        )
+        if lane == INTERACTIVE_LANE:
+            undispatched = pending_ids
+        await run_in_threadpool(publish_created_events, evaluation_ids, cached_results, batch_id)
+        await db.run_sync(complete_attached, duplicate_of)
+
+        group_id = None
+        if pending_ids and lane == INTERACTIVE_LANE:
+            group_result = await run_in_threadpool(dispatch_evaluations, pending_ids, batch_id=batch_id)
+            group_id = group_result.id
+            undispatched = []
+        elif pending_ids:
+            await run_in_threadpool(release_bulk_backlog_task.delay)
+        cached = sum(1 for result in cached_results if result is not None)
+        deduplicated = sum(1 for leader in duplicate_of if leader is not None)
+        logger.info(
+            f"Batch dispatched to {lane} lane with group ID: {group_id} "
+            f"({cached} served from judge cache, {deduplicated} attached to in-flight evaluations)"
+        )
+
+        response = EvaluationBatchResponse(
+            batch_id=batch_id,
+            lane=lane,
+            group_id=group_id,
+            evaluation_ids=evaluation_ids,
+            cached=cached,
+            deduplicated=deduplicated,
+            run_id=request.run_id,
+        )
+
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        # Let duplicates and retries run instead of waiting on work that was never dispatched
+        await run_in_threadpool(get_in_flight_registry().release_many, claimed_keys)
+        if undispatched:
+            # No task owns these rows; hand them to the bulk lane backlog
+            try:
+                await db.rollback()
+                await db.run_sync(return_to_backlog, undispatched)
+            except Exception as backlog_error:
+                logger.error(f"Failed to return evaluations of batch {batch_id} to the backlog: {backlog_error}")
+        if idempotency_key is not None:
+            await run_in_threadpool(idempotency.abort, idempotency_key)
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to dispatch task"
+        )
+
+    if idempotency_key is not None:
+        await run_in_threadpool(idempotency.finish, idempotency_key, fingerprint, response.model_dump(mode="json"))
+    return response
+
+
+def get_evaluation_filters(
+    status: Optional[str] = None,
+    criteria_id: Optional[uuid.UUID] = None,
+    agent_id: Optional[uuid.UUID] = None,
+    criteria_version: Optional[int] = None,
+    created_after: Optional[datetime.datetime] = None,
+    created_before: Optional[datetime.datetime] = None,
+) -> EvaluationFilters:
+    """Collect the evaluation filter query parameters."""
+    return EvaluationFilters(
+        status=status,
+        criteria_id=criteria_id,
+        agent_id=agent_id,
+        criteria_version=criteria_version,
+        created_after=created_after,
+        created_before=created_before,
+    )
+
+
+@evaluations_router.get("/evaluations", response_model=EvaluationListResponse)
+async def list_evaluations(
+    filters: EvaluationFilters = Depends(get_evaluation_filters),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
+) -> EvaluationListResponse:
+    """List evaluations newest first with keyset pagination.
+
+    Args:
+        filters: Status, criteria, agent and created_at range filters
+        cursor: ``next_cursor`` of the previous page
+        limit: Page size
+        db: Database session
+
+    Returns:
+        EvaluationListResponse with the page and the next page's cursor
+
+    Raises:
+        HTTPException: If the cursor is invalid
+    """
+    try:
+        query = build_list_query(
+            filters,
+            cursor,
+            limit,
+            Evaluation.id,
+            Evaluation.criteria_id,
+            Evaluation.status,
+            Evaluation.created_at,
+            Evaluation.completed_at,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    rows, next_cursor = split_page((await db.execute(query)).all(), limit)
+    return EvaluationListResponse(
+        items=[EvaluationSummary.model_validate(row) for row in rows],
+        next_cursor=next_cursor,
+    )
+
+
+@evaluations_router.get("/evaluations:export")
+async def export_evaluations(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    include_archive: bool = Query(False),
+    filters: EvaluationFilters = Depends(get_evaluation_filters),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_async_session_factory),
+) -> StreamingResponse:
+    """Stream every matching evaluation, including prompts, outputs and results.
+
+    The body is produced from a server-side cursor while it is sent, so
+    API memory stays constant however many rows match.
+
+    Args:
+        export_format: ``ndjson`` (default) or ``csv``
+        include_archive: Also stream archived evaluations, ahead of the hot rows
+        filters: Status, criteria, agent, criteria version and created_at range filters
+        session_factory: Factory for the session that streams the rows
+
+    Returns:
+        StreamingResponse with the export body
+    """
+    logger.info(f"Starting {export_format} export with {filters}")
+    return StreamingResponse(
+        stream_export(
+            session_factory,
+            filters,
+            export_format,
+            settings.EXPORT_BATCH_SIZE,
+            archive_root=settings.ARCHIVE_PATH if include_archive else None,
+        ),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="evaluations.{export_format}"'},
+    )
+
+
+@evaluations_router.post("/evaluations:status", response_model=EvaluationStatusResponse)
+async def get_evaluation_statuses(
+    request: EvaluationStatusRequest,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+) -> EvaluationStatusResponse | Response:
+    """Look up the status of many evaluations in one query.
+
+    The response carries an ETag over every evaluation's status and
+    completed_at. A client polling a batch sends it back in
+    ``If-None-Match`` and gets an empty 304 until something changed.
+
+    Args:
+        request: Evaluation IDs, and whether to include their results
+        response: Response whose headers receive the ETag
+        if_none_match: ETag of the client's copy, if any
+        db: Database session
+
+    Returns:
+        EvaluationStatusResponse in request order, or 304 Not Modified
+
+    Raises:
+        HTTPException: If more than ``settings.EVALUATION_STATUS_MAX_IDS`` IDs are requested
+    """
+    ids = list(dict.fromkeys(request.ids))
+    if len(ids) > settings.EVALUATION_STATUS_MAX_IDS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Status lookup exceeds {settings.EVALUATION_STATUS_MAX_IDS} ids"
+        )
+
+    columns = [Evaluation.id, Evaluation.status, Evaluation.completed_at]
+    if request.include_results:
+        columns.append(Evaluation.results)
+    found = {row.id: row for row in (await db.execute(select(*columns).where(Evaluation.id.in_(ids)))).all()}
+    rows = [found[evaluation_id] for evaluation_id in ids if evaluation_id in found]
+
+    etag = evaluation_etag(rows, variant="results" if request.include_results else "")
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return EvaluationStatusResponse(
+        items=[EvaluationStatus.model_validate(row) for row in rows],
+        missing=[evaluation_id for evaluation_id in ids if evaluation_id not in found],
+    )
+
+
+@evaluations_router.get("/evaluations/{evaluation_id}", response_model=EvaluationDetail)
+async def get_evaluation(
+    evaluation_id: uuid.UUID,
+    response: Response,
+    include_archive: bool = Query(False),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+) -> EvaluationDetail | Response:
+    """Return one evaluation with its results.
+
+    Args:
+        evaluation_id: Evaluation ID
+        response: Response whose headers receive the ETag
+        include_archive: Look the evaluation up in the archive if it is
+            no longer in the database
+        if_none_match: ETag of the client's copy, if any
+        db: Database session
+
+    Returns:
+        EvaluationDetail, or 304 Not Modified if the client's copy is current
+
+    Raises:
+        HTTPException: If the evaluation does not exist
+    """
+    row = (await db.execute(
+        select(
+            Evaluation.id,
+            Evaluation.criteria_id,
+            Evaluation.status,
+            Evaluation.created_at,
+            Evaluation.completed_at,
+            Evaluation.batch_id,
+            Evaluation.results,
+        ).where(Evaluation.id == evaluation_id)
+    )).one_or_none()
+    if row is None and include_archive:
+        path = await db.scalar(select(ArchivedEvaluation.path).where(ArchivedEvaluation.id == evaluation_id))
+        if path is not None:
+            record = await run_in_threadpool(find_archived, settings.ARCHIVE_PATH, path, evaluation_id)
+            if record is not None:
+                row = EvaluationDetail.model_validate(record)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Evaluation not found")
+
+    etag = evaluation_etag([row])
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return EvaluationDetail.model_validate(row)
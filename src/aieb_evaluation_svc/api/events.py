@@ -0,0 +1,237 @@
+"""FastAPI endpoints that push evaluation status changes to clients."""
+
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.models.base import get_async_session_factory
+from aieb_evaluation_svc.models.evaluation import Evaluation
+from aieb_evaluation_svc.services.status_events import (
+    StatusEvent,
+    StatusEventHub,
+    batch_channel,
+    evaluation_channel,
+    follow_events,
+    get_status_event_hub,
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Create router
+events_router = APIRouter()
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def format_sse(event: Optional[Dict[str, Any]]) -> str:
+    """Render an event, or a keep-alive comment for None, as a server-sent event."""
+    if event is None:
+        return ": keepalive\n\n"
+    return f"event: status\ndata: {json.dumps(event)}\n\n"
+
+
+async def subscribe_evaluation(
+    hub: StatusEventHub,
+    session_factory: async_sessionmaker[AsyncSession],
+    evaluation_id: uuid.UUID,
+) -> Tuple[str, asyncio.Queue, Optional[Dict[str, Any]]]:
+    """Subscribe to an evaluation's channel and read its current status.
+
+    Args:
+        hub: Event hub to subscribe on
+        session_factory: Factory for the session the status is read with
+        evaluation_id: Evaluation to follow
+
+    Returns:
+        The channel, the subscription queue and a snapshot event, which is
+        None if the evaluation does not exist
+    """
+    channel = evaluation_channel(evaluation_id)
+    queue = await hub.subscribe(channel)
+    try:
+        async with session_factory() as session:
+            status = await session.scalar(select(Evaluation.status).where(Evaluation.id == evaluation_id))
+    except Exception:
+        await hub.unsubscribe(channel, queue)
+        raise
+    if status is None:
+        await hub.unsubscribe(channel, queue)
+        return channel, queue, None
+    return channel, queue, StatusEvent(evaluation_id, status).__dict__
+
+
+async def sse_stream(events: AsyncIterator[Optional[Dict[str, Any]]]) -> AsyncIterator[str]:
+    async for event in events:
+        yield format_sse(event)
+
+
+def sse_response(
+    hub: StatusEventHub, channel: str, queue: asyncio.Queue, events: AsyncIterator[Optional[Dict[str, Any]]]
+) -> StreamingResponse:
+    """Wrap events in an SSE response that always releases the subscription.
+
+    The background unsubscribe covers clients that disconnect before the
+    body generator has started and so never reach its ``finally``.
+    """
+    return StreamingResponse(
+        sse_stream(events),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+        background=BackgroundTask(hub.unsubscribe, channel, queue),
+    )
+
+
+@events_router.get("/evaluations/{evaluation_id}/events")
+async def stream_evaluation_events(
+    evaluation_id: uuid.UUID,
+    hub: StatusEventHub = Depends(get_status_event_hub),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_async_session_factory),
+) -> StreamingResponse:
+    """Stream an evaluation's status changes as server-sent events.
+
+    The first event carries the current status; the stream ends after the
+    evaluation completes or fails.
+
+    Args:
+        evaluation_id: Evaluation to follow
+        hub: Event hub the stream is fed from
+        session_factory: Factory for the session the current status is read with
+
+    Returns:
+        StreamingResponse of ``text/event-stream``
+
+    Raises:
+        HTTPException: If the evaluation does not exist or events are unavailable
+    """
+    try:
+        channel, queue, snapshot = await subscribe_evaluation(hub, session_factory, evaluation_id)
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        raise HTTPException(status_code=503, detail="Status events unavailable")
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"Evaluation {evaluation_id} not found")
+
+    events = follow_events(
+        hub, channel, queue, settings.EVENTS_KEEPALIVE_SECONDS, snapshot=snapshot, until_terminal=True
+    )
+    return sse_response(hub, channel, queue, events)
+
+
+@events_router.get("/evaluation-batches/{batch_id}/events")
+async def stream_batch_events(
+    batch_id: uuid.UUID, hub: StatusEventHub = Depends(get_status_event_hub)
+) -> StreamingResponse:
+    """Stream status changes of every evaluation in a batch as server-sent events.
+
+    The stream stays open until the client disconnects.
+
+    Args:
+        batch_id: ``batch_id`` returned by ``POST /evaluations:batch``
+        hub: Event hub the stream is fed from
+
+    Returns:
+        StreamingResponse of ``text/event-stream``
+
+    Raises:
+        HTTPException: If events are unavailable
+    """
+    channel = batch_channel(batch_id)
+    try:
+        queue = await hub.subscribe(channel)
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        raise HTTPException(status_code=503, detail="Status events unavailable")
+
+    events = follow_events(hub, channel, queue, settings.EVENTS_KEEPALIVE_SECONDS)
+    return sse_response(hub, channel, queue, events)
+
+
+async def send_events(websocket: WebSocket, events: AsyncIterator[Optional[Dict[str, Any]]]) -> None:
+    """Send events over an accepted WebSocket until they end or the client leaves.
+
+    Keep-alives are not needed: a concurrent receive notices the
+    disconnect, which cancels the sender.
+
+    Args:
+        websocket: Accepted WebSocket
+        events: Events from :func:`follow_events`
+    """
+    finished = False
+
+    async with anyio.create_task_group() as task_group:
+        async def send() -> None:
+            nonlocal finished
+            async for event in events:
+                if event is not None:
+                    await websocket.send_json(event)
+            finished = True
+            task_group.cancel_scope.cancel()
+
+        async def watch_disconnect() -> None:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+            task_group.cancel_scope.cancel()
+
+        task_group.start_soon(send)
+        task_group.start_soon(watch_disconnect)
+
+    await events.aclose()
+    if finished:
+        await websocket.close()
+
+
+@events_router.websocket("/evaluations/{evaluation_id}/events/ws")
+async def evaluation_events_websocket(
+    websocket: WebSocket,
+    evaluation_id: uuid.UUID,
+    hub: StatusEventHub = Depends(get_status_event_hub),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_async_session_factory),
+) -> None:
+    """WebSocket variant of :func:`stream_evaluation_events`.
+
+    The socket is closed with code 1008 if the evaluation does not exist.
+    """
+    channel, queue, snapshot = await subscribe_evaluation(hub, session_factory, evaluation_id)
+    if snapshot is None:
+        await websocket.close(code=1008)
+        return
+
+    try:
+        await websocket.accept()
+        await send_events(websocket, follow_events(
+            hub, channel, queue, settings.EVENTS_KEEPALIVE_SECONDS, snapshot=snapshot, until_terminal=True
+        ))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await hub.unsubscribe(channel, queue)
+
+
+@events_router.websocket("/evaluation-batches/{batch_id}/events/ws")
+async def batch_events_websocket(
+    websocket: WebSocket,
+    batch_id: uuid.UUID,
+    hub: StatusEventHub = Depends(get_status_event_hub),
+) -> None:
+    """WebSocket variant of :func:`stream_batch_events`."""
+    channel = batch_channel(batch_id)
+    queue = await hub.subscribe(channel)
+
+    try:
+        await websocket.accept()
+        await send_events(websocket, follow_events(hub, channel, queue, settings.EVENTS_KEEPALIVE_SECONDS))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await hub.unsubscribe(channel, queue)
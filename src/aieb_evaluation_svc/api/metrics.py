@@ -0,0 +1,94 @@
+"""Prometheus metrics endpoint and HTTP request instrumentation."""
+
+import logging
+import time
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from aieb_evaluation_svc.core.metrics import HTTP_REQUEST_SECONDS, observe_pools
+from aieb_evaluation_svc.models.base import created_engines
+from aieb_evaluation_svc.worker.celery_app import metrics_registry
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Create router
+metrics_router = APIRouter()
+
+# Route label of requests that matched no route, to bound label cardinality
+UNMATCHED_ROUTE = "<unmatched>"
+
+_registry: Optional[CollectorRegistry] = None
+
+
+def get_metrics_registry() -> CollectorRegistry:
+    """Return the process-wide exposition registry, creating it on first use."""
+    global _registry
+    if _registry is None:
+        _registry = metrics_registry()
+    return _registry
+
+
+class MetricsMiddleware:
+    """Records the latency of every HTTP request by method, route template and status.
+
+    Latency is measured up to the response headers, so long-lived
+    streaming responses (exports, server-sent events) report their time
+    to first byte rather than their lifetime.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        recorded = False
+
+        def record(status: Any) -> None:
+            nonlocal recorded
+            recorded = True
+            # FastAPI stores the matched route in the scope while routing
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.labels(
+                scope["method"], getattr(route, "path", UNMATCHED_ROUTE), str(status)
+            ).observe(time.perf_counter() - started)
+
+        async def send_with_metrics(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                record(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        except Exception:
+            if not recorded:
+                record(500)
+            raise
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def get_metrics(registry: CollectorRegistry = Depends(get_metrics_registry)) -> Response:
+    """Expose metrics in the Prometheus text format.
+
+    Collection reads the Celery queue depth from Redis, so it runs in the
+    threadpool. Pool gauges cover the engines this process has created.
+
+    Args:
+        registry: Registry to expose
+
+    Returns:
+        Response with the current metric samples
+    """
+    def render() -> bytes:
+        observe_pools(created_engines())
+        return generate_latest(registry)
+
+    return Response(await run_in_threadpool(render), media_type=CONTENT_TYPE_LATEST)
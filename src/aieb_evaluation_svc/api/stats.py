@@ -0,0 +1,53 @@
+"""FastAPI endpoints for score statistics."""
+
+import logging
+import uuid
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from aieb_evaluation_svc.models.base import get_async_db
+from aieb_evaluation_svc.models.score_aggregate import ScoreAggregate
+from aieb_evaluation_svc.schemas.stats import AgentScoreStatsResponse
+from aieb_evaluation_svc.services.score_aggregates import summarize_aggregates
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Create router
+stats_router = APIRouter()
+
+
+@stats_router.get("/agents/{agent_id}/stats", response_model=AgentScoreStatsResponse)
+async def get_agent_score_stats(
+    agent_id: uuid.UUID,
+    criteria_version: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+) -> AgentScoreStatsResponse:
+    """Return an agent's score statistics per dimension.
+
+    Answered from the score aggregate table alone: one row per dimension
+    for a single criteria version, or the merged rows of every version
+    when ``criteria_version`` is omitted.
+
+    Args:
+        agent_id: Agent to report on
+        criteria_version: Restrict to one criteria version
+        db: Database session
+
+    Returns:
+        AgentScoreStatsResponse with count, mean, stddev, min, max and
+        p50/p90/p95/p99 per dimension
+    """
+    query = select(ScoreAggregate).where(ScoreAggregate.agent_id == agent_id)
+    if criteria_version is not None:
+        query = query.where(ScoreAggregate.criteria_version == criteria_version)
+    aggregates = (await db.scalars(query)).all()
+
+    return AgentScoreStatsResponse(
+        agent_id=agent_id,
+        criteria_version=criteria_version,
+        dimensions=summarize_aggregates(aggregates),
+    )
@@ -1,8 +1,63 @@
+"""FastAPI application factory.
+
+Building the application touches no settings, database or broker: engines,
+Redis clients and broker connections are created by the first request
+that needs them, and the lifespan closes whatever was created on shutdown.
+"""
+
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 
+from aieb_evaluation_svc.api.admin import admin_router
 from aieb_evaluation_svc.api.celery_tasks import celery_tasks_router
+from aieb_evaluation_svc.api.evaluation_runs import evaluation_runs_router
+from aieb_evaluation_svc.api.evaluations import evaluations_router
+from aieb_evaluation_svc.api.events import events_router
+from aieb_evaluation_svc.api.metrics import MetricsMiddleware, metrics_router
+from aieb_evaluation_svc.api.stats import stats_router
+from aieb_evaluation_svc.models.base import dispose_engines
+from aieb_evaluation_svc.services.status_events import close_status_event_hub
+from aieb_evaluation_svc.worker.celery_app import celery_app
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Release the lazily created resources when the application stops.
+
+    Args:
+        app: The application being served
+    """
+    yield
+    logger.info("Closing database engines, event hub and broker connections")
+    await close_status_event_hub()
+    await dispose_engines()
+    celery_app.close()
+
+
+def create_app() -> FastAPI:
+    """Build the FastAPI application.
+
+    Returns:
+        The application with every router and middleware installed
+    """
+    app = FastAPI(debug=True, lifespan=lifespan)
+    app.add_middleware(MetricsMiddleware)
+
+    # Include routers
+    app.include_router(celery_tasks_router, prefix="/api")
+    app.include_router(evaluations_router, prefix="/api")
+    app.include_router(evaluation_runs_router, prefix="/api")
+    app.include_router(events_router, prefix="/api")
+    app.include_router(stats_router, prefix="/api")
+    app.include_router(admin_router, prefix="/api")
+    app.include_router(metrics_router)
+    return app
 
-app = FastAPI(debug=True)
 
-# Include routers
-app.include_router(celery_tasks_router, prefix="/api")
+app = create_app()
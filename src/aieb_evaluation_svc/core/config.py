@@ -1,3 +1,6 @@
+import threading
+from typing import Any, Optional, cast
+
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 
@@ -8,6 +11,163 @@ class Settings(BaseSettings):
     SERVICE_PORT: int = 8000
     OPENAI_API_KEY: str
     OPENAI_MODEL: str
+    OPENAI_BASE_URL: str = "https://api.openai.com/v1"
     REDIS_BROKER_URL: str = "redis://localhost:6379/0"
 
-settings = Settings()
+    # Database connection pool
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+
+    # Payload storage
+    STORAGE_COMPRESSION_CODEC: str = "zstd"
+    STORAGE_COMPRESSION_MIN_BYTES: int = 256
+
+    # Judge
+    JUDGE_TIMEOUT_SECONDS: float = 60.0
+
+    # Judge rate limits of the provider, shared by every worker through Redis (0 disables a limit)
+    JUDGE_RATE_LIMIT_ENABLED: bool = True
+    JUDGE_RPM_LIMIT: int = 500
+    JUDGE_TPM_LIMIT: int = 200000
+    JUDGE_RATE_LIMIT_REDIS_URL: Optional[str] = None
+    JUDGE_RATE_LIMIT_REDIS_TIMEOUT_SECONDS: float = 0.5
+    JUDGE_RATE_LIMIT_MAX_WAIT_SECONDS: float = 120.0
+    # Tokens budgeted for a judge reply until the actual usage is known
+    JUDGE_COMPLETION_TOKENS_ESTIMATE: int = 300
+    # Retries of requests the provider throttled with 429
+    JUDGE_THROTTLE_MAX_RETRIES: int = 5
+    JUDGE_THROTTLE_BACKOFF_SECONDS: float = 1.0
+
+    # Adaptive (AIMD) limit on judge calls in flight per worker process
+    JUDGE_ADAPTIVE_CONCURRENCY_ENABLED: bool = True
+    JUDGE_CONCURRENCY_INITIAL: int = 4
+    JUDGE_CONCURRENCY_MIN: int = 1
+    JUDGE_CONCURRENCY_MAX: int = 64
+    JUDGE_LATENCY_TOLERANCE: float = 2.0
+
+    # Multi-item judge requests: evaluations sharing criteria are scored together
+    JUDGE_BATCH_ENABLED: bool = False
+    JUDGE_BATCH_MAX_ITEMS: int = 8
+    JUDGE_BATCH_MAX_WAIT_SECONDS: float = 0.05
+
+    # Rubric fan-out: judge each rubric item of a criteria document as its own task
+    RUBRIC_FANOUT_ENABLED: bool = True
+    RUBRIC_FANOUT_MIN_ITEMS: int = 2
+    RUBRIC_ITEM_MAX_RETRIES: int = 3
+    RUBRIC_ITEM_RETRY_BACKOFF_SECONDS: float = 2.0
+    # Evaluations of the previous criteria version re-evaluated per transaction
+    REEVALUATION_BATCH_SIZE: int = 500
+
+    # Judge result cache
+    JUDGE_CACHE_ENABLED: bool = True
+    JUDGE_CACHE_MAX_ENTRIES: int = 10000
+    JUDGE_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    JUDGE_CACHE_REDIS_URL: Optional[str] = None
+    JUDGE_CACHE_REDIS_TIMEOUT_SECONDS: float = 0.5
+
+    # Criteria cache
+    CRITERIA_CACHE_MAX_ENTRIES: int = 1000
+
+    # Single-flight deduplication
+    SINGLE_FLIGHT_ENABLED: bool = True
+    SINGLE_FLIGHT_TTL_SECONDS: int = 3600
+    SINGLE_FLIGHT_REDIS_URL: Optional[str] = None
+    SINGLE_FLIGHT_REDIS_TIMEOUT_SECONDS: float = 0.5
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 24 * 3600
+    IDEMPOTENCY_LOCK_SECONDS: int = 60
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0
+
+    # Batch submission
+    EVALUATION_BATCH_MAX_ITEMS: int = 10000
+    # IDs accepted by one bulk status lookup
+    EVALUATION_STATUS_MAX_IDS: int = 5000
+    EVALUATION_DISPATCH_CHUNK_SIZE: int = 1
+
+    # Scheduling lanes
+    CELERY_INTERACTIVE_QUEUE: str = "evaluations.interactive"
+    CELERY_BULK_QUEUE: str = "evaluations.bulk"
+    EVALUATION_INTERACTIVE_MAX_ITEMS: int = 100
+    BULK_MAX_IN_FLIGHT_PER_AGENT: int = 200
+    BULK_RELEASE_INTERVAL_SECONDS: float = 30.0
+    WORKER_PREFETCH_MULTIPLIER: int = 1
+    TASK_ACKS_LATE: bool = True
+
+    # Load shedding: submissions get 429 while the broker queues are this deep.
+    # Bulk submissions count both queues, so interactive work keeps headroom
+    BACKPRESSURE_ENABLED: bool = True
+    BACKPRESSURE_INTERACTIVE_MAX_DEPTH: int = 20000
+    BACKPRESSURE_BULK_MAX_DEPTH: int = 10000
+    BACKPRESSURE_SAMPLE_SECONDS: float = 1.0
+    BACKPRESSURE_RETRY_AFTER_MIN_SECONDS: float = 1.0
+    BACKPRESSURE_RETRY_AFTER_MAX_SECONDS: float = 60.0
+    BACKPRESSURE_REDIS_TIMEOUT_SECONDS: float = 0.5
+
+    # Celery task results; evaluation outcomes are read from the evaluation table,
+    # so results are only stored when enabled and then expire
+    CELERY_RESULT_BACKEND_URL: Optional[str] = None
+    CELERY_IGNORE_RESULTS: bool = True
+    CELERY_RESULT_EXPIRES_SECONDS: int = 3600
+
+    # Export
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Archival of old finished evaluations to compressed JSONL files
+    ARCHIVE_ENABLED: bool = False
+    ARCHIVE_PATH: str = "archive"
+    ARCHIVE_AFTER_DAYS: int = 90
+    ARCHIVE_BATCH_SIZE: int = 1000
+    ARCHIVE_CODEC: str = "zstd"
+    ARCHIVE_INTERVAL_SECONDS: float = 3600.0
+
+    # Status events
+    EVENTS_REDIS_TIMEOUT_SECONDS: float = 0.5
+    EVENTS_KEEPALIVE_SECONDS: float = 15.0
+
+    # Metrics
+    METRICS_REDIS_TIMEOUT_SECONDS: float = 0.5
+    WORKER_METRICS_PORT: Optional[int] = 9808
+
+    # Worker execution
+    EVALUATION_EXECUTION_MODE: str = "sync"
+    WORKER_ASYNC_CONCURRENCY: int = 32
+
+    # Completion writer: outcomes are committed in batches of up to MAX_ROWS;
+    # MAX_DELAY_MS lets the first outcome wait for others (1 row writes inline).
+    # Prefork and solo pool processes always write inline
+    COMPLETION_WRITER_MAX_ROWS: int = 200
+    COMPLETION_WRITER_MAX_DELAY_MS: float = 0.0
+
+
+_settings: Optional[Settings] = None
+_settings_lock = threading.Lock()
+
+
+def get_settings() -> Settings:
+    """Return the process settings, reading the environment on first use."""
+    global _settings
+    with _settings_lock:
+        if _settings is None:
+            _settings = Settings()
+        return _settings
+
+
+class LazySettings:
+    """Stand-in for the settings object that defers reading the environment.
+
+    Modules read ``settings.X`` when they run rather than when they are
+    imported, so importing the application needs no environment at all.
+    Attribute writes (e.g. ``monkeypatch.setattr`` in tests) go to the
+    real settings.
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(get_settings(), name, value)
+
+
+settings = cast(Settings, LazySettings())
@@ -0,0 +1,228 @@
+"""Prometheus metrics shared by the API and the Celery workers.
+
+Metrics are recorded in the default registry of each process. When one
+scrape target is served by several processes (uvicorn workers, Celery
+prefork children), point ``PROMETHEUS_MULTIPROC_DIR`` at an empty
+directory before starting them: every process then writes its samples
+there and :func:`build_registry` aggregates them at scrape time.
+"""
+
+import logging
+import os
+from typing import Callable, Dict, Iterable, Iterator
+
+import redis
+from kombu.transport.redis import PRIORITY_STEPS, Channel
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+from prometheus_client.metrics_core import GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+from sqlalchemy.engine import Engine
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Judge calls and tasks take seconds, so extend the default buckets upwards
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, float("inf"))
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "aieb_http_request_duration_seconds",
+    "Time from receiving an HTTP request to sending the response headers",
+    ["method", "route", "status"],
+)
+
+TASK_QUEUE_WAIT_SECONDS = Histogram(
+    "aieb_task_queue_wait_seconds",
+    "Time a task spent in the broker between publish and execution start",
+    ["task"],
+    buckets=SLOW_BUCKETS,
+)
+
+TASK_RUN_SECONDS = Histogram(
+    "aieb_task_run_duration_seconds",
+    "Task execution time in the worker",
+    ["task", "state"],
+    buckets=SLOW_BUCKETS,
+)
+
+LOAD_SHED = Counter(
+    "aieb_load_shed",
+    "Submissions rejected with 429 because the broker queues were too deep",
+    ["lane"],
+)
+
+JUDGE_REQUEST_SECONDS = Histogram(
+    "aieb_judge_request_duration_seconds",
+    "Latency of judge model requests",
+    ["client", "outcome"],
+    buckets=SLOW_BUCKETS,
+)
+
+JUDGE_TOKENS = Counter(
+    "aieb_judge_tokens",
+    "Tokens reported by the judge model",
+    ["kind"],
+)
+
+JUDGE_THROTTLED = Counter(
+    "aieb_judge_throttled",
+    "Judge requests the provider rejected with 429 Too Many Requests",
+)
+
+JUDGE_BATCH_ITEMS = Histogram(
+    "aieb_judge_batch_items",
+    "Evaluations scored by one multi-item judge request",
+    buckets=(1, 2, 4, 8, 16, 32, 64, float("inf")),
+)
+
+JUDGE_BATCH_FALLBACKS = Counter(
+    "aieb_judge_batch_fallbacks",
+    "Multi-item judge responses that did not parse and were retried one item per request",
+)
+
+REEVALUATION_RUBRIC_ITEMS = Counter(
+    "aieb_reevaluation_rubric_items",
+    "Rubric items of re-evaluated outputs, carried over from the previous criteria version or judged again",
+    ["outcome"],
+)
+
+JUDGE_RATE_LIMIT_WAIT_SECONDS = Histogram(
+    "aieb_judge_rate_limit_wait_seconds",
+    "Time judge calls waited for the shared request and token budget",
+    buckets=SLOW_BUCKETS,
+)
+
+JUDGE_CONCURRENCY_LIMIT = Gauge(
+    "aieb_judge_concurrency_limit",
+    "Adaptive limit on the judge calls a process keeps in flight",
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_SIZE = Gauge(
+    "aieb_db_pool_size",
+    "Configured size of the SQLAlchemy connection pool",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "aieb_db_pool_checked_out",
+    "Connections currently checked out of the SQLAlchemy pool",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_OVERFLOW = Gauge(
+    "aieb_db_pool_overflow",
+    "Connections open beyond the pool size",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+
+
+def multiprocess_enabled() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def observe_pools(engines: Dict[str, Engine]) -> None:
+    """Copy the current connection pool counters into the pool gauges.
+
+    Pools without sizing (e.g. SQLite's single-connection pools) only
+    report what they support.
+
+    Args:
+        engines: Sync engines by label
+    """
+    for name, engine in engines.items():
+        pool = engine.pool
+        for gauge, counter in (
+            (DB_POOL_SIZE, "size"),
+            (DB_POOL_CHECKED_OUT, "checkedout"),
+            (DB_POOL_OVERFLOW, "overflow"),
+        ):
+            read = getattr(pool, counter, None)
+            if callable(read):
+                gauge.labels(name).set(read())
+
+
+def read_queue_depths(redis_client: redis.Redis, queue_names: Iterable[str]) -> Dict[str, int]:
+    """Read the number of messages waiting in Celery queues with one pipelined round trip.
+
+    Sums the lists kombu keeps per priority step of each queue.
+
+    Args:
+        redis_client: Client for the Redis broker
+        queue_names: Queues to read
+
+    Returns:
+        Depth per queue, in queue name order
+
+    Raises:
+        redis.RedisError: If the broker cannot be read
+    """
+    queues = sorted(set(queue_names))
+    pipe = redis_client.pipeline(transaction=False)
+    for queue in queues:
+        for priority in PRIORITY_STEPS:
+            pipe.llen(f"{queue}{Channel.sep}{priority}" if priority else queue)
+    lengths = pipe.execute()
+    steps = len(PRIORITY_STEPS)
+    return {queue: sum(lengths[i * steps:(i + 1) * steps]) for i, queue in enumerate(queues)}
+
+
+class QueueDepthCollector(Collector):
+    """Reports the number of messages waiting in each Celery queue.
+
+    Depth is read from the Redis broker at scrape time, summing the lists
+    kombu keeps per priority step. Broker errors are logged and the
+    metric is left empty for that scrape.
+    """
+
+    def __init__(self, redis_client: redis.Redis, queue_names: Callable[[], Iterable[str]]):
+        """Create the collector.
+
+        Args:
+            redis_client: Client for the Redis broker
+            queue_names: Returns the queues to report, called per scrape
+        """
+        self.redis = redis_client
+        self.queue_names = queue_names
+
+    def describe(self) -> Iterator[Metric]:
+        yield GaugeMetricFamily("aieb_celery_queue_depth", "Messages waiting in a Celery queue", labels=["queue"])
+
+    def collect(self) -> Iterator[Metric]:
+        family = GaugeMetricFamily("aieb_celery_queue_depth", "Messages waiting in a Celery queue", labels=["queue"])
+        try:
+            depths = read_queue_depths(self.redis, self.queue_names())
+        except redis.RedisError as e:
+            logger.warning(f"Could not read Celery queue depth: {e}")
+        else:
+            for queue, depth in depths.items():
+                family.add_metric([queue], depth)
+        yield family
+
+
+class _ProcessCollector(Collector):
+    # Exposes the default registry through another registry
+    def collect(self) -> Iterator[Metric]:
+        return REGISTRY.collect()
+
+
+def build_registry(*collectors: Collector) -> CollectorRegistry:
+    """Build the registry served to Prometheus.
+
+    Args:
+        collectors: Extra scrape-time collectors, e.g. a QueueDepthCollector
+
+    Returns:
+        Registry with this process's metrics, or every process's metrics
+        in multiprocess mode, plus the extra collectors
+    """
+    registry = CollectorRegistry(auto_describe=False)
+    if multiprocess_enabled():
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry.register(_ProcessCollector())
+    for collector in collectors:
+        registry.register(collector)
+    return registry
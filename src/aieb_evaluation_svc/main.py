@@ -1,7 +1,6 @@
 import logging
 
 import uvicorn
-from aieb_evaluation_svc.app import app
 from aieb_evaluation_svc.core.config import settings
 
 
@@ -12,7 +11,7 @@ logger = logging.getLogger(__name__)
 
 def main():
     service_port = settings.SERVICE_PORT
-    uvicorn.run(app, host="0.0.0.0", port=service_port)
+    uvicorn.run("aieb_evaluation_svc.app:create_app", factory=True, host="0.0.0.0", port=service_port)
 
 
 if __name__ == "__main__":
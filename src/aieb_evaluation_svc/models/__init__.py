@@ -1,4 +1,7 @@
 from .agent import Agent
-from .base import Base, get_db
+from .archived_evaluation import ArchivedEvaluation
+from .base import Base, get_async_db, get_db
 from .evaluation import Evaluation
 from .evaluation_criteria import EvaluationCriteria
+from .evaluation_run import EvaluationRun
+from .score_aggregate import ScoreAggregate
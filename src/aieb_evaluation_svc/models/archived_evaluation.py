@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, UUID
+
+from .base import Base
+
+
+class ArchivedEvaluation(Base):
+    """Archive file holding an evaluation moved out of the ``evaluation`` table.
+
+    Written in the transaction that deletes the evaluation, so that an
+    archived evaluation is looked up by reading one file.
+    """
+    __tablename__ = 'archived_evaluation'
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    # Relative to the archive directory
+    path = Column(String, nullable=False)
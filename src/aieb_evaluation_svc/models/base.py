@@ -1,19 +1,165 @@
-from sqlalchemy import Column, PrimaryKeyConstraint, String
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
 from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import scoped_session, sessionmaker, Session
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base, sessionmaker, Session
 
 from aieb_evaluation_svc.core.config import settings
 
 Base = declarative_base()
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine)
+# Async driver used for each sync backend in DATABASE_URL
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def to_async_url(database_url: str) -> str:
+    """Return the async-driver equivalent of a sync database URL.
+
+    Args:
+        database_url: SQLAlchemy URL, e.g. ``postgresql://...``
+
+    Returns:
+        The URL with its driver replaced by the matching async driver
+    """
+    url = make_url(database_url)
+    async_driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if async_driver is None or url.drivername == async_driver:
+        return database_url
+    return url.set(drivername=async_driver).render_as_string(hide_password=False)
+
+
+def engine_options(database_url: str) -> Dict[str, Any]:
+    """Build connection pool options from settings.
+
+    SQLite uses single-connection pools that take no sizing options, so
+    only pre-ping and recycle apply to it.
+
+    Args:
+        database_url: SQLAlchemy URL the engine is created for
+
+    Returns:
+        Keyword arguments for ``create_engine``/``create_async_engine``
+    """
+    options: Dict[str, Any] = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
+    if make_url(database_url).get_backend_name() != "sqlite":
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        )
+    return options
+
+
+class LazySessionmaker(sessionmaker):
+    """``sessionmaker`` that binds to its engine when the first session is made."""
+
+    def __init__(self, engine_factory: Callable[[], Engine], **kw: Any):
+        super().__init__(**kw)
+        self.engine_factory = engine_factory
+
+    def __call__(self, **local_kw: Any) -> Session:
+        if self.kw.get("bind") is None:
+            self.configure(bind=self.engine_factory())
+        return super().__call__(**local_kw)
+
+
+class LazyAsyncSessionmaker(async_sessionmaker):
+    """``async_sessionmaker`` that binds to its engine when the first session is made."""
+
+    def __init__(self, engine_factory: Callable[[], AsyncEngine], **kw: Any):
+        super().__init__(**kw)
+        self.engine_factory = engine_factory
+
+    def __call__(self, **local_kw: Any) -> AsyncSession:
+        if self.kw.get("bind") is None:
+            self.configure(bind=self.engine_factory())
+        return super().__call__(**local_kw)
+
 
+_engine: Optional[Engine] = None
+_async_engine: Optional[AsyncEngine] = None
+_engine_lock = threading.Lock()
 
-def get_db() -> Session:
-    session = scoped_session(sessionmaker(bind=engine))
+
+def get_engine() -> Engine:
+    """Return the sync engine, used by Celery workers and migrations, creating it on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+        return _engine
+
+
+def get_async_engine() -> AsyncEngine:
+    """Return the async engine, used by FastAPI request handlers, creating it on first use."""
+    global _async_engine
+    with _engine_lock:
+        if _async_engine is None:
+            _async_engine = create_async_engine(
+                to_async_url(settings.DATABASE_URL), **engine_options(settings.DATABASE_URL)
+            )
+        return _async_engine
+
+
+def created_engines() -> Dict[str, Engine]:
+    """Return the engines created so far by name, e.g. to report pool metrics."""
+    engines: Dict[str, Engine] = {}
+    if _engine is not None:
+        engines["sync"] = _engine
+    if _async_engine is not None:
+        engines["async"] = _async_engine.sync_engine
+    return engines
+
+
+async def dispose_engines() -> None:
+    """Close every pooled connection; engines are created again on next use."""
+    global _engine, _async_engine
+    with _engine_lock:
+        engine, async_engine = _engine, _async_engine
+        _engine = _async_engine = None
+        SessionLocal.configure(bind=None)
+        AsyncSessionLocal.configure(bind=None)
+    if async_engine is not None:
+        await async_engine.dispose()
+    if engine is not None:
+        engine.dispose()
+
+
+# Session factories; their engines are created by the first session
+SessionLocal = LazySessionmaker(get_engine)
+AsyncSessionLocal = LazyAsyncSessionmaker(get_async_engine, expire_on_commit=False)
+
+
+def __getattr__(name: str) -> Any:
+    # ``engine`` and ``async_engine`` used to be module attributes
+    if name == "engine":
+        return get_engine()
+    if name == "async_engine":
+        return get_async_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_db() -> Iterator[Session]:
+    session = SessionLocal()
     try:
         yield session
     finally:
         session.close()
+
+
+def get_async_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Return the async session factory for work that outlives the request, e.g. streaming."""
+    return AsyncSessionLocal
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as session:
+        yield session
@@ -0,0 +1,138 @@
+"""Transparently compressed column types for large text and JSON payloads.
+
+Values are stored as binary blobs whose first byte names the codec the
+rest of the blob was written with, so rows written with different codecs
+(or before a codec change) stay readable side by side. Payloads shorter
+than ``settings.STORAGE_COMPRESSION_MIN_BYTES`` are stored raw because
+compression would not pay for itself.
+"""
+
+import json
+import zlib
+from typing import Any, Optional
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+from aieb_evaluation_svc.core.config import settings
+
+# Optional: installed with the ``zstd`` extra
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Codec marker stored in the first byte of every blob
+CODEC_MARKERS = {"none": 0, "zlib": 1, "zstd": 2}
+CODEC_NAMES = {marker: name for name, marker in CODEC_MARKERS.items()}
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+class CompressionError(ValueError):
+    """Raised when a stored blob cannot be decoded."""
+
+
+def active_codec() -> str:
+    """Return the codec new values are written with.
+
+    ``zstd`` falls back to ``zlib`` when the ``zstandard`` package is not
+    installed.
+
+    Raises:
+        CompressionError: If ``settings.STORAGE_COMPRESSION_CODEC`` is unknown
+    """
+    codec = settings.STORAGE_COMPRESSION_CODEC
+    if codec not in CODEC_MARKERS:
+        raise CompressionError(f"Unknown storage compression codec: {codec}")
+    if codec == "zstd" and zstandard is None:
+        return "zlib"
+    return codec
+
+
+def encode_payload(data: bytes, codec: Optional[str] = None) -> bytes:
+    """Compress bytes and prefix them with their codec marker.
+
+    Args:
+        data: Payload to store
+        codec: Codec to use, defaults to :func:`active_codec`
+
+    Returns:
+        The stored blob
+    """
+    codec = codec or active_codec()
+    if len(data) < settings.STORAGE_COMPRESSION_MIN_BYTES:
+        codec = "none"
+    if codec == "zstd":
+        body = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    elif codec == "zlib":
+        body = zlib.compress(data, ZLIB_LEVEL)
+    else:
+        body = data
+    return bytes([CODEC_MARKERS[codec]]) + body
+
+
+def decode_payload(blob: bytes) -> bytes:
+    """Strip the codec marker of a stored blob and decompress it.
+
+    Args:
+        blob: Blob written by :func:`encode_payload`
+
+    Returns:
+        The original payload
+
+    Raises:
+        CompressionError: If the marker is unknown or its codec is unavailable
+    """
+    blob = bytes(blob)
+    if not blob:
+        raise CompressionError("Empty compressed payload")
+    codec = CODEC_NAMES.get(blob[0])
+    body = blob[1:]
+    if codec == "none":
+        return body
+    if codec == "zlib":
+        return zlib.decompress(body)
+    if codec == "zstd":
+        if zstandard is None:
+            raise CompressionError("Payload is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(body)
+    raise CompressionError(f"Unknown codec marker: {blob[0]}")
+
+
+class CompressedText(TypeDecorator):
+    """Text column stored as a compressed blob; reads and writes ``str``."""
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[str], dialect: Any) -> Optional[bytes]:
+        if value is None:
+            return None
+        return encode_payload(value.encode("utf-8"))
+
+    def process_result_value(self, value: Any, dialect: Any) -> Optional[str]:
+        if value is None:
+            return None
+        if isinstance(value, str):
+            # Written before the column was compressed
+            return value
+        return decode_payload(value).decode("utf-8")
+
+
+class CompressedJSON(TypeDecorator):
+    """JSON column stored as a compressed blob; reads and writes JSON values."""
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect: Any) -> Optional[bytes]:
+        if value is None:
+            return None
+        return encode_payload(json.dumps(value).encode("utf-8"))
+
+    def process_result_value(self, value: Any, dialect: Any) -> Any:
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return json.loads(value)
+        return json.loads(decode_payload(value))
@@ -1,9 +1,10 @@
 import datetime
 import uuid
 
-from sqlalchemy import Column, DateTime, ForeignKey, String, Text, JSON, UUID
+from sqlalchemy import Column, DateTime, ForeignKey, Index, String, UUID, text
 
 from .base import Base
+from .compression import CompressedJSON, CompressedText
 
 
 class Evaluation(Base):
@@ -11,8 +12,52 @@ class Evaluation(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     criteria_id = Column(UUID(as_uuid=True), ForeignKey('evaluation_criteria.id'), nullable=False)
     status = Column(String, nullable=False, default='pending')
-    agent_prompt = Column(Text, nullable=False)
-    agent_output = Column(Text, nullable=True)
-    results = Column(JSON, nullable=True)
+    # Transcripts and verdicts can be hundreds of KB, so they are stored compressed
+    agent_prompt = Column(CompressedText, nullable=False)
+    agent_output = Column(CompressedText, nullable=True)
+    results = Column(CompressedJSON, nullable=True)
     created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
     completed_at = Column(DateTime, nullable=True)
+    # Batch the evaluation was submitted in
+    batch_id = Column(UUID(as_uuid=True), nullable=True)
+    # When the evaluation's task was published; NULL while it waits in the bulk lane backlog
+    dispatched_at = Column(DateTime, nullable=True)
+    # In-flight evaluation with the same judge inputs whose outcome this one receives instead of a task
+    duplicate_of = Column(UUID(as_uuid=True), nullable=True)
+    # Run the evaluation belongs to, if any
+    run_id = Column(UUID(as_uuid=True), ForeignKey('evaluation_run.id'), nullable=True)
+    # Evaluation of the previous criteria version this one re-evaluates
+    carried_from = Column(UUID(as_uuid=True), nullable=True)
+    # Verdicts of rubric items unchanged since that version, by item key; only the other items are judged
+    carried_items = Column(CompressedJSON, nullable=True)
+    # Keyset pagination indexes: every listing orders by (created_at, id)
+    __table_args__ = (
+        Index('ix_evaluation_created_at_id', 'created_at', 'id'),
+        Index('ix_evaluation_status_created_at_id', 'status', 'created_at', 'id'),
+        Index('ix_evaluation_criteria_created_at_id', 'criteria_id', 'created_at', 'id'),
+        Index('ix_evaluation_criteria_status_created_at_id', 'criteria_id', 'status', 'created_at', 'id'),
+        # Bulk lane backlog, released oldest first
+        Index(
+            'ix_evaluation_undispatched_created_at_id', 'created_at', 'id',
+            postgresql_where=text('dispatched_at IS NULL'),
+            sqlite_where=text('dispatched_at IS NULL'),
+        ),
+        # Followers waiting on a leader
+        Index(
+            'ix_evaluation_duplicate_of', 'duplicate_of',
+            postgresql_where=text('duplicate_of IS NOT NULL'),
+            sqlite_where=text('duplicate_of IS NOT NULL'),
+        ),
+        # Unfinished evaluations of a run, found on resume
+        Index(
+            'ix_evaluation_run_status', 'run_id', 'status',
+            postgresql_where=text('run_id IS NOT NULL'),
+            sqlite_where=text('run_id IS NOT NULL'),
+        ),
+        # Evaluations already re-evaluated against a newer criteria version
+        Index(
+            'ix_evaluation_carried_from', 'carried_from',
+            postgresql_where=text('carried_from IS NOT NULL'),
+            sqlite_where=text('carried_from IS NOT NULL'),
+        ),
+    )
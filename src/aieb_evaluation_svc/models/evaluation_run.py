@@ -0,0 +1,24 @@
+import datetime
+import uuid
+
+from sqlalchemy import BigInteger, Column, DateTime, String, UUID
+
+from .base import Base
+
+
+class EvaluationRun(Base):
+    """A group of evaluations submitted over any number of batches.
+
+    Progress counters are updated in the transactions that create and
+    finish the run's evaluations, so reading progress never scans them.
+    """
+    __tablename__ = 'evaluation_run'
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    name = Column(String, nullable=True)
+    total = Column(BigInteger, nullable=False, default=0)
+    completed = Column(BigInteger, nullable=False, default=0)
+    failed = Column(BigInteger, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    # Last time the run's unfinished evaluations were re-enqueued
+    resumed_at = Column(DateTime, nullable=True)
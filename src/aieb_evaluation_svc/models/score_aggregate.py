@@ -0,0 +1,24 @@
+import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Float, ForeignKey, Integer, JSON, String, UUID
+
+from .base import Base
+
+
+class ScoreAggregate(Base):
+    """Running score statistics of one agent, criteria version and score dimension.
+
+    Updated in the same transaction that completes an evaluation, so that
+    stats never need a scan over ``Evaluation.results``.
+    """
+    __tablename__ = 'score_aggregate'
+    agent_id = Column(UUID(as_uuid=True), ForeignKey('agent.id'), primary_key=True)
+    criteria_version = Column(Integer, primary_key=True)
+    dimension = Column(String, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+    sum = Column(Float, nullable=False, default=0.0)
+    sum_squares = Column(Float, nullable=False, default=0.0)
+    min = Column(Float, nullable=True)
+    max = Column(Float, nullable=True)
+    sketch = Column(JSON, nullable=False)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
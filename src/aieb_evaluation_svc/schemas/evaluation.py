@@ -0,0 +1,122 @@
+"""Request and response models for evaluation endpoints."""
+
+import datetime
+import uuid
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, computed_field
+
+
+class EvaluationItem(BaseModel):
+    """A single (criteria, prompt, output) triple to evaluate."""
+    criteria_id: uuid.UUID
+    agent_prompt: str
+    agent_output: Optional[str] = None
+
+
+class EvaluationBatchRequest(BaseModel):
+    """Request model for bulk evaluation submission."""
+    items: List[EvaluationItem] = Field(..., min_length=1)
+    # Defaults to interactive for small batches and bulk for large ones
+    lane: Optional[Literal["interactive", "bulk"]] = None
+    # Run the items are added to
+    run_id: Optional[uuid.UUID] = None
+
+
+class EvaluationBatchResponse(BaseModel):
+    """Response model for bulk evaluation submission."""
+    batch_id: uuid.UUID
+    lane: str
+    group_id: Optional[str] = None
+    evaluation_ids: List[uuid.UUID]
+    cached: int = 0
+    # Items attached to an identical evaluation already in flight
+    deduplicated: int = 0
+    run_id: Optional[uuid.UUID] = None
+
+
+class EvaluationSummary(BaseModel):
+    """Evaluation fields returned by listing endpoints."""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    criteria_id: uuid.UUID
+    status: str
+    created_at: datetime.datetime
+    completed_at: Optional[datetime.datetime] = None
+
+
+class EvaluationListResponse(BaseModel):
+    """Response model for a page of evaluations."""
+    items: List[EvaluationSummary]
+    next_cursor: Optional[str] = None
+
+
+class EvaluationDetail(EvaluationSummary):
+    """A single evaluation with its results."""
+    batch_id: Optional[uuid.UUID] = None
+    results: Optional[Dict[str, Any]] = None
+
+
+class EvaluationStatusRequest(BaseModel):
+    """Request model for a bulk status lookup."""
+    ids: List[uuid.UUID] = Field(..., min_length=1)
+    include_results: bool = False
+
+
+class EvaluationStatus(BaseModel):
+    """Status of one evaluation in a bulk status lookup."""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    status: str
+    completed_at: Optional[datetime.datetime] = None
+    results: Optional[Dict[str, Any]] = None
+
+
+class EvaluationStatusResponse(BaseModel):
+    """Response model for a bulk status lookup."""
+    items: List[EvaluationStatus]
+    # Requested IDs with no evaluation
+    missing: List[uuid.UUID] = []
+
+
+class EvaluationRunCreate(BaseModel):
+    """Request model for creating an evaluation run."""
+    name: Optional[str] = Field(None, max_length=255)
+
+
+class EvaluationRunResponse(BaseModel):
+    """An evaluation run with its progress counters."""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    name: Optional[str] = None
+    total: int
+    completed: int
+    failed: int
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+    resumed_at: Optional[datetime.datetime] = None
+
+    @computed_field
+    @property
+    def pending(self) -> int:
+        """Evaluations of the run that have not finished yet."""
+        return self.total - self.completed - self.failed
+
+
+class EvaluationRunResumeResponse(BaseModel):
+    """Response model for resuming an evaluation run."""
+    run_id: uuid.UUID
+    requeued: int
+
+
+class CriteriaReevaluationResponse(BaseModel):
+    """Response model for re-evaluating the previous version's outputs against a criteria version."""
+    run_id: uuid.UUID
+    task_id: str
+    previous_criteria_id: uuid.UUID
+    # Rubric items judged again, and those whose verdicts are carried over
+    changed_items: List[str]
+    unchanged_items: List[str]
@@ -0,0 +1,26 @@
+"""Response models for score statistics endpoints."""
+
+import uuid
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+
+
+class ScoreStats(BaseModel):
+    """Statistics of one score dimension; quantiles are sketch estimates."""
+    count: int
+    mean: Optional[float] = None
+    stddev: Optional[float] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    p95: Optional[float] = None
+    p99: Optional[float] = None
+
+
+class AgentScoreStatsResponse(BaseModel):
+    """Response model for an agent's score statistics."""
+    agent_id: uuid.UUID
+    criteria_version: Optional[int] = None
+    dimensions: Dict[str, ScoreStats]
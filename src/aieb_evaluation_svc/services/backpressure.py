@@ -0,0 +1,162 @@
+"""Load shedding of submissions while the broker queues are backed up.
+
+Dispatch endpoints ask :func:`admission_delay` before creating work. The
+depth of the lane queues is sampled from the Redis broker at most every
+``settings.BACKPRESSURE_SAMPLE_SECONDS`` per process and cached in
+between, so a burst of submissions costs one broker round trip per
+interval rather than one per request.
+
+Each lane has its own threshold. Interactive submissions are compared
+with the interactive queue alone; bulk submissions with both queues
+together, against a lower threshold, so bulk work is shed first and a
+backed-up interactive queue also holds bulk work back.
+
+The broker being unreadable never sheds load: depths are then treated
+as unknown, and publishing fails on its own if the broker is really down.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+import redis
+
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.core.metrics import LOAD_SHED, read_queue_depths
+from aieb_evaluation_svc.worker.celery_app import BULK_LANE
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class QueueDepthMonitor:
+    """Caches the depth of the lane queues and how fast they drain."""
+
+    def __init__(self, sample_seconds: float, redis_client: redis.Redis | None = None):
+        """Create the monitor; the broker is first read by the first admission check.
+
+        Args:
+            sample_seconds: Longest time a sample is reused
+            redis_client: Client for the Redis broker, or None to never shed load
+        """
+        self.sample_seconds = sample_seconds
+        self.redis = redis_client
+        self._depths: Dict[str, int] = {}
+        # Messages per second each queue shrank by between the last two samples
+        self._drain_rates: Dict[str, float] = {}
+        self._sampled_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def depths(self) -> Dict[str, int]:
+        """Return the latest depth per lane queue, sampling the broker if the cached one is too old.
+
+        While one caller samples, concurrent callers get the previous sample.
+
+        Returns:
+            Depth per queue; empty if the broker could not be read
+        """
+        if self.redis is None:
+            return {}
+        now = time.monotonic()
+        if self._sampled_at is not None and now - self._sampled_at < self.sample_seconds:
+            return self._depths
+        if not self._lock.acquire(blocking=False):
+            return self._depths
+        try:
+            queues = [settings.CELERY_INTERACTIVE_QUEUE, settings.CELERY_BULK_QUEUE]
+            try:
+                depths = read_queue_depths(self.redis, queues)
+            except redis.RedisError as e:
+                logger.warning(f"Could not read Celery queue depth, not shedding load: {e}")
+                depths = {}
+            if self._sampled_at is not None and now > self._sampled_at:
+                elapsed = now - self._sampled_at
+                self._drain_rates = {
+                    queue: (self._depths[queue] - depth) / elapsed
+                    for queue, depth in depths.items()
+                    if queue in self._depths
+                }
+            self._depths, self._sampled_at = depths, now
+            return depths
+        finally:
+            self._lock.release()
+
+    def retry_after(self, excess: int, queues: List[str]) -> float:
+        """Estimate the seconds until queues shrink by ``excess`` messages at their current drain rate.
+
+        Args:
+            excess: Messages above the threshold
+            queues: Queues whose drain counts
+
+        Returns:
+            The estimate, bounded by ``settings.BACKPRESSURE_RETRY_AFTER_MIN_SECONDS``
+            and ``settings.BACKPRESSURE_RETRY_AFTER_MAX_SECONDS``; the maximum
+            if the queues are not draining
+        """
+        rate = sum(self._drain_rates.get(queue, 0.0) for queue in queues)
+        estimate = excess / rate if rate > 0 else settings.BACKPRESSURE_RETRY_AFTER_MAX_SECONDS
+        return min(
+            max(estimate, settings.BACKPRESSURE_RETRY_AFTER_MIN_SECONDS),
+            settings.BACKPRESSURE_RETRY_AFTER_MAX_SECONDS,
+        )
+
+
+def admission_delay(lane: str) -> Optional[float]:
+    """Decide whether a submission to a lane is accepted.
+
+    Blocks on the broker when the cached sample is too old, so call it
+    from a thread pool.
+
+    Args:
+        lane: ``interactive`` or ``bulk``
+
+    Returns:
+        None to accept the submission, or the seconds the client should
+        wait before retrying
+    """
+    if not settings.BACKPRESSURE_ENABLED:
+        return None
+    monitor = get_queue_depth_monitor()
+    depths = monitor.depths()
+    if lane == BULK_LANE:
+        queues = [settings.CELERY_INTERACTIVE_QUEUE, settings.CELERY_BULK_QUEUE]
+        limit = settings.BACKPRESSURE_BULK_MAX_DEPTH
+    else:
+        queues = [settings.CELERY_INTERACTIVE_QUEUE]
+        limit = settings.BACKPRESSURE_INTERACTIVE_MAX_DEPTH
+    depth = sum(depths.get(queue, 0) for queue in queues)
+    if depth <= limit:
+        return None
+    LOAD_SHED.labels(lane).inc()
+    delay = monitor.retry_after(depth - limit, queues)
+    logger.warning(f"Shedding {lane} submission: {depth} queued messages exceed {limit}, retry in {delay:.0f}s")
+    return delay
+
+
+def _redis_client() -> redis.Redis:
+    return redis.Redis.from_url(
+        settings.REDIS_BROKER_URL,
+        socket_timeout=settings.BACKPRESSURE_REDIS_TIMEOUT_SECONDS,
+        socket_connect_timeout=settings.BACKPRESSURE_REDIS_TIMEOUT_SECONDS,
+    )
+
+
+_monitor: QueueDepthMonitor | None = None
+_monitor_lock = threading.Lock()
+
+
+def get_queue_depth_monitor() -> QueueDepthMonitor:
+    """Return the process-wide queue depth monitor, creating it on first use."""
+    global _monitor
+    with _monitor_lock:
+        if _monitor is None:
+            _monitor = QueueDepthMonitor(settings.BACKPRESSURE_SAMPLE_SECONDS, _redis_client())
+        return _monitor
+
+
+def set_queue_depth_monitor(monitor: QueueDepthMonitor | None) -> None:
+    """Replace the process-wide queue depth monitor, e.g. in tests."""
+    global _monitor
+    with _monitor_lock:
+        _monitor = monitor
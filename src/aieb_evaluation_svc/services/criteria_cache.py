@@ -0,0 +1,224 @@
+"""Read-through cache of EvaluationCriteria rows shared by API and worker code.
+
+Rows are immutable once written: ``_agent_version_uc`` pins every
+``(agent_id, version)`` pair to a single row, and the session hooks at the
+bottom of this module refuse to UPDATE criteria, so a change is always a
+new version. Lookups by ID or by ``(agent_id, version)`` can therefore be
+cached without invalidation. A row changed by hand outside the ORM stays
+stale in running processes until they restart.
+
+Checks blocks are validated before a criteria row is written. A stored
+row whose checks no longer parse is scored by the judge alone.
+"""
+
+import logging
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.models.evaluation_criteria import EvaluationCriteria
+from aieb_evaluation_svc.services.deterministic_scoring import (
+    Check,
+    InvalidCheckError,
+    parse_checks,
+    strip_checks,
+)
+from aieb_evaluation_svc.services.judge_cache import LRUCache, criteria_digest
+from aieb_evaluation_svc.services.rubric import RubricItem, split_rubric
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class ImmutableCriteriaError(ValueError):
+    """Raised when a stored criteria row would be changed instead of versioned."""
+
+
+@dataclass(frozen=True)
+class CachedCriteria:
+    """Detached copy of an EvaluationCriteria row with its content digest, checks and rubric items."""
+    id: uuid.UUID
+    agent_id: uuid.UUID
+    version: int
+    criteria_content: str
+    digest: str
+    rubric: Tuple[RubricItem, ...]
+    checks: Tuple[Check, ...]
+    # Criteria text sent to the judge: the document without its checks blocks
+    judged_content: str
+
+    @property
+    def deterministic_only(self) -> bool:
+        """Whether the criteria are scored by their checks alone, without a judge call."""
+        return bool(self.checks) and not self.judged_content
+
+    @classmethod
+    def from_row(cls, row: Any) -> "CachedCriteria":
+        try:
+            checks, judged_content = parse_checks(row.criteria_content)
+        except InvalidCheckError as e:
+            # Failing here would fail every submission and task using the criteria
+            logger.warning(f"Criteria {row.id} has invalid checks, scoring with the judge alone: {e}")
+            checks, judged_content = (), strip_checks(row.criteria_content)
+        return cls(
+            row.id,
+            row.agent_id,
+            row.version,
+            row.criteria_content,
+            criteria_digest(row.criteria_content),
+            split_rubric(judged_content),
+            checks,
+            judged_content,
+        )
+
+
+CRITERIA_COLUMNS = (
+    EvaluationCriteria.id,
+    EvaluationCriteria.agent_id,
+    EvaluationCriteria.version,
+    EvaluationCriteria.criteria_content,
+)
+
+
+class CriteriaCache:
+    """Bounded read-through cache of criteria by ID and by version."""
+
+    def __init__(self, maxsize: int):
+        """Create an empty cache.
+
+        Args:
+            maxsize: Maximum entries kept in each index
+        """
+        self.by_id = LRUCache(maxsize)
+        self.by_version = LRUCache(maxsize)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _count(self, hits: int = 0, misses: int = 0) -> None:
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def _store(self, criteria: CachedCriteria) -> None:
+        self.by_id.set(criteria.id, criteria)
+        self.by_version.set((criteria.agent_id, criteria.version), criteria)
+
+    def get_many(self, db: Session, criteria_ids: Iterable[uuid.UUID]) -> Dict[uuid.UUID, CachedCriteria]:
+        """Look up many criteria by ID, loading all misses with one query.
+
+        Args:
+            db: Database session used for misses
+            criteria_ids: Criteria IDs
+
+        Returns:
+            Mapping of criteria ID to criteria; unknown IDs are absent
+        """
+        criteria_ids = set(criteria_ids)
+        found: Dict[uuid.UUID, CachedCriteria] = {}
+        missing = []
+        for criteria_id in criteria_ids:
+            criteria = self.by_id.get(criteria_id)
+            if criteria is None:
+                missing.append(criteria_id)
+            else:
+                found[criteria_id] = criteria
+
+        if missing:
+            for row in db.execute(select(*CRITERIA_COLUMNS).where(EvaluationCriteria.id.in_(missing))):
+                criteria = CachedCriteria.from_row(row)
+                self._store(criteria)
+                found[criteria.id] = criteria
+
+        self._count(hits=len(criteria_ids) - len(missing), misses=len(missing))
+        return found
+
+    def get(self, db: Session, criteria_id: uuid.UUID) -> Optional[CachedCriteria]:
+        """Look up one criteria by ID, or None if it does not exist."""
+        return self.get_many(db, [criteria_id]).get(criteria_id)
+
+    def get_version(self, db: Session, agent_id: uuid.UUID, version: int) -> Optional[CachedCriteria]:
+        """Look up an agent's criteria by version, or None if it does not exist."""
+        criteria = self.by_version.get((agent_id, version))
+        if criteria is not None:
+            self._count(hits=1)
+            return criteria
+
+        self._count(misses=1)
+        row = db.execute(
+            select(*CRITERIA_COLUMNS)
+            .where(EvaluationCriteria.agent_id == agent_id, EvaluationCriteria.version == version)
+        ).first()
+        if row is None:
+            return None
+        criteria = CachedCriteria.from_row(row)
+        self._store(criteria)
+        return criteria
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit, miss and eviction counters."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.by_id.evictions,
+                "size": len(self.by_id),
+                "maxsize": self.by_id.maxsize,
+            }
+
+
+_criteria_cache: CriteriaCache | None = None
+_criteria_cache_lock = threading.Lock()
+
+
+def get_criteria_cache() -> CriteriaCache:
+    """Return this process's criteria cache, creating it on first use."""
+    global _criteria_cache
+    with _criteria_cache_lock:
+        if _criteria_cache is None:
+            _criteria_cache = CriteriaCache(settings.CRITERIA_CACHE_MAX_ENTRIES)
+        return _criteria_cache
+
+
+def set_criteria_cache(cache: CriteriaCache | None) -> None:
+    """Replace the process-wide criteria cache, e.g. in tests."""
+    global _criteria_cache
+    with _criteria_cache_lock:
+        _criteria_cache = cache
+
+
+@event.listens_for(EvaluationCriteria, "before_insert")
+def _validate_checks(mapper: Any, connection: Any, target: EvaluationCriteria) -> None:
+    """Refuse to write criteria whose checks blocks do not parse.
+
+    Raises:
+        InvalidCheckError: If a checks block is invalid
+    """
+    parse_checks(target.criteria_content)
+
+
+@event.listens_for(EvaluationCriteria, "before_update")
+def _refuse_update(mapper: Any, connection: Any, target: EvaluationCriteria) -> None:
+    """Refuse to flush changes to a stored criteria row; cached copies would go stale.
+
+    Raises:
+        ImmutableCriteriaError: If a column of the row was changed
+    """
+    if Session.object_session(target).is_modified(target):
+        raise ImmutableCriteriaError(f"Criteria {target.id} cannot be changed; add a new version instead")
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _refuse_bulk_update(orm_execute_state: ORMExecuteState) -> None:
+    """Refuse ORM ``update(EvaluationCriteria)`` statements, which bypass flush hooks.
+
+    Raises:
+        ImmutableCriteriaError: If the statement updates criteria
+    """
+    if orm_execute_state.is_update and orm_execute_state.bind_mapper is inspect(EvaluationCriteria):
+        raise ImmutableCriteriaError("Criteria cannot be changed; add a new version instead")
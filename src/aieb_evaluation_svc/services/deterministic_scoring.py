@@ -0,0 +1,414 @@
+"""Deterministic checks scored ahead of the LLM judge.
+
+A criteria document can declare mechanical checks in a fenced ``checks``
+block, one JSON object per line or a JSON list::
+
+    ```checks
+    {"type": "keywords", "keywords": ["refund", "30 days"]}
+    {"type": "length", "max_chars": 800}
+    {"type": "bleu", "key": "similarity", "reference": "Refunds are accepted within 30 days."}
+    ```
+
+The block is removed from the text the judge sees. Checks are scored
+over a whole batch of agent outputs at once: every scorer takes a NumPy
+array of outputs and returns one score in [0, 1] per output, using
+vectorized ``numpy.strings`` operations and array counting wherever the
+check allows it. Their scores are merged into the evaluation's results,
+and a document with nothing but checks is never sent to the judge.
+
+Scorers are registered by check type with :func:`register_scorer`.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from itertools import repeat
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.dtypes import StringDType
+
+CHECKS_BLOCK = re.compile(r"^```checks[ \t]*\n(?P<body>.*?)^```[ \t]*(?:\n|\Z)", re.MULTILINE | re.DOTALL)
+TOKEN = re.compile(r"\w+")
+# Joins the texts of a batch so that they are tokenized in one pass
+ROW_SEPARATOR = "\x00"
+TOKEN_OR_SEPARATOR = re.compile(r"\w+|\x00")
+
+# Recorded as the verdict's model when no judge was called
+DETERMINISTIC_MODEL = "deterministic"
+
+# Longest n-grams counted by the BLEU scorer
+BLEU_MAX_ORDER = 4
+
+Scorer = Callable[[np.ndarray, Dict[str, Any]], np.ndarray]
+
+
+class InvalidCheckError(ValueError):
+    """Raised when a checks block cannot be parsed."""
+
+
+@dataclass(frozen=True)
+class Check:
+    """One deterministic check of a criteria document."""
+    key: str
+    type: str
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class ScorerSpec:
+    """A registered scorer with the parameters its checks must set."""
+    score: Scorer
+    required: Tuple[str, ...]
+
+
+SCORERS: Dict[str, ScorerSpec] = {}
+
+
+def register_scorer(check_type: str, required: Sequence[str] = ()) -> Callable[[Scorer], Scorer]:
+    """Register a vectorized scorer for a check type.
+
+    Args:
+        check_type: Value of the ``type`` field of the checks it scores
+        required: Parameters every such check must set
+
+    Returns:
+        Decorator registering the scorer
+    """
+    def decorator(score: Scorer) -> Scorer:
+        SCORERS[check_type] = ScorerSpec(score, tuple(required))
+        return score
+    return decorator
+
+
+def strip_checks(criteria_content: str) -> str:
+    """Remove the checks blocks of a criteria document, leaving the text the judge sees."""
+    return CHECKS_BLOCK.sub("", criteria_content).strip()
+
+
+def parse_checks(criteria_content: str) -> Tuple[Tuple[Check, ...], str]:
+    """Extract the deterministic checks of a criteria document.
+
+    Args:
+        criteria_content: Evaluation criteria document
+
+    Returns:
+        The checks, and the document without its checks blocks
+
+    Raises:
+        InvalidCheckError: If a block is not JSON, or a check has an
+            unknown type or lacks a required parameter
+    """
+    specs: List[Any] = []
+    for match in CHECKS_BLOCK.finditer(criteria_content):
+        body = match.group("body").strip()
+        try:
+            parsed = json.loads(body) if body.startswith("[") else [
+                json.loads(line) for line in body.splitlines() if line.strip()
+            ]
+        except json.JSONDecodeError as e:
+            raise InvalidCheckError(f"Invalid checks block: {e}") from e
+        specs.extend(parsed)
+    if not specs:
+        return (), criteria_content
+
+    checks = []
+    taken = set()
+    for spec in specs:
+        if not isinstance(spec, dict) or spec.get("type") not in SCORERS:
+            raise InvalidCheckError(f"Unknown check: {spec}")
+        params = {name: value for name, value in spec.items() if name not in ("type", "key")}
+        missing = [name for name in SCORERS[spec["type"]].required if name not in params]
+        if missing:
+            raise InvalidCheckError(f"Check {spec['type']} lacks {', '.join(missing)}")
+        key = base = str(spec.get("key") or spec["type"])
+        suffix = 2
+        while key in taken:
+            key, suffix = f"{base}_{suffix}", suffix + 1
+        taken.add(key)
+        checks.append(Check(key, spec["type"], params))
+    return tuple(checks), strip_checks(criteria_content)
+
+
+def as_strings(outputs: Iterable[Optional[str]]) -> np.ndarray:
+    """Pack agent outputs into a variable-width string array; missing outputs are empty."""
+    return np.array(["" if output is None else output for output in outputs], dtype=StringDType())
+
+
+def score_outputs(checks: Sequence[Check], outputs: Sequence[Optional[str]]) -> List[Dict[str, float]]:
+    """Score a batch of agent outputs against the same checks.
+
+    Args:
+        checks: Checks of one criteria version
+        outputs: Agent outputs; None counts as an empty output
+
+    Returns:
+        Mapping of check key to score for every output, in output order
+    """
+    if not checks:
+        return [{} for _ in outputs]
+    strings = as_strings(outputs)
+    columns = [(check.key, SCORERS[check.type].score(strings, check.params)) for check in checks]
+    return [
+        {key: float(scores[row]) for key, scores in columns}
+        for row in range(len(strings))
+    ]
+
+
+def score_evaluations(evaluations: Sequence[Any], criteria: Dict[Any, Any]) -> List[Dict[str, float]]:
+    """Score a batch of Evaluation rows, one vectorized pass per criteria version.
+
+    Args:
+        evaluations: Rows with ``criteria_id`` and ``agent_output``
+        criteria: Cached criteria by ID, with their parsed ``checks``
+
+    Returns:
+        Check scores of every evaluation, in order; empty without checks
+    """
+    scores: List[Dict[str, float]] = [{} for _ in evaluations]
+    groups: Dict[Any, List[int]] = {}
+    for i, evaluation in enumerate(evaluations):
+        if criteria[evaluation.criteria_id].checks:
+            groups.setdefault(evaluation.criteria_id, []).append(i)
+    for criteria_id, rows in groups.items():
+        group_scores = score_outputs(criteria[criteria_id].checks, [evaluations[i].agent_output for i in rows])
+        for i, row_scores in zip(rows, group_scores):
+            scores[i] = row_scores
+    return scores
+
+
+def with_check_scores(verdict: Optional[Dict[str, Any]], check_scores: Dict[str, float]) -> Dict[str, Any]:
+    """Merge check scores into a judge verdict.
+
+    Args:
+        verdict: Judge verdict, or None if no judge was called
+        check_scores: Scores of the deterministic checks
+
+    Returns:
+        The verdict with the check scores added to ``scores`` and listed
+        under ``checks``; the verdict unchanged if there are no checks
+    """
+    if verdict is None:
+        verdict = {"scores": {}, "rationale": None, "model": DETERMINISTIC_MODEL}
+    if not check_scores:
+        return verdict
+    return {**verdict, "scores": {**verdict["scores"], **check_scores}, "checks": check_scores}
+
+
+def casefold(strings: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    return strings if params.get("case_sensitive", False) else np.strings.lower(strings)
+
+
+@register_scorer("exact_match", required=("expected",))
+def score_exact_match(strings: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    """1 if the output equals ``expected``, ignoring surrounding whitespace and, by default, case."""
+    expected = params["expected"].strip()
+    if not params.get("case_sensitive", False):
+        expected = expected.lower()
+    return (np.strings.strip(casefold(strings, params)) == expected).astype(float)
+
+
+@register_scorer("regex", required=("pattern",))
+def score_regex(strings: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    """1 if ``pattern`` matches anywhere in the output (``fullmatch`` to match all of it)."""
+    pattern = re.compile(params["pattern"], 0 if params.get("case_sensitive", True) else re.IGNORECASE)
+    # NumPy has no regex kernels, so the compiled pattern runs once per output
+    match = pattern.fullmatch if params.get("fullmatch", False) else pattern.search
+    return np.fromiter((match(text) is not None for text in strings.tolist()), dtype=float, count=len(strings))
+
+
+@register_scorer("keywords", required=("keywords",))
+def score_keywords(strings: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    """Fraction of ``keywords`` found in the output; with ``all`` set, 1 only if every one is."""
+    keywords = as_strings(params["keywords"])
+    if not len(keywords):
+        return np.ones(len(strings))
+    if not params.get("case_sensitive", False):
+        keywords = np.strings.lower(keywords)
+    # One keywords x outputs search
+    found = np.strings.find(casefold(strings, params)[np.newaxis, :], keywords[:, np.newaxis]) >= 0
+    return found.all(axis=0).astype(float) if params.get("all", False) else found.mean(axis=0)
+
+
+@register_scorer("length")
+def score_length(strings: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    """1 if the output has between ``min_chars`` and ``max_chars`` characters."""
+    lengths = np.strings.str_len(strings)
+    within = lengths >= params.get("min_chars", 0)
+    if params.get("max_chars") is not None:
+        within &= lengths <= params["max_chars"]
+    return within.astype(float)
+
+
+JSON_TYPES: Dict[str, Tuple[type, ...]] = {
+    "object": (dict,),
+    "array": (list,),
+    "string": (str,),
+    "number": (int, float),
+    "integer": (int,),
+    "boolean": (bool,),
+    "null": (type(None),),
+}
+
+
+def matches_schema(value: Any, schema: Dict[str, Any]) -> bool:
+    """Validate a value against the ``type``, ``enum``, ``required``, ``properties`` and ``items`` keywords."""
+    expected = schema.get("type")
+    if expected is not None:
+        types = JSON_TYPES.get(expected, ())
+        # bool is an int subclass, but not a JSON number
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            return False
+    if "enum" in schema and value not in schema["enum"]:
+        return False
+    if isinstance(value, dict):
+        if any(name not in value for name in schema.get("required", ())):
+            return False
+        return all(
+            matches_schema(value[name], subschema)
+            for name, subschema in schema.get("properties", {}).items()
+            if name in value
+        )
+    if isinstance(value, list) and "items" in schema:
+        return all(matches_schema(item, schema["items"]) for item in value)
+    return True
+
+
+@register_scorer("json_schema")
+def score_json_schema(strings: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    """1 if the output is JSON matching ``schema``, or any JSON without one."""
+    schema = params.get("schema", {})
+
+    def valid(text: str) -> bool:
+        try:
+            return matches_schema(json.loads(text), schema)
+        except json.JSONDecodeError:
+            return False
+
+    # Parsing has no array form, so each output is decoded on its own
+    return np.fromiter((valid(text) for text in strings.tolist()), dtype=float, count=len(strings))
+
+
+@dataclass(frozen=True)
+class TokenIds:
+    """Tokens of a batch of texts, flattened into ids of a reference vocabulary."""
+    # 1-based vocabulary id of every token, 0 for tokens not in the reference
+    ids: np.ndarray
+    # Row of every token
+    owners: np.ndarray
+    # Tokens from every token to the end of its row, itself included
+    remaining: np.ndarray
+    # Tokens per row
+    lengths: np.ndarray
+
+
+def encode_texts(texts: Sequence[str], vocabulary: Dict[str, int]) -> TokenIds:
+    """Tokenize a batch of lowercased texts into vocabulary ids.
+
+    The texts are joined with a separator and tokenized by one regex pass
+    instead of one per text; row boundaries are recovered from the
+    separator tokens with a cumulative sum.
+    """
+    tokens = TOKEN_OR_SEPARATOR.findall(ROW_SEPARATOR.join(texts) + ROW_SEPARATOR)
+    # Tokens outside the vocabulary get id 0
+    ids = np.fromiter(map(vocabulary.get, tokens, repeat(0)), dtype=np.int64, count=len(tokens))
+    separators = ids < 0
+    owners = (np.cumsum(separators) - separators)[~separators]
+    ids = ids[~separators]
+    lengths = np.bincount(owners, minlength=len(texts))
+    remaining = np.cumsum(lengths)[owners] - np.arange(len(ids))
+    return TokenIds(ids, owners, remaining, lengths)
+
+
+def ngram_codes(tokens: TokenIds, order: int, base: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Encode every n-gram made of reference tokens only as one integer, in base ``base``.
+
+    Returns:
+        The n-gram codes and the row of each
+    """
+    count = len(tokens.ids)
+    codes = np.zeros(count, dtype=np.int64)
+    known = tokens.remaining >= order
+    for offset in range(order):
+        shifted = np.zeros(count, dtype=np.int64)
+        shifted[:count - offset] = tokens.ids[offset:]
+        codes = codes * base + shifted
+        known &= shifted > 0
+    return codes[known], tokens.owners[known]
+
+
+def ngram_matches(outputs: TokenIds, reference: TokenIds, order: int, base: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Count the n-grams of every output that clipped-match the reference.
+
+    All outputs are counted with a single ``bincount`` over
+    ``row * vocabulary + n-gram``; clipping is one ``minimum`` against the
+    reference counts.
+
+    Args:
+        outputs: Tokens of the outputs
+        reference: Tokens of the reference, as its only row
+        order: n
+        base: Reference vocabulary size plus one
+
+    Returns:
+        Matching n-grams per output and total n-grams per output
+    """
+    rows = len(outputs.lengths)
+    totals = np.maximum(outputs.lengths - order + 1, 0)
+    vocabulary, reference_counts = np.unique(ngram_codes(reference, order, base)[0], return_counts=True)
+    if not len(vocabulary):
+        return np.zeros(rows), totals
+
+    codes, owners = ngram_codes(outputs, order, base)
+    positions = np.minimum(np.searchsorted(vocabulary, codes), len(vocabulary) - 1)
+    found = vocabulary[positions] == codes
+    size = len(vocabulary)
+    counts = np.bincount(owners[found] * size + positions[found], minlength=rows * size).reshape(rows, size)
+    return np.minimum(counts, reference_counts).sum(axis=1).astype(float), totals
+
+
+def encode_with_reference(strings: np.ndarray, reference: str) -> Tuple[TokenIds, TokenIds, int]:
+    """Tokenize outputs and a reference into ids of the reference's vocabulary.
+
+    Returns:
+        Output tokens, reference tokens and the n-gram code base
+    """
+    vocabulary = {ROW_SEPARATOR: -1}
+    for token in TOKEN.findall(reference.lower()):
+        vocabulary.setdefault(token, len(vocabulary))
+    # numpy.strings treats "\x00" as an empty string, so separators in the texts are replaced in Python
+    texts = [text.replace(ROW_SEPARATOR, " ") for text in np.strings.lower(strings).tolist()]
+    return encode_texts(texts, vocabulary), encode_texts([reference.lower()], vocabulary), len(vocabulary)
+
+
+@register_scorer("rouge_1", required=("reference",))
+def score_rouge_1(strings: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    """Unigram F1 between the output and ``reference``."""
+    outputs, reference, base = encode_with_reference(strings, params["reference"])
+    matches, totals = ngram_matches(outputs, reference, 1, base)
+    denominator = totals + len(reference.ids)
+    return np.divide(2 * matches, denominator, out=np.zeros(len(strings)), where=denominator > 0)
+
+
+@register_scorer("bleu", required=("reference",))
+def score_bleu(strings: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    """Sentence BLEU against ``reference``, up to ``max_order`` (default 4) n-grams.
+
+    Precisions are smoothed by adding one to the matches and totals of
+    every order above one, so short outputs do not score zero outright.
+    """
+    outputs, reference, base = encode_with_reference(strings, params["reference"])
+    max_order = params.get("max_order", BLEU_MAX_ORDER)
+    log_precision = np.zeros(len(strings))
+    for order in range(1, max_order + 1):
+        matches, totals = ngram_matches(outputs, reference, order, base)
+        smoothing = 0 if order == 1 else 1
+        precision = np.divide(
+            matches + smoothing, totals + smoothing, out=np.zeros(len(strings)), where=totals + smoothing > 0
+        )
+        with np.errstate(divide="ignore"):
+            log_precision += np.log(precision) / max_order
+    lengths = outputs.lengths.astype(float)
+    # Log of the brevity penalty for outputs shorter than the reference
+    brevity = np.minimum(0.0, 1 - len(reference.ids) / np.maximum(lengths, 1))
+    return np.where(lengths > 0, np.exp(log_precision + brevity), 0.0)
@@ -0,0 +1,219 @@
+"""Archival of old finished evaluations to compressed JSONL files.
+
+Finished evaluations created more than ``settings.ARCHIVE_AFTER_DAYS``
+ago are moved out of the hot ``evaluation`` table in batches: each batch
+is written to files partitioned by creation day, Hive style::
+
+    <ARCHIVE_PATH>/created_date=2026-01-31/part-<first evaluation id>.jsonl.zst
+
+and then deleted from the table in the same pass. Records have the export
+columns (see :mod:`~aieb_evaluation_svc.services.evaluation_export`), so
+archived and hot rows can be streamed together, and carry each row's
+agent and criteria version so historical analytics need no joins.
+
+The file of every archived evaluation is recorded in the
+``archived_evaluation`` table, so a lookup by ID reads a single file.
+
+A batch file is named after its first evaluation and written atomically
+before the rows are deleted. If a run dies in between, the next run
+selects the same first rows and overwrites the same file, so no
+evaluation is archived twice.
+"""
+
+import datetime
+import gzip
+import heapq
+import itertools
+import json
+import logging
+import os
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, IO, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.models.archived_evaluation import ArchivedEvaluation
+from aieb_evaluation_svc.models.compression import CompressionError, zstandard
+from aieb_evaluation_svc.models.evaluation import Evaluation
+from aieb_evaluation_svc.services.evaluation_export import build_export_query, to_record
+from aieb_evaluation_svc.services.evaluation_query import EvaluationFilters
+from aieb_evaluation_svc.services.single_flight import FINISHED_STATUSES
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+PARTITION_PREFIX = "created_date="
+ARCHIVE_SUFFIXES = {"zstd": ".jsonl.zst", "gzip": ".jsonl.gz"}
+
+
+def archive_codec() -> str:
+    """Return the codec new archive files are written with; ``zstd`` falls back to ``gzip`` without zstandard."""
+    if settings.ARCHIVE_CODEC == "zstd" and zstandard is not None:
+        return "zstd"
+    return "gzip"
+
+
+def open_archive_file(path: str, mode: str) -> IO[str]:
+    """Open an archive file as text, picking the codec from its suffix."""
+    if path.endswith(ARCHIVE_SUFFIXES["zstd"]):
+        if zstandard is None:
+            raise CompressionError(f"Reading {path} requires the zstandard package")
+        return zstandard.open(path, mode, encoding="utf-8")
+    return gzip.open(path, mode, encoding="utf-8")
+
+
+def write_partition(root: str, day: datetime.date, records: Sequence[Dict[str, Any]]) -> str:
+    """Atomically write one batch file of a day partition.
+
+    Args:
+        root: Archive directory
+        day: Creation day of the records
+        records: Export records, in (created_at, id) order
+
+    Returns:
+        Path of the written file
+    """
+    directory = os.path.join(root, f"{PARTITION_PREFIX}{day.isoformat()}")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"part-{records[0]['id']}{ARCHIVE_SUFFIXES[archive_codec()]}")
+    temporary = f"{path}.tmp"
+    with open_archive_file(temporary, "wt") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    os.replace(temporary, path)
+    return path
+
+
+def archive_evaluations(
+    db: Session, root: str, older_than: datetime.datetime, batch_size: int
+) -> int:
+    """Move finished evaluations created before a cutoff to the archive.
+
+    Args:
+        db: Database session; committed after every batch
+        root: Archive directory
+        older_than: Evaluations created before this are archived
+        batch_size: Rows written and deleted per batch
+
+    Returns:
+        Number of evaluations archived
+    """
+    query = (
+        build_export_query(EvaluationFilters(created_before=older_than))
+        .where(Evaluation.status.in_(FINISHED_STATUSES))
+        .limit(batch_size)
+    )
+    archived = 0
+    while True:
+        rows = db.execute(query).all()
+        if not rows:
+            break
+        partitions: Dict[datetime.date, List[Dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            partitions[row.created_at.date()].append(to_record(row._asdict()))
+        index = []
+        for day, records in partitions.items():
+            path = os.path.relpath(write_partition(root, day, records), root)
+            index.extend({"id": uuid.UUID(record["id"]), "path": path} for record in records)
+        db.execute(delete(Evaluation).where(Evaluation.id.in_([row.id for row in rows])))
+        db.execute(insert(ArchivedEvaluation), index)
+        db.commit()
+        archived += len(rows)
+        logger.info(f"Archived {len(rows)} evaluations to {len(partitions)} partitions")
+        if len(rows) < batch_size:
+            break
+    return archived
+
+
+def _matches(record: Dict[str, Any], filters: EvaluationFilters) -> bool:
+    if filters.status is not None and record["status"] != filters.status:
+        return False
+    if filters.criteria_id is not None and record["criteria_id"] != str(filters.criteria_id):
+        return False
+    if filters.agent_id is not None and record["agent_id"] != str(filters.agent_id):
+        return False
+    if filters.criteria_version is not None and record["criteria_version"] != filters.criteria_version:
+        return False
+    created_at = datetime.datetime.fromisoformat(record["created_at"])
+    if filters.created_after is not None and created_at < filters.created_after:
+        return False
+    if filters.created_before is not None and created_at >= filters.created_before:
+        return False
+    return True
+
+
+def _record_order(record: Dict[str, Any]) -> Tuple[str, str]:
+    """Sort key of a record, matching the (created_at, id) order files are written in."""
+    return record["created_at"], uuid.UUID(record["id"]).hex
+
+
+def _read_archive_file(path: str, filters: EvaluationFilters) -> Iterator[Dict[str, Any]]:
+    with open_archive_file(path, "rt") as f:
+        for line in f:
+            record = json.loads(line)
+            if _matches(record, filters):
+                yield record
+
+
+def iter_archive(
+    root: str, filters: EvaluationFilters, chunk_size: int = 1000
+) -> Iterator[List[Dict[str, Any]]]:
+    """Read archived evaluations matching filters, oldest first.
+
+    Day partitions outside the created_at range are skipped without
+    being opened. The batch files of a day are already sorted, so they
+    are read line by line and merged, keeping at most one chunk in memory.
+
+    Args:
+        root: Archive directory
+        filters: Filters to apply
+        chunk_size: Most records yielded at a time
+
+    Yields:
+        Matching records of one day partition, in (created_at, id) order
+    """
+    if not os.path.isdir(root):
+        return
+    for name in sorted(os.listdir(root)):
+        if not name.startswith(PARTITION_PREFIX):
+            continue
+        day = datetime.date.fromisoformat(name[len(PARTITION_PREFIX):])
+        if filters.created_after is not None and day < filters.created_after.date():
+            continue
+        if filters.created_before is not None and day > filters.created_before.date():
+            continue
+        directory = os.path.join(root, name)
+        # Batch files of one day may interleave
+        records = heapq.merge(
+            *(
+                _read_archive_file(os.path.join(directory, file_name), filters)
+                for file_name in sorted(os.listdir(directory))
+                if file_name.endswith(tuple(ARCHIVE_SUFFIXES.values()))
+            ),
+            key=_record_order,
+        )
+        while True:
+            chunk = list(itertools.islice(records, chunk_size))
+            if not chunk:
+                break
+            yield chunk
+
+
+def find_archived(root: str, path: str, evaluation_id: uuid.UUID) -> Optional[Dict[str, Any]]:
+    """Read an archived evaluation from its archive file.
+
+    Args:
+        root: Archive directory
+        path: File of the evaluation, as recorded in ``archived_evaluation``
+        evaluation_id: Evaluation ID
+
+    Returns:
+        The archived record, or None if the file does not hold it
+    """
+    for record in _read_archive_file(os.path.join(root, path), EvaluationFilters()):
+        if record["id"] == str(evaluation_id):
+            return record
+    return None
@@ -0,0 +1,125 @@
+"""Streaming export of evaluation rows as NDJSON or CSV."""
+
+import csv
+import io
+import json
+import logging
+import uuid
+from typing import Any, AsyncIterator, Dict, Optional, Sequence
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.concurrency import iterate_in_threadpool
+
+from aieb_evaluation_svc.models.evaluation import Evaluation
+from aieb_evaluation_svc.models.evaluation_criteria import EvaluationCriteria
+from aieb_evaluation_svc.services.evaluation_query import EvaluationFilters
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+EXPORT_COLUMNS = (
+    Evaluation.id,
+    Evaluation.criteria_id,
+    EvaluationCriteria.agent_id,
+    EvaluationCriteria.version.label("criteria_version"),
+    Evaluation.status,
+    Evaluation.agent_prompt,
+    Evaluation.agent_output,
+    Evaluation.results,
+    Evaluation.created_at,
+    Evaluation.completed_at,
+)
+
+
+def build_export_query(filters: EvaluationFilters) -> Select:
+    """Build the export select in (created_at, id) order.
+
+    Args:
+        filters: Filters to apply
+
+    Returns:
+        The export select
+    """
+    query = select(*EXPORT_COLUMNS).join(EvaluationCriteria, Evaluation.criteria_id == EvaluationCriteria.id)
+    return filters.apply(query).order_by(Evaluation.created_at, Evaluation.id)
+
+
+def to_record(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert an export row's values to JSON types: IDs and timestamps become strings."""
+    return {
+        key: value.isoformat() if hasattr(value, "isoformat") else
+        str(value) if isinstance(value, uuid.UUID) else value
+        for key, value in values.items()
+    }
+
+
+def format_ndjson(records: Sequence[Dict[str, Any]]) -> str:
+    """Format records as newline-delimited JSON objects."""
+    return "".join(json.dumps(record) + "\n" for record in records)
+
+
+def format_csv(records: Sequence[Dict[str, Any]], header: bool = False) -> str:
+    """Format records as CSV, with ``results`` as a JSON string column."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow([column.key for column in EXPORT_COLUMNS])
+    for record in records:
+        writer.writerow([
+            json.dumps(value) if key == "results" and value is not None else value
+            for key, value in record.items()
+        ])
+    return buffer.getvalue()
+
+
+async def stream_export(
+    session_factory: async_sessionmaker[AsyncSession],
+    filters: EvaluationFilters,
+    export_format: str,
+    batch_size: int,
+    archive_root: Optional[str] = None,
+) -> AsyncIterator[str]:
+    """Stream matching evaluations through a server-side cursor.
+
+    Rows are fetched ``batch_size`` at a time with ``yield_per`` and each
+    batch is formatted and yielded before the next one is fetched, so
+    memory use does not depend on the size of the result set. Archived
+    evaluations, which are older than every hot one, are streamed first,
+    ``batch_size`` records at a time.
+
+    Args:
+        session_factory: Factory for the session that owns the cursor
+        filters: Filters to apply
+        export_format: ``ndjson`` or ``csv``
+        batch_size: Rows fetched per round trip
+        archive_root: Also export archived evaluations from this directory
+
+    Yields:
+        Formatted chunks of the export body
+    """
+    formatter = format_csv if export_format == "csv" else format_ndjson
+    if export_format == "csv":
+        yield format_csv([], header=True)
+
+    exported = 0
+    if archive_root is not None:
+        # Imported here: the archive module builds on this one
+        from aieb_evaluation_svc.services.evaluation_archive import iter_archive
+
+        async for records in iterate_in_threadpool(iter_archive(archive_root, filters, batch_size)):
+            exported += len(records)
+            yield formatter(records)
+
+    query = build_export_query(filters).execution_options(yield_per=batch_size)
+    async with session_factory() as session:
+        result = await session.stream(query)
+        async for partition in result.partitions():
+            exported += len(partition)
+            yield formatter([to_record(row._asdict()) for row in partition])
+    logger.info(f"Exported {exported} evaluations as {export_format}")
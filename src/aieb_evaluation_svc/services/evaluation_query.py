@@ -0,0 +1,174 @@
+"""Filtering, keyset pagination and status lookups over the evaluation table."""
+
+import base64
+import datetime
+import hashlib
+import json
+import uuid
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Select, select, tuple_
+
+from aieb_evaluation_svc.models.evaluation import Evaluation
+from aieb_evaluation_svc.models.evaluation_criteria import EvaluationCriteria
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+@dataclass
+class EvaluationFilters:
+    """Filters shared by the evaluation read endpoints."""
+    status: Optional[str] = None
+    criteria_id: Optional[uuid.UUID] = None
+    agent_id: Optional[uuid.UUID] = None
+    criteria_version: Optional[int] = None
+    created_after: Optional[datetime.datetime] = None
+    created_before: Optional[datetime.datetime] = None
+
+    def apply(self, query: Select) -> Select:
+        """Add WHERE clauses for every filter that is set.
+
+        Args:
+            query: A select over the evaluation table
+
+        Returns:
+            The filtered select
+        """
+        if self.status is not None:
+            query = query.where(Evaluation.status == self.status)
+        if self.criteria_id is not None:
+            query = query.where(Evaluation.criteria_id == self.criteria_id)
+        if self.agent_id is not None or self.criteria_version is not None:
+            # Resolved through _agent_version_uc, whose index leads with agent_id
+            criteria_ids = select(EvaluationCriteria.id)
+            if self.agent_id is not None:
+                criteria_ids = criteria_ids.where(EvaluationCriteria.agent_id == self.agent_id)
+            if self.criteria_version is not None:
+                criteria_ids = criteria_ids.where(EvaluationCriteria.version == self.criteria_version)
+            query = query.where(Evaluation.criteria_id.in_(criteria_ids))
+        if self.created_after is not None:
+            query = query.where(Evaluation.created_at >= self.created_after)
+        if self.created_before is not None:
+            query = query.where(Evaluation.created_at < self.created_before)
+        return query
+
+
+def encode_cursor(created_at: datetime.datetime, evaluation_id: uuid.UUID) -> str:
+    """Encode the position after a row as an opaque cursor.
+
+    Args:
+        created_at: created_at of the last row of a page
+        evaluation_id: id of the last row of a page
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = json.dumps([created_at.isoformat(), str(evaluation_id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime.datetime, uuid.UUID]:
+    """Decode a cursor produced by :func:`encode_cursor`.
+
+    Args:
+        cursor: Cursor string
+
+    Returns:
+        The (created_at, id) position the cursor points after
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, evaluation_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.datetime.fromisoformat(created_at), uuid.UUID(evaluation_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+
+def build_list_query(
+    filters: EvaluationFilters, cursor: Optional[str], limit: int, *columns: Any
+) -> Select:
+    """Build a newest-first keyset page query.
+
+    The page is ordered by ``(created_at, id)`` descending and starts
+    strictly after the cursor position, so every page is an index range
+    scan regardless of how deep into the result set it is. One extra row
+    is fetched to tell whether another page follows.
+
+    Args:
+        filters: Filters to apply
+        cursor: Cursor returned with the previous page, if any
+        limit: Page size
+        columns: Columns to select, defaults to the Evaluation entity
+
+    Returns:
+        The page select
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    query = filters.apply(select(*(columns or (Evaluation,))))
+    if cursor is not None:
+        created_at, evaluation_id = decode_cursor(cursor)
+        query = query.where(tuple_(Evaluation.created_at, Evaluation.id) < tuple_(created_at, evaluation_id))
+    return query.order_by(Evaluation.created_at.desc(), Evaluation.id.desc()).limit(limit + 1)
+
+
+def split_page(rows: List[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Trim the look-ahead row from a page and build the next cursor.
+
+    Args:
+        rows: Rows returned by a :func:`build_list_query` select
+        limit: Page size the query was built with
+
+    Returns:
+        The page rows and the cursor of the next page, or None on the last page
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(page[-1].created_at, page[-1].id)
+
+
+def evaluation_etag(rows: Iterable[Any], variant: str = "") -> str:
+    """Build an entity tag for the current state of some evaluations.
+
+    An evaluation's results are written once, together with its final
+    status and completed_at, so ``(id, status, completed_at)`` identifies
+    every version of its representation without reading the results.
+
+    Args:
+        rows: Rows with ``id``, ``status`` and ``completed_at``, in response order
+        variant: Distinguishes representations of the same rows, e.g. with
+            and without results
+
+    Returns:
+        Quoted strong ETag
+    """
+    digest = hashlib.sha256(variant.encode())
+    for row in rows:
+        completed_at = row.completed_at.isoformat() if row.completed_at is not None else ""
+        digest.update(f"{row.id}:{row.status}:{completed_at};".encode())
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Tell whether an ``If-None-Match`` header matches an ETag.
+
+    Args:
+        if_none_match: Header value, a comma-separated list of ETags or ``*``
+        etag: Current ETag of the resource
+
+    Returns:
+        True if the client's copy is current
+    """
+    if if_none_match is None:
+        return False
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
@@ -0,0 +1,67 @@
+"""Progress counters of evaluation runs.
+
+A run's ``total``, ``completed`` and ``failed`` counters change in the
+same transaction as the evaluations they count: ``total`` when a batch
+is inserted into the run, the others when an evaluation first reaches a
+finished status. Every writer already skips evaluations that finished
+before, so counters never count an evaluation twice, and reading a run's
+progress is a primary key lookup however many evaluations it holds.
+"""
+
+import datetime
+import logging
+import uuid
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from aieb_evaluation_svc.models.evaluation_run import EvaluationRun
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def update_run_counters(
+    db: Session, run_id: uuid.UUID, total: int = 0, completed: int = 0, failed: int = 0
+) -> None:
+    """Add to a run's counters with one relative UPDATE; the caller commits.
+
+    Args:
+        db: Database session
+        run_id: Run to update
+        total: Evaluations added to the run
+        completed: Evaluations of the run that completed
+        failed: Evaluations of the run that failed
+    """
+    db.execute(
+        update(EvaluationRun)
+        .where(EvaluationRun.id == run_id)
+        .values(
+            total=EvaluationRun.total + total,
+            completed=EvaluationRun.completed + completed,
+            failed=EvaluationRun.failed + failed,
+            updated_at=datetime.datetime.utcnow(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def record_run_outcomes(db: Session, outcomes: Iterable[Tuple[Optional[uuid.UUID], str]]) -> None:
+    """Count newly finished evaluations towards their runs; the caller commits.
+
+    Outcomes are summed per run first, so a flush of many evaluations
+    costs one UPDATE per run. Runs are updated in a fixed order, so that
+    concurrent flushes touching the same runs cannot deadlock.
+
+    Args:
+        db: Database session
+        outcomes: (run_id or None, final status) per finished evaluation
+    """
+    counts: Dict[uuid.UUID, Counter] = defaultdict(Counter)
+    for run_id, status in outcomes:
+        if run_id is not None:
+            counts[run_id][status] += 1
+    for run_id in sorted(counts, key=str):
+        update_run_counters(db, run_id, completed=counts[run_id]['completed'], failed=counts[run_id]['failed'])
@@ -0,0 +1,587 @@
+"""Business logic for creating and dispatching evaluations."""
+
+import datetime
+import itertools
+import logging
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from celery import group
+from celery.result import ResultBase
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.core.metrics import REEVALUATION_RUBRIC_ITEMS
+from aieb_evaluation_svc.models.evaluation import Evaluation
+from aieb_evaluation_svc.models.evaluation_criteria import EvaluationCriteria
+from aieb_evaluation_svc.models.evaluation_run import EvaluationRun
+from aieb_evaluation_svc.schemas.evaluation import EvaluationItem
+from aieb_evaluation_svc.services.criteria_cache import CachedCriteria, get_criteria_cache
+from aieb_evaluation_svc.services.deterministic_scoring import score_outputs, with_check_scores
+from aieb_evaluation_svc.services.evaluation_runs import update_run_counters
+from aieb_evaluation_svc.services.judge_cache import get_judge_cache, judge_cache_key
+from aieb_evaluation_svc.services.rubric import aggregate_rubric, carry_verdicts, merge_verdicts, unchanged_items
+from aieb_evaluation_svc.services.score_aggregates import record_scores
+from aieb_evaluation_svc.services.single_flight import FINISHED_STATUSES, assign_leaders, complete_duplicates
+from aieb_evaluation_svc.services.status_events import StatusEvent, get_status_publisher
+from aieb_evaluation_svc.worker.celery_app import (
+    BULK_LANE,
+    INTERACTIVE_LANE,
+    celery_app,
+    evaluate,
+    evaluate_batch,
+    lane_queue,
+    uses_rubric_fanout,
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# (evaluation_id, batch_id) arguments of one evaluate task
+TaskArgs = Tuple[str, Optional[str]]
+
+
+def load_criteria(db: Session, criteria_ids: Iterable[uuid.UUID]) -> Dict[uuid.UUID, CachedCriteria]:
+    """Load many criteria through the criteria cache.
+
+    Args:
+        db: Database session used for cache misses
+        criteria_ids: Criteria IDs referenced by a submission
+
+    Returns:
+        Mapping of criteria ID to criteria; unknown IDs are absent
+    """
+    return get_criteria_cache().get_many(db, criteria_ids)
+
+
+def item_judge_keys(items: Sequence[EvaluationItem], criteria: Dict[uuid.UUID, CachedCriteria]) -> List[str]:
+    """Compute the judge cache key of each submitted item.
+
+    Args:
+        items: Submitted items
+        criteria: Every criteria referenced by ``items``
+
+    Returns:
+        Judge cache key for each item, in item order
+    """
+    return [
+        judge_cache_key(criteria[item.criteria_id].digest, item.agent_prompt, item.agent_output)
+        for item in items
+    ]
+
+
+def lookup_cached_results(keys: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+    """Look up judge verdicts for submitted items in the judge cache.
+
+    Args:
+        keys: Judge cache key of each item, see :func:`item_judge_keys`
+
+    Returns:
+        Cached verdict or None for each item, in item order
+    """
+    if not settings.JUDGE_CACHE_ENABLED:
+        return [None] * len(keys)
+    return get_judge_cache().get_many(keys)
+
+
+def publish_created_events(
+    evaluation_ids: Sequence[uuid.UUID],
+    cached_results: Sequence[Optional[Dict[str, Any]]],
+    batch_id: uuid.UUID | None = None,
+) -> None:
+    """Publish the initial status of newly created evaluations.
+
+    Args:
+        evaluation_ids: IDs returned by :func:`create_evaluations_bulk`
+        cached_results: Cached verdict or None for each evaluation
+        batch_id: Batch the evaluations were submitted in
+    """
+    get_status_publisher().publish_many([
+        StatusEvent(evaluation_id, "pending" if cached is None else "completed", batch_id)
+        for evaluation_id, cached in zip(evaluation_ids, cached_results)
+    ])
+
+
+def attach_duplicates(
+    keys: Sequence[str], cached_results: Sequence[Optional[Dict[str, Any]]]
+) -> Tuple[List[uuid.UUID], List[Optional[uuid.UUID]], List[str]]:
+    """Pick the leader of every item that needs a judge call.
+
+    Args:
+        keys: Judge cache key of each item
+        cached_results: Cached verdict or None for each item
+
+    Returns:
+        (evaluation IDs, leader ID or None per item, judge keys claimed by
+        the submission), see :func:`assign_leaders`
+    """
+    if not settings.SINGLE_FLIGHT_ENABLED:
+        return [uuid.uuid4() for _ in keys], [None] * len(keys), []
+    return assign_leaders([key if cached is None else None for key, cached in zip(keys, cached_results)])
+
+
+def complete_attached(db: Session, duplicate_of: Sequence[Optional[uuid.UUID]]) -> None:
+    """Complete new followers whose leader finished while they were inserted.
+
+    Args:
+        db: Database session
+        duplicate_of: Leader or None of each new evaluation
+    """
+    events = complete_duplicates(db, list({leader for leader in duplicate_of if leader is not None}))
+    if events:
+        get_status_publisher().publish_many(events)
+
+
+def select_lane(pending_count: int, requested: Optional[str] = None) -> str:
+    """Choose the scheduling lane of a submission.
+
+    Args:
+        pending_count: Evaluations of the submission that need a task
+        requested: Lane asked for by the client, if any
+
+    Returns:
+        ``interactive`` or ``bulk``
+    """
+    if requested is not None:
+        return requested
+    return INTERACTIVE_LANE if pending_count <= settings.EVALUATION_INTERACTIVE_MAX_ITEMS else BULK_LANE
+
+
+def create_evaluations_bulk(
+    db: Session,
+    items: Sequence[EvaluationItem],
+    cached_results: Sequence[Optional[Dict[str, Any]]] | None = None,
+    batch_id: uuid.UUID | None = None,
+    lane: str = INTERACTIVE_LANE,
+    evaluation_ids: Sequence[uuid.UUID] | None = None,
+    duplicate_of: Sequence[Optional[uuid.UUID]] | None = None,
+    run_id: uuid.UUID | None = None,
+    carried_from: Sequence[Optional[uuid.UUID]] | None = None,
+    carried_items: Sequence[Optional[Dict[str, Any]]] | None = None,
+) -> List[uuid.UUID]:
+    """Insert Evaluation rows with a single executemany INSERT.
+
+    IDs and timestamps are generated client-side so that no per-row
+    round trip is needed to learn the primary keys. Items with a cached
+    verdict are inserted already completed and counted in the score
+    aggregates. Pending items of the bulk lane are left undispatched for
+    :func:`release_bulk_backlog` to publish. Followers of an in-flight
+    evaluation are never dispatched; they wait for its outcome. Items
+    added to a run are counted in its progress counters.
+
+    Args:
+        db: Database session
+        items: Items to insert
+        cached_results: Optional cached verdict for each item
+        batch_id: Batch the items are submitted in
+        lane: Scheduling lane of the pending items
+        evaluation_ids: IDs to insert the items with, generated if omitted
+        duplicate_of: Optional leader of each item, see :func:`assign_leaders`
+        run_id: Run the items are added to
+        carried_from: Optional evaluation of the previous criteria version each item re-evaluates
+        carried_items: Optional rubric item verdicts carried over for each item
+
+    Returns:
+        IDs of the created evaluations, in submission order
+    """
+    now = datetime.datetime.utcnow()
+    cached_results = cached_results or [None] * len(items)
+    evaluation_ids = evaluation_ids or [uuid.uuid4() for _ in items]
+    duplicate_of = duplicate_of or [None] * len(items)
+    carried_from = carried_from or [None] * len(items)
+    carried_items = carried_items or [None] * len(items)
+    rows = [
+        {
+            "id": evaluation_id,
+            "criteria_id": item.criteria_id,
+            "status": "pending" if cached is None else "completed",
+            "agent_prompt": item.agent_prompt,
+            "agent_output": item.agent_output,
+            "results": cached,
+            "created_at": now,
+            "completed_at": None if cached is None else now,
+            "batch_id": batch_id,
+            "dispatched_at": None if cached is None and leader is None and lane == BULK_LANE else now,
+            "duplicate_of": leader,
+            "run_id": run_id,
+            "carried_from": source,
+            "carried_items": carried,
+        }
+        for item, cached, evaluation_id, leader, source, carried in zip(
+            items, cached_results, evaluation_ids, duplicate_of, carried_from, carried_items
+        )
+    ]
+    db.execute(insert(Evaluation), rows)
+
+    completed = [row for row in rows if row["results"] is not None]
+    if completed:
+        criteria = get_criteria_cache().get_many(db, {row["criteria_id"] for row in completed})
+        record_scores(db, [
+            (criteria[row["criteria_id"]].agent_id, criteria[row["criteria_id"]].version, row["results"])
+            for row in completed
+        ])
+    if run_id is not None:
+        update_run_counters(db, run_id, total=len(rows), completed=len(completed))
+    db.commit()
+    return [row["id"] for row in rows]
+
+
+def dispatch_evaluations(
+    evaluation_ids: Sequence[uuid.UUID],
+    chunk_size: int | None = None,
+    batch_id: uuid.UUID | None = None,
+) -> ResultBase:
+    """Publish evaluate tasks for many evaluations to the interactive lane.
+
+    Args:
+        evaluation_ids: IDs of the evaluations to process
+        chunk_size: Evaluations per message, defaults to
+            ``settings.EVALUATION_DISPATCH_CHUNK_SIZE``
+        batch_id: Batch the evaluations belong to; workers publish status
+            events to the batch's channel as well
+
+    Returns:
+        The group result of the published tasks
+    """
+    batch_id = None if batch_id is None else str(batch_id)
+    return publish_evaluations(
+        [(str(evaluation_id), batch_id) for evaluation_id in evaluation_ids], chunk_size
+    )
+
+
+def publish_evaluations(
+    task_args: Sequence[TaskArgs],
+    chunk_size: int | None = None,
+    lane: str = INTERACTIVE_LANE,
+) -> ResultBase:
+    """Publish evaluate tasks to a lane's queue over one broker connection.
+
+    With ``chunk_size`` greater than one the IDs are split into Celery
+    ``chunks`` so each message carries several evaluations; otherwise a
+    plain ``group`` with one message per evaluation is published. In
+    ``async`` execution mode each message is an ``evaluate_batch`` task
+    whose items are judged concurrently on the worker's event loop. Every
+    message carries a ``lane`` header.
+
+    Args:
+        task_args: (evaluation_id, batch_id) per evaluation, in publish order
+        chunk_size: Evaluations per message, defaults to
+            ``settings.EVALUATION_DISPATCH_CHUNK_SIZE``
+        lane: Lane whose queue the messages are routed to
+
+    Returns:
+        The group result of the published tasks
+    """
+    chunk_size = chunk_size or settings.EVALUATION_DISPATCH_CHUNK_SIZE
+
+    if settings.EVALUATION_EXECUTION_MODE == "async":
+        # A batch smaller than the loop's concurrency would leave slots idle
+        batch_size = max(chunk_size, settings.WORKER_ASYNC_CONCURRENCY)
+        signatures = []
+        for batch_id, args in itertools.groupby(task_args, key=lambda a: a[1]):
+            ids = [evaluation_id for evaluation_id, _ in args]
+            signatures.extend(
+                evaluate_batch.s(ids[start:start + batch_size], batch_id)
+                for start in range(0, len(ids), batch_size)
+            )
+        signature = group(signatures)
+    elif chunk_size > 1:
+        signature = evaluate.chunks(task_args, chunk_size).group()
+    else:
+        signature = group(evaluate.s(*args) for args in task_args)
+
+    with celery_app.producer_or_acquire() as producer:
+        return signature.apply_async(producer=producer, queue=lane_queue(lane), headers={"lane": lane})
+
+
+def claim_bulk_backlog(db: Session, max_in_flight_per_agent: int) -> List[TaskArgs]:
+    """Claim the next evaluations of the bulk lane backlog, fairly across agents.
+
+    Each agent may have at most ``max_in_flight_per_agent`` dispatched but
+    unfinished evaluations, so a large sweep for one agent leaves room in
+    the bulk queue for every other agent's work. Claimed evaluations are
+    interleaved round-robin by agent, starting with the agent whose
+    backlog is oldest and taking each agent's oldest first, and marked
+    dispatched in one conditional UPDATE so that concurrent releases never
+    claim the same evaluation twice.
+
+    Args:
+        db: Database session; committed when evaluations are claimed
+        max_in_flight_per_agent: Per-agent cap on unfinished dispatched evaluations
+
+    Returns:
+        (evaluation_id, batch_id) per claimed evaluation, in publish order
+    """
+    backlog = (Evaluation.status == 'pending', Evaluation.dispatched_at.is_(None))
+    agent_ids = db.scalars(
+        select(EvaluationCriteria.agent_id)
+        .join(Evaluation, Evaluation.criteria_id == EvaluationCriteria.id)
+        .where(*backlog)
+        .group_by(EvaluationCriteria.agent_id)
+        .order_by(func.min(Evaluation.created_at))
+    ).all()
+    if not agent_ids:
+        return []
+
+    in_flight = dict(db.execute(
+        select(EvaluationCriteria.agent_id, func.count())
+        .join(Evaluation, Evaluation.criteria_id == EvaluationCriteria.id)
+        .where(
+            EvaluationCriteria.agent_id.in_(agent_ids),
+            Evaluation.status.in_(('pending', 'running')),
+            Evaluation.dispatched_at.is_not(None),
+            # Followers have no task of their own
+            Evaluation.duplicate_of.is_(None),
+        )
+        .group_by(EvaluationCriteria.agent_id)
+    ).all())
+
+    per_agent = []
+    for agent_id in agent_ids:
+        free = max_in_flight_per_agent - in_flight.get(agent_id, 0)
+        if free > 0:
+            per_agent.append(db.execute(
+                select(Evaluation.id, Evaluation.batch_id)
+                .join(EvaluationCriteria, Evaluation.criteria_id == EvaluationCriteria.id)
+                .where(EvaluationCriteria.agent_id == agent_id, *backlog)
+                .order_by(Evaluation.created_at, Evaluation.id)
+                .limit(free)
+            ).all())
+    candidates = [row for row in itertools.chain.from_iterable(itertools.zip_longest(*per_agent)) if row]
+    if not candidates:
+        return []
+
+    claimed = set(db.scalars(
+        update(Evaluation)
+        .where(Evaluation.id.in_([row.id for row in candidates]), Evaluation.dispatched_at.is_(None))
+        .values(dispatched_at=datetime.datetime.utcnow())
+        .returning(Evaluation.id)
+        .execution_options(synchronize_session=False)
+    ).all())
+    db.commit()
+    return [
+        (str(row.id), None if row.batch_id is None else str(row.batch_id))
+        for row in candidates
+        if row.id in claimed
+    ]
+
+
+def return_to_backlog(db: Session, evaluation_ids: Sequence[uuid.UUID]) -> None:
+    """Mark evaluations whose tasks could not be published as undispatched.
+
+    They join the bulk lane backlog, which :func:`release_bulk_backlog`
+    publishes once the broker is reachable again.
+
+    Args:
+        db: Database session; committed
+        evaluation_ids: Evaluations marked dispatched but never published
+    """
+    db.execute(
+        update(Evaluation)
+        .where(Evaluation.id.in_(evaluation_ids), Evaluation.status == 'pending')
+        .values(dispatched_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def release_bulk_backlog(db: Session, max_in_flight_per_agent: int | None = None) -> int:
+    """Claim bulk lane evaluations and publish them to the bulk queue.
+
+    If publishing fails the claim is undone so the evaluations stay in
+    the backlog.
+
+    Args:
+        db: Database session
+        max_in_flight_per_agent: Per-agent cap, defaults to
+            ``settings.BULK_MAX_IN_FLIGHT_PER_AGENT``
+
+    Returns:
+        Number of evaluations published
+    """
+    task_args = claim_bulk_backlog(db, max_in_flight_per_agent or settings.BULK_MAX_IN_FLIGHT_PER_AGENT)
+    if not task_args:
+        return 0
+    try:
+        publish_evaluations(task_args, lane=BULK_LANE)
+    except Exception:
+        return_to_backlog(db, [uuid.UUID(evaluation_id) for evaluation_id, _ in task_args])
+        raise
+    logger.info(f"Released {len(task_args)} evaluations from the bulk backlog")
+    return len(task_args)
+
+
+def resume_run(db: Session, run_id: uuid.UUID) -> int:
+    """Put every unfinished evaluation of a run back into the bulk lane backlog.
+
+    Meant for recovering a run after workers or the broker lost its task
+    messages. Followers whose leader already finished receive its outcome
+    first. All other unfinished evaluations, running ones included, are
+    reset to undispatched pending rows with one UPDATE, however large the
+    run, and :func:`release_bulk_backlog` then publishes them fairly
+    across agents. An evaluation whose original task is still running
+    may be judged twice; only the first outcome is written.
+
+    Args:
+        db: Database session; committed
+        run_id: Run to resume
+
+    Returns:
+        Number of evaluations put back into the backlog
+    """
+    unfinished = (Evaluation.run_id == run_id, Evaluation.status.not_in(FINISHED_STATUSES))
+    leaders = db.scalars(
+        select(Evaluation.duplicate_of).where(*unfinished, Evaluation.duplicate_of.is_not(None)).distinct()
+    ).all()
+    events = complete_duplicates(db, leaders)
+    if events:
+        get_status_publisher().publish_many(events)
+
+    requeued = db.execute(
+        update(Evaluation)
+        .where(*unfinished)
+        # Followers of unfinished leaders are judged on their own
+        .values(status='pending', dispatched_at=None, duplicate_of=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.execute(
+        update(EvaluationRun)
+        .where(EvaluationRun.id == run_id)
+        .values(resumed_at=datetime.datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    logger.info(f"Resumed run {run_id}: {requeued} evaluations back in the bulk backlog")
+    return requeued
+
+
+def load_previous_version(db: Session, criteria: CachedCriteria) -> Optional[CachedCriteria]:
+    """Look up the version before a criteria version of the same agent, or None for the first.
+
+    Versions need not be consecutive, so this is the agent's highest version
+    below the given one.
+    """
+    version = db.execute(
+        select(func.max(EvaluationCriteria.version))
+        .where(EvaluationCriteria.agent_id == criteria.agent_id, EvaluationCriteria.version < criteria.version)
+    ).scalar()
+    if version is None:
+        return None
+    return get_criteria_cache().get_version(db, criteria.agent_id, version)
+
+
+def reevaluated_items(previous: CachedCriteria, criteria: CachedCriteria) -> Dict[str, str]:
+    """Match the rubric items of a criteria version whose verdicts carry over from the previous one.
+
+    Verdicts are only carried over when the new version is judged item by item.
+
+    Returns:
+        Mapping of each unchanged item's key to the key of its previous item, see :func:`unchanged_items`
+    """
+    return unchanged_items(previous.rubric, criteria.rubric) if uses_rubric_fanout(criteria) else {}
+
+
+def reevaluate_previous_version(
+    db: Session, criteria_id: uuid.UUID, run_id: uuid.UUID | None = None, batch_size: int | None = None
+) -> Dict[str, int]:
+    """Re-evaluate the outputs of the previous criteria version against a new one.
+
+    Every finished evaluation of the previous version, the agent's highest
+    version below N, gets a new evaluation of the same prompt and output
+    against version N. Rubric items whose text did not change between the
+    versions, matched by their digest, keep the verdict the previous
+    evaluation got for them; only the changed and added items are judged
+    again. New evaluations whose every item is
+    unchanged are inserted completed, the others join the bulk lane
+    backlog. Items are only carried over when the previous evaluation
+    holds per-item verdicts, see :func:`reevaluated_items`.
+
+    Evaluations already re-evaluated against version N are skipped, so
+    the call can be repeated after a failure.
+
+    Args:
+        db: Database session; committed after every batch
+        criteria_id: The new criteria version
+        run_id: Run the new evaluations are added to
+        batch_size: Previous evaluations handled per batch, defaults to
+            ``settings.REEVALUATION_BATCH_SIZE``
+
+    Returns:
+        Counts of new ``evaluations``, of those ``completed`` from carried
+        verdicts alone, and of rubric items ``carried`` and ``judged``
+
+    Raises:
+        LookupError: If the criteria or its previous version does not exist
+    """
+    criteria = get_criteria_cache().get(db, criteria_id)
+    if criteria is None:
+        raise LookupError(f"Criteria {criteria_id} not found")
+    previous = load_previous_version(db, criteria)
+    if previous is None:
+        raise LookupError(f"Criteria {criteria_id} has no previous version")
+    unchanged = reevaluated_items(previous, criteria)
+    logger.info(
+        f"Re-evaluating version {previous.version} of agent {criteria.agent_id} against version "
+        f"{criteria.version}: {len(unchanged)} of {len(criteria.rubric)} rubric items unchanged"
+    )
+
+    reevaluated = select(Evaluation.carried_from).where(
+        Evaluation.criteria_id == criteria.id, Evaluation.carried_from.is_not(None)
+    )
+    query = (
+        select(Evaluation.id, Evaluation.agent_prompt, Evaluation.agent_output, Evaluation.results)
+        .where(
+            Evaluation.criteria_id == previous.id,
+            Evaluation.status.in_(FINISHED_STATUSES),
+            Evaluation.id.not_in(reevaluated),
+        )
+        .order_by(Evaluation.created_at, Evaluation.id)
+        .limit(batch_size or settings.REEVALUATION_BATCH_SIZE)
+    )
+    counts = {"evaluations": 0, "completed": 0, "carried": 0, "judged": 0}
+    while True:
+        rows = db.execute(query).all()
+        if not rows:
+            break
+        carried = [carry_verdicts(unchanged, row.results) for row in rows]
+        complete = [i for i, verdicts in enumerate(carried) if len(verdicts) == len(criteria.rubric)]
+        cached_results: List[Optional[Dict[str, Any]]] = [None] * len(rows)
+        # Deterministic checks are scored again, one array pass for the whole batch
+        check_scores = score_outputs(criteria.checks, [rows[i].agent_output for i in complete])
+        for i, scores in zip(complete, check_scores):
+            cached_results[i] = with_check_scores(
+                aggregate_rubric(criteria.rubric, merge_verdicts(criteria.rubric, carried[i], [])), scores
+            )
+
+        items = [
+            EvaluationItem(criteria_id=criteria.id, agent_prompt=row.agent_prompt, agent_output=row.agent_output)
+            for row in rows
+        ]
+        evaluation_ids = create_evaluations_bulk(
+            db,
+            items,
+            cached_results,
+            lane=BULK_LANE,
+            run_id=run_id,
+            carried_from=[row.id for row in rows],
+            carried_items=[
+                verdicts if verdicts and cached is None else None
+                for verdicts, cached in zip(carried, cached_results)
+            ],
+        )
+        publish_created_events(evaluation_ids, cached_results)
+
+        carried_count = sum(len(verdicts) for verdicts in carried)
+        judged_count = len(rows) * len(criteria.rubric) - carried_count
+        REEVALUATION_RUBRIC_ITEMS.labels("carried").inc(carried_count)
+        REEVALUATION_RUBRIC_ITEMS.labels("judged").inc(judged_count)
+        counts["evaluations"] += len(rows)
+        counts["completed"] += len(complete)
+        counts["carried"] += carried_count
+        counts["judged"] += judged_count
+    logger.info(
+        f"Re-evaluated {counts['evaluations']} evaluations against criteria {criteria_id}: "
+        f"{counts['carried']} rubric items carried over, {counts['judged']} to judge"
+    )
+    return counts
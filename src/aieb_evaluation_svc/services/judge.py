@@ -0,0 +1,393 @@
+"""LLM judge client used to score agent outputs against evaluation criteria."""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.core.metrics import JUDGE_REQUEST_SECONDS, JUDGE_THROTTLED, JUDGE_TOKENS
+from aieb_evaluation_svc.services.rate_limit import (
+    AdaptiveConcurrency,
+    get_judge_concurrency,
+    get_judge_rate_limiter,
+    jittered,
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+JUDGE_SYSTEM_PROMPT = (
+    "You are an impartial evaluator. Score the agent output against the "
+    "evaluation criteria. Respond with a JSON object of the form "
+    '{"scores": {"<dimension>": <number between 0 and 1>}, "rationale": "<text>"}.'
+)
+
+JUDGE_MULTI_ITEM_SYSTEM_PROMPT = (
+    "You are an impartial evaluator. Score each numbered item's agent output "
+    "against the evaluation criteria, independently of the other items. "
+    'Respond with a JSON object of the form {"items": [{"id": <item number>, '
+    '"scores": {"<dimension>": <number between 0 and 1>}, "rationale": "<text>"}]} '
+    "with one entry per item."
+)
+
+# Sampling parameters sent with every judge request
+JUDGE_PARAMS: Dict[str, Any] = {
+    "temperature": 0,
+    "response_format": {"type": "json_object"},
+}
+
+
+class JudgeResponseError(ValueError):
+    """Raised when the judge response cannot be parsed into scores."""
+
+
+def build_judge_messages(
+    criteria_content: str, agent_prompt: str, agent_output: str | None
+) -> List[Dict[str, str]]:
+    """Build the chat messages sent to the judge model.
+
+    Args:
+        criteria_content: Evaluation criteria document
+        agent_prompt: Prompt given to the agent
+        agent_output: Output produced by the agent
+
+    Returns:
+        List of chat messages
+    """
+    user_content = (
+        f"## Evaluation criteria\n{criteria_content}\n\n"
+        f"## Agent prompt\n{agent_prompt}\n\n"
+        f"## Agent output\n{agent_output or ''}"
+    )
+    return [
+        {"role": "system", "content": JUDGE_SYSTEM_PROMPT},
+        {"role": "user", "content": user_content},
+    ]
+
+
+def build_multi_item_judge_messages(
+    criteria_content: str, items: Sequence[Tuple[str, str | None]]
+) -> List[Dict[str, str]]:
+    """Build the chat messages that score several agent outputs in one request.
+
+    The criteria are sent once, followed by the numbered items.
+
+    Args:
+        criteria_content: Evaluation criteria document shared by the items
+        items: (agent_prompt, agent_output) per item
+
+    Returns:
+        List of chat messages
+    """
+    sections = [f"## Evaluation criteria\n{criteria_content}"]
+    for i, (agent_prompt, agent_output) in enumerate(items):
+        sections.append(
+            f"## Item {i}\n"
+            f"### Agent prompt\n{agent_prompt}\n\n"
+            f"### Agent output\n{agent_output or ''}"
+        )
+    return [
+        {"role": "system", "content": JUDGE_MULTI_ITEM_SYSTEM_PROMPT},
+        {"role": "user", "content": "\n\n".join(sections)},
+    ]
+
+
+def build_judge_request(messages: List[Dict[str, str]]) -> Dict[str, Any]:
+    """Build the chat completion request body for the judge model.
+
+    Args:
+        messages: Chat messages to send
+
+    Returns:
+        Request body for the chat completions endpoint
+    """
+    return {
+        "model": settings.OPENAI_MODEL,
+        "messages": messages,
+        **JUDGE_PARAMS,
+    }
+
+
+def parse_judge_response(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract scores from a chat completion response.
+
+    Args:
+        payload: Decoded chat completion response
+
+    Returns:
+        Dictionary with ``scores``, ``rationale`` and ``model`` keys
+
+    Raises:
+        JudgeResponseError: If the response does not contain valid scores
+    """
+    try:
+        content = payload["choices"][0]["message"]["content"]
+        verdict = json.loads(content)
+        scores = {name: float(value) for name, value in verdict["scores"].items()}
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        raise JudgeResponseError(f"Invalid judge response: {e}") from e
+
+    return {
+        "scores": scores,
+        "rationale": verdict.get("rationale"),
+        "model": payload.get("model", settings.OPENAI_MODEL),
+    }
+
+
+def parse_multi_item_judge_response(payload: Dict[str, Any], count: int) -> List[Dict[str, Any]]:
+    """Extract per-item scores from a multi-item chat completion response.
+
+    Args:
+        payload: Decoded chat completion response
+        count: Number of items in the request
+
+    Returns:
+        One verdict per item, in item order, each with ``scores``,
+        ``rationale`` and ``model`` keys
+
+    Raises:
+        JudgeResponseError: If any item is missing or lacks valid scores
+    """
+    try:
+        content = payload["choices"][0]["message"]["content"]
+        verdicts = {int(item["id"]): item for item in json.loads(content)["items"]}
+        scores = [
+            {name: float(value) for name, value in verdicts[i]["scores"].items()}
+            for i in range(count)
+        ]
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        raise JudgeResponseError(f"Invalid multi-item judge response: {e}") from e
+
+    model = payload.get("model", settings.OPENAI_MODEL)
+    return [
+        {"scores": item_scores, "rationale": verdicts[i].get("rationale"), "model": model}
+        for i, item_scores in enumerate(scores)
+    ]
+
+
+def record_judge_call(client: str, started: float, payload: Dict[str, Any] | None) -> None:
+    """Record the latency and token usage of one judge request.
+
+    Args:
+        client: ``sync`` or ``async``
+        started: ``time.perf_counter()`` value taken before the request
+        payload: Decoded response, or None if the request failed
+    """
+    JUDGE_REQUEST_SECONDS.labels(client, "error" if payload is None else "success").observe(
+        time.perf_counter() - started
+    )
+    usage = (payload or {}).get("usage") or {}
+    for kind in ("prompt", "completion"):
+        tokens = usage.get(f"{kind}_tokens")
+        if isinstance(tokens, int):
+            JUDGE_TOKENS.labels(kind).inc(tokens)
+
+
+def estimate_tokens(messages: List[Dict[str, str]], replies: int = 1) -> int:
+    """Estimate the tokens a judge request will use before it is sent.
+
+    Counts about four characters per prompt token plus the reply budget
+    ``settings.JUDGE_COMPLETION_TOKENS_ESTIMATE`` per verdict requested;
+    the rate limiter is corrected with the reported usage once the reply
+    arrives.
+    """
+    prompt_tokens = sum(len(message["content"]) for message in messages) // 4
+    return prompt_tokens + replies * settings.JUDGE_COMPLETION_TOKENS_ESTIMATE
+
+
+def usage_tokens(payload: Dict[str, Any]) -> Optional[int]:
+    """Return the total tokens a judge response reports, if any."""
+    total = (payload.get("usage") or {}).get("total_tokens")
+    return total if isinstance(total, int) else None
+
+
+def throttle_delay(response: httpx.Response, attempt: int) -> Optional[float]:
+    """Return how long to wait before retrying a throttled judge request.
+
+    Args:
+        response: Judge response
+        attempt: Number of retries already made
+
+    Returns:
+        The provider's ``Retry-After``, or an exponential backoff without
+        one; None if the request was not throttled or may not be retried
+    """
+    if response.status_code != 429 or attempt >= settings.JUDGE_THROTTLE_MAX_RETRIES:
+        return None
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return settings.JUDGE_THROTTLE_BACKOFF_SECONDS * 2 ** attempt
+
+
+def adapt_concurrency(concurrency: AdaptiveConcurrency, response: httpx.Response | None, started: float) -> None:
+    """Feed the outcome of one judge request into the adaptive concurrency limit."""
+    if response is None:
+        return
+    if response.status_code == 429:
+        JUDGE_THROTTLED.inc()
+        concurrency.on_overload()
+    elif response.is_success:
+        concurrency.on_success(time.perf_counter() - started)
+
+
+def judge(criteria_content: str, agent_prompt: str, agent_output: str | None) -> Dict[str, Any]:
+    """Score an agent output with the configured judge model.
+
+    The call waits for the fleet-wide rate limit budget and a slot under the
+    process's adaptive concurrency limit, and throttled requests are retried
+    after the provider's ``Retry-After``.
+
+    Args:
+        criteria_content: Evaluation criteria document
+        agent_prompt: Prompt given to the agent
+        agent_output: Output produced by the agent
+
+    Returns:
+        Parsed judge verdict
+
+    Raises:
+        httpx.HTTPError: If the judge request fails
+        JudgeResponseError: If the judge response cannot be parsed
+        RateLimitTimeout: If the rate limit budget stays exhausted
+    """
+    messages = build_judge_messages(criteria_content, agent_prompt, agent_output)
+    tokens = estimate_tokens(messages)
+    limiter, concurrency = get_judge_rate_limiter(), get_judge_concurrency()
+    attempt = 0
+    while True:
+        limiter.acquire(tokens)
+        with concurrency:
+            started = time.perf_counter()
+            response = payload = delay = None
+            try:
+                response = httpx.post(
+                    f"{settings.OPENAI_BASE_URL}/chat/completions",
+                    json=build_judge_request(messages),
+                    headers={"Authorization": f"Bearer {settings.OPENAI_API_KEY}"},
+                    timeout=settings.JUDGE_TIMEOUT_SECONDS,
+                )
+                delay = throttle_delay(response, attempt)
+                if delay is None:
+                    response.raise_for_status()
+                    payload = response.json()
+            finally:
+                record_judge_call("sync", started, payload)
+                adapt_concurrency(concurrency, response, started)
+        if delay is None:
+            break
+        logger.warning(f"Judge request throttled, retrying in {delay:.1f}s")
+        limiter.penalize(delay)
+        time.sleep(jittered(delay))
+        attempt += 1
+    limiter.reconcile(tokens, usage_tokens(payload))
+    return parse_judge_response(payload)
+
+
+class AsyncJudgeClient:
+    """Judge client backed by one pooled keep-alive ``httpx.AsyncClient``.
+
+    A single instance is meant to be shared by every evaluation running on
+    an event loop so that connections to the judge API are reused.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 32,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        """Create the pooled HTTP client.
+
+        Args:
+            max_connections: Size of the connection pool
+            transport: Optional transport override, used in tests
+        """
+        self._client = httpx.AsyncClient(
+            base_url=settings.OPENAI_BASE_URL,
+            headers={"Authorization": f"Bearer {settings.OPENAI_API_KEY}"},
+            timeout=settings.JUDGE_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            transport=transport,
+        )
+
+    async def judge(
+        self, criteria_content: str, agent_prompt: str, agent_output: str | None
+    ) -> Dict[str, Any]:
+        """Score an agent output with the configured judge model.
+
+        Rate limits, adaptive concurrency and throttling retries work as in
+        :func:`judge`; waiting happens on the event loop.
+
+        Args:
+            criteria_content: Evaluation criteria document
+            agent_prompt: Prompt given to the agent
+            agent_output: Output produced by the agent
+
+        Returns:
+            Parsed judge verdict
+
+        Raises:
+            httpx.HTTPError: If the judge request fails
+            JudgeResponseError: If the judge response cannot be parsed
+            RateLimitTimeout: If the rate limit budget stays exhausted
+        """
+        messages = build_judge_messages(criteria_content, agent_prompt, agent_output)
+        return parse_judge_response(await self._complete(messages, estimate_tokens(messages)))
+
+    async def judge_items(
+        self, criteria_content: str, items: Sequence[Tuple[str, str | None]]
+    ) -> List[Dict[str, Any]]:
+        """Score several agent outputs against shared criteria in one request.
+
+        Args:
+            criteria_content: Evaluation criteria document shared by the items
+            items: (agent_prompt, agent_output) per item
+
+        Returns:
+            One parsed judge verdict per item, in item order
+
+        Raises:
+            httpx.HTTPError: If the judge request fails
+            JudgeResponseError: If the judge response cannot be parsed
+            RateLimitTimeout: If the rate limit budget stays exhausted
+        """
+        messages = build_multi_item_judge_messages(criteria_content, items)
+        payload = await self._complete(messages, estimate_tokens(messages, replies=len(items)))
+        return parse_multi_item_judge_response(payload, len(items))
+
+    async def _complete(self, messages: List[Dict[str, str]], tokens: int) -> Dict[str, Any]:
+        limiter, concurrency = get_judge_rate_limiter(), get_judge_concurrency()
+        attempt = 0
+        while True:
+            await limiter.acquire_async(tokens)
+            async with concurrency:
+                started = time.perf_counter()
+                response = payload = delay = None
+                try:
+                    response = await self._client.post("/chat/completions", json=build_judge_request(messages))
+                    delay = throttle_delay(response, attempt)
+                    if delay is None:
+                        response.raise_for_status()
+                        payload = response.json()
+                finally:
+                    record_judge_call("async", started, payload)
+                    adapt_concurrency(concurrency, response, started)
+            if delay is None:
+                break
+            logger.warning(f"Judge request throttled, retrying in {delay:.1f}s")
+            limiter.penalize(delay)
+            await asyncio.sleep(jittered(delay))
+            attempt += 1
+        limiter.reconcile(tokens, usage_tokens(payload))
+        return payload
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pool."""
+        await self._client.aclose()
@@ -0,0 +1,236 @@
+"""Content-addressed cache of judge verdicts with in-process and Redis tiers."""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence
+
+import redis
+
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.services.judge import JUDGE_PARAMS
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "judge-cache:"
+
+
+def criteria_digest(criteria_content: str) -> str:
+    """Hash a criteria document once so it can be reused across many keys.
+
+    Args:
+        criteria_content: Evaluation criteria document
+
+    Returns:
+        Hex SHA-256 digest of the document
+    """
+    return hashlib.sha256(criteria_content.encode()).hexdigest()
+
+
+def judge_cache_key(
+    criteria_hash: str,
+    agent_prompt: str,
+    agent_output: str | None,
+    model: str | None = None,
+    params: Dict[str, Any] | None = None,
+) -> str:
+    """Build the content-addressed cache key for one judge call.
+
+    Args:
+        criteria_hash: Digest of the criteria document, see :func:`criteria_digest`
+        agent_prompt: Prompt given to the agent
+        agent_output: Output produced by the agent
+        model: Judge model, defaults to ``settings.OPENAI_MODEL``
+        params: Judge request parameters, defaults to ``JUDGE_PARAMS``
+
+    Returns:
+        Hex SHA-256 digest identifying the judgement
+    """
+    material = json.dumps(
+        [
+            criteria_hash,
+            agent_prompt,
+            agent_output,
+            model or settings.OPENAI_MODEL,
+            JUDGE_PARAMS if params is None else params,
+        ],
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe bounded mapping that evicts the least recently used entry."""
+
+    def __init__(self, maxsize: int):
+        """Create an empty cache.
+
+        Args:
+            maxsize: Maximum number of entries kept
+        """
+        self.maxsize = maxsize
+        self.evictions = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            return self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class JudgeResultCache:
+    """Two-tier cache of judge verdicts keyed by :func:`judge_cache_key`.
+
+    Lookups try the bounded in-process LRU first and fall back to Redis,
+    promoting Redis hits into the local tier. Redis errors are logged and
+    treated as misses so that the cache never fails an evaluation.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl_seconds: int,
+        redis_client: redis.Redis | None = None,
+    ):
+        """Create the cache.
+
+        Args:
+            maxsize: Maximum entries in the in-process tier
+            ttl_seconds: Expiry of entries in the Redis tier
+            redis_client: Client for the shared tier, or None for local only
+        """
+        self.ttl_seconds = ttl_seconds
+        self.redis = redis_client
+        self.local = LRUCache(maxsize)
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _count(self, local_hits: int = 0, redis_hits: int = 0, misses: int = 0) -> None:
+        with self._lock:
+            self.local_hits += local_hits
+            self.redis_hits += redis_hits
+            self.misses += misses
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached verdict for a key, or None on a miss."""
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+        """Look up many keys, using a single MGET for the Redis tier.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Cached verdict or None for each key, in key order
+        """
+        found: List[Optional[Dict[str, Any]]] = [self.local.get(key) for key in keys]
+        local_hits = sum(result is not None for result in found)
+        redis_hits = 0
+
+        pending = [i for i, result in enumerate(found) if result is None]
+        if pending and self.redis is not None:
+            try:
+                values = self.redis.mget([REDIS_KEY_PREFIX + keys[i] for i in pending])
+            except redis.RedisError as e:
+                logger.warning(f"Judge cache Redis lookup failed: {e}")
+                values = [None] * len(pending)
+
+            for i, value in zip(pending, values):
+                if value is not None:
+                    found[i] = json.loads(value)
+                    self.local.set(keys[i], found[i])
+                    redis_hits += 1
+
+        self._count(local_hits, redis_hits, len(keys) - local_hits - redis_hits)
+        return found
+
+    def set(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a verdict in both tiers."""
+        self.set_many({key: result})
+
+    def set_many(self, results: Dict[str, Dict[str, Any]]) -> None:
+        """Store many verdicts, pipelining the Redis writes.
+
+        Args:
+            results: Mapping of cache key to verdict
+        """
+        for key, result in results.items():
+            self.local.set(key, result)
+
+        if results and self.redis is not None:
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                for key, result in results.items():
+                    pipe.set(REDIS_KEY_PREFIX + key, json.dumps(result), ex=self.ttl_seconds)
+                pipe.execute()
+            except redis.RedisError as e:
+                logger.warning(f"Judge cache Redis write failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit, miss and eviction counters."""
+        with self._lock:
+            return {
+                "local_hits": self.local_hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "evictions": self.local.evictions,
+                "local_size": len(self.local),
+                "local_maxsize": self.local.maxsize,
+            }
+
+
+_judge_cache: JudgeResultCache | None = None
+_judge_cache_lock = threading.Lock()
+
+
+def get_judge_cache() -> JudgeResultCache:
+    """Return the process-wide judge cache, creating it on first use."""
+    global _judge_cache
+    with _judge_cache_lock:
+        if _judge_cache is None:
+            redis_url = settings.JUDGE_CACHE_REDIS_URL or settings.REDIS_BROKER_URL
+            _judge_cache = JudgeResultCache(
+                maxsize=settings.JUDGE_CACHE_MAX_ENTRIES,
+                ttl_seconds=settings.JUDGE_CACHE_TTL_SECONDS,
+                redis_client=redis.Redis.from_url(
+                    redis_url,
+                    socket_timeout=settings.JUDGE_CACHE_REDIS_TIMEOUT_SECONDS,
+                    socket_connect_timeout=settings.JUDGE_CACHE_REDIS_TIMEOUT_SECONDS,
+                ),
+            )
+        return _judge_cache
+
+
+def set_judge_cache(cache: JudgeResultCache | None) -> None:
+    """Replace the process-wide judge cache, e.g. in tests."""
+    global _judge_cache
+    with _judge_cache_lock:
+        _judge_cache = cache
@@ -0,0 +1,468 @@
+"""Fleet-wide rate limiting and per-process adaptive concurrency for judge calls.
+
+The judge provider enforces requests-per-minute and tokens-per-minute
+limits across every worker, so two mechanisms share them out:
+
+* :class:`TokenBucketLimiter` keeps one request bucket and one token
+  bucket per judge model in Redis. Every judge call takes a request and
+  its estimated tokens before it is sent, and the estimate is corrected
+  with the reported usage afterwards. A throttled response blocks the
+  buckets for the provider's ``Retry-After``, so the whole fleet backs off
+  together instead of retrying in lockstep.
+* :class:`AdaptiveConcurrency` bounds the judge calls one process keeps in
+  flight with an AIMD limit: it grows by one per round trip while calls
+  succeed at normal latency, and halves when the provider throttles or
+  recent latency climbs well above its long-term average.
+
+Redis errors are logged and let the call through, so an outage costs
+rate-limit coordination, never judge calls.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import redis
+
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.core.metrics import JUDGE_CONCURRENCY_LIMIT, JUDGE_RATE_LIMIT_WAIT_SECONDS
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_KEY_PREFIX = "judge-rate:"
+
+# Weights of the newest round trip in the recent and baseline latency
+# averages: the baseline follows lasting changes, the recent average
+# follows congestion
+RECENT_LATENCY_WEIGHT = 0.2
+BASELINE_LATENCY_WEIGHT = 0.02
+
+# Extra wait added to every retry so that throttled callers spread out
+JITTER_RATIO = 0.2
+
+# Refill both buckets, which hold ARGV[1] requests and ARGV[2] tokens per
+# ARGV[4] seconds, then take one request and ARGV[3] tokens if both hold
+# enough. Returns the seconds to wait, as a string since Redis
+# truncates Lua numbers to integers; "0" means the budget was taken.
+TAKE_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local rpm, tpm, cost, period = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'requests', 'tokens', 'updated', 'blocked_until')
+local requests = tonumber(state[1]) or rpm
+local tokens = tonumber(state[2]) or tpm
+local elapsed = math.max(now - (tonumber(state[3]) or now), 0)
+local blocked_until = tonumber(state[4]) or 0
+requests = math.min(rpm, requests + elapsed * rpm / period)
+tokens = math.min(tpm, tokens + elapsed * tpm / period)
+cost = math.min(cost, tpm)
+local wait = 0
+if blocked_until > now then
+  wait = blocked_until - now
+else
+  if rpm > 0 and requests < 1 then wait = (1 - requests) * period / rpm end
+  if tpm > 0 and tokens < cost then wait = math.max(wait, (cost - tokens) * period / tpm) end
+end
+if wait == 0 then
+  requests = requests - 1
+  tokens = tokens - cost
+end
+redis.call('HSET', KEYS[1], 'requests', requests, 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(period * 2))
+return tostring(wait)
+"""
+
+# Block the buckets for ARGV[1] seconds unless they already are for longer;
+# ARGV[2] is the key's expiry
+PENALIZE_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local until_ = now + tonumber(ARGV[1])
+local current = tonumber(redis.call('HGET', KEYS[1], 'blocked_until')) or 0
+if until_ > current then redis.call('HSET', KEYS[1], 'blocked_until', until_) end
+redis.call('EXPIRE', KEYS[1], math.ceil(tonumber(ARGV[2])))
+return 1
+"""
+
+
+class RateLimitTimeout(RuntimeError):
+    """Raised when the judge budget does not free up within the maximum wait."""
+
+
+def take_budget(
+    state: Dict[str, float], now: float, rpm: int, tpm: int, cost: float, period: float = 60.0
+) -> float:
+    """Refill an in-process bucket pair and take one request and ``cost`` tokens.
+
+    Mirrors :data:`TAKE_SCRIPT`; a limit of 0 or less disables its bucket.
+
+    Args:
+        state: Bucket state, updated in place
+        now: Current time in seconds
+        rpm: Requests per period
+        tpm: Tokens per period
+        cost: Tokens the request is expected to use
+        period: Seconds over which the buckets refill completely
+
+    Returns:
+        Seconds to wait before trying again, or 0 if the budget was taken
+    """
+    elapsed = max(now - state.get("updated", now), 0.0)
+    requests = min(rpm, state.get("requests", rpm) + elapsed * rpm / period)
+    tokens = min(tpm, state.get("tokens", tpm) + elapsed * tpm / period)
+    cost = min(cost, tpm)
+    wait = 0.0
+    if state.get("blocked_until", 0.0) > now:
+        wait = state["blocked_until"] - now
+    else:
+        if rpm > 0 and requests < 1:
+            wait = (1 - requests) * period / rpm
+        if tpm > 0 and tokens < cost:
+            wait = max(wait, (cost - tokens) * period / tpm)
+    if wait == 0:
+        requests -= 1
+        tokens -= cost
+    state.update(requests=requests, tokens=tokens, updated=now)
+    return wait
+
+
+class TokenBucketLimiter:
+    """Requests-per-minute and tokens-per-minute budget shared through Redis."""
+
+    def __init__(
+        self,
+        rpm: int,
+        tpm: int,
+        max_wait_seconds: float,
+        key: str,
+        redis_client: redis.Redis | None = None,
+        period_seconds: float = 60.0,
+    ):
+        """Create the limiter.
+
+        Args:
+            rpm: Requests per minute across the fleet, 0 for no limit
+            tpm: Tokens per minute across the fleet, 0 for no limit
+            max_wait_seconds: Longest a caller waits for budget
+            key: Redis key of the bucket pair, one per judge model
+            redis_client: Shared client, or None to limit this process only
+            period_seconds: Window the limits apply to; providers use a minute
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_wait_seconds = max_wait_seconds
+        self.key = key
+        self.redis = redis_client
+        self.period_seconds = period_seconds
+        self._local: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        if redis_client is not None:
+            self._take = redis_client.register_script(TAKE_SCRIPT)
+            self._penalize = redis_client.register_script(PENALIZE_SCRIPT)
+
+    @property
+    def enabled(self) -> bool:
+        return self.rpm > 0 or self.tpm > 0
+
+    def try_acquire(self, tokens: int) -> float:
+        """Take one request and ``tokens`` tokens if the budget allows.
+
+        Args:
+            tokens: Estimated tokens of the request
+
+        Returns:
+            Seconds to wait before trying again, or 0 if the budget was taken
+        """
+        if not self.enabled:
+            return 0.0
+        if self.redis is None:
+            with self._lock:
+                return take_budget(self._local, time.monotonic(), self.rpm, self.tpm, tokens, self.period_seconds)
+        try:
+            return float(self._take(keys=[self.key], args=[self.rpm, self.tpm, tokens, self.period_seconds]))
+        except redis.RedisError as e:
+            logger.warning(f"Judge rate limit check failed: {e}")
+            return 0.0
+
+    def acquire(self, tokens: int) -> float:
+        """Block until the budget for one request is taken.
+
+        Args:
+            tokens: Estimated tokens of the request
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            RateLimitTimeout: If the budget is not available within ``max_wait_seconds``
+        """
+        started = time.monotonic()
+        while True:
+            wait = self._next_wait(tokens, started)
+            if wait == 0:
+                return self._waited(started)
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int) -> float:
+        """Wait on the event loop until the budget for one request is taken.
+
+        Same as :meth:`acquire`; the Redis round trip itself is not awaited.
+        """
+        started = time.monotonic()
+        while True:
+            wait = self._next_wait(tokens, started)
+            if wait == 0:
+                return self._waited(started)
+            await asyncio.sleep(wait)
+
+    def _next_wait(self, tokens: int, started: float) -> float:
+        wait = self.try_acquire(tokens)
+        if wait == 0:
+            return 0.0
+        if time.monotonic() - started + wait > self.max_wait_seconds:
+            raise RateLimitTimeout(f"Judge rate limit budget not available within {self.max_wait_seconds}s")
+        return jittered(wait)
+
+    def _waited(self, started: float) -> float:
+        waited = time.monotonic() - started
+        JUDGE_RATE_LIMIT_WAIT_SECONDS.observe(waited)
+        return waited
+
+    def reconcile(self, estimated: int, actual: Optional[int]) -> None:
+        """Correct the token bucket with a request's reported usage.
+
+        Args:
+            estimated: Tokens taken before the request
+            actual: Tokens the judge reported, or None if unknown
+        """
+        if actual is None or actual == estimated or self.tpm <= 0:
+            return
+        if self.redis is None:
+            with self._lock:
+                self._local["tokens"] = self._local.get("tokens", self.tpm) + estimated - actual
+            return
+        try:
+            self.redis.hincrbyfloat(self.key, "tokens", estimated - actual)
+        except redis.RedisError as e:
+            logger.warning(f"Judge rate limit reconcile failed: {e}")
+
+    def penalize(self, seconds: float) -> None:
+        """Hold every caller back after the provider throttled a request.
+
+        Args:
+            seconds: How long the provider asked callers to wait
+        """
+        if not self.enabled:
+            return
+        if self.redis is None:
+            with self._lock:
+                self._local["blocked_until"] = max(
+                    self._local.get("blocked_until", 0.0), time.monotonic() + seconds
+                )
+            return
+        try:
+            self._penalize(keys=[self.key], args=[seconds, max(seconds, self.period_seconds) * 2])
+        except redis.RedisError as e:
+            logger.warning(f"Judge rate limit backoff failed: {e}")
+
+
+def jittered(seconds: float) -> float:
+    """Spread a wait by up to ``JITTER_RATIO`` so that waiting callers do not retry together."""
+    return seconds * (1 + random.random() * JITTER_RATIO)
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on the judge calls one process keeps in flight.
+
+    Usable as a context manager from threads and as an async context
+    manager from an event loop; both kinds of caller share the limit.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int,
+        maximum: int,
+        latency_tolerance: float,
+        backoff_ratio: float = 0.5,
+    ):
+        """Create the limit.
+
+        Args:
+            initial: Starting limit
+            minimum: Lowest the limit shrinks to
+            maximum: Highest the limit grows to
+            latency_tolerance: Multiple of the long-term average latency
+                above which the recent average counts as congestion
+            backoff_ratio: Factor the limit shrinks by on congestion
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_tolerance = latency_tolerance
+        self.backoff_ratio = backoff_ratio
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.in_flight = 0
+        # Moving averages of the round trip time, None until the first call
+        self.latency: float | None = None
+        self.baseline_latency: float | None = None
+        self._last_decrease = float("-inf")
+        self._condition = threading.Condition()
+        self._async_waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        JUDGE_CONCURRENCY_LIMIT.set(self.limit)
+
+    def acquire(self) -> None:
+        """Block until a call may start."""
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    async def acquire_async(self) -> None:
+        """Wait on the event loop until a call may start."""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self._condition:
+                    if (loop, waiter) in self._async_waiters:
+                        self._async_waiters.remove((loop, waiter))
+                    else:
+                        # Woken while being cancelled: pass the slot on
+                        self._wake()
+                raise
+
+    def release(self) -> None:
+        """Mark a call finished."""
+        with self._condition:
+            self.in_flight -= 1
+            self._wake()
+
+    def on_success(self, latency: float) -> None:
+        """Grow the limit after a call, or shrink it if the call was slow.
+
+        Args:
+            latency: Seconds the call took
+        """
+        with self._condition:
+            if self.latency is None:
+                self.latency = self.baseline_latency = latency
+            self.latency += RECENT_LATENCY_WEIGHT * (latency - self.latency)
+            self.baseline_latency += BASELINE_LATENCY_WEIGHT * (latency - self.baseline_latency)
+            if self.latency > self.baseline_latency * self.latency_tolerance:
+                self._decrease(latency)
+                return
+            # One more slot per limit's worth of successful calls, i.e. about one per round trip
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            JUDGE_CONCURRENCY_LIMIT.set(self.limit)
+            self._wake()
+
+    def on_overload(self) -> None:
+        """Shrink the limit after the provider throttled a call."""
+        with self._condition:
+            self._decrease(self.latency or 0.0)
+
+    def _decrease(self, window: float) -> None:
+        # Calls started before the last decrease report the same congestion; count it once
+        now = time.monotonic()
+        if now - self._last_decrease < window:
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit * self.backoff_ratio)
+        JUDGE_CONCURRENCY_LIMIT.set(self.limit)
+        logger.info(f"Judge concurrency limit lowered to {self.limit:.1f}")
+
+    def _wake(self) -> None:
+        free = int(self.limit) - self.in_flight
+        if free <= 0:
+            return
+        self._condition.notify(free)
+        for _ in range(min(free, len(self._async_waiters))):
+            loop, waiter = self._async_waiters.popleft()
+            loop.call_soon_threadsafe(_resolve, waiter)
+
+    def __enter__(self) -> "AdaptiveConcurrency":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.release()
+
+    async def __aenter__(self) -> "AdaptiveConcurrency":
+        await self.acquire_async()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.release()
+
+
+def _resolve(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+_rate_limiter: TokenBucketLimiter | None = None
+_concurrency: AdaptiveConcurrency | None = None
+_lock = threading.Lock()
+
+
+def get_judge_rate_limiter() -> TokenBucketLimiter:
+    """Return the process-wide judge rate limiter, creating it on first use."""
+    global _rate_limiter
+    with _lock:
+        if _rate_limiter is None:
+            redis_client = None
+            if settings.JUDGE_RATE_LIMIT_ENABLED:
+                redis_client = redis.Redis.from_url(
+                    settings.JUDGE_RATE_LIMIT_REDIS_URL or settings.REDIS_BROKER_URL,
+                    socket_timeout=settings.JUDGE_RATE_LIMIT_REDIS_TIMEOUT_SECONDS,
+                    socket_connect_timeout=settings.JUDGE_RATE_LIMIT_REDIS_TIMEOUT_SECONDS,
+                )
+            _rate_limiter = TokenBucketLimiter(
+                rpm=settings.JUDGE_RPM_LIMIT if settings.JUDGE_RATE_LIMIT_ENABLED else 0,
+                tpm=settings.JUDGE_TPM_LIMIT if settings.JUDGE_RATE_LIMIT_ENABLED else 0,
+                max_wait_seconds=settings.JUDGE_RATE_LIMIT_MAX_WAIT_SECONDS,
+                key=f"{RATE_LIMIT_KEY_PREFIX}{settings.OPENAI_MODEL}",
+                redis_client=redis_client,
+            )
+        return _rate_limiter
+
+
+def set_judge_rate_limiter(limiter: TokenBucketLimiter | None) -> None:
+    """Replace the process-wide judge rate limiter, e.g. in tests."""
+    global _rate_limiter
+    with _lock:
+        _rate_limiter = limiter
+
+
+def get_judge_concurrency() -> AdaptiveConcurrency:
+    """Return the process-wide adaptive judge concurrency limit, creating it on first use."""
+    global _concurrency
+    with _lock:
+        if _concurrency is None:
+            maximum = settings.JUDGE_CONCURRENCY_MAX
+            _concurrency = AdaptiveConcurrency(
+                initial=settings.JUDGE_CONCURRENCY_INITIAL if settings.JUDGE_ADAPTIVE_CONCURRENCY_ENABLED else maximum,
+                minimum=settings.JUDGE_CONCURRENCY_MIN if settings.JUDGE_ADAPTIVE_CONCURRENCY_ENABLED else maximum,
+                maximum=maximum,
+                latency_tolerance=settings.JUDGE_LATENCY_TOLERANCE,
+            )
+        return _concurrency
+
+
+def set_judge_concurrency(concurrency: AdaptiveConcurrency | None) -> None:
+    """Replace the process-wide adaptive judge concurrency limit, e.g. in tests."""
+    global _concurrency
+    with _lock:
+        _concurrency = concurrency
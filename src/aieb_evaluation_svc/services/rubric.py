@@ -0,0 +1,173 @@
+"""Splitting criteria documents into rubric items and combining their verdicts.
+
+A criteria document usually lists several independent rubric items,
+either as markdown headings or as a top-level list. Each item can be
+judged on its own, in parallel, with the document's preamble as shared
+context; the per-item verdicts are then folded into one evaluation result
+with one score per item.
+
+Each item is identified across criteria versions by the hash of its
+text, so a new version can be diffed against the previous one and only
+the items whose text changed need to be judged again.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+HEADING = re.compile(r"^#{1,6}\s+(?P<title>.+?)\s*#*\s*$")
+LIST_ITEM = re.compile(r"^(?:[-*+]|\d+[.)])\s+(?P<title>.+?)\s*$")
+
+# Longest score key derived from an item's title
+MAX_KEY_LENGTH = 40
+
+
+@dataclass(frozen=True)
+class RubricItem:
+    """One independently judged part of a criteria document."""
+    key: str
+    title: str
+    # Criteria text sent to the judge: the document preamble and this item
+    text: str
+
+    @property
+    def digest(self) -> str:
+        """Hex SHA-256 of the item's text; equal digests get equal verdicts from the judge."""
+        return hashlib.sha256(self.text.encode()).hexdigest()
+
+
+def item_key(title: str, index: int, taken: Set[str]) -> str:
+    """Derive a unique score key from an item title."""
+    key = re.sub(r"[^a-z0-9]+", "_", title.lower()).strip("_")[:MAX_KEY_LENGTH].rstrip("_")
+    key = key or f"item_{index + 1}"
+    unique, suffix = key, 2
+    while unique in taken:
+        unique, suffix = f"{key}_{suffix}", suffix + 1
+    taken.add(unique)
+    return unique
+
+
+def split_rubric(criteria_content: str) -> Tuple[RubricItem, ...]:
+    """Split a criteria document into rubric items.
+
+    Items start at markdown headings if the document has any, otherwise at
+    unindented list items. Text before the first item is a preamble shared
+    by every item; indented or unmarked lines belong to the item above them.
+
+    Args:
+        criteria_content: Evaluation criteria document
+
+    Returns:
+        The rubric items in document order; a single item holding the whole
+        document if it has fewer than two
+    """
+    lines = criteria_content.splitlines()
+    pattern = HEADING if any(HEADING.match(line) for line in lines) else LIST_ITEM
+
+    preamble: List[str] = []
+    blocks: List[Tuple[str, List[str]]] = []
+    for line in lines:
+        match = pattern.match(line)
+        if match:
+            blocks.append((match.group("title"), [line]))
+        elif blocks:
+            blocks[-1][1].append(line)
+        else:
+            preamble.append(line)
+
+    if len(blocks) < 2:
+        return (RubricItem("overall", "Overall", criteria_content),)
+
+    context = "\n".join(preamble).strip()
+    taken: Set[str] = set()
+    return tuple(
+        RubricItem(
+            item_key(title, index, taken),
+            title,
+            "\n\n".join(part for part in (context, "\n".join(block).strip()) if part),
+        )
+        for index, (title, block) in enumerate(blocks)
+    )
+
+
+def aggregate_rubric(items: Sequence[RubricItem], verdicts: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine per-item judge verdicts into one evaluation result.
+
+    Each item contributes one score, the mean of the scores its judge
+    returned, keyed by the item's key; the full verdicts are kept under
+    ``items``.
+
+    Args:
+        items: Rubric items, as returned by :func:`split_rubric`
+        verdicts: Judge verdict of each item, in item order
+
+    Returns:
+        Result with ``scores``, ``rationale``, ``model`` and ``items`` keys
+    """
+    scores = {}
+    for item, verdict in zip(items, verdicts):
+        values = list(verdict["scores"].values())
+        if values:
+            scores[item.key] = sum(values) / len(values)
+    return {
+        "scores": scores,
+        "rationale": "\n\n".join(
+            f"{item.title}: {verdict.get('rationale') or ''}" for item, verdict in zip(items, verdicts)
+        ),
+        "model": verdicts[0].get("model") if verdicts else None,
+        "items": {item.key: verdict for item, verdict in zip(items, verdicts)},
+    }
+
+
+def unchanged_items(previous: Sequence[RubricItem], current: Sequence[RubricItem]) -> Dict[str, str]:
+    """Match the items of a criteria version to identical items of the previous version.
+
+    Items match on their digest, so an item keeps its match when other
+    items are added, removed or reordered, and loses it when its own text
+    or the shared preamble changes.
+
+    Args:
+        previous: Rubric items of the previous version
+        current: Rubric items of the new version
+
+    Returns:
+        Mapping of each unchanged item's key to the key of its previous item
+    """
+    previous_keys = {item.digest: item.key for item in previous}
+    return {item.key: previous_keys[item.digest] for item in current if item.digest in previous_keys}
+
+
+def carry_verdicts(
+    unchanged: Mapping[str, str], previous_results: Optional[Dict[str, Any]]
+) -> Dict[str, Dict[str, Any]]:
+    """Pick the verdicts of unchanged items out of a previous evaluation's results.
+
+    Args:
+        unchanged: Current item key to previous item key, see :func:`unchanged_items`
+        previous_results: Results of the previous evaluation, as stored by
+            :func:`aggregate_rubric`
+
+    Returns:
+        Verdict per current item key; empty if the results hold no item verdicts
+    """
+    items = (previous_results or {}).get("items") or {}
+    return {key: items[previous_key] for key, previous_key in unchanged.items() if previous_key in items}
+
+
+def merge_verdicts(
+    items: Sequence[RubricItem], carried: Optional[Mapping[str, Dict[str, Any]]], judged: Sequence[Any]
+) -> List[Any]:
+    """Interleave carried verdicts with the verdicts of the items judged again.
+
+    Args:
+        items: Rubric items
+        carried: Verdict per carried item key, or None
+        judged: Outcomes of the other items, in item order
+
+    Returns:
+        One outcome per item, in item order
+    """
+    carried = carried or {}
+    outcomes: Iterator[Any] = iter(judged)
+    return [carried[item.key] if item.key in carried else next(outcomes) for item in items]
@@ -0,0 +1,228 @@
+"""Incrementally maintained score statistics per agent, criteria version and dimension."""
+
+import datetime
+import itertools
+import logging
+import math
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from aieb_evaluation_svc.models.evaluation import Evaluation
+from aieb_evaluation_svc.models.evaluation_criteria import EvaluationCriteria
+from aieb_evaluation_svc.models.score_aggregate import ScoreAggregate
+from aieb_evaluation_svc.services.evaluation_query import EvaluationFilters
+from aieb_evaluation_svc.services.score_sketch import QuantileSketch
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+STATS_QUANTILES = {"p50": 0.5, "p90": 0.9, "p95": 0.95, "p99": 0.99}
+
+# (agent_id, criteria_version, dimension)
+AggregateKey = Tuple[uuid.UUID, int, str]
+
+
+def extract_scores(results: Optional[Dict[str, Any]]) -> Dict[str, float]:
+    """Return the numeric score dimensions of a judge verdict.
+
+    Args:
+        results: ``Evaluation.results`` of a completed evaluation
+
+    Returns:
+        Mapping of dimension to score; non-numeric scores are skipped
+    """
+    scores = (results or {}).get("scores")
+    if not isinstance(scores, dict):
+        return {}
+    return {
+        dimension: float(value)
+        for dimension, value in scores.items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+    }
+
+
+def group_scores(samples: Iterable[Tuple[uuid.UUID, int, Optional[Dict[str, Any]]]]) -> Dict[AggregateKey, List[float]]:
+    """Group the scores of many verdicts by aggregate key.
+
+    Args:
+        samples: (agent_id, criteria_version, results) per completed evaluation
+
+    Returns:
+        Score values per (agent_id, criteria_version, dimension)
+    """
+    grouped: Dict[AggregateKey, List[float]] = defaultdict(list)
+    for agent_id, criteria_version, results in samples:
+        for dimension, value in extract_scores(results).items():
+            grouped[(agent_id, criteria_version, dimension)].append(value)
+    return grouped
+
+
+def _empty_aggregate(key: AggregateKey) -> ScoreAggregate:
+    agent_id, criteria_version, dimension = key
+    return ScoreAggregate(
+        agent_id=agent_id,
+        criteria_version=criteria_version,
+        dimension=dimension,
+        count=0,
+        sum=0.0,
+        sum_squares=0.0,
+        sketch=QuantileSketch().to_dict(),
+    )
+
+
+def _apply_values(aggregate: ScoreAggregate, values: np.ndarray) -> None:
+    aggregate.count += int(values.size)
+    aggregate.sum += float(values.sum())
+    aggregate.sum_squares += float(np.dot(values, values))
+    low, high = float(values.min()), float(values.max())
+    aggregate.min = low if aggregate.min is None else min(aggregate.min, low)
+    aggregate.max = high if aggregate.max is None else max(aggregate.max, high)
+    sketch = QuantileSketch.from_dict(aggregate.sketch)
+    sketch.add_many(values)
+    aggregate.sketch = sketch.to_dict()
+    aggregate.updated_at = datetime.datetime.utcnow()
+
+
+def _lock_aggregate(db: Session, key: AggregateKey) -> Optional[ScoreAggregate]:
+    agent_id, criteria_version, dimension = key
+    return db.execute(
+        select(ScoreAggregate)
+        .where(
+            ScoreAggregate.agent_id == agent_id,
+            ScoreAggregate.criteria_version == criteria_version,
+            ScoreAggregate.dimension == dimension,
+        )
+        .with_for_update()
+    ).scalar_one_or_none()
+
+
+def record_scores(db: Session, samples: Iterable[Tuple[uuid.UUID, int, Optional[Dict[str, Any]]]]) -> None:
+    """Fold the scores of newly completed evaluations into their aggregates.
+
+    Must run in the transaction that marks the evaluations completed so
+    that every evaluation is counted exactly once. Each affected row is
+    locked and updated once per call, in key order so that concurrent
+    workers cannot deadlock; the caller commits.
+
+    Args:
+        db: Database session of the completing transaction
+        samples: (agent_id, criteria_version, results) per completed evaluation
+    """
+    grouped = group_scores(samples)
+    for key in sorted(grouped, key=lambda k: (str(k[0]), k[1], k[2])):
+        aggregate = _lock_aggregate(db, key)
+        if aggregate is None:
+            try:
+                with db.begin_nested():
+                    aggregate = _empty_aggregate(key)
+                    db.add(aggregate)
+            except IntegrityError:
+                # Another worker created the row first
+                aggregate = _lock_aggregate(db, key)
+        _apply_values(aggregate, np.asarray(grouped[key], dtype=float))
+
+
+def summarize_aggregates(aggregates: Sequence[ScoreAggregate]) -> Dict[str, Dict[str, Any]]:
+    """Compute stats per dimension, merging rows of several criteria versions.
+
+    Args:
+        aggregates: ScoreAggregate rows of one agent
+
+    Returns:
+        Mapping of dimension to count, mean, stddev, min, max and quantiles
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for aggregate in aggregates:
+        entry = merged.setdefault(aggregate.dimension, {
+            "count": 0, "sum": 0.0, "sum_squares": 0.0, "min": None, "max": None, "sketch": QuantileSketch(),
+        })
+        entry["count"] += aggregate.count
+        entry["sum"] += aggregate.sum
+        entry["sum_squares"] += aggregate.sum_squares
+        entry["min"] = aggregate.min if entry["min"] is None else min(entry["min"], aggregate.min)
+        entry["max"] = aggregate.max if entry["max"] is None else max(entry["max"], aggregate.max)
+        entry["sketch"].merge(QuantileSketch.from_dict(aggregate.sketch))
+
+    stats = {}
+    for dimension, entry in sorted(merged.items()):
+        count = entry["count"]
+        mean = entry["sum"] / count if count else None
+        variance = max(entry["sum_squares"] / count - mean * mean, 0.0) if count else None
+        stats[dimension] = {
+            "count": count,
+            "mean": mean,
+            "stddev": math.sqrt(variance) if variance is not None else None,
+            "min": entry["min"],
+            "max": entry["max"],
+            **{name: entry["sketch"].quantile(q) for name, q in STATS_QUANTILES.items()},
+        }
+    return stats
+
+
+def recompute_score_aggregates(
+    db: Session,
+    agent_id: Optional[uuid.UUID] = None,
+    criteria_version: Optional[int] = None,
+    batch_size: int = 1000,
+    archive_root: Optional[str] = None,
+) -> int:
+    """Rebuild aggregates from the completed evaluations, e.g. for a backfill.
+
+    Scores are streamed from a server-side cursor and reduced with NumPy
+    per aggregate key. Matching aggregate rows are replaced in a single
+    transaction; evaluations completing while the scan runs may be missed,
+    so run it while the affected agents are idle.
+
+    Args:
+        db: Database session
+        agent_id: Only rebuild this agent's aggregates
+        criteria_version: Only rebuild this criteria version's aggregates
+        batch_size: Rows fetched per round trip
+        archive_root: Also count the archived evaluations in this directory
+
+    Returns:
+        Number of aggregate rows written
+    """
+    query = (
+        select(EvaluationCriteria.agent_id, EvaluationCriteria.version, Evaluation.results)
+        .join(EvaluationCriteria, Evaluation.criteria_id == EvaluationCriteria.id)
+        .where(Evaluation.status == 'completed')
+        .execution_options(yield_per=batch_size)
+    )
+    stale = delete(ScoreAggregate)
+    if agent_id is not None:
+        query = query.where(EvaluationCriteria.agent_id == agent_id)
+        stale = stale.where(ScoreAggregate.agent_id == agent_id)
+    if criteria_version is not None:
+        query = query.where(EvaluationCriteria.version == criteria_version)
+        stale = stale.where(ScoreAggregate.criteria_version == criteria_version)
+
+    samples = db.execute(query)
+    if archive_root is not None:
+        from aieb_evaluation_svc.services.evaluation_archive import iter_archive
+
+        archived = (
+            (uuid.UUID(record["agent_id"]), record["criteria_version"], record["results"])
+            for records in iter_archive(
+                archive_root,
+                EvaluationFilters(status='completed', agent_id=agent_id, criteria_version=criteria_version),
+            )
+            for record in records
+        )
+        samples = itertools.chain(archived, samples)
+    grouped = group_scores(samples)
+    db.execute(stale)
+    for key, values in grouped.items():
+        aggregate = _empty_aggregate(key)
+        _apply_values(aggregate, np.asarray(values, dtype=float))
+        db.add(aggregate)
+    db.commit()
+
+    logger.info(f"Recomputed {len(grouped)} score aggregates")
+    return len(grouped)
@@ -0,0 +1,126 @@
+"""Mergeable quantile sketch for judge scores.
+
+A log-bucketed sketch in the style of DDSketch: every value is counted in
+the bucket ``ceil(log_gamma(|x|))``, which bounds the relative error of
+every quantile estimate by ``relative_accuracy``. Two sketches with the
+same accuracy merge by adding bucket counts, so per-version sketches can
+be combined into per-agent ones without revisiting any evaluation.
+"""
+
+import math
+from collections import Counter
+from typing import Any, Dict, Iterable
+
+import numpy as np
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+# Values closer to zero than this are counted as zero
+MIN_INDEXABLE_VALUE = 1e-9
+
+
+class QuantileSketch:
+    """Relative-error quantile sketch with JSON-serialisable state."""
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        """Create an empty sketch.
+
+        Args:
+            relative_accuracy: Maximum relative error of quantile estimates
+        """
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive: Counter = Counter()
+        self.negative: Counter = Counter()
+        self.zero = 0
+
+    @property
+    def count(self) -> int:
+        return self.zero + sum(self.positive.values()) + sum(self.negative.values())
+
+    def add(self, value: float) -> None:
+        """Count one value."""
+        if abs(value) < MIN_INDEXABLE_VALUE:
+            self.zero += 1
+        elif value > 0:
+            self.positive[math.ceil(math.log(value) / self._log_gamma)] += 1
+        else:
+            self.negative[math.ceil(math.log(-value) / self._log_gamma)] += 1
+
+    def add_many(self, values: Iterable[float]) -> None:
+        """Count many values with one vectorized bucketing pass.
+
+        Args:
+            values: Values to count
+        """
+        values = np.asarray(values, dtype=float)
+        if values.size == 0:
+            return
+        magnitudes = np.abs(values)
+        indexable = magnitudes >= MIN_INDEXABLE_VALUE
+        self.zero += int((~indexable).sum())
+
+        indexes = np.ceil(np.log(magnitudes[indexable]) / self._log_gamma).astype(np.int64)
+        signs = values[indexable] > 0
+        for store, selected in ((self.positive, indexes[signs]), (self.negative, indexes[~signs])):
+            buckets, counts = np.unique(selected, return_counts=True)
+            store.update(dict(zip(buckets.tolist(), counts.tolist())))
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Add another sketch's counts to this one.
+
+        Raises:
+            ValueError: If the sketches were built with different accuracies
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        self.positive.update(other.positive)
+        self.negative.update(other.negative)
+        self.zero += other.zero
+
+    def _value(self, index: int) -> float:
+        # Midpoint of the bucket (gamma^(i-1), gamma^i] in relative terms
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate the q-quantile, or None if the sketch is empty.
+
+        Args:
+            q: Quantile in [0, 1]
+        """
+        total = self.count
+        if total == 0:
+            return None
+        # Nearest-rank definition: the smallest value with at least q of the mass at or below it
+        rank = max(math.ceil(q * total) - 1, 0)
+
+        seen = 0
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -self._value(index)
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return self._value(index)
+        return self._value(max(self.positive))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "zero": self.zero,
+            "positive": {str(index): count for index, count in self.positive.items()},
+            "negative": {str(index): count for index, count in self.negative.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"])
+        sketch.zero = data["zero"]
+        sketch.positive.update({int(index): count for index, count in data["positive"].items()})
+        sketch.negative.update({int(index): count for index, count in data["negative"].items()})
+        return sketch
@@ -0,0 +1,312 @@
+"""Redis coordination of duplicate submissions.
+
+Two mechanisms keep retried and repeated submissions from doing the same
+work twice:
+
+* Idempotency keys: a client-chosen key names one submission, and a
+  retry with the same key and body replays the first response.
+* In-flight judge keys: the first pending evaluation of a judge cache
+  key becomes its leader and is the only one dispatched. Identical
+  evaluations submitted while it runs are stored as its followers and
+  receive its outcome when it finishes.
+
+Both live in Redis so that every API replica and worker sees the same
+claims. Redis errors are logged and treated as "no claim", so an outage
+only costs duplicate judge calls, never a failed submission.
+"""
+
+import datetime
+import json
+import logging
+import threading
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import redis
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.models.evaluation import Evaluation
+from aieb_evaluation_svc.services.criteria_cache import get_criteria_cache
+from aieb_evaluation_svc.services.evaluation_runs import record_run_outcomes
+from aieb_evaluation_svc.services.score_aggregates import record_scores
+from aieb_evaluation_svc.services.status_events import StatusEvent
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+INFLIGHT_KEY_PREFIX = "judge-inflight:"
+IDEMPOTENCY_KEY_PREFIX = "idempotency:"
+
+# Statuses after which an evaluation's outcome no longer changes
+FINISHED_STATUSES = ('completed', 'failed')
+
+
+class InFlightRegistry:
+    """Maps judge cache keys to the evaluation currently judging them."""
+
+    def __init__(self, ttl_seconds: int, redis_client: redis.Redis | None = None):
+        """Create the registry.
+
+        Args:
+            ttl_seconds: Expiry of a claim whose leader never releases it
+            redis_client: Shared client, or None to disable cross-request deduplication
+        """
+        self.ttl_seconds = ttl_seconds
+        self.redis = redis_client
+
+    def claim_many(self, keys: Sequence[str], evaluation_ids: Sequence[uuid.UUID]) -> List[Optional[uuid.UUID]]:
+        """Claim judge keys for new evaluations, or find who already holds them.
+
+        Args:
+            keys: Distinct judge cache keys
+            evaluation_ids: Evaluation that would lead each key
+
+        Returns:
+            For each key, None if the evaluation became its leader, or the
+            ID of the evaluation already leading it
+        """
+        leaders: List[Optional[uuid.UUID]] = [None] * len(keys)
+        if not keys or self.redis is None:
+            return leaders
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, evaluation_id in zip(keys, evaluation_ids):
+                pipe.set(INFLIGHT_KEY_PREFIX + key, str(evaluation_id), nx=True, ex=self.ttl_seconds)
+            claimed = pipe.execute()
+            taken = [i for i, ok in enumerate(claimed) if not ok]
+            if taken:
+                for i, value in zip(taken, self.redis.mget([INFLIGHT_KEY_PREFIX + keys[i] for i in taken])):
+                    # A leader that released in between leaves nothing to attach to
+                    if value is not None:
+                        leaders[i] = uuid.UUID(value.decode() if isinstance(value, bytes) else value)
+        except redis.RedisError as e:
+            logger.warning(f"In-flight claim failed: {e}")
+        return leaders
+
+    def release_many(self, keys: Sequence[str]) -> None:
+        """Release the claims of finished leaders.
+
+        Args:
+            keys: Judge cache keys whose leaders finished
+        """
+        if not keys or self.redis is None:
+            return
+        try:
+            self.redis.delete(*[INFLIGHT_KEY_PREFIX + key for key in keys])
+        except redis.RedisError as e:
+            logger.warning(f"In-flight release failed: {e}")
+
+
+class IdempotencyStore:
+    """Remembers the response of each submission made with an idempotency key.
+
+    A key is reserved when its first request starts and holds that
+    request's body fingerprint; the response is stored once the request
+    succeeds. Failed requests drop the reservation so they can be retried.
+    """
+
+    def __init__(self, ttl_seconds: int, lock_seconds: int, redis_client: redis.Redis | None = None):
+        """Create the store.
+
+        Args:
+            ttl_seconds: How long responses are replayed
+            lock_seconds: How long a reservation outlives a request that
+                never finished, e.g. because its replica died
+            redis_client: Shared client, or None to disable idempotency keys
+        """
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+        self.redis = redis_client
+
+    def begin(self, key: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Reserve a key for a new request.
+
+        Args:
+            key: Client-supplied idempotency key
+            fingerprint: Digest of the request body
+
+        Returns:
+            None if the caller now owns the key, otherwise the existing
+            record with its ``fingerprint`` and ``response`` (None while the
+            original request is still running)
+        """
+        if self.redis is None:
+            return None
+        record = json.dumps({"fingerprint": fingerprint, "response": None})
+        try:
+            if self.redis.set(IDEMPOTENCY_KEY_PREFIX + key, record, nx=True, ex=self.lock_seconds):
+                return None
+            existing = self.redis.get(IDEMPOTENCY_KEY_PREFIX + key)
+        except redis.RedisError as e:
+            logger.warning(f"Idempotency key lookup failed: {e}")
+            return None
+        # Expired between the two commands: try again as a new request
+        return None if existing is None else json.loads(existing)
+
+    def finish(self, key: str, fingerprint: str, response: Dict[str, Any]) -> None:
+        """Store the response of a request that owns a key."""
+        if self.redis is None:
+            return
+        try:
+            self.redis.set(
+                IDEMPOTENCY_KEY_PREFIX + key,
+                json.dumps({"fingerprint": fingerprint, "response": response}),
+                ex=self.ttl_seconds,
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Idempotency response write failed: {e}")
+
+    def abort(self, key: str) -> None:
+        """Drop the reservation of a request that failed."""
+        if self.redis is None:
+            return
+        try:
+            self.redis.delete(IDEMPOTENCY_KEY_PREFIX + key)
+        except redis.RedisError as e:
+            logger.warning(f"Idempotency key release failed: {e}")
+
+
+def assign_leaders(keys: Sequence[Optional[str]]) -> Tuple[List[uuid.UUID], List[Optional[uuid.UUID]], List[str]]:
+    """Allocate evaluation IDs and attach duplicates to their leaders.
+
+    Identical items of one submission follow the first of them; that
+    first item in turn follows an evaluation of another submission if
+    one is already in flight for the same key.
+
+    Args:
+        keys: Judge cache key per item, or None for items needing no task
+
+    Returns:
+        (evaluation IDs, leader ID or None per item, judge keys claimed by
+        this submission)
+    """
+    evaluation_ids = [uuid.uuid4() for _ in keys]
+    first: Dict[str, int] = {}
+    for i, key in enumerate(keys):
+        if key is not None:
+            first.setdefault(key, i)
+
+    leaders = get_in_flight_registry().claim_many(list(first), [evaluation_ids[i] for i in first.values()])
+    leader_by_key = {
+        key: evaluation_ids[i] if leader is None else leader
+        for (key, i), leader in zip(first.items(), leaders)
+    }
+    duplicate_of = [
+        None if key is None or leader_by_key[key] == evaluation_ids[i] else leader_by_key[key]
+        for i, key in enumerate(keys)
+    ]
+    claimed = [key for key, leader in zip(first, leaders) if leader is None]
+    return evaluation_ids, duplicate_of, claimed
+
+
+def complete_duplicates(db: Session, leader_ids: Sequence[uuid.UUID]) -> List[StatusEvent]:
+    """Copy the outcome of finished leaders to their pending followers.
+
+    Safe to call repeatedly and from both sides of a race: the worker calls
+    it after committing a leader's outcome and the API after committing new
+    followers, so a follower attached while its leader finishes is
+    completed by whichever side commits last.
+
+    Args:
+        db: Database session; committed when followers are completed
+        leader_ids: Leaders that may have finished
+
+    Returns:
+        Status events of the completed followers, to publish after commit
+    """
+    if not leader_ids:
+        return []
+    waited_on = db.scalars(
+        select(Evaluation.duplicate_of)
+        .where(Evaluation.duplicate_of.in_(leader_ids), Evaluation.status == 'pending')
+        .distinct()
+    ).all()
+    if not waited_on:
+        return []
+    leaders = db.execute(
+        select(Evaluation.id, Evaluation.status, Evaluation.results)
+        .where(Evaluation.id.in_(waited_on), Evaluation.status.in_(FINISHED_STATUSES))
+    ).all()
+
+    now = datetime.datetime.utcnow()
+    events = []
+    scores = []
+    runs = []
+    for leader in leaders:
+        followers = db.execute(
+            update(Evaluation)
+            .where(Evaluation.duplicate_of == leader.id, Evaluation.status == 'pending')
+            .values(status=leader.status, results=leader.results, completed_at=now)
+            .returning(Evaluation.id, Evaluation.batch_id, Evaluation.criteria_id, Evaluation.run_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        events.extend(StatusEvent(follower.id, leader.status, follower.batch_id) for follower in followers)
+        runs.extend((follower.run_id, leader.status) for follower in followers)
+        if leader.status == 'completed':
+            scores.extend((follower.criteria_id, leader.results) for follower in followers)
+
+    if scores:
+        criteria = get_criteria_cache().get_many(db, {criteria_id for criteria_id, _ in scores})
+        record_scores(db, [
+            (criteria[criteria_id].agent_id, criteria[criteria_id].version, results)
+            for criteria_id, results in scores
+        ])
+    record_run_outcomes(db, runs)
+    if events:
+        db.commit()
+        logger.info(f"Completed {len(events)} duplicate evaluations from {len(leaders)} leaders")
+    return events
+
+
+def _redis_client() -> redis.Redis:
+    return redis.Redis.from_url(
+        settings.SINGLE_FLIGHT_REDIS_URL or settings.REDIS_BROKER_URL,
+        socket_timeout=settings.SINGLE_FLIGHT_REDIS_TIMEOUT_SECONDS,
+        socket_connect_timeout=settings.SINGLE_FLIGHT_REDIS_TIMEOUT_SECONDS,
+    )
+
+
+_in_flight_registry: InFlightRegistry | None = None
+_idempotency_store: IdempotencyStore | None = None
+_lock = threading.Lock()
+
+
+def get_in_flight_registry() -> InFlightRegistry:
+    """Return the process-wide in-flight registry, creating it on first use."""
+    global _in_flight_registry
+    with _lock:
+        if _in_flight_registry is None:
+            _in_flight_registry = InFlightRegistry(
+                ttl_seconds=settings.SINGLE_FLIGHT_TTL_SECONDS,
+                redis_client=_redis_client() if settings.SINGLE_FLIGHT_ENABLED else None,
+            )
+        return _in_flight_registry
+
+
+def set_in_flight_registry(registry: InFlightRegistry | None) -> None:
+    """Replace the process-wide in-flight registry, e.g. in tests."""
+    global _in_flight_registry
+    with _lock:
+        _in_flight_registry = registry
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    """Return the process-wide idempotency store, creating it on first use."""
+    global _idempotency_store
+    with _lock:
+        if _idempotency_store is None:
+            _idempotency_store = IdempotencyStore(
+                ttl_seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS,
+                lock_seconds=settings.IDEMPOTENCY_LOCK_SECONDS,
+                redis_client=_redis_client(),
+            )
+        return _idempotency_store
+
+
+def set_idempotency_store(store: IdempotencyStore | None) -> None:
+    """Replace the process-wide idempotency store, e.g. in tests."""
+    global _idempotency_store
+    with _lock:
+        _idempotency_store = store
@@ -0,0 +1,263 @@
+"""Evaluation status events over Redis pub/sub.
+
+Workers (and the API for events it produces itself) publish every
+``Evaluation.status`` transition to a per-evaluation channel and, when the
+evaluation was submitted as part of a batch, to a per-batch channel. Each
+API process holds one shared subscription connection and fans messages
+out to its local SSE/WebSocket subscribers.
+"""
+
+import asyncio
+import datetime
+import json
+import logging
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+import redis
+import redis.asyncio
+
+from aieb_evaluation_svc.core.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "evaluation-events"
+TERMINAL_STATUSES = frozenset({"completed", "failed"})
+
+
+def evaluation_channel(evaluation_id: Any) -> str:
+    return f"{CHANNEL_PREFIX}:evaluation:{evaluation_id}"
+
+
+def batch_channel(batch_id: Any) -> str:
+    return f"{CHANNEL_PREFIX}:batch:{batch_id}"
+
+
+@dataclass
+class StatusEvent:
+    """A single evaluation status transition."""
+    evaluation_id: str
+    status: str
+    batch_id: Optional[str] = None
+    timestamp: Optional[str] = None
+
+    def __post_init__(self):
+        self.evaluation_id = str(self.evaluation_id)
+        self.batch_id = None if self.batch_id is None else str(self.batch_id)
+        if self.timestamp is None:
+            self.timestamp = datetime.datetime.utcnow().isoformat()
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+
+class StatusEventPublisher:
+    """Publishes status events with a synchronous Redis client.
+
+    Publishing is best effort: Redis errors are logged and swallowed so
+    that losing the push channel never fails an evaluation.
+    """
+
+    def __init__(self, redis_client: redis.Redis):
+        self.redis = redis_client
+
+    def publish_many(self, events: List[StatusEvent]) -> None:
+        """Publish events in one pipelined round trip.
+
+        Args:
+            events: Events to publish
+        """
+        if not events:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for event in events:
+                message = event.to_json()
+                pipe.publish(evaluation_channel(event.evaluation_id), message)
+                if event.batch_id is not None:
+                    pipe.publish(batch_channel(event.batch_id), message)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Failed to publish {len(events)} status events: {e}")
+
+    def publish(self, evaluation_id: Any, status: str, batch_id: Any = None) -> None:
+        """Publish one status transition."""
+        self.publish_many([StatusEvent(evaluation_id, status, batch_id)])
+
+
+_publisher: StatusEventPublisher | None = None
+_publisher_lock = threading.Lock()
+
+
+def get_status_publisher() -> StatusEventPublisher:
+    """Return the process-wide publisher, creating it on first use."""
+    global _publisher
+    with _publisher_lock:
+        if _publisher is None:
+            _publisher = StatusEventPublisher(redis.Redis.from_url(
+                settings.REDIS_BROKER_URL,
+                socket_timeout=settings.EVENTS_REDIS_TIMEOUT_SECONDS,
+                socket_connect_timeout=settings.EVENTS_REDIS_TIMEOUT_SECONDS,
+            ))
+        return _publisher
+
+
+def set_status_publisher(publisher: StatusEventPublisher | None) -> None:
+    """Replace the process-wide publisher, e.g. in tests."""
+    global _publisher
+    with _publisher_lock:
+        _publisher = publisher
+
+
+class StatusEventHub:
+    """Fans out pub/sub messages from one Redis connection to many local subscribers.
+
+    A channel is subscribed on Redis when its first local subscriber joins
+    and unsubscribed when its last one leaves. Each subscriber gets a
+    bounded queue; a subscriber that falls behind loses its oldest events
+    instead of slowing down everyone else.
+    """
+
+    def __init__(self, redis_client: redis.asyncio.Redis, queue_size: int = 100):
+        self.redis = redis_client
+        self.queue_size = queue_size
+        self._pubsub = None
+        self._reader: asyncio.Task | None = None
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._lock = asyncio.Lock()
+
+    async def _ensure_reader(self) -> None:
+        if self._pubsub is None:
+            self._pubsub = self.redis.pubsub()
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read())
+
+    async def _read(self) -> None:
+        while True:
+            try:
+                if not self._subscribers:
+                    await asyncio.sleep(0.1)
+                    continue
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(e, exc_info=True)
+                await asyncio.sleep(1.0)
+                continue
+            if message is None or message.get("type") != "message":
+                continue
+
+            channel = message["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+            event = json.loads(message["data"])
+            for queue in list(self._subscribers.get(channel, ())):
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(event)
+
+    async def subscribe(self, channel: str) -> asyncio.Queue:
+        """Register a local subscriber for a channel.
+
+        Args:
+            channel: Channel to receive events from
+
+        Returns:
+            Queue the channel's events are delivered to
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        async with self._lock:
+            await self._ensure_reader()
+            if channel not in self._subscribers:
+                await self._pubsub.subscribe(channel)
+                self._subscribers[channel] = set()
+            self._subscribers[channel].add(queue)
+        return queue
+
+    async def unsubscribe(self, channel: str, queue: asyncio.Queue) -> None:
+        """Remove a local subscriber, dropping the Redis subscription if it was the last."""
+        async with self._lock:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is None:
+                return
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[channel]
+                await self._pubsub.unsubscribe(channel)
+
+    async def close(self) -> None:
+        """Stop the reader task and close the subscription connection."""
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+
+
+async def follow_events(
+    hub: StatusEventHub,
+    channel: str,
+    queue: asyncio.Queue,
+    keepalive_seconds: float,
+    snapshot: Optional[Dict[str, Any]] = None,
+    until_terminal: bool = False,
+) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """Iterate over a subscription's events, unsubscribing when iteration stops.
+
+    Subscribe before reading the ``snapshot`` so no transition between the
+    two is missed. ``None`` is yielded after ``keepalive_seconds`` without
+    an event so callers can send a keep-alive.
+
+    Args:
+        hub: Hub the queue was subscribed on
+        channel: Channel the queue was subscribed to
+        queue: Queue returned by :meth:`StatusEventHub.subscribe`
+        keepalive_seconds: Idle time before a ``None`` is yielded
+        snapshot: Current state to yield before any event
+        until_terminal: Stop after the first completed or failed status
+
+    Yields:
+        Decoded events, or None on idle
+    """
+    try:
+        if snapshot is not None:
+            yield snapshot
+            if until_terminal and snapshot["status"] in TERMINAL_STATUSES:
+                return
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=keepalive_seconds)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            yield event
+            if until_terminal and event["status"] in TERMINAL_STATUSES:
+                return
+    finally:
+        await hub.unsubscribe(channel, queue)
+
+
+_hub: StatusEventHub | None = None
+
+
+def get_status_event_hub() -> StatusEventHub:
+    """Return the process-wide event hub, creating it on first use."""
+    global _hub
+    if _hub is None:
+        _hub = StatusEventHub(redis.asyncio.Redis.from_url(settings.REDIS_BROKER_URL))
+    return _hub
+
+
+async def close_status_event_hub() -> None:
+    """Close the process-wide event hub and its Redis connection, if one was created."""
+    global _hub
+    hub, _hub = _hub, None
+    if hub is not None:
+        await hub.close()
+        await hub.redis.aclose()
@@ -1,4 +1,18 @@
 # Worker module for background tasks
-from .celery_app import celery_app, add
+from .celery_app import celery_app, add, evaluate, evaluate_batch, recompute_score_aggregates_task, archive_evaluations_task
+from .bulk_lane import release_bulk_backlog_task
+from .reevaluation import reevaluate_criteria_task
+from .rubric import aggregate_rubric_task, judge_rubric_item
 
-__all__ = ["celery_app", "add"]
+__all__ = [
+    "celery_app",
+    "add",
+    "evaluate",
+    "evaluate_batch",
+    "recompute_score_aggregates_task",
+    "archive_evaluations_task",
+    "release_bulk_backlog_task",
+    "reevaluate_criteria_task",
+    "judge_rubric_item",
+    "aggregate_rubric_task",
+]
@@ -0,0 +1,237 @@
+"""Per-process event loop that keeps many judge calls in flight at once."""
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.core.metrics import JUDGE_BATCH_FALLBACKS, JUDGE_BATCH_ITEMS
+from aieb_evaluation_svc.services.judge import AsyncJudgeClient, JudgeResponseError
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# (criteria_content, agent_prompt, agent_output)
+JudgeRequest = Tuple[str, str, Optional[str]]
+
+
+class JudgeMicroBatcher:
+    """Groups judge requests that share criteria into multi-item judge requests.
+
+    Requests are queued per criteria document, so they can come from
+    several tasks sharing the event loop. A queue is sent as one request
+    once it holds ``max_items`` requests, or ``max_wait`` seconds after
+    its first request arrived. The criteria tokens are then paid once per
+    request rather than once per evaluation. If a multi-item response
+    does not parse, its items are judged again one per request.
+
+    Must be created and used on the executor's event loop.
+    """
+
+    def __init__(
+        self,
+        client: AsyncJudgeClient,
+        semaphore: asyncio.Semaphore,
+        max_items: int,
+        max_wait: float,
+    ):
+        """Create an empty batcher.
+
+        Args:
+            client: Judge client the requests are sent with
+            semaphore: Bounds the judge requests in flight; a multi-item
+                request takes one slot
+            max_items: Most evaluations scored by one request
+            max_wait: Seconds a request waits for others sharing its criteria
+        """
+        self._client = client
+        self._semaphore = semaphore
+        self.max_items = max_items
+        self.max_wait = max_wait
+        self._pending: Dict[str, List[Tuple[str, Optional[str], asyncio.Future]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._sending: Set[asyncio.Task] = set()
+
+    async def judge(self, request: JudgeRequest) -> Dict[str, Any]:
+        """Queue one judge request and wait for its verdict.
+
+        Args:
+            request: (criteria_content, agent_prompt, agent_output)
+
+        Returns:
+            Parsed judge verdict
+        """
+        criteria_content, agent_prompt, agent_output = request
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(criteria_content, [])
+        pending.append((agent_prompt, agent_output, future))
+        if len(pending) >= self.max_items:
+            self._flush(criteria_content)
+        elif len(pending) == 1:
+            self._timers[criteria_content] = loop.call_later(self.max_wait, self._flush, criteria_content)
+        return await future
+
+    def _flush(self, criteria_content: str) -> None:
+        timer = self._timers.pop(criteria_content, None)
+        if timer is not None:
+            timer.cancel()
+        items = self._pending.pop(criteria_content, None)
+        if items:
+            task = asyncio.ensure_future(self._send(criteria_content, items))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _judge_single(self, criteria_content: str, agent_prompt: str, agent_output: Optional[str]):
+        async with self._semaphore:
+            return await self._client.judge(criteria_content, agent_prompt, agent_output)
+
+    async def _send(
+        self, criteria_content: str, items: List[Tuple[str, Optional[str], asyncio.Future]]
+    ) -> None:
+        JUDGE_BATCH_ITEMS.observe(len(items))
+        try:
+            if len(items) == 1:
+                verdicts = [await self._judge_single(criteria_content, items[0][0], items[0][1])]
+            else:
+                try:
+                    async with self._semaphore:
+                        verdicts = await self._client.judge_items(
+                            criteria_content, [(agent_prompt, agent_output) for agent_prompt, agent_output, _ in items]
+                        )
+                except JudgeResponseError as e:
+                    logger.warning(f"Judging {len(items)} items one by one, multi-item response did not parse: {e}")
+                    JUDGE_BATCH_FALLBACKS.inc()
+                    verdicts = await asyncio.gather(
+                        *(self._judge_single(criteria_content, agent_prompt, agent_output)
+                          for agent_prompt, agent_output, _ in items),
+                        return_exceptions=True,
+                    )
+        except Exception as e:
+            verdicts = [e] * len(items)
+        for (_, _, future), verdict in zip(items, verdicts):
+            if future.done():
+                continue
+            if isinstance(verdict, BaseException):
+                future.set_exception(verdict)
+            else:
+                future.set_result(verdict)
+
+
+class AsyncEvaluationExecutor:
+    """Runs judge calls on a background event loop owned by this process.
+
+    Celery task code stays synchronous: it hands a list of judge requests
+    to :meth:`judge_many` and blocks until all of them finish, while the
+    loop keeps up to ``concurrency`` requests in flight over one shared
+    :class:`AsyncJudgeClient`. With ``batch_items`` above 1, requests
+    sharing criteria are scored together by a :class:`JudgeMicroBatcher`.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        client_factory: Callable[[], AsyncJudgeClient] | None = None,
+        batch_items: int = 1,
+        batch_wait: float = 0.0,
+    ):
+        """Start the event loop thread and create the shared judge client.
+
+        Args:
+            concurrency: Maximum number of judge calls in flight
+            client_factory: Builds the judge client inside the loop; defaults
+                to a pooled client sized to ``concurrency``
+            batch_items: Most evaluations sharing criteria scored by one
+                judge request; 1 sends every evaluation on its own
+            batch_wait: Seconds a request waits for others sharing its criteria
+        """
+        self.concurrency = concurrency
+        self.batch_items = batch_items
+        self.batch_wait = batch_wait
+        self._client_factory = client_factory or (lambda: AsyncJudgeClient(max_connections=concurrency))
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="evaluation-event-loop", daemon=True
+        )
+        self._thread.start()
+        self._semaphore, self._client, self._batcher = self._submit(self._setup()).result()
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def _setup(self) -> Tuple[asyncio.Semaphore, AsyncJudgeClient, Optional[JudgeMicroBatcher]]:
+        semaphore, client = asyncio.Semaphore(self.concurrency), self._client_factory()
+        batcher = None
+        if self.batch_items > 1:
+            batcher = JudgeMicroBatcher(client, semaphore, self.batch_items, self.batch_wait)
+        return semaphore, client, batcher
+
+    async def _judge_one(self, request: JudgeRequest) -> Dict[str, Any]:
+        if self._batcher is not None:
+            return await self._batcher.judge(request)
+        async with self._semaphore:
+            return await self._client.judge(*request)
+
+    async def _judge_many(self, requests: Sequence[JudgeRequest]) -> List[Union[Dict[str, Any], BaseException]]:
+        return await asyncio.gather(
+            *(self._judge_one(request) for request in requests), return_exceptions=True
+        )
+
+    def judge_many(self, requests: Sequence[JudgeRequest]) -> List[Union[Dict[str, Any], BaseException]]:
+        """Judge many requests concurrently and wait for all of them.
+
+        Args:
+            requests: Judge requests to run
+
+        Returns:
+            One verdict or exception per request, in request order
+        """
+        return self._submit(self._judge_many(requests)).result()
+
+    def close(self) -> None:
+        """Close the judge client and stop the event loop."""
+        try:
+            self._submit(self._client.aclose()).result()
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+
+_executor: AsyncEvaluationExecutor | None = None
+_executor_pid: int | None = None
+_executor_lock = threading.Lock()
+
+
+def get_async_executor() -> AsyncEvaluationExecutor:
+    """Return this process's executor, creating it on first use.
+
+    The executor is keyed on the process ID so that prefork children never
+    reuse an event loop thread inherited from their parent.
+
+    Returns:
+        The process-wide AsyncEvaluationExecutor
+    """
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            logger.info(f"Starting async evaluation executor with concurrency={settings.WORKER_ASYNC_CONCURRENCY}")
+            _executor = AsyncEvaluationExecutor(
+                settings.WORKER_ASYNC_CONCURRENCY,
+                batch_items=settings.JUDGE_BATCH_MAX_ITEMS if settings.JUDGE_BATCH_ENABLED else 1,
+                batch_wait=settings.JUDGE_BATCH_MAX_WAIT_SECONDS,
+            )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def shutdown_async_executor() -> None:
+    """Close this process's executor if one was started."""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is not None and _executor_pid == os.getpid():
+            _executor.close()
+        _executor = None
+        _executor_pid = None
@@ -0,0 +1,50 @@
+"""Fair-share release of the bulk lane backlog.
+
+Bulk submissions are stored undispatched and published to the bulk
+queue a few at a time per agent. Every finished bulk message releases
+more work for the agents with room under their in-flight cap, and a beat
+schedule releases periodically in case no bulk message is running.
+"""
+
+import logging
+from typing import Any
+
+from celery.signals import task_postrun
+
+from aieb_evaluation_svc.models.base import SessionLocal
+from aieb_evaluation_svc.services.evaluation_service import release_bulk_backlog
+from aieb_evaluation_svc.worker.celery_app import BULK_LANE, celery_app, request_header
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="aieb_evaluation_svc.release_bulk_backlog")
+def release_bulk_backlog_task() -> int:
+    """Publish the next fair share of the bulk lane backlog.
+
+    Returns:
+        Number of evaluations published
+    """
+    session = SessionLocal()
+    try:
+        return release_bulk_backlog(session)
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        raise
+    finally:
+        session.close()
+
+
+@task_postrun.connect
+def _release_after_bulk_task(task: Any, **kwargs: Any) -> None:
+    if request_header(task.request, "lane") != BULK_LANE:
+        return
+    try:
+        release_bulk_backlog_task()
+    except Exception:
+        # Already logged; the beat schedule retries the release
+        pass
+
+
+__all__ = ["release_bulk_backlog_task"]
@@ -1,32 +1,137 @@
+import os
 import time
+import datetime
 import logging
-from typing import Union
+import uuid
+from typing import Any, Dict, List, Sequence, Union
 
-from celery import Celery
+import redis
+from celery import Celery, chord
+from kombu import Queue
+from celery.signals import (
+    before_task_publish,
+    task_postrun,
+    task_prerun,
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
+)
+from prometheus_client import CollectorRegistry, multiprocess, start_http_server
+from sqlalchemy import select
 
 from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.core.metrics import (
+    TASK_QUEUE_WAIT_SECONDS,
+    TASK_RUN_SECONDS,
+    QueueDepthCollector,
+    build_registry,
+    multiprocess_enabled,
+    observe_pools,
+)
+from aieb_evaluation_svc.models.base import SessionLocal, created_engines
+from aieb_evaluation_svc.models.evaluation import Evaluation
+from aieb_evaluation_svc.services.judge import judge
+from aieb_evaluation_svc.services.criteria_cache import CachedCriteria, get_criteria_cache
+from aieb_evaluation_svc.services.evaluation_archive import archive_evaluations
+from aieb_evaluation_svc.services.deterministic_scoring import score_evaluations, score_outputs, with_check_scores
+from aieb_evaluation_svc.services.judge_cache import get_judge_cache, judge_cache_key
+from aieb_evaluation_svc.services.rubric import aggregate_rubric, merge_verdicts
+from aieb_evaluation_svc.services.score_aggregates import recompute_score_aggregates
+from aieb_evaluation_svc.services.single_flight import FINISHED_STATUSES
+from aieb_evaluation_svc.services.status_events import StatusEvent, get_status_publisher
+from aieb_evaluation_svc.worker.async_executor import get_async_executor, shutdown_async_executor
+from aieb_evaluation_svc.worker.completion_writer import (
+    Completion,
+    get_completion_writer,
+    set_inline_writes,
+    shutdown_completion_writer,
+)
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Initialize Celery application
-celery_app = Celery(
-    "aieb_evaluation_svc",
-    broker=settings.REDIS_BROKER_URL,
-    backend=settings.REDIS_BROKER_URL
-)
+# Initialize Celery application; its configuration is read from settings on first use
+celery_app = Celery("aieb_evaluation_svc")
 
-# Configure Celery
-celery_app.conf.update(
-    task_serializer='json',
-    accept_content=['json'],
-    result_serializer='json',
-    timezone='UTC',
-    enable_utc=True,
-)
+# Scheduling lanes: interactive work is published straight to its queue,
+# bulk work is released from a per-agent fair-share backlog
+INTERACTIVE_LANE = "interactive"
+BULK_LANE = "bulk"
+
+# Tasks of the rubric fan-out chord, defined in worker.rubric
+RUBRIC_ITEM_TASK = "aieb_evaluation_svc.judge_rubric_item"
+RUBRIC_AGGREGATE_TASK = "aieb_evaluation_svc.aggregate_rubric"
+
+
+def lane_queue(lane: str) -> str:
+    """Return the name of a scheduling lane's queue."""
+    return settings.CELERY_BULK_QUEUE if lane == BULK_LANE else settings.CELERY_INTERACTIVE_QUEUE
+
+
+def celery_config() -> Dict[str, Any]:
+    """Build the Celery configuration from settings.
+
+    Registered as lazy defaults, so it runs when the configuration is first
+    read rather than when this module is imported.
+
+    Returns:
+        Celery configuration keys
+    """
+    return dict(
+        broker_url=settings.REDIS_BROKER_URL,
+        # Chords count finished rubric items in the backend even when results are ignored
+        result_backend=settings.CELERY_RESULT_BACKEND_URL or settings.REDIS_BROKER_URL,
+        task_ignore_result=settings.CELERY_IGNORE_RESULTS,
+        result_expires=settings.CELERY_RESULT_EXPIRES_SECONDS,
+        task_serializer='json',
+        accept_content=['json'],
+        result_serializer='json',
+        timezone='UTC',
+        enable_utc=True,
+        task_queues=[Queue(lane_queue(lane)) for lane in (INTERACTIVE_LANE, BULK_LANE)],
+        task_default_queue=settings.CELERY_INTERACTIVE_QUEUE,
+        task_routes={
+            "aieb_evaluation_svc.recompute_score_aggregates": {"queue": settings.CELERY_BULK_QUEUE},
+            "aieb_evaluation_svc.archive_evaluations": {"queue": settings.CELERY_BULK_QUEUE},
+            "aieb_evaluation_svc.reevaluate_criteria": {"queue": settings.CELERY_BULK_QUEUE},
+        },
+        # Long judge calls: reserve one message at a time and ack only once it is done,
+        # so queued work stays visible to idle workers and survives worker crashes
+        worker_prefetch_multiplier=settings.WORKER_PREFETCH_MULTIPLIER,
+        task_acks_late=settings.TASK_ACKS_LATE,
+        task_reject_on_worker_lost=settings.TASK_ACKS_LATE,
+        beat_schedule={
+            "release-bulk-backlog": {
+                "task": "aieb_evaluation_svc.release_bulk_backlog",
+                "schedule": settings.BULK_RELEASE_INTERVAL_SECONDS,
+            },
+            **({
+                "archive-evaluations": {
+                    "task": "aieb_evaluation_svc.archive_evaluations",
+                    "schedule": settings.ARCHIVE_INTERVAL_SECONDS,
+                },
+            } if settings.ARCHIVE_ENABLED else {}),
+        },
+    )
+
+
+celery_app.add_defaults(celery_config)
 
 
-@celery_app.task
+def request_header(request: Any, name: str) -> Any:
+    """Read a custom message header from a task request.
+
+    Headers of delivered messages become request attributes, while eager
+    ``apply()`` calls keep them in ``request.headers``.
+    """
+    value = getattr(request, name, None)
+    if value is None:
+        value = (getattr(request, "headers", None) or {}).get(name)
+    return value
+
+
+# The test task's result is what its caller checks, so it is always stored
+@celery_app.task(ignore_result=False)
 def add(x: int, y: int) -> int:
     """Simple test task that adds two numbers after a simulated delay.
     
@@ -56,4 +161,409 @@ def add(x: int, y: int) -> int:
         raise
 
 
-__all__ = ["celery_app", "add"]
+def uses_rubric_fanout(criteria: CachedCriteria) -> bool:
+    """Whether a criteria version is judged one rubric item at a time."""
+    return settings.RUBRIC_FANOUT_ENABLED and len(criteria.rubric) >= settings.RUBRIC_FANOUT_MIN_ITEMS
+
+
+def finish_evaluation(
+    evaluation: Evaluation,
+    criteria: CachedCriteria,
+    status: str,
+    results: Dict[str, Any],
+    batch_id: str | None,
+    cache_key: str,
+) -> None:
+    """Persist the outcome of a running evaluation through the completion writer.
+
+    Returns once the outcome is committed, its status event published and
+    its followers completed.
+    """
+    get_completion_writer().write([Completion(
+        evaluation.id,
+        status,
+        results,
+        datetime.datetime.utcnow(),
+        criteria.agent_id,
+        criteria.version,
+        batch_id,
+        cache_key,
+    )])
+    logger.info(f"Evaluation {evaluation.id} {status}")
+
+
+def fan_out_rubric(
+    evaluation_id: str, batch_id: str | None, item_indices: Sequence[int], lane: str | None
+) -> None:
+    """Publish a chord judging rubric items of an evaluation in parallel.
+
+    The chord's body aggregates the item verdicts, with those carried over
+    from the previous criteria version, and completes the evaluation; both
+    run on the queue of the evaluation's lane.
+
+    Args:
+        evaluation_id: Running evaluation
+        batch_id: Batch the evaluation was submitted in, if any
+        item_indices: Positions in its criteria's rubric of the items to judge
+        lane: Scheduling lane of the evaluation
+    """
+    queue = lane_queue(lane or INTERACTIVE_LANE)
+    header = [
+        celery_app.signature(RUBRIC_ITEM_TASK, args=(evaluation_id, index), queue=queue)
+        for index in item_indices
+    ]
+    chord(header)(celery_app.signature(RUBRIC_AGGREGATE_TASK, args=(evaluation_id, batch_id), queue=queue))
+
+
+@celery_app.task(name="aieb_evaluation_svc.evaluate")
+def evaluate(evaluation_id: str, batch_id: str | None = None) -> Dict[str, Any]:
+    """Judge a pending evaluation and persist its results.
+
+    Every status change is published as a status event once committed.
+    When the criteria holds several rubric items, the items are judged in
+    parallel by a chord (see :func:`fan_out_rubric`) that completes the
+    evaluation, and this task returns as soon as the chord is published.
+    Items whose verdict was carried over from the previous criteria
+    version are not judged again.
+
+    Args:
+        evaluation_id: ID of the Evaluation row to process
+        batch_id: Batch the evaluation was submitted in, if any
+
+    Returns:
+        The results stored on the evaluation, or its status and rubric item
+        count if it was fanned out
+
+    Raises:
+        LookupError: If the evaluation does not exist
+        Exception: If the judge call or publishing the rubric chord fails;
+            the evaluation is marked failed
+    """
+    session = SessionLocal()
+    try:
+        evaluation = session.get(Evaluation, uuid.UUID(evaluation_id))
+        if evaluation is None:
+            raise LookupError(f"Evaluation {evaluation_id} not found")
+        if evaluation.status in FINISHED_STATUSES:
+            # Redelivered after its outcome was written
+            logger.info(f"Evaluation {evaluation_id} already {evaluation.status}")
+            return evaluation.results
+
+        criteria = get_criteria_cache().get(session, evaluation.criteria_id)
+        evaluation.status = 'running'
+        session.commit()
+        get_status_publisher().publish(evaluation_id, 'running', batch_id)
+
+        cache_key = judge_cache_key(criteria.digest, evaluation.agent_prompt, evaluation.agent_output)
+        results = get_judge_cache().get(cache_key) if settings.JUDGE_CACHE_ENABLED else None
+        if results is None and criteria.deterministic_only:
+            logger.info(f"Scoring evaluation {evaluation_id} with {len(criteria.checks)} checks only")
+            results = with_check_scores(None, score_outputs(criteria.checks, [evaluation.agent_output])[0])
+        elif results is None and uses_rubric_fanout(criteria):
+            carried = evaluation.carried_items or {}
+            item_indices = [index for index, item in enumerate(criteria.rubric) if item.key not in carried]
+            logger.info(f"Judging {len(item_indices)} rubric items of evaluation {evaluation_id} in parallel")
+            try:
+                fan_out_rubric(evaluation_id, batch_id, item_indices, request_header(evaluate.request, "lane"))
+            except Exception as e:
+                # Nothing would ever finish the evaluation or release its claim
+                session.close()
+                finish_evaluation(evaluation, criteria, 'failed', {"error": str(e)}, batch_id, cache_key)
+                raise
+            return {"status": "running", "rubric_items": len(item_indices)}
+        elif results is None:
+            logger.info(f"Judging evaluation {evaluation_id}")
+            try:
+                results = judge(criteria.judged_content, evaluation.agent_prompt, evaluation.agent_output)
+            except Exception as e:
+                session.close()
+                finish_evaluation(evaluation, criteria, 'failed', {"error": str(e)}, batch_id, cache_key)
+                raise
+            results = with_check_scores(results, score_outputs(criteria.checks, [evaluation.agent_output])[0])
+            if settings.JUDGE_CACHE_ENABLED:
+                get_judge_cache().set(cache_key, results)
+
+        # Do not hold a connection while the writer flushes
+        session.close()
+        finish_evaluation(evaluation, criteria, 'completed', results, batch_id, cache_key)
+        return results
+
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        raise
+    finally:
+        session.close()
+
+
+def judge_requests(requests: List[Any], retryable: List[bool]) -> List[Union[Dict[str, Any], BaseException]]:
+    """Judge requests on the process event loop, retrying failed rubric items.
+
+    Failed rubric item requests are judged again on their own, with
+    exponential backoff, up to ``settings.RUBRIC_ITEM_MAX_RETRIES`` times.
+
+    Args:
+        requests: (criteria, prompt, output) per judge call
+        retryable: Whether each request is a rubric item
+
+    Returns:
+        Verdict or exception per request
+    """
+    if not requests:
+        return []
+    executor = get_async_executor()
+    outcomes = executor.judge_many(requests)
+    for attempt in range(settings.RUBRIC_ITEM_MAX_RETRIES):
+        failed = [
+            i for i, outcome in enumerate(outcomes) if retryable[i] and isinstance(outcome, BaseException)
+        ]
+        if not failed:
+            break
+        logger.warning(f"Retrying {len(failed)} failed rubric items")
+        time.sleep(settings.RUBRIC_ITEM_RETRY_BACKOFF_SECONDS * 2 ** attempt)
+        for i, outcome in zip(failed, executor.judge_many([requests[i] for i in failed])):
+            outcomes[i] = outcome
+    return outcomes
+
+
+@celery_app.task(name="aieb_evaluation_svc.evaluate_batch")
+def evaluate_batch(evaluation_ids: List[str], batch_id: str | None = None) -> Dict[str, str]:
+    """Judge several evaluations concurrently on the process event loop.
+
+    Rows are loaded and written back in bulk from the task thread, with
+    criteria served from the criteria cache; only the judge calls run on
+    the event loop, with up to ``settings.WORKER_ASYNC_CONCURRENCY`` of
+    them in flight. Multi-item rubrics are judged one item per call, and
+    failed items are retried on their own; items carried over from the
+    previous criteria version are not judged again. With ``settings.JUDGE_BATCH_ENABLED``
+    the event loop scores evaluations sharing criteria in multi-item
+    judge requests. Status events
+    for the whole batch are published in one pipeline per transition.
+
+    Args:
+        evaluation_ids: IDs of the Evaluation rows to process
+        batch_id: Batch the evaluations were submitted in, if any
+
+    Returns:
+        Mapping of evaluation ID to final status
+    """
+    session = SessionLocal()
+    try:
+        # Evaluations finished by an earlier delivery of this task are skipped
+        evaluations = session.scalars(
+            select(Evaluation).where(
+                Evaluation.id.in_([uuid.UUID(i) for i in evaluation_ids]),
+                Evaluation.status.not_in(FINISHED_STATUSES),
+            )
+        ).all()
+        for evaluation in evaluations:
+            evaluation.status = 'running'
+        session.commit()
+        publisher = get_status_publisher()
+        publisher.publish_many([StatusEvent(evaluation.id, 'running', batch_id) for evaluation in evaluations])
+
+        criteria = get_criteria_cache().get_many(session, {evaluation.criteria_id for evaluation in evaluations})
+        keys = [
+            judge_cache_key(criteria[evaluation.criteria_id].digest, evaluation.agent_prompt, evaluation.agent_output)
+            for evaluation in evaluations
+        ]
+
+        if settings.JUDGE_CACHE_ENABLED:
+            outcomes = get_judge_cache().get_many(keys)
+        else:
+            outcomes = [None] * len(evaluations)
+        misses = [i for i, outcome in enumerate(outcomes) if outcome is None]
+        # Deterministic checks are scored for all misses at once, one array pass per criteria version
+        check_scores = score_evaluations([evaluations[i] for i in misses], criteria)
+
+        logger.info(f"Judging batch of {len(misses)} evaluations ({len(evaluations) - len(misses)} cached)")
+        # Evaluations with a multi-item rubric get one judge call per item not carried over
+        requests = []
+        for i in misses:
+            evaluation, evaluation_criteria = evaluations[i], criteria[evaluations[i].criteria_id]
+            if evaluation_criteria.deterministic_only:
+                continue
+            if uses_rubric_fanout(evaluation_criteria):
+                carried = evaluation.carried_items or {}
+                requests.extend(
+                    (i, (item.text, evaluation.agent_prompt, evaluation.agent_output), True)
+                    for item in evaluation_criteria.rubric
+                    if item.key not in carried
+                )
+            else:
+                requests.append(
+                    (i, (evaluation_criteria.judged_content, evaluation.agent_prompt, evaluation.agent_output), False)
+                )
+        judged = judge_requests([request for _, request, _ in requests], [item for _, _, item in requests])
+
+        verdicts: Dict[int, List[Any]] = {}
+        for (i, _, item), outcome in zip(requests, judged):
+            if item:
+                verdicts.setdefault(i, []).append(outcome)
+            else:
+                outcomes[i] = outcome
+        for i, item_verdicts in verdicts.items():
+            failed = [verdict for verdict in item_verdicts if isinstance(verdict, BaseException)]
+            rubric = criteria[evaluations[i].criteria_id].rubric
+            outcomes[i] = failed[0] if failed else aggregate_rubric(
+                rubric, merge_verdicts(rubric, evaluations[i].carried_items, item_verdicts)
+            )
+        for i, scores in zip(misses, check_scores):
+            if not isinstance(outcomes[i], BaseException):
+                outcomes[i] = with_check_scores(outcomes[i], scores)
+
+        if settings.JUDGE_CACHE_ENABLED:
+            get_judge_cache().set_many({
+                keys[i]: outcomes[i] for i in misses if not isinstance(outcomes[i], BaseException)
+            })
+
+        completed_at = datetime.datetime.utcnow()
+        completions = []
+        for evaluation, outcome, key in zip(evaluations, outcomes, keys):
+            if isinstance(outcome, BaseException):
+                logger.error(f"Evaluation {evaluation.id} failed: {outcome}")
+                status, results = 'failed', {"error": str(outcome)}
+            else:
+                status, results = 'completed', outcome
+            evaluation_criteria = criteria[evaluation.criteria_id]
+            completions.append(Completion(
+                evaluation.id,
+                status,
+                results,
+                completed_at,
+                evaluation_criteria.agent_id,
+                evaluation_criteria.version,
+                batch_id,
+                key,
+            ))
+        session.close()
+        get_completion_writer().write(completions)
+        logger.info(f"Batch of {len(evaluations)} evaluations finished")
+
+        return {str(completion.evaluation_id): completion.status for completion in completions}
+
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        raise
+    finally:
+        session.close()
+
+
+@celery_app.task(name="aieb_evaluation_svc.recompute_score_aggregates")
+def recompute_score_aggregates_task(agent_id: str | None = None, criteria_version: int | None = None) -> int:
+    """Rebuild score aggregates from completed evaluations.
+
+    Args:
+        agent_id: Only rebuild this agent's aggregates
+        criteria_version: Only rebuild this criteria version's aggregates
+
+    Returns:
+        Number of aggregate rows written
+    """
+    session = SessionLocal()
+    try:
+        return recompute_score_aggregates(
+            session,
+            None if agent_id is None else uuid.UUID(agent_id),
+            criteria_version,
+            archive_root=settings.ARCHIVE_PATH if settings.ARCHIVE_ENABLED else None,
+        )
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        raise
+    finally:
+        session.close()
+
+
+@celery_app.task(name="aieb_evaluation_svc.archive_evaluations")
+def archive_evaluations_task() -> int:
+    """Move finished evaluations older than ``settings.ARCHIVE_AFTER_DAYS`` to the archive.
+
+    Returns:
+        Number of evaluations archived
+    """
+    session = SessionLocal()
+    try:
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+        return archive_evaluations(session, settings.ARCHIVE_PATH, cutoff, settings.ARCHIVE_BATCH_SIZE)
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        raise
+    finally:
+        session.close()
+
+
+def metrics_registry() -> CollectorRegistry:
+    """Build the Prometheus registry served by the worker and API exporters.
+
+    Returns:
+        Registry with the process metrics and the Celery queue depth
+    """
+    broker = redis.Redis.from_url(
+        settings.REDIS_BROKER_URL,
+        socket_timeout=settings.METRICS_REDIS_TIMEOUT_SECONDS,
+        socket_connect_timeout=settings.METRICS_REDIS_TIMEOUT_SECONDS,
+    )
+    return build_registry(
+        QueueDepthCollector(broker, lambda: [queue.name for queue in celery_app.amqp.queues.values()])
+    )
+
+
+# Start times of the tasks running in this process, by task ID
+_task_started: Dict[str, float] = {}
+
+
+@before_task_publish.connect
+def _stamp_publish_time(headers: Dict[str, Any] | None = None, **kwargs: Any) -> None:
+    # Wall clock, as the consuming worker may run on another host
+    if headers is not None:
+        headers.setdefault("published_at", time.time())
+
+
+@task_prerun.connect
+def _start_task_timer(task_id: str, task: Any, **kwargs: Any) -> None:
+    published_at = request_header(task.request, "published_at")
+    # Scheduled tasks wait on purpose, so only count immediate ones
+    if published_at is not None and not task.request.eta:
+        TASK_QUEUE_WAIT_SECONDS.labels(task.name).observe(max(time.time() - published_at, 0.0))
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _stop_task_timer(task_id: str, task: Any, state: str | None = None, **kwargs: Any) -> None:
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        TASK_RUN_SECONDS.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started)
+    observe_pools(created_engines())
+
+
+@worker_init.connect
+def _start_metrics_exporter(**kwargs: Any) -> None:
+    if settings.WORKER_METRICS_PORT is None:
+        return
+    start_http_server(settings.WORKER_METRICS_PORT, registry=metrics_registry())
+    logger.info(f"Serving worker metrics on port {settings.WORKER_METRICS_PORT}")
+
+
+@worker_process_shutdown.connect
+def _close_async_executor(**kwargs: Any) -> None:
+    shutdown_async_executor()
+
+
+@worker_process_init.connect
+def _write_completions_inline(**kwargs: Any) -> None:
+    # Only sent by the prefork and solo pools, whose processes run one task at a time
+    set_inline_writes(True)
+
+
+@worker_process_shutdown.connect
+def _close_completion_writer(**kwargs: Any) -> None:
+    shutdown_completion_writer()
+
+
+@worker_process_shutdown.connect
+def _mark_metrics_process_dead(**kwargs: Any) -> None:
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(os.getpid())
+
+
+__all__ = ["celery_app", "metrics_registry", "add", "evaluate", "evaluate_batch", "recompute_score_aggregates_task"]
@@ -0,0 +1,301 @@
+"""Write-behind buffer that persists evaluation outcomes in batches.
+
+Finished tasks hand their outcome to the process's completion writer
+instead of committing it themselves. A background thread collects the
+outcomes of concurrently finishing tasks (thread or gevent pools, batch
+tasks, chord bodies) and writes them with one bulk UPDATE and one commit
+once ``settings.COMPLETION_WRITER_MAX_ROWS`` rows are buffered or the
+oldest has waited ``settings.COMPLETION_WRITER_MAX_DELAY_MS``
+milliseconds. Outcomes arriving while a flush runs are buffered for the
+next one, so batches grow with load even without a delay.
+
+Worker processes that run one task at a time (the prefork and solo pools)
+have no concurrent outcomes to batch with, so they write every task's
+outcomes inline; ``evaluate_batch`` still writes a whole batch at once.
+
+Tasks block until their outcome is committed, so a task message is only
+acknowledged (``task_acks_late``) once its row is durable. Writes skip
+evaluations that are already finished, so a message redelivered after
+its outcome was committed never overwrites it or counts its scores twice.
+"""
+
+import datetime
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.models.base import SessionLocal
+from aieb_evaluation_svc.models.evaluation import Evaluation
+from aieb_evaluation_svc.services.evaluation_runs import record_run_outcomes
+from aieb_evaluation_svc.services.score_aggregates import record_scores
+from aieb_evaluation_svc.services.single_flight import (
+    FINISHED_STATUSES,
+    complete_duplicates,
+    get_in_flight_registry,
+)
+from aieb_evaluation_svc.services.status_events import StatusEvent, get_status_publisher
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Completion:
+    """Final outcome of one evaluation, waiting to be written."""
+    evaluation_id: uuid.UUID
+    status: str
+    results: Optional[Dict[str, Any]]
+    completed_at: datetime.datetime
+    agent_id: uuid.UUID
+    criteria_version: int
+    batch_id: Optional[str] = None
+    # Judge cache key claimed by the evaluation as an in-flight leader
+    cache_key: Optional[str] = None
+
+
+def write_completions(session: Session, completions: Sequence[Completion]) -> List[Completion]:
+    """Persist evaluation outcomes in one transaction.
+
+    Rows are locked before they are updated, and evaluations that already
+    finished (e.g. by an earlier delivery of the same task) are left as
+    they are. The score aggregates and run progress counters are updated
+    in the same transaction.
+
+    Args:
+        session: Database session; committed
+        completions: Outcomes to write
+
+    Returns:
+        The completions that were applied, the first one per evaluation
+    """
+    open_runs = dict(session.execute(
+        select(Evaluation.id, Evaluation.run_id)
+        .where(
+            Evaluation.id.in_([completion.evaluation_id for completion in completions]),
+            Evaluation.status.not_in(FINISHED_STATUSES),
+        )
+        .with_for_update()
+    ).all())
+    applied = []
+    for completion in completions:
+        # A redelivered task may race its first delivery into the same flush
+        if completion.evaluation_id in open_runs:
+            run_id = open_runs.pop(completion.evaluation_id)
+            applied.append((completion, run_id))
+    runs = [(run_id, completion.status) for completion, run_id in applied]
+    applied = [completion for completion, _ in applied]
+    if applied:
+        session.execute(update(Evaluation), [
+            {
+                "id": completion.evaluation_id,
+                "status": completion.status,
+                "results": completion.results,
+                "completed_at": completion.completed_at,
+            }
+            for completion in applied
+        ])
+        record_scores(session, [
+            (completion.agent_id, completion.criteria_version, completion.results)
+            for completion in applied
+            if completion.status == 'completed'
+        ])
+        record_run_outcomes(session, runs)
+    session.commit()
+    return applied
+
+
+def finish_leaders(session: Session, keys: Sequence[str], evaluation_ids: Sequence[uuid.UUID]) -> None:
+    """Hand the outcome of finished evaluations to their followers and release their claims.
+
+    Args:
+        session: Database session the outcomes were committed with
+        keys: Judge cache keys of the finished evaluations
+        evaluation_ids: IDs of the finished evaluations
+    """
+    events = complete_duplicates(session, evaluation_ids)
+    if events:
+        get_status_publisher().publish_many(events)
+    get_in_flight_registry().release_many(keys)
+
+
+class CompletionWriter:
+    """Buffers evaluation outcomes and writes them in batches.
+
+    With ``max_rows`` of 1 or less, every call writes its outcomes
+    immediately from the calling thread.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], max_rows: int, max_delay_seconds: float):
+        """Create the writer; its flush thread starts on first use.
+
+        Args:
+            session_factory: Creates the session each flush writes with
+            max_rows: Buffered outcomes that trigger a flush
+            max_delay_seconds: Longest time an outcome waits for more to
+                batch with; 0 flushes as soon as the previous flush is done
+        """
+        self.session_factory = session_factory
+        self.max_rows = max_rows
+        self.max_delay_seconds = max_delay_seconds
+        self._pending: List[Tuple[Completion, Future]] = []
+        self._oldest: float | None = None
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+    @property
+    def buffered(self) -> bool:
+        """Whether outcomes are batched by the flush thread."""
+        return self.max_rows > 1
+
+    def write(self, completions: Sequence[Completion]) -> None:
+        """Persist outcomes, returning once they are committed.
+
+        Args:
+            completions: Outcomes to write
+
+        Raises:
+            Exception: If the flush writing them failed
+        """
+        if not completions:
+            return
+        if not self.buffered:
+            self._flush(list(completions))
+            return
+        futures = []
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Completion writer is closed")
+            self._ensure_thread()
+            for completion in completions:
+                future: Future = Future()
+                self._pending.append((completion, future))
+                futures.append(future)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            self._condition.notify()
+        for future in futures:
+            future.result()
+
+    def close(self) -> None:
+        """Flush buffered outcomes and stop the flush thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="completion-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._ready():
+                    timeout = None if self._oldest is None else self._oldest + self.max_delay_seconds - time.monotonic()
+                    self._condition.wait(timeout)
+                batch, self._pending = self._pending[:self.max_rows], self._pending[self.max_rows:]
+                self._oldest = time.monotonic() if self._pending else None
+                done = self._closed and not batch
+            if done:
+                return
+            try:
+                self._flush([completion for completion, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for _, future in batch:
+                    future.set_result(None)
+
+    def _ready(self) -> bool:
+        if self._closed or len(self._pending) >= self.max_rows:
+            return True
+        return self._oldest is not None and time.monotonic() >= self._oldest + self.max_delay_seconds
+
+    def _flush(self, completions: List[Completion]) -> None:
+        session = self.session_factory()
+        try:
+            applied = write_completions(session, completions)
+            get_status_publisher().publish_many([
+                StatusEvent(completion.evaluation_id, completion.status, completion.batch_id)
+                for completion in applied
+            ])
+            finish_leaders(
+                session,
+                [completion.cache_key for completion in completions if completion.cache_key is not None],
+                [completion.evaluation_id for completion in completions],
+            )
+            logger.info(f"Wrote {len(applied)} evaluation outcomes ({len(completions) - len(applied)} already finished)")
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+
+_writer: CompletionWriter | None = None
+_writer_pid: int | None = None
+_writer_lock = threading.Lock()
+# Set in worker processes that run one task at a time
+_inline_writes = False
+
+
+def set_inline_writes(inline: bool) -> None:
+    """Make this process's writer write outcomes from the calling task instead of batching them."""
+    global _inline_writes
+    with _writer_lock:
+        _inline_writes = inline
+
+
+def get_completion_writer() -> CompletionWriter:
+    """Return this process's completion writer, creating it on first use.
+
+    Like the async executor, the writer is keyed on the process ID so that
+    prefork children never share a flush thread inherited from their parent.
+    After :func:`set_inline_writes` it writes inline.
+
+    Returns:
+        The process-wide CompletionWriter
+    """
+    global _writer, _writer_pid
+    with _writer_lock:
+        if _writer is None or _writer_pid != os.getpid():
+            _writer = CompletionWriter(
+                SessionLocal,
+                1 if _inline_writes else settings.COMPLETION_WRITER_MAX_ROWS,
+                settings.COMPLETION_WRITER_MAX_DELAY_MS / 1000,
+            )
+            _writer_pid = os.getpid()
+        return _writer
+
+
+def set_completion_writer(writer: CompletionWriter | None) -> None:
+    """Replace this process's completion writer, e.g. in tests."""
+    global _writer, _writer_pid
+    with _writer_lock:
+        _writer = writer
+        _writer_pid = None if writer is None else os.getpid()
+
+
+def shutdown_completion_writer() -> None:
+    """Flush and close this process's completion writer if one was started."""
+    global _writer, _writer_pid
+    with _writer_lock:
+        if _writer is not None and _writer_pid == os.getpid():
+            _writer.close()
+        _writer = None
+        _writer_pid = None
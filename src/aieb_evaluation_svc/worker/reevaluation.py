@@ -0,0 +1,47 @@
+"""Incremental re-evaluation of outputs when a new criteria version is published.
+
+See :func:`~aieb_evaluation_svc.services.evaluation_service.reevaluate_previous_version`.
+The task runs on the bulk queue and releases the new evaluations through
+the bulk lane backlog, so a large re-evaluation shares workers fairly
+with every other agent's bulk work.
+"""
+
+import logging
+import uuid
+from typing import Dict
+
+from aieb_evaluation_svc.models.base import SessionLocal
+from aieb_evaluation_svc.services.evaluation_service import release_bulk_backlog, reevaluate_previous_version
+from aieb_evaluation_svc.worker.celery_app import celery_app
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="aieb_evaluation_svc.reevaluate_criteria")
+def reevaluate_criteria_task(criteria_id: str, run_id: str | None = None) -> Dict[str, int]:
+    """Re-evaluate the previous version's outputs against a criteria version.
+
+    Args:
+        criteria_id: The new criteria version
+        run_id: Run the new evaluations are added to
+
+    Returns:
+        Counts of new evaluations and of carried and judged rubric items
+    """
+    session = SessionLocal()
+    try:
+        counts = reevaluate_previous_version(
+            session, uuid.UUID(criteria_id), None if run_id is None else uuid.UUID(run_id)
+        )
+        if counts["evaluations"] > counts["completed"]:
+            release_bulk_backlog(session)
+        return counts
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        raise
+    finally:
+        session.close()
+
+
+__all__ = ["reevaluate_criteria_task"]
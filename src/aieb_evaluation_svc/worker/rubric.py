@@ -0,0 +1,143 @@
+"""Chord tasks judging the rubric items of one evaluation in parallel.
+
+:func:`~aieb_evaluation_svc.worker.celery_app.evaluate` publishes one
+``judge_rubric_item`` task per rubric item of the evaluation's criteria,
+with ``aggregate_rubric`` as the chord body. Each item is retried on its
+own, so a transient failure only repeats that item's judge call, and the
+evaluation finishes once its slowest item does.
+"""
+
+import logging
+import uuid
+from typing import Any, Dict, List
+
+from celery import Task
+
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.models.base import SessionLocal
+from aieb_evaluation_svc.models.evaluation import Evaluation
+from aieb_evaluation_svc.services.criteria_cache import get_criteria_cache
+from aieb_evaluation_svc.services.deterministic_scoring import score_outputs, with_check_scores
+from aieb_evaluation_svc.services.judge import judge
+from aieb_evaluation_svc.services.judge_cache import criteria_digest, get_judge_cache, judge_cache_key
+from aieb_evaluation_svc.services.rubric import aggregate_rubric, merge_verdicts
+from aieb_evaluation_svc.services.single_flight import FINISHED_STATUSES
+from aieb_evaluation_svc.worker.celery_app import (
+    RUBRIC_AGGREGATE_TASK,
+    RUBRIC_ITEM_TASK,
+    celery_app,
+    finish_evaluation,
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(bind=True, name=RUBRIC_ITEM_TASK)
+def judge_rubric_item(self: Task, evaluation_id: str, item_index: int) -> Dict[str, Any]:
+    """Judge one rubric item of a running evaluation.
+
+    Failed judge calls are retried with exponential backoff, up to
+    ``settings.RUBRIC_ITEM_MAX_RETRIES`` times; after that the failure is
+    returned rather than raised so the chord still reaches its body.
+
+    Args:
+        evaluation_id: ID of the Evaluation row being judged
+        item_index: Position of the item in its criteria's rubric
+
+    Returns:
+        The item's judge verdict, or ``{"error": ...}`` if it kept failing
+    """
+    session = SessionLocal()
+    try:
+        evaluation = session.get(Evaluation, uuid.UUID(evaluation_id))
+        if evaluation is None:
+            raise LookupError(f"Evaluation {evaluation_id} not found")
+        item = get_criteria_cache().get(session, evaluation.criteria_id).rubric[item_index]
+        agent_prompt, agent_output = evaluation.agent_prompt, evaluation.agent_output
+    finally:
+        # Do not hold a connection during the judge call
+        session.close()
+
+    cache_key = judge_cache_key(criteria_digest(item.text), agent_prompt, agent_output)
+    verdict = get_judge_cache().get(cache_key) if settings.JUDGE_CACHE_ENABLED else None
+    if verdict is not None:
+        return verdict
+
+    try:
+        verdict = judge(item.text, agent_prompt, agent_output)
+    except Exception as e:
+        if self.request.retries < settings.RUBRIC_ITEM_MAX_RETRIES:
+            logger.warning(f"Rubric item {item.key} of evaluation {evaluation_id} failed, retrying: {e}")
+            raise self.retry(
+                exc=e, countdown=settings.RUBRIC_ITEM_RETRY_BACKOFF_SECONDS * 2 ** self.request.retries
+            )
+        logger.error(f"Rubric item {item.key} of evaluation {evaluation_id} failed: {e}")
+        return {"error": str(e)}
+
+    if settings.JUDGE_CACHE_ENABLED:
+        get_judge_cache().set(cache_key, verdict)
+    return verdict
+
+
+@celery_app.task(name=RUBRIC_AGGREGATE_TASK)
+def aggregate_rubric_task(
+    verdicts: List[Dict[str, Any]], evaluation_id: str, batch_id: str | None = None
+) -> Dict[str, Any]:
+    """Combine the rubric item verdicts of an evaluation and complete it.
+
+    The evaluation fails if any of its items failed every attempt. Items
+    carried over from the previous criteria version get their carried
+    verdict.
+
+    Args:
+        verdicts: Verdicts of the judged items in rubric order, as returned by the chord header
+        evaluation_id: ID of the Evaluation row being judged
+        batch_id: Batch the evaluation was submitted in, if any
+
+    Returns:
+        The results stored on the evaluation
+
+    Raises:
+        LookupError: If the evaluation does not exist
+    """
+    session = SessionLocal()
+    try:
+        evaluation = session.get(Evaluation, uuid.UUID(evaluation_id))
+        if evaluation is None:
+            raise LookupError(f"Evaluation {evaluation_id} not found")
+        if evaluation.status in FINISHED_STATUSES:
+            return evaluation.results
+        criteria = get_criteria_cache().get(session, evaluation.criteria_id)
+        cache_key = judge_cache_key(criteria.digest, evaluation.agent_prompt, evaluation.agent_output)
+        verdicts = merge_verdicts(criteria.rubric, evaluation.carried_items, verdicts)
+
+        errors = [
+            f"{item.title}: {verdict['error']}"
+            for item, verdict in zip(criteria.rubric, verdicts)
+            if "error" in verdict
+        ]
+        # Do not hold a connection while the writer flushes
+        session.close()
+        if errors:
+            results = {"error": "; ".join(errors)}
+            finish_evaluation(evaluation, criteria, 'failed', results, batch_id, cache_key)
+            return results
+
+        results = with_check_scores(
+            aggregate_rubric(criteria.rubric, verdicts),
+            score_outputs(criteria.checks, [evaluation.agent_output])[0],
+        )
+        if settings.JUDGE_CACHE_ENABLED:
+            get_judge_cache().set(cache_key, results)
+        finish_evaluation(evaluation, criteria, 'completed', results, batch_id, cache_key)
+        return results
+
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        raise
+    finally:
+        session.close()
+
+
+__all__ = ["judge_rubric_item", "aggregate_rubric_task"]
@@ -1,10 +1,36 @@
+import sys
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import StaticPool, create_engine
+from sqlalchemy import NullPool, StaticPool, create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from aieb_evaluation_svc.app import app
-from aieb_evaluation_svc.models.base import Base, get_db
+from aieb_evaluation_svc.models.base import (
+    Base,
+    get_async_db,
+    get_async_session_factory,
+    get_db,
+    to_async_url,
+)
+from aieb_evaluation_svc.services.backpressure import QueueDepthMonitor, set_queue_depth_monitor
+from aieb_evaluation_svc.services.criteria_cache import CriteriaCache, set_criteria_cache
+from aieb_evaluation_svc.services.judge_cache import JudgeResultCache, set_judge_cache
+from aieb_evaluation_svc.services.rate_limit import (
+    AdaptiveConcurrency,
+    TokenBucketLimiter,
+    set_judge_concurrency,
+    set_judge_rate_limiter,
+)
+from aieb_evaluation_svc.services.single_flight import (
+    IdempotencyStore,
+    InFlightRegistry,
+    set_idempotency_store,
+    set_in_flight_registry,
+)
+from aieb_evaluation_svc.services.status_events import StatusEventPublisher, set_status_publisher
+from aieb_evaluation_svc.worker.completion_writer import CompletionWriter, set_completion_writer
 
 
 # DO NOT MODIFY SECTION START
@@ -39,4 +65,125 @@ def client(session_local):
     with TestClient(app) as c:
         yield c
     app.dependency_overrides[get_db] = get_db
-# DO NOT MODIFY SECTION END
\ No newline at end of file
+# DO NOT MODIFY SECTION END
+
+
+@pytest.fixture(autouse=True)
+def judge_cache():
+    """Give every test a fresh, local-only judge cache."""
+    cache = JudgeResultCache(maxsize=100, ttl_seconds=60)
+    set_judge_cache(cache)
+    yield cache
+    set_judge_cache(None)
+
+
+@pytest.fixture(autouse=True)
+def criteria_cache():
+    """Give every test a fresh, local-only criteria cache."""
+    cache = CriteriaCache(maxsize=100)
+    set_criteria_cache(cache)
+    yield cache
+    set_criteria_cache(None)
+
+
+@pytest.fixture(autouse=True)
+def single_flight():
+    """Keep in-flight claims and idempotency keys out of Redis unless a test opts in."""
+    set_in_flight_registry(InFlightRegistry(ttl_seconds=60))
+    set_idempotency_store(IdempotencyStore(ttl_seconds=60, lock_seconds=5))
+    yield
+    set_in_flight_registry(None)
+    set_idempotency_store(None)
+
+
+@pytest.fixture(autouse=True)
+def judge_limits():
+    """Leave judge calls unthrottled and out of Redis unless a test opts in."""
+    set_judge_rate_limiter(TokenBucketLimiter(rpm=0, tpm=0, max_wait_seconds=1, key="test"))
+    set_judge_concurrency(AdaptiveConcurrency(initial=64, minimum=64, maximum=64, latency_tolerance=2.0))
+    yield
+    set_judge_rate_limiter(None)
+    set_judge_concurrency(None)
+
+
+@pytest.fixture(autouse=True)
+def queue_depths():
+    """Never shed load on broker queue depth unless a test opts in."""
+    set_queue_depth_monitor(QueueDepthMonitor(sample_seconds=0))
+    yield
+    set_queue_depth_monitor(None)
+
+
+@pytest.fixture(autouse=True)
+def completion_writer():
+    """Write task outcomes immediately, with whatever session factory the worker module is patched to use."""
+    worker_module = sys.modules["aieb_evaluation_svc.worker.celery_app"]
+    set_completion_writer(CompletionWriter(lambda: worker_module.SessionLocal(), max_rows=1, max_delay_seconds=0))
+    yield
+    set_completion_writer(None)
+
+
+class RecordingStatusPublisher(StatusEventPublisher):
+    """Publisher that keeps events in memory instead of sending them to Redis."""
+    def __init__(self):
+        super().__init__(redis_client=None)
+        self.events = []
+
+    def publish_many(self, events):
+        self.events.extend(events)
+
+
+@pytest.fixture(autouse=True)
+def status_events():
+    """Record status events published during a test."""
+    publisher = RecordingStatusPublisher()
+    set_status_publisher(publisher)
+    yield publisher.events
+    set_status_publisher(None)
+
+
+@pytest.fixture
+def file_session_local(tmp_path):
+    """Sync session factory on a file database that async sessions can share."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def file_db_session(file_session_local):
+    session = file_session_local()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def async_client(file_session_local):
+    """Test client whose sync and async sessions both use the file database."""
+    async_engine = create_async_engine(
+        to_async_url(str(file_session_local.kw["bind"].url)), poolclass=NullPool
+    )
+    async_session_local = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    def override_session():
+        session = file_session_local()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    async def override_async_session():
+        async with async_session_local() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_session
+    app.dependency_overrides[get_async_db] = override_async_session
+    app.dependency_overrides[get_async_session_factory] = lambda: async_session_local
+    with TestClient(app) as c:
+        yield c
+    app.dependency_overrides.pop(get_db, None)
+    app.dependency_overrides.pop(get_async_db, None)
+    app.dependency_overrides.pop(get_async_session_factory, None)
@@ -0,0 +1,199 @@
+"""Tests for the asyncio evaluation execution mode."""
+
+import asyncio
+import importlib
+import json
+import re
+import uuid
+
+import httpx
+import pytest
+
+from aieb_evaluation_svc.models import Agent, Evaluation, EvaluationCriteria
+from aieb_evaluation_svc.services.judge import (
+    AsyncJudgeClient,
+    JudgeResponseError,
+    parse_judge_response,
+    parse_multi_item_judge_response,
+)
+from aieb_evaluation_svc.worker import celery_app
+from aieb_evaluation_svc.worker.async_executor import AsyncEvaluationExecutor
+
+worker_module = importlib.import_module("aieb_evaluation_svc.worker.celery_app")
+
+
+def completion(scores: dict) -> dict:
+    """Build a chat completion payload carrying the given scores."""
+    content = json.dumps({"scores": scores, "rationale": "ok"})
+    return {"model": "stub", "choices": [{"message": {"content": content}}]}
+
+
+class InFlightTransport(httpx.AsyncBaseTransport):
+    """Async transport that records the peak number of concurrent requests."""
+    def __init__(self, latency: float = 0.01, fail_on: str | None = None):
+        self.latency = latency
+        self.fail_on = fail_on
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+
+        if self.fail_on and self.fail_on in request.content.decode():
+            return httpx.Response(500, json={"error": "boom"})
+        return httpx.Response(200, json=completion({"accuracy": 0.5}))
+
+
+def test_parse_judge_response():
+    verdict = parse_judge_response(completion({"accuracy": 1, "tone": "0.5"}))
+
+    assert verdict["scores"] == {"accuracy": 1.0, "tone": 0.5}
+    assert verdict["rationale"] == "ok"
+    assert verdict["model"] == "stub"
+
+
+def test_parse_judge_response_invalid():
+    with pytest.raises(JudgeResponseError):
+        parse_judge_response({"choices": [{"message": {"content": "not json"}}]})
+
+
+def test_executor_bounds_in_flight_requests():
+    transport = InFlightTransport()
+    executor = AsyncEvaluationExecutor(4, client_factory=lambda: AsyncJudgeClient(transport=transport))
+    try:
+        outcomes = executor.judge_many([("criteria", f"p{i}", "o") for i in range(20)])
+    finally:
+        executor.close()
+
+    assert transport.calls == 20
+    assert transport.peak == 4
+    assert all(outcome["scores"] == {"accuracy": 0.5} for outcome in outcomes)
+
+
+def test_executor_returns_exceptions_per_request():
+    transport = InFlightTransport(fail_on="bad prompt")
+    executor = AsyncEvaluationExecutor(2, client_factory=lambda: AsyncJudgeClient(transport=transport))
+    try:
+        outcomes = executor.judge_many([("c", "good prompt", "o"), ("c", "bad prompt", "o")])
+    finally:
+        executor.close()
+
+    assert outcomes[0]["scores"] == {"accuracy": 0.5}
+    assert isinstance(outcomes[1], httpx.HTTPStatusError)
+
+
+class EchoTransport(httpx.AsyncBaseTransport):
+    """Async transport scoring every item with the number in its agent output."""
+    def __init__(self, drop_item: bool = False):
+        self.drop_item = drop_item
+        self.requests = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        content = body["messages"][1]["content"]
+        self.requests.append(content)
+        outputs = [float(output) for output in re.findall(r"Agent output\n([\d.]+)", content)]
+        if "## Item" not in content:
+            return httpx.Response(200, json=completion({"accuracy": outputs[0]}))
+        items = [{"id": i, "scores": {"accuracy": output}, "rationale": "ok"} for i, output in enumerate(outputs)]
+        verdict = {"items": items[:-1] if self.drop_item else items}
+        return httpx.Response(200, json={"model": "stub", "choices": [{"message": {"content": json.dumps(verdict)}}]})
+
+
+def test_parse_multi_item_judge_response():
+    content = json.dumps({"items": [
+        {"id": 1, "scores": {"accuracy": "0.5"}, "rationale": "second"},
+        {"id": 0, "scores": {"accuracy": 1}},
+    ]})
+    verdicts = parse_multi_item_judge_response({"model": "stub", "choices": [{"message": {"content": content}}]}, 2)
+
+    assert [verdict["scores"] for verdict in verdicts] == [{"accuracy": 1.0}, {"accuracy": 0.5}]
+    assert [verdict["rationale"] for verdict in verdicts] == [None, "second"]
+
+    with pytest.raises(JudgeResponseError):
+        parse_multi_item_judge_response({"choices": [{"message": {"content": content}}]}, 3)
+
+
+def test_executor_batches_requests_sharing_criteria():
+    transport = EchoTransport()
+    executor = AsyncEvaluationExecutor(
+        4, client_factory=lambda: AsyncJudgeClient(transport=transport), batch_items=4, batch_wait=0.01
+    )
+    requests = [("Criteria A", f"p{i}", f"0.{i}") for i in range(6)] + [("Criteria B", "p", "0.9")]
+    try:
+        outcomes = executor.judge_many(requests)
+    finally:
+        executor.close()
+
+    # A full batch of four, the two left after the wait, and B on its own
+    assert len(transport.requests) == 3
+    assert sum(request.count("Criteria A") for request in transport.requests) == 2
+    assert [outcome["scores"]["accuracy"] for outcome in outcomes] == [0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.9]
+
+
+def test_executor_falls_back_to_single_requests():
+    transport = EchoTransport(drop_item=True)
+    executor = AsyncEvaluationExecutor(
+        4, client_factory=lambda: AsyncJudgeClient(transport=transport), batch_items=3, batch_wait=0.01
+    )
+    try:
+        outcomes = executor.judge_many([("Criteria", f"p{i}", f"0.{i}") for i in range(3)])
+    finally:
+        executor.close()
+
+    # The multi-item response misses an item, so every item is judged again alone
+    assert len(transport.requests) == 4
+    assert [outcome["scores"]["accuracy"] for outcome in outcomes] == [0.0, 0.1, 0.2]
+
+
+class TestEvaluateBatchTask:
+    """Test cases for the evaluate_batch task."""
+
+    @pytest.fixture(autouse=True)
+    def eager(self, monkeypatch, session_local):
+        monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+        monkeypatch.setattr(worker_module, "SessionLocal", session_local)
+
+    @pytest.fixture
+    def executor(self, monkeypatch):
+        transport = InFlightTransport(fail_on="bad prompt")
+        executor = AsyncEvaluationExecutor(8, client_factory=lambda: AsyncJudgeClient(transport=transport))
+        monkeypatch.setattr(worker_module, "get_async_executor", lambda: executor)
+        yield executor
+        executor.close()
+
+    def test_async_mode_dispatch(self, db_session, executor, monkeypatch):
+        from aieb_evaluation_svc.core.config import settings
+        from aieb_evaluation_svc.schemas.evaluation import EvaluationItem
+        from aieb_evaluation_svc.services.evaluation_service import create_evaluations_bulk, dispatch_evaluations
+
+        monkeypatch.setattr(settings, "EVALUATION_EXECUTION_MODE", "async")
+        monkeypatch.setattr(settings, "WORKER_ASYNC_CONCURRENCY", 4)
+
+        agent = Agent(name=f"test-agent-{uuid.uuid4()}")
+        db_session.add(agent)
+        db_session.commit()
+        criteria = EvaluationCriteria(agent_id=agent.id, version=1, criteria_content="Be correct.")
+        db_session.add(criteria)
+        db_session.commit()
+
+        prompts = [f"prompt {i}" for i in range(9)] + ["bad prompt"]
+        evaluation_ids = create_evaluations_bulk(
+            db_session, [EvaluationItem(criteria_id=criteria.id, agent_prompt=p) for p in prompts]
+        )
+
+        group_result = dispatch_evaluations(evaluation_ids)
+
+        # 10 items in batches of 4
+        assert len(group_result.results) == 3
+        db_session.expire_all()
+        statuses = {row.agent_prompt: row.status for row in db_session.query(Evaluation)}
+        assert statuses.pop("bad prompt") == "failed"
+        assert set(statuses.values()) == {"completed"}
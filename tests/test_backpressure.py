@@ -0,0 +1,134 @@
+"""Tests for queue-depth load shedding on the dispatch endpoints."""
+
+import uuid
+
+import pytest
+import redis
+from prometheus_client import REGISTRY
+
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.models import Agent, EvaluationCriteria
+from aieb_evaluation_svc.services import backpressure
+from aieb_evaluation_svc.services.backpressure import QueueDepthMonitor, admission_delay, set_queue_depth_monitor
+
+INTERACTIVE = "evaluations.interactive"
+BULK = "evaluations.bulk"
+
+
+class FakeBroker:
+    """Redis stand-in that answers pipelined LLEN calls and counts round trips."""
+    def __init__(self, lengths=None):
+        self.lengths = lengths or {}
+        self.fail = False
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        broker = self
+        calls = []
+
+        class Pipeline:
+            def llen(self, key):
+                calls.append(key)
+
+            def execute(self):
+                broker.round_trips += 1
+                if broker.fail:
+                    raise redis.ConnectionError("broker down")
+                return [broker.lengths.get(key, 0) for key in calls]
+
+        return Pipeline()
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    monkeypatch.setattr(settings, "BACKPRESSURE_INTERACTIVE_MAX_DEPTH", 100)
+    monkeypatch.setattr(settings, "BACKPRESSURE_BULK_MAX_DEPTH", 50)
+    broker = FakeBroker()
+    set_queue_depth_monitor(QueueDepthMonitor(sample_seconds=60, redis_client=broker))
+    return broker
+
+
+def shed(lane):
+    return REGISTRY.get_sample_value("aieb_load_shed_total", {"lane": lane}) or 0.0
+
+
+def test_bulk_is_shed_before_interactive(broker):
+    broker.lengths = {INTERACTIVE: 40, BULK: 30}
+    before = shed("bulk")
+
+    assert admission_delay("interactive") is None
+    # Bulk submissions count the interactive backlog too
+    assert admission_delay("bulk") == settings.BACKPRESSURE_RETRY_AFTER_MAX_SECONDS
+    assert shed("bulk") == before + 1
+
+
+def test_depth_is_sampled_not_read_per_request(broker):
+    broker.lengths = {INTERACTIVE: 500}
+
+    for _ in range(20):
+        assert admission_delay("interactive") is not None
+
+    assert broker.round_trips == 1
+
+
+def test_unreadable_broker_never_sheds(broker):
+    broker.lengths = {INTERACTIVE: 500}
+    broker.fail = True
+
+    assert admission_delay("interactive") is None
+
+
+def test_retry_after_follows_drain_rate(broker, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(backpressure.time, "monotonic", lambda: now[0])
+    monitor = QueueDepthMonitor(sample_seconds=1, redis_client=broker)
+    set_queue_depth_monitor(monitor)
+
+    broker.lengths = {INTERACTIVE: 400}
+    admission_delay("interactive")
+    # 200 messages drained in 10 seconds; 100 more to go below the threshold
+    now[0] += 10
+    broker.lengths = {INTERACTIVE: 200}
+
+    assert admission_delay("interactive") == pytest.approx(5.0)
+
+
+@pytest.fixture
+def criteria(file_db_session):
+    agent = Agent(name=f"backpressure-{uuid.uuid4()}")
+    file_db_session.add(agent)
+    file_db_session.flush()
+    criteria = EvaluationCriteria(agent_id=agent.id, version=1, criteria_content="Be correct.")
+    file_db_session.add(criteria)
+    file_db_session.commit()
+    return criteria
+
+
+def test_batch_endpoint_returns_429_with_retry_after(async_client, file_db_session, criteria, broker, monkeypatch):
+    from aieb_evaluation_svc.api import evaluations as module
+
+    monkeypatch.setattr(settings, "EVALUATION_INTERACTIVE_MAX_ITEMS", 1)
+    monkeypatch.setattr(
+        module, "dispatch_evaluations", lambda ids, batch_id=None: type("R", (), {"id": "group-1"})()
+    )
+    broker.lengths = {INTERACTIVE: 10, BULK: 60}
+
+    def submit(count):
+        items = [{"criteria_id": str(criteria.id), "agent_prompt": f"p{i}"} for i in range(count)]
+        return async_client.post("/api/evaluations:batch", json={"items": items})
+
+    # Small batches take the interactive lane, which still has headroom
+    assert submit(1).status_code == 200
+    refused = submit(2)
+    assert refused.status_code == 429
+    assert refused.headers["Retry-After"] == "60"
+    assert file_db_session.query(module.Evaluation).count() == 1
+
+
+def test_test_task_endpoint_sheds_load(client, broker):
+    broker.lengths = {INTERACTIVE: 101}
+
+    response = client.get("/api/test-celery-task", params={"x": 1, "y": 2})
+
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
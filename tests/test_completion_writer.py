@@ -0,0 +1,215 @@
+"""Tests for the batched completion writer."""
+
+import datetime
+import importlib
+import threading
+import time
+import uuid
+
+import pytest
+
+from aieb_evaluation_svc.models import Agent, Evaluation, EvaluationCriteria, ScoreAggregate
+from aieb_evaluation_svc.worker import celery_app
+from aieb_evaluation_svc.worker.completion_writer import (
+    Completion,
+    CompletionWriter,
+    get_completion_writer,
+    set_completion_writer,
+    set_inline_writes,
+    write_completions,
+)
+
+worker_module = importlib.import_module("aieb_evaluation_svc.worker.celery_app")
+
+
+@pytest.fixture
+def criteria(file_db_session):
+    agent = Agent(name=f"writer-{uuid.uuid4()}")
+    file_db_session.add(agent)
+    file_db_session.flush()
+    row = EvaluationCriteria(agent_id=agent.id, version=1, criteria_content="Be correct.")
+    file_db_session.add(row)
+    file_db_session.commit()
+    return row
+
+
+@pytest.fixture
+def running(file_db_session, criteria):
+    def create(count):
+        rows = [
+            Evaluation(criteria_id=criteria.id, status="running", agent_prompt=f"p{i}", agent_output="o")
+            for i in range(count)
+        ]
+        file_db_session.add_all(rows)
+        file_db_session.commit()
+        return rows
+    return create
+
+
+def completion(evaluation, criteria, score=1.0):
+    return Completion(
+        evaluation.id,
+        "completed",
+        {"scores": {"accuracy": score}},
+        datetime.datetime.utcnow(),
+        criteria.agent_id,
+        criteria.version,
+    )
+
+
+class CountingSessions:
+    """Session factory that counts the flushes made with it."""
+    def __init__(self, session_local):
+        self.session_local = session_local
+        self.flushes = 0
+
+    def __call__(self):
+        self.flushes += 1
+        return self.session_local()
+
+
+def statuses(session):
+    session.expire_all()
+    return [row.status for row in session.query(Evaluation).order_by(Evaluation.agent_prompt)]
+
+
+def test_write_completions_skips_finished_evaluations(file_db_session, file_session_local, criteria, running):
+    first, second = running(2)
+    session = file_session_local()
+    try:
+        assert len(write_completions(session, [completion(first, criteria)])) == 1
+        # A redelivered task writes the same outcome again, next to a new one
+        applied = write_completions(
+            session, [completion(first, criteria, 0.0), completion(second, criteria), completion(second, criteria)]
+        )
+    finally:
+        session.close()
+
+    assert [c.evaluation_id for c in applied] == [second.id]
+    file_db_session.expire_all()
+    assert file_db_session.get(Evaluation, first.id).results == {"scores": {"accuracy": 1.0}}
+    aggregate = file_db_session.query(ScoreAggregate).one()
+    assert (aggregate.count, aggregate.sum) == (2, 2.0)
+
+
+def test_concurrent_writes_share_flushes(file_db_session, file_session_local, criteria, running):
+    rows = running(20)
+    sessions = CountingSessions(file_session_local)
+    writer = CompletionWriter(sessions, max_rows=20, max_delay_seconds=5.0)
+    barrier = threading.Barrier(len(rows))
+
+    def finish(evaluation):
+        barrier.wait()
+        writer.write([completion(evaluation, criteria)])
+
+    threads = [threading.Thread(target=finish, args=(row,)) for row in rows]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.close()
+
+    # Reaching max_rows flushes without waiting out the delay
+    assert time.monotonic() - start < 5.0
+    assert sessions.flushes == 1
+    assert set(statuses(file_db_session)) == {"completed"}
+
+
+def test_concurrent_evaluate_tasks_share_a_flush(file_db_session, file_session_local, criteria, monkeypatch):
+    monkeypatch.setattr(worker_module, "SessionLocal", file_session_local)
+    monkeypatch.setattr(worker_module, "judge", lambda *args: {"scores": {"accuracy": 1.0}})
+    rows = [Evaluation(criteria_id=criteria.id, agent_prompt=f"p{i}", agent_output="o") for i in range(8)]
+    file_db_session.add_all(rows)
+    file_db_session.commit()
+    sessions = CountingSessions(file_session_local)
+    writer = CompletionWriter(sessions, max_rows=len(rows), max_delay_seconds=5.0)
+    set_completion_writer(writer)
+
+    # Tasks run side by side, as on a thread pool
+    threads = [threading.Thread(target=worker_module.evaluate, args=(str(row.id),)) for row in rows]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.close()
+
+    assert sessions.flushes == 1
+    assert set(statuses(file_db_session)) == {"completed"}
+
+
+def test_one_task_per_process_pools_write_inline():
+    set_completion_writer(None)
+    assert get_completion_writer().buffered
+
+    worker_module._write_completions_inline()
+    try:
+        set_completion_writer(None)
+        assert not get_completion_writer().buffered
+    finally:
+        set_inline_writes(False)
+
+
+def test_delay_flushes_partial_batch(file_db_session, file_session_local, criteria, running):
+    (row,) = running(1)
+    sessions = CountingSessions(file_session_local)
+    writer = CompletionWriter(sessions, max_rows=100, max_delay_seconds=0.05)
+
+    start = time.monotonic()
+    writer.write([completion(row, criteria)])
+
+    assert 0.04 <= time.monotonic() - start < 2.0
+    assert statuses(file_db_session) == ["completed"]
+    writer.close()
+
+
+def test_close_flushes_buffered_outcomes(file_db_session, file_session_local, criteria, running):
+    (row,) = running(1)
+    writer = CompletionWriter(file_session_local, max_rows=100, max_delay_seconds=60.0)
+    thread = threading.Thread(target=writer.write, args=([completion(row, criteria)],))
+    thread.start()
+    while not writer._pending:
+        time.sleep(0.01)
+
+    writer.close()
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert statuses(file_db_session) == ["completed"]
+    with pytest.raises(RuntimeError):
+        writer.write([completion(row, criteria)])
+
+
+def test_failed_flush_raises_in_every_writer(file_session_local, criteria, running):
+    (row,) = running(1)
+
+    def broken_session():
+        raise RuntimeError("database down")
+
+    writer = CompletionWriter(broken_session, max_rows=10, max_delay_seconds=0.0)
+    with pytest.raises(RuntimeError, match="database down"):
+        writer.write([completion(row, criteria)])
+    writer.close()
+
+
+def test_redelivered_evaluate_keeps_first_outcome(file_db_session, file_session_local, criteria, monkeypatch):
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+    monkeypatch.setattr(worker_module, "SessionLocal", file_session_local)
+    calls = []
+
+    def fake_judge(criteria_content, agent_prompt, agent_output):
+        calls.append(agent_prompt)
+        return {"scores": {"accuracy": 1.0}}
+
+    monkeypatch.setattr(worker_module, "judge", fake_judge)
+    evaluation = Evaluation(criteria_id=criteria.id, agent_prompt="p", agent_output="o")
+    file_db_session.add(evaluation)
+    file_db_session.commit()
+
+    worker_module.evaluate.delay(str(evaluation.id))
+    # Acks-late redelivery after the outcome was committed
+    assert worker_module.evaluate.delay(str(evaluation.id)).get() == {"scores": {"accuracy": 1.0}}
+    assert worker_module.evaluate_batch.delay([str(evaluation.id)]).get() == {}
+
+    assert calls == ["p"]
+    assert file_db_session.query(ScoreAggregate).one().count == 1
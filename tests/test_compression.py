@@ -0,0 +1,104 @@
+"""Tests for compressed payload storage."""
+
+import json
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.models import Agent, Evaluation, EvaluationCriteria
+from aieb_evaluation_svc.models import compression
+from aieb_evaluation_svc.models.compression import (
+    CODEC_MARKERS,
+    CompressionError,
+    active_codec,
+    decode_payload,
+    encode_payload,
+)
+
+TRANSCRIPT = "\n".join(f"step {i}: the agent called search and read result {i % 7}" for i in range(2000))
+
+
+@pytest.fixture
+def criteria(file_db_session):
+    agent = Agent(name=f"compression-{uuid.uuid4()}")
+    file_db_session.add(agent)
+    file_db_session.flush()
+    criteria = EvaluationCriteria(agent_id=agent.id, version=1, criteria_content="criteria")
+    file_db_session.add(criteria)
+    file_db_session.commit()
+    return criteria
+
+
+@pytest.mark.parametrize("codec", ["none", "zlib", "zstd"])
+def test_round_trip(codec):
+    data = TRANSCRIPT.encode()
+    blob = encode_payload(data, codec)
+    assert blob[0] == CODEC_MARKERS[codec]
+    assert decode_payload(blob) == data
+    if codec != "none":
+        assert len(blob) < len(data) / 5
+
+
+def test_small_payloads_are_stored_raw():
+    assert encode_payload(b"short", "zstd") == bytes([CODEC_MARKERS["none"]]) + b"short"
+
+
+def test_unknown_marker_raises():
+    with pytest.raises(CompressionError):
+        decode_payload(b"\x09payload")
+
+
+def test_zstd_falls_back_to_zlib_without_zstandard(monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_COMPRESSION_CODEC", "zstd")
+    zstd_blob = encode_payload(TRANSCRIPT.encode())
+    monkeypatch.setattr(compression, "zstandard", None)
+
+    assert active_codec() == "zlib"
+    assert encode_payload(TRANSCRIPT.encode())[0] == CODEC_MARKERS["zlib"]
+    with pytest.raises(CompressionError):
+        decode_payload(zstd_blob)
+
+
+def test_model_stores_compressed_blobs(file_db_session, criteria):
+    results = {"scores": {"accuracy": 0.5}, "rationale": TRANSCRIPT}
+    evaluation = Evaluation(
+        criteria_id=criteria.id, status="completed", agent_prompt="prompt", agent_output=TRANSCRIPT, results=results
+    )
+    file_db_session.add(evaluation)
+    file_db_session.commit()
+
+    stored_output, stored_results = file_db_session.execute(
+        text("SELECT agent_output, results FROM evaluation")
+    ).one()
+    assert stored_output[0] == CODEC_MARKERS[active_codec()]
+    assert len(stored_output) < len(TRANSCRIPT) / 5
+    assert stored_results[0] == CODEC_MARKERS[active_codec()]
+
+    file_db_session.expire_all()
+    evaluation = file_db_session.get(Evaluation, evaluation.id)
+    assert evaluation.agent_output == TRANSCRIPT
+    assert evaluation.agent_prompt == "prompt"
+    assert evaluation.results == results
+
+
+def test_model_reads_rows_written_with_another_codec(file_db_session, criteria, monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_COMPRESSION_CODEC", "none")
+    plain = Evaluation(criteria_id=criteria.id, agent_prompt="plain", agent_output=TRANSCRIPT)
+    file_db_session.add(plain)
+    file_db_session.commit()
+    monkeypatch.setattr(settings, "STORAGE_COMPRESSION_CODEC", "zlib")
+    file_db_session.add(Evaluation(criteria_id=criteria.id, agent_prompt="zlib", agent_output=TRANSCRIPT))
+    file_db_session.commit()
+    # A legacy row written before the columns were compressed
+    file_db_session.execute(
+        text("UPDATE evaluation SET results = :results WHERE id = :id"),
+        {"results": json.dumps({"scores": {"accuracy": 1.0}}), "id": plain.id.hex},
+    )
+    file_db_session.commit()
+
+    file_db_session.expire_all()
+    rows = {row.agent_prompt: row for row in file_db_session.query(Evaluation).all()}
+    assert rows["plain"].agent_output == rows["zlib"].agent_output == TRANSCRIPT
+    assert rows["plain"].results == {"scores": {"accuracy": 1.0}}
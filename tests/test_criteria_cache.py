@@ -0,0 +1,79 @@
+"""Tests for the EvaluationCriteria read-through cache."""
+
+import uuid
+
+import pytest
+from sqlalchemy import update
+
+from aieb_evaluation_svc.models import Agent, EvaluationCriteria
+from aieb_evaluation_svc.services.criteria_cache import CriteriaCache, ImmutableCriteriaError
+from aieb_evaluation_svc.services.judge_cache import criteria_digest
+
+
+@pytest.fixture
+def agent(db_session):
+    agent = Agent(name=f"test-agent-{uuid.uuid4()}")
+    db_session.add(agent)
+    db_session.commit()
+    return agent
+
+
+def add_version(db_session, agent, version):
+    criteria = EvaluationCriteria(agent_id=agent.id, version=version, criteria_content=f"v{version}")
+    db_session.add(criteria)
+    db_session.commit()
+    return criteria
+
+
+def test_get_many_reads_through_once(db_session, agent, criteria_cache):
+    first = add_version(db_session, agent, 1)
+    second = add_version(db_session, agent, 2)
+
+    loaded = criteria_cache.get_many(db_session, [first.id, second.id, uuid.uuid4()])
+    assert set(loaded) == {first.id, second.id}
+    assert loaded[first.id].digest == criteria_digest("v1")
+
+    # Versions are immutable, so later lookups never go back to the database
+    db_session.delete(first)
+    db_session.commit()
+    assert criteria_cache.get(db_session, first.id).criteria_content == "v1"
+    assert criteria_cache.get_version(db_session, agent.id, 2).id == second.id
+
+    stats = criteria_cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 3, 2)
+
+
+def test_criteria_cannot_be_updated(db_session, agent, criteria_cache):
+    criteria = add_version(db_session, agent, 1)
+    criteria_cache.get(db_session, criteria.id)
+
+    criteria.criteria_content = "changed"
+    with pytest.raises(ImmutableCriteriaError):
+        db_session.commit()
+    db_session.rollback()
+
+    with pytest.raises(ImmutableCriteriaError):
+        db_session.execute(
+            update(EvaluationCriteria).where(EvaluationCriteria.id == criteria.id).values(criteria_content="changed")
+        )
+    db_session.rollback()
+
+    db_session.expire_all()
+    assert db_session.get(EvaluationCriteria, criteria.id).criteria_content == "v1"
+
+
+def test_entries_are_bounded(db_session, agent):
+    cache = CriteriaCache(maxsize=2)
+    ids = [add_version(db_session, agent, version).id for version in range(1, 4)]
+
+    cache.get_many(db_session, ids)
+
+    assert cache.stats()["size"] == 2
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_stats_endpoint_includes_criteria_cache(client, criteria_cache):
+    response = client.get("/api/admin/cache-stats")
+
+    assert response.status_code == 200
+    assert response.json()["criteria_cache"]["maxsize"] == 100
@@ -0,0 +1,100 @@
+"""Tests for engine configuration and session dependencies."""
+
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.models import base
+
+
+def test_to_async_url():
+    memory = make_url(base.to_async_url("sqlite:///:memory:"))
+    assert (memory.drivername, memory.database) == ("sqlite+aiosqlite", ":memory:")
+    assert base.to_async_url("sqlite:////tmp/db.sqlite") == "sqlite+aiosqlite:////tmp/db.sqlite"
+    assert base.to_async_url("postgresql://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    assert base.to_async_url("postgresql+asyncpg://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+
+
+def test_engine_options_from_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 3)
+    monkeypatch.setattr(settings, "DB_POOL_RECYCLE_SECONDS", 60)
+
+    options = base.engine_options("postgresql://u:p@db/app")
+
+    assert options["pool_size"] == 7
+    assert options["max_overflow"] == 3
+    assert options["pool_recycle"] == 60
+    assert options["pool_pre_ping"] is True
+
+
+def test_engine_options_sqlite_skips_pool_sizing():
+    options = base.engine_options("sqlite:///:memory:")
+
+    assert "pool_size" not in options
+    assert "max_overflow" not in options
+
+
+def test_async_engine_for_postgres_url(monkeypatch):
+    asyncio.run(base.dispose_engines())
+    monkeypatch.setattr(settings, "DATABASE_URL", "postgresql://u:p@db/app")
+    try:
+        # Built without connecting
+        engine = base.get_async_engine()
+        assert engine.dialect.driver == "asyncpg"
+        assert engine.pool.size() == settings.DB_POOL_SIZE
+    finally:
+        asyncio.run(base.dispose_engines())
+
+
+def test_get_db_uses_shared_session_factory(monkeypatch):
+    created = []
+
+    def factory():
+        created.append(object())
+        return FakeSession()
+
+    monkeypatch.setattr(base, "SessionLocal", factory)
+
+    dependency = base.get_db()
+    session = next(dependency)
+    dependency.close()
+
+    assert len(created) == 1
+    assert session.closed
+
+
+def test_get_async_db_yields_async_session():
+    async def run():
+        dependency = base.get_async_db()
+        session = await dependency.__anext__()
+        try:
+            assert isinstance(session, AsyncSession)
+            assert (await session.execute(text("SELECT 1"))).scalar() == 1
+        finally:
+            await dependency.aclose()
+
+    asyncio.run(run())
+
+
+def test_engines_are_created_on_first_session_and_disposed():
+    asyncio.run(base.dispose_engines())
+    assert base.created_engines() == {}
+
+    with base.SessionLocal() as session:
+        assert session.execute(text("SELECT 1")).scalar() == 1
+    assert set(base.created_engines()) == {"sync"}
+
+    asyncio.run(base.dispose_engines())
+    assert base.created_engines() == {}
+
+
+class FakeSession:
+    """Session stand-in that records whether it was closed."""
+    closed = False
+
+    def close(self):
+        self.closed = True
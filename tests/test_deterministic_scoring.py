@@ -0,0 +1,236 @@
+"""Tests for the deterministic scorer tier."""
+
+import importlib
+import json
+import uuid
+
+import pytest
+from sqlalchemy import insert
+
+from aieb_evaluation_svc.models import Agent, Evaluation, EvaluationCriteria
+from aieb_evaluation_svc.services.criteria_cache import CachedCriteria
+from aieb_evaluation_svc.services.deterministic_scoring import (
+    InvalidCheckError,
+    parse_checks,
+    score_outputs,
+)
+from aieb_evaluation_svc.worker import celery_app
+from benchmarks import scoring_baseline
+
+worker_module = importlib.import_module("aieb_evaluation_svc.worker.celery_app")
+
+CHECKS = """Answer the refund question.
+
+```checks
+{"type": "exact_match", "expected": "Yes"}
+{"type": "regex", "pattern": "\\\\d+ days"}
+{"type": "keywords", "keywords": ["refund", "30 days", "receipt"]}
+{"type": "keywords", "keywords": ["refund", "receipt"], "all": true}
+{"type": "length", "min_chars": 3, "max_chars": 60}
+{"type": "json_schema", "schema": {"type": "object", "required": ["refund"], "properties": {"refund": {"type": "boolean"}}}}
+{"type": "rouge_1", "reference": "Refunds are accepted within 30 days with a receipt."}
+{"type": "bleu", "key": "similarity", "reference": "Refunds are accepted within 30 days with a receipt."}
+```
+"""
+
+OUTPUTS = [
+    "Yes",
+    " yes ",
+    "Refunds are accepted within 30 days with a receipt.",
+    "A refund is possible, bring the Receipt.",
+    '{"refund": true}',
+    '{"refund": "yes"}',
+    "",
+    None,
+    "receipt " * 20,
+]
+
+
+def test_parse_checks():
+    checks, judged_content = parse_checks(CHECKS)
+
+    assert [check.key for check in checks] == [
+        "exact_match", "regex", "keywords", "keywords_2", "length", "json_schema", "rouge_1", "similarity",
+    ]
+    assert judged_content == "Answer the refund question."
+    assert parse_checks("Be correct.") == ((), "Be correct.")
+
+    checks, judged_content = parse_checks('```checks\n[{"type": "length", "max_chars": 5}]\n```')
+    assert checks[0].params == {"max_chars": 5}
+    assert judged_content == ""
+
+
+@pytest.mark.parametrize("content", [
+    "```checks\nnot json\n```",
+    '```checks\n{"type": "sentiment"}\n```',
+    '```checks\n{"type": "regex"}\n```',
+])
+def test_invalid_checks(content):
+    with pytest.raises(InvalidCheckError):
+        parse_checks(content)
+
+
+def test_vectorized_scores_match_per_row_scoring():
+    checks, _ = parse_checks(CHECKS)
+
+    vectorized = score_outputs(checks, OUTPUTS)
+    per_row = scoring_baseline.score_outputs(checks, OUTPUTS)
+
+    assert len(vectorized) == len(OUTPUTS)
+    for expected, actual in zip(per_row, vectorized):
+        assert actual == pytest.approx(expected)
+    assert [scores["exact_match"] for scores in vectorized[:3]] == [1.0, 1.0, 0.0]
+    assert vectorized[3]["keywords"] == pytest.approx(2 / 3)
+    assert vectorized[2]["similarity"] == pytest.approx(1.0)
+    assert [scores["json_schema"] for scores in vectorized[4:6]] == [1.0, 0.0]
+    # A missing output fails every check
+    assert set(vectorized[7].values()) == {0.0}
+
+
+@pytest.fixture
+def criteria_row(file_db_session):
+    def create(content):
+        agent = Agent(name=f"checks-{uuid.uuid4()}")
+        file_db_session.add(agent)
+        file_db_session.flush()
+        row = EvaluationCriteria(agent_id=agent.id, version=1, criteria_content=content)
+        file_db_session.add(row)
+        file_db_session.commit()
+        return row
+    return create
+
+
+@pytest.fixture
+def eager(monkeypatch, file_session_local):
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+    monkeypatch.setattr(worker_module, "SessionLocal", file_session_local)
+
+
+DETERMINISTIC = '```checks\n{"type": "keywords", "keywords": ["refund"]}\n```'
+
+
+def test_deterministic_criteria_skip_the_judge(eager, file_db_session, criteria_row, monkeypatch):
+    monkeypatch.setattr(worker_module, "judge", lambda *args: pytest.fail("judge called"))
+    criteria = criteria_row(DETERMINISTIC)
+    evaluation = Evaluation(criteria_id=criteria.id, agent_prompt="p", agent_output="No refund.")
+    file_db_session.add(evaluation)
+    file_db_session.commit()
+
+    results = worker_module.evaluate.delay(str(evaluation.id)).get()
+
+    assert results["scores"] == {"keywords": 1.0}
+    assert results["model"] == "deterministic"
+    file_db_session.expire_all()
+    assert file_db_session.get(Evaluation, evaluation.id).status == "completed"
+
+
+def test_check_scores_merge_with_judge_verdict(eager, file_db_session, criteria_row, monkeypatch):
+    criteria = criteria_row("Be polite.\n\n" + DETERMINISTIC)
+    judged = []
+
+    def fake_judge(criteria_content, agent_prompt, agent_output):
+        judged.append(criteria_content)
+        return {"scores": {"politeness": 0.5}, "rationale": "ok", "model": "stub"}
+
+    monkeypatch.setattr(worker_module, "judge", fake_judge)
+    evaluation = Evaluation(criteria_id=criteria.id, agent_prompt="p", agent_output="Sorry, no refund.")
+    file_db_session.add(evaluation)
+    file_db_session.commit()
+
+    results = worker_module.evaluate.delay(str(evaluation.id)).get()
+
+    # The judge never sees the checks block
+    assert judged == ["Be polite."]
+    assert results["scores"] == {"politeness": 0.5, "keywords": 1.0}
+    assert results["checks"] == {"keywords": 1.0}
+
+
+def test_evaluate_batch_scores_checks_per_criteria(eager, file_db_session, criteria_row, monkeypatch):
+    deterministic = criteria_row(DETERMINISTIC)
+    mixed = criteria_row('Be polite.\n\n```checks\n{"type": "length", "max_chars": 10}\n```')
+    requests = []
+
+    class FakeExecutor:
+        def judge_many(self, batch):
+            requests.extend(criteria for criteria, _, _ in batch)
+            return [{"scores": {"politeness": 1.0}, "rationale": "ok", "model": "stub"} for _ in batch]
+
+    monkeypatch.setattr(worker_module, "get_async_executor", FakeExecutor)
+    evaluations = [
+        Evaluation(criteria_id=criteria.id, agent_prompt=f"p{i}", agent_output=output)
+        for i, (criteria, output) in enumerate([
+            (deterministic, "refund"), (deterministic, "none"), (mixed, "short"), (mixed, "far too long"),
+        ])
+    ]
+    file_db_session.add_all(evaluations)
+    file_db_session.commit()
+
+    worker_module.evaluate_batch.delay([str(evaluation.id) for evaluation in evaluations]).get()
+
+    assert requests == ["Be polite.", "Be polite."]
+    file_db_session.expire_all()
+    scores = [file_db_session.get(Evaluation, evaluation.id).results["scores"] for evaluation in evaluations]
+    assert scores == [
+        {"keywords": 1.0},
+        {"keywords": 0.0},
+        {"politeness": 1.0, "length": 1.0},
+        {"politeness": 1.0, "length": 0.0},
+    ]
+
+
+def test_cached_criteria_split_rubric_without_checks():
+    row = type("Row", (), {
+        "id": uuid.uuid4(),
+        "agent_id": uuid.uuid4(),
+        "version": 1,
+        "criteria_content": "## Tone\nPolite.\n\n## Facts\nCorrect.\n\n" + DETERMINISTIC,
+    })
+    criteria = CachedCriteria.from_row(row)
+
+    assert [item.key for item in criteria.rubric] == ["tone", "facts"]
+    assert "checks" not in criteria.rubric[-1].text
+    assert not criteria.deterministic_only
+    assert json.dumps(criteria.checks[0].params) == '{"keywords": ["refund"]}'
+
+
+def test_invalid_checks_are_not_stored(file_db_session, criteria_row):
+    with pytest.raises(InvalidCheckError):
+        criteria_row('Be polite.\n\n```checks\n{"type": "regex"}\n```')
+
+
+def test_stored_invalid_checks_fall_back_to_the_judge(
+    eager, async_client, file_db_session, criteria_row, monkeypatch
+):
+    from aieb_evaluation_svc.api import evaluations as module
+
+    valid = criteria_row(DETERMINISTIC)
+    # Written before checks were validated
+    malformed_id = uuid.uuid4()
+    file_db_session.execute(insert(EvaluationCriteria).values(
+        id=malformed_id,
+        agent_id=valid.agent_id,
+        version=2,
+        criteria_content='Be polite.\n\n```checks\n{"type": "sentiment"}\n```',
+    ))
+    file_db_session.commit()
+    monkeypatch.setattr(
+        module, "dispatch_evaluations", lambda ids, batch_id=None: type("R", (), {"id": "group-1"})()
+    )
+
+    response = async_client.post("/api/evaluations:batch", json={"items": [
+        {"criteria_id": str(valid.id), "agent_prompt": "p", "agent_output": "refund"},
+        {"criteria_id": str(malformed_id), "agent_prompt": "p", "agent_output": "Sorry."},
+    ]})
+
+    assert response.status_code == 200
+    judged = []
+
+    def fake_judge(criteria_content, agent_prompt, agent_output):
+        judged.append(criteria_content)
+        return {"scores": {"politeness": 1.0}, "rationale": "ok", "model": "stub"}
+
+    monkeypatch.setattr(worker_module, "judge", fake_judge)
+    results = worker_module.evaluate.delay(response.json()["evaluation_ids"][1]).get()
+
+    assert judged == ["Be polite."]
+    assert results["scores"] == {"politeness": 1.0}
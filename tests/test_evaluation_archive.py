@@ -0,0 +1,175 @@
+"""Tests for archiving old finished evaluations to compressed files."""
+
+import datetime
+import importlib
+import json
+import os
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.models import Agent, ArchivedEvaluation, Evaluation, EvaluationCriteria, ScoreAggregate
+from aieb_evaluation_svc.services.evaluation_archive import (
+    archive_evaluations,
+    find_archived,
+    iter_archive,
+    write_partition,
+)
+from aieb_evaluation_svc.services.evaluation_query import EvaluationFilters
+from aieb_evaluation_svc.services.score_aggregates import recompute_score_aggregates, summarize_aggregates
+from aieb_evaluation_svc.worker import celery_app
+
+worker_module = importlib.import_module("aieb_evaluation_svc.worker.celery_app")
+
+BASE_TIME = datetime.datetime(2026, 1, 1)
+CUTOFF = BASE_TIME + datetime.timedelta(days=3)
+
+
+@pytest.fixture
+def archive_root(tmp_path, monkeypatch):
+    root = str(tmp_path / "archive")
+    monkeypatch.setattr(settings, "ARCHIVE_PATH", root)
+    monkeypatch.setattr(settings, "ARCHIVE_CODEC", "gzip")
+    return root
+
+
+@pytest.fixture
+def seeded(file_db_session):
+    """Eight evaluations, two a day over four days; the last one of day one is still running."""
+    agent = Agent(name="archive-agent")
+    file_db_session.add(agent)
+    file_db_session.flush()
+    criteria = EvaluationCriteria(agent_id=agent.id, version=1, criteria_content="c")
+    file_db_session.add(criteria)
+    file_db_session.flush()
+    rows = [
+        Evaluation(
+            criteria_id=criteria.id,
+            status="running" if i == 1 else "completed",
+            agent_prompt=f"prompt {i}",
+            results=None if i == 1 else {"scores": {"accuracy": i / 10}},
+            created_at=BASE_TIME + datetime.timedelta(hours=12 * i),
+        )
+        for i in range(8)
+    ]
+    file_db_session.add_all(rows)
+    file_db_session.commit()
+    return agent, rows
+
+
+def hot_prompts(session):
+    return session.scalars(select(Evaluation.agent_prompt).order_by(Evaluation.created_at)).all()
+
+
+def test_archive_moves_old_finished_evaluations(file_db_session, archive_root, seeded):
+    assert archive_evaluations(file_db_session, archive_root, CUTOFF, batch_size=2) == 5
+
+    # Recent and unfinished evaluations stay in the table
+    assert hot_prompts(file_db_session) == ["prompt 1", "prompt 6", "prompt 7"]
+    assert sorted(os.listdir(archive_root)) == [
+        "created_date=2026-01-01", "created_date=2026-01-02", "created_date=2026-01-03",
+    ]
+    days = list(iter_archive(archive_root, EvaluationFilters()))
+    assert [[record["agent_prompt"] for record in records] for records in days] == [
+        ["prompt 0"], ["prompt 2", "prompt 3"], ["prompt 4", "prompt 5"],
+    ]
+    assert days[0][0]["agent_id"] == str(seeded[0].id)
+    assert days[0][0]["results"] == {"scores": {"accuracy": 0.0}}
+
+    # Nothing left to archive
+    assert archive_evaluations(file_db_session, archive_root, CUTOFF, batch_size=2) == 0
+
+
+def test_archive_rerun_after_crash_does_not_duplicate(file_db_session, archive_root, seeded, monkeypatch):
+    def crash(*args, **kwargs):
+        raise RuntimeError("crashed before delete")
+
+    monkeypatch.setattr(file_db_session, "commit", crash)
+    with pytest.raises(RuntimeError):
+        archive_evaluations(file_db_session, archive_root, CUTOFF, batch_size=10)
+    file_db_session.rollback()
+    monkeypatch.undo()
+    monkeypatch.setattr(settings, "ARCHIVE_PATH", archive_root)
+    monkeypatch.setattr(settings, "ARCHIVE_CODEC", "gzip")
+
+    assert archive_evaluations(file_db_session, archive_root, CUTOFF, batch_size=10) == 5
+    records = [record for records in iter_archive(archive_root, EvaluationFilters()) for record in records]
+    assert len(records) == 5
+
+
+def test_interleaved_batch_files_are_merged(archive_root):
+    day = BASE_TIME.date()
+    records = [
+        {"id": str(uuid.UUID(int=i)), "created_at": (BASE_TIME + datetime.timedelta(minutes=i)).isoformat()}
+        for i in range(6)
+    ]
+    write_partition(archive_root, day, records[0::2])
+    write_partition(archive_root, day, records[1::2])
+
+    chunks = list(iter_archive(archive_root, EvaluationFilters(), chunk_size=4))
+
+    assert [len(chunk) for chunk in chunks] == [4, 2]
+    assert [record["id"] for chunk in chunks for record in chunk] == [record["id"] for record in records]
+
+
+def test_archive_filters_prune_partitions(file_db_session, archive_root, seeded):
+    archived_id, hot_id = seeded[1][3].id, seeded[1][7].id
+    archive_evaluations(file_db_session, archive_root, CUTOFF, batch_size=10)
+
+    days = list(iter_archive(archive_root, EvaluationFilters(
+        created_after=BASE_TIME + datetime.timedelta(days=1),
+        created_before=BASE_TIME + datetime.timedelta(days=2, hours=1),
+    )))
+    assert [[record["agent_prompt"] for record in records] for records in days] == [
+        ["prompt 2", "prompt 3"], ["prompt 4"],
+    ]
+    path = file_db_session.get(ArchivedEvaluation, archived_id).path
+    assert path.startswith("created_date=2026-01-02" + os.sep)
+    assert find_archived(archive_root, path, archived_id)["agent_prompt"] == "prompt 3"
+    assert find_archived(archive_root, path, hot_id) is None
+    assert file_db_session.get(ArchivedEvaluation, hot_id) is None
+
+
+def test_export_and_get_include_archive(async_client, file_db_session, archive_root, seeded):
+    evaluation_id = seeded[1][0].id
+    archive_evaluations(file_db_session, archive_root, CUTOFF, batch_size=10)
+
+    hot = async_client.get("/api/evaluations:export")
+    assert [json.loads(line)["agent_prompt"] for line in hot.text.splitlines()] == [
+        "prompt 1", "prompt 6", "prompt 7",
+    ]
+    everything = async_client.get("/api/evaluations:export", params={"include_archive": True})
+    assert [json.loads(line)["agent_prompt"] for line in everything.text.splitlines()] == [
+        "prompt 0", "prompt 2", "prompt 3", "prompt 4", "prompt 5", "prompt 1", "prompt 6", "prompt 7",
+    ]
+
+    assert async_client.get(f"/api/evaluations/{evaluation_id}").status_code == 404
+    response = async_client.get(f"/api/evaluations/{evaluation_id}", params={"include_archive": True})
+    assert response.status_code == 200
+    assert response.json()["results"] == {"scores": {"accuracy": 0.0}}
+    assert response.headers["ETag"]
+
+
+def test_recompute_includes_archived_scores(file_db_session, archive_root, seeded):
+    agent, _ = seeded
+    archive_evaluations(file_db_session, archive_root, CUTOFF, batch_size=10)
+
+    recompute_score_aggregates(file_db_session, agent_id=agent.id)
+    assert summarize_aggregates(file_db_session.query(ScoreAggregate).all())["accuracy"]["count"] == 2
+
+    recompute_score_aggregates(file_db_session, agent_id=agent.id, archive_root=archive_root)
+    file_db_session.expire_all()
+    stats = summarize_aggregates(file_db_session.query(ScoreAggregate).all())["accuracy"]
+    assert stats["count"] == 7
+    assert stats["mean"] == pytest.approx(sum([0, 2, 3, 4, 5, 6, 7]) / 70)
+
+
+def test_archive_task(monkeypatch, file_db_session, file_session_local, archive_root, seeded):
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+    monkeypatch.setattr(worker_module, "SessionLocal", file_session_local)
+    monkeypatch.setattr(settings, "ARCHIVE_AFTER_DAYS", 0)
+
+    assert worker_module.archive_evaluations_task.delay().get() == 7
+    assert file_db_session.scalar(select(func.count()).select_from(Evaluation)) == 1
@@ -0,0 +1,172 @@
+"""Tests for bulk evaluation submission and the evaluate task."""
+
+import importlib
+import uuid
+
+import pytest
+
+from aieb_evaluation_svc.models import Agent, Evaluation, EvaluationCriteria
+from aieb_evaluation_svc.worker import celery_app
+
+# The worker package re-exports the Celery app under the module's own name
+worker_module = importlib.import_module("aieb_evaluation_svc.worker.celery_app")
+
+
+class DummyGroupResult:
+    """Mock Celery GroupResult for testing."""
+    def __init__(self, group_id: str):
+        self.id = group_id
+
+
+@pytest.fixture
+def criteria(file_db_session):
+    agent = Agent(name=f"test-agent-{uuid.uuid4()}")
+    file_db_session.add(agent)
+    file_db_session.commit()
+    criteria = EvaluationCriteria(agent_id=agent.id, version=1, criteria_content="Be correct.")
+    file_db_session.add(criteria)
+    file_db_session.commit()
+    return criteria
+
+
+@pytest.fixture
+def dispatched(monkeypatch):
+    from aieb_evaluation_svc.api import evaluations as module
+
+    calls = []
+
+    def fake_dispatch(evaluation_ids, batch_id=None):
+        calls.append(list(evaluation_ids))
+        return DummyGroupResult("group-123")
+
+    monkeypatch.setattr(module, "dispatch_evaluations", fake_dispatch)
+    return calls
+
+
+def test_create_evaluation_batch(async_client, file_db_session, criteria, dispatched):
+    items = [
+        {"criteria_id": str(criteria.id), "agent_prompt": f"prompt {i}", "agent_output": f"output {i}"}
+        for i in range(50)
+    ]
+
+    response = async_client.post("/api/evaluations:batch", json={"items": items})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["group_id"] == "group-123"
+    assert len(data["evaluation_ids"]) == 50
+
+    # All IDs are dispatched in a single call
+    assert len(dispatched) == 1
+    assert [str(i) for i in dispatched[0]] == data["evaluation_ids"]
+
+    rows = file_db_session.query(Evaluation).all()
+    assert len(rows) == 50
+    assert {row.status for row in rows} == {"pending"}
+
+
+def test_create_evaluation_batch_unknown_criteria(async_client, criteria, dispatched):
+    unknown = uuid.uuid4()
+    items = [
+        {"criteria_id": str(criteria.id), "agent_prompt": "p"},
+        {"criteria_id": str(unknown), "agent_prompt": "p"},
+    ]
+
+    response = async_client.post("/api/evaluations:batch", json={"items": items})
+
+    assert response.status_code == 422
+    assert str(unknown) in response.json()["detail"]
+    assert dispatched == []
+
+
+def test_create_evaluation_batch_empty(async_client):
+    response = async_client.post("/api/evaluations:batch", json={"items": []})
+    assert response.status_code == 422
+
+
+def test_create_evaluation_batch_too_large(async_client, criteria, dispatched, monkeypatch):
+    from aieb_evaluation_svc.core.config import settings
+
+    monkeypatch.setattr(settings, "EVALUATION_BATCH_MAX_ITEMS", 2)
+    items = [{"criteria_id": str(criteria.id), "agent_prompt": "p"}] * 3
+
+    response = async_client.post("/api/evaluations:batch", json={"items": items})
+
+    assert response.status_code == 413
+
+
+def test_create_evaluation_batch_dispatch_failure(async_client, file_db_session, criteria, monkeypatch):
+    from aieb_evaluation_svc.api import evaluations as module
+
+    def failing_dispatch(evaluation_ids, batch_id=None):
+        raise Exception("Celery connection failed")
+
+    monkeypatch.setattr(module, "dispatch_evaluations", failing_dispatch)
+
+    response = async_client.post(
+        "/api/evaluations:batch",
+        json={"items": [{"criteria_id": str(criteria.id), "agent_prompt": "p"}]},
+    )
+
+    assert response.status_code == 500
+    assert response.json()["detail"] == "Failed to dispatch task"
+    # The rows stay pending and rejoin the backlog instead of waiting on a task never published
+    file_db_session.expire_all()
+    rows = file_db_session.query(Evaluation).all()
+    assert [(row.status, row.dispatched_at) for row in rows] == [("pending", None)]
+
+
+class TestEvaluateTask:
+    """Test cases for the evaluate task and grouped dispatch."""
+
+    @pytest.fixture(autouse=True)
+    def eager(self, monkeypatch, file_session_local):
+        monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+        monkeypatch.setattr(worker_module, "SessionLocal", file_session_local)
+
+    def _create_evaluations(self, file_db_session, criteria, count):
+        from aieb_evaluation_svc.schemas.evaluation import EvaluationItem
+        from aieb_evaluation_svc.services.evaluation_service import create_evaluations_bulk
+
+        items = [
+            EvaluationItem(criteria_id=criteria.id, agent_prompt=f"p{i}", agent_output=f"o{i}")
+            for i in range(count)
+        ]
+        return create_evaluations_bulk(file_db_session, items)
+
+    @pytest.mark.parametrize("chunk_size", [1, 3])
+    def test_dispatch_evaluations_runs_every_item(self, file_db_session, criteria, monkeypatch, chunk_size):
+        from aieb_evaluation_svc.services.evaluation_service import dispatch_evaluations
+
+        judged = []
+
+        def fake_judge(criteria_content, agent_prompt, agent_output):
+            judged.append(agent_prompt)
+            return {"scores": {"accuracy": 1.0}, "rationale": "ok", "model": "stub"}
+
+        monkeypatch.setattr(worker_module, "judge", fake_judge)
+        evaluation_ids = self._create_evaluations(file_db_session, criteria, 7)
+
+        dispatch_evaluations(evaluation_ids, chunk_size=chunk_size)
+
+        assert sorted(judged) == sorted(f"p{i}" for i in range(7))
+        file_db_session.expire_all()
+        rows = file_db_session.query(Evaluation).all()
+        assert {row.status for row in rows} == {"completed"}
+        assert all(row.completed_at is not None for row in rows)
+        assert rows[0].results["scores"] == {"accuracy": 1.0}
+
+    def test_evaluate_marks_failed_on_judge_error(self, file_db_session, criteria, monkeypatch):
+        def failing_judge(criteria_content, agent_prompt, agent_output):
+            raise RuntimeError("judge unavailable")
+
+        monkeypatch.setattr(worker_module, "judge", failing_judge)
+        [evaluation_id] = self._create_evaluations(file_db_session, criteria, 1)
+
+        result = worker_module.evaluate.delay(str(evaluation_id))
+
+        assert result.failed()
+        file_db_session.expire_all()
+        evaluation = file_db_session.get(Evaluation, evaluation_id)
+        assert evaluation.status == "failed"
+        assert evaluation.results == {"error": "judge unavailable"}
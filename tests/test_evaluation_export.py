@@ -0,0 +1,108 @@
+"""Tests for the streaming evaluation export endpoint."""
+
+import asyncio
+import csv
+import datetime
+import io
+import json
+
+import pytest
+from sqlalchemy import NullPool
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from aieb_evaluation_svc.models import Agent, Evaluation, EvaluationCriteria
+from aieb_evaluation_svc.models.base import to_async_url
+from aieb_evaluation_svc.services.evaluation_export import stream_export
+from aieb_evaluation_svc.services.evaluation_query import EvaluationFilters
+
+BASE_TIME = datetime.datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def seeded(file_db_session):
+    """One agent with two criteria versions and 25 evaluations."""
+    agent = Agent(name="export-agent")
+    file_db_session.add(agent)
+    file_db_session.flush()
+    versions = []
+    for version in (1, 2):
+        criteria = EvaluationCriteria(agent_id=agent.id, version=version, criteria_content="c")
+        file_db_session.add(criteria)
+        file_db_session.flush()
+        versions.append(criteria)
+
+    for i in range(25):
+        file_db_session.add(Evaluation(
+            criteria_id=versions[i % 2].id,
+            status="completed",
+            agent_prompt=f"prompt {i}",
+            agent_output=f'output, with "quotes" {i}',
+            results={"scores": {"accuracy": i / 25}},
+            created_at=BASE_TIME + datetime.timedelta(minutes=i),
+        ))
+    file_db_session.commit()
+    return agent
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    from aieb_evaluation_svc.core.config import settings
+
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 10)
+
+
+def test_export_ndjson(async_client, seeded):
+    response = async_client.get("/api/evaluations:export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 25
+    assert [row["agent_prompt"] for row in rows] == [f"prompt {i}" for i in range(25)]
+    assert rows[3]["results"] == {"scores": {"accuracy": 3 / 25}}
+    assert rows[3]["agent_id"] == str(seeded.id)
+    assert rows[3]["criteria_version"] == 2
+
+
+def test_export_csv(async_client, seeded):
+    response = async_client.get("/api/evaluations:export", params={"format": "csv"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 25
+    assert rows[0]["agent_output"] == 'output, with "quotes" 0'
+    assert json.loads(rows[1]["results"]) == {"scores": {"accuracy": 1 / 25}}
+
+
+def test_export_filters(async_client, seeded):
+    response = async_client.get("/api/evaluations:export", params={
+        "agent_id": str(seeded.id),
+        "criteria_version": 1,
+        "created_after": (BASE_TIME + datetime.timedelta(minutes=10)).isoformat(),
+        "created_before": (BASE_TIME + datetime.timedelta(minutes=20)).isoformat(),
+    })
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["agent_prompt"] for row in rows] == [f"prompt {i}" for i in (10, 12, 14, 16, 18)]
+    assert {row["criteria_version"] for row in rows} == {1}
+
+
+def test_export_rejects_unknown_format(async_client):
+    response = async_client.get("/api/evaluations:export", params={"format": "xml"})
+    assert response.status_code == 422
+
+
+def test_stream_export_yields_one_chunk_per_batch(file_session_local, seeded):
+    async def collect():
+        engine = create_async_engine(to_async_url(str(file_session_local.kw["bind"].url)), poolclass=NullPool)
+        try:
+            return [chunk async for chunk in stream_export(
+                async_sessionmaker(engine), EvaluationFilters(), "ndjson", batch_size=10
+            )]
+        finally:
+            await engine.dispose()
+
+    chunks = asyncio.run(collect())
+
+    assert [chunk.count("\n") for chunk in chunks] == [10, 10, 5]
@@ -0,0 +1,121 @@
+"""Tests for the keyset-paginated evaluation listing endpoint."""
+
+import datetime
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from aieb_evaluation_svc.models import Agent, Evaluation, EvaluationCriteria
+from aieb_evaluation_svc.services.evaluation_query import (
+    EvaluationFilters,
+    InvalidCursorError,
+    build_list_query,
+    decode_cursor,
+    encode_cursor,
+)
+
+BASE_TIME = datetime.datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def seeded(file_db_session):
+    """Two agents with one criteria each and 30 evaluations spread over time."""
+    criteria = []
+    for name in ("agent-a", "agent-b"):
+        agent = Agent(name=name)
+        file_db_session.add(agent)
+        file_db_session.flush()
+        row = EvaluationCriteria(agent_id=agent.id, version=1, criteria_content="c")
+        file_db_session.add(row)
+        file_db_session.flush()
+        criteria.append(row)
+
+    for i in range(30):
+        file_db_session.add(Evaluation(
+            criteria_id=criteria[i % 2].id,
+            status="pending" if i % 3 else "completed",
+            agent_prompt=f"p{i}",
+            # Pairs of rows share a timestamp to exercise the id tie-breaker
+            created_at=BASE_TIME + datetime.timedelta(minutes=i // 2),
+        ))
+    file_db_session.commit()
+    return criteria
+
+
+def fetch_all(client, **params):
+    """Follow next_cursor until the last page and return every item."""
+    items = []
+    cursor = None
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        response = client.get("/api/evaluations", params=query)
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["items"]) <= params.get("limit", 50)
+        items.extend(data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            return items
+
+
+def test_pages_cover_every_row_newest_first(async_client, seeded):
+    items = fetch_all(async_client, limit=7)
+
+    assert len(items) == 30
+    assert len({item["id"] for item in items}) == 30
+    keys = [(item["created_at"], uuid.UUID(item["id"]).hex) for item in items]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_filters(async_client, seeded):
+    criteria_a, criteria_b = seeded
+
+    pending_a = fetch_all(async_client, limit=4, status="pending", criteria_id=str(criteria_a.id))
+    assert len(pending_a) == 10
+    assert {item["status"] for item in pending_a} == {"pending"}
+    assert {item["criteria_id"] for item in pending_a} == {str(criteria_a.id)}
+
+    by_agent = fetch_all(async_client, agent_id=str(criteria_b.agent_id))
+    assert len(by_agent) == 15
+    assert {item["criteria_id"] for item in by_agent} == {str(criteria_b.id)}
+
+    in_range = fetch_all(
+        async_client,
+        created_after=(BASE_TIME + datetime.timedelta(minutes=2)).isoformat(),
+        created_before=(BASE_TIME + datetime.timedelta(minutes=5)).isoformat(),
+    )
+    assert len(in_range) == 6
+
+
+def test_invalid_cursor(async_client):
+    response = async_client.get("/api/evaluations", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_cursor_round_trip():
+    evaluation_id = uuid.uuid4()
+    cursor = encode_cursor(BASE_TIME, evaluation_id)
+
+    assert decode_cursor(cursor) == (BASE_TIME, evaluation_id)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("e30")
+
+
+@pytest.mark.parametrize("filters", [
+    EvaluationFilters(),
+    EvaluationFilters(status="pending"),
+    EvaluationFilters(criteria_id=uuid.uuid4()),
+    EvaluationFilters(criteria_id=uuid.uuid4(), status="pending"),
+])
+def test_page_query_uses_index(file_db_session, filters):
+    """Every page is an index range scan with no sort step."""
+    query = build_list_query(filters, encode_cursor(BASE_TIME, uuid.uuid4()), 50, Evaluation.id)
+    compiled = query.compile(file_db_session.get_bind(), compile_kwargs={"literal_binds": True})
+
+    plan = " ".join(
+        row[-1] for row in file_db_session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+    )
+
+    assert "SEARCH evaluation USING COVERING INDEX ix_evaluation_" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,186 @@
+"""Tests for evaluation runs, their progress counters and resume."""
+
+import datetime
+import importlib
+import uuid
+
+import pytest
+
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.models import Agent, Evaluation, EvaluationCriteria, EvaluationRun
+from aieb_evaluation_svc.schemas.evaluation import EvaluationItem
+from aieb_evaluation_svc.services.evaluation_service import create_evaluations_bulk
+from aieb_evaluation_svc.worker import celery_app
+
+worker_module = importlib.import_module("aieb_evaluation_svc.worker.celery_app")
+
+VERDICT = {"scores": {"accuracy": 0.5}, "rationale": "ok", "model": "stub"}
+
+
+@pytest.fixture
+def criteria(file_db_session):
+    agent = Agent(name=f"run-agent-{uuid.uuid4()}")
+    file_db_session.add(agent)
+    file_db_session.flush()
+    criteria = EvaluationCriteria(agent_id=agent.id, version=1, criteria_content="Be correct.")
+    file_db_session.add(criteria)
+    file_db_session.commit()
+    return criteria
+
+
+@pytest.fixture
+def dispatched(monkeypatch):
+    from aieb_evaluation_svc.api import evaluations as module
+
+    calls = []
+
+    def fake_dispatch(evaluation_ids, batch_id=None):
+        calls.append([str(evaluation_id) for evaluation_id in evaluation_ids])
+        return type("FakeGroupResult", (), {"id": "group-1"})()
+
+    monkeypatch.setattr(module, "dispatch_evaluations", fake_dispatch)
+    return calls
+
+
+@pytest.fixture
+def released(monkeypatch):
+    from aieb_evaluation_svc.api import evaluation_runs as module
+
+    calls = []
+    monkeypatch.setattr(module.release_bulk_backlog_task, "delay", lambda: calls.append(True))
+    return calls
+
+
+@pytest.fixture
+def eager(monkeypatch, file_session_local):
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+    monkeypatch.setattr(worker_module, "SessionLocal", file_session_local)
+    monkeypatch.setattr(settings, "JUDGE_CACHE_ENABLED", False)
+
+    def fake_judge(criteria_content, agent_prompt, agent_output):
+        if agent_prompt == "bad":
+            raise ValueError("judge failed")
+        return VERDICT
+
+    monkeypatch.setattr(worker_module, "judge", fake_judge)
+
+
+def create_run(client, name="nightly"):
+    response = client.post("/api/evaluation-runs", json={"name": name})
+    assert response.status_code == 200
+    return response.json()
+
+
+def submit(client, criteria, prompts, run_id):
+    items = [{"criteria_id": str(criteria.id), "agent_prompt": prompt, "agent_output": "o"} for prompt in prompts]
+    response = client.post("/api/evaluations:batch", json={"items": items, "run_id": run_id})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_run_progress_counts_outcomes(async_client, criteria, dispatched, eager):
+    run = create_run(async_client)
+    assert (run["name"], run["total"], run["pending"]) == ("nightly", 0, 0)
+
+    first = submit(async_client, criteria, ["a", "b"], run["id"])
+    second = submit(async_client, criteria, ["c", "bad"], run["id"])
+    assert first["run_id"] == run["id"]
+    progress = async_client.get(f"/api/evaluation-runs/{run['id']}").json()
+    assert (progress["total"], progress["pending"]) == (4, 4)
+
+    evaluation_ids = first["evaluation_ids"] + second["evaluation_ids"]
+    for evaluation_id in evaluation_ids:
+        worker_module.evaluate.delay(evaluation_id)
+    # A redelivered task does not count its evaluation again
+    worker_module.evaluate.delay(evaluation_ids[0])
+
+    progress = async_client.get(f"/api/evaluation-runs/{run['id']}").json()
+    assert (progress["total"], progress["completed"], progress["failed"], progress["pending"]) == (4, 3, 1, 0)
+
+
+def test_cached_items_count_as_completed(file_db_session, criteria):
+    run = EvaluationRun(name="cached")
+    file_db_session.add(run)
+    file_db_session.commit()
+    items = [EvaluationItem(criteria_id=criteria.id, agent_prompt=f"p{i}") for i in range(3)]
+
+    create_evaluations_bulk(file_db_session, items, [VERDICT, None, VERDICT], run_id=run.id)
+
+    file_db_session.refresh(run)
+    assert (run.total, run.completed, run.failed) == (3, 2, 0)
+
+
+def test_unknown_run(async_client, criteria, dispatched):
+    unknown = str(uuid.uuid4())
+    items = [{"criteria_id": str(criteria.id), "agent_prompt": "p"}]
+
+    response = async_client.post("/api/evaluations:batch", json={"items": items, "run_id": unknown})
+
+    assert response.status_code == 422
+    assert dispatched == []
+    assert async_client.get(f"/api/evaluation-runs/{unknown}").status_code == 404
+    assert async_client.post(f"/api/evaluation-runs/{unknown}:resume").status_code == 404
+
+
+def test_resume_requeues_only_unfinished(async_client, file_db_session, criteria, dispatched, released, eager):
+    run = create_run(async_client)
+    data = submit(async_client, criteria, ["done", "bad", "running", "lost", "queued"], run["id"])
+    ids = [uuid.UUID(evaluation_id) for evaluation_id in data["evaluation_ids"]]
+    worker_module.evaluate.delay(str(ids[0]))
+    worker_module.evaluate.delay(str(ids[1]))
+    # A worker died while judging one evaluation, and the broker lost the others' messages
+    file_db_session.get(Evaluation, ids[2]).status = "running"
+    file_db_session.get(Evaluation, ids[4]).dispatched_at = None
+    file_db_session.commit()
+
+    response = async_client.post(f"/api/evaluation-runs/{run['id']}:resume")
+
+    assert response.status_code == 200
+    assert response.json() == {"run_id": run["id"], "requeued": 3}
+    assert released == [True]
+    file_db_session.expire_all()
+    rows = [file_db_session.get(Evaluation, evaluation_id) for evaluation_id in ids]
+    assert [row.status for row in rows] == ["completed", "failed", "pending", "pending", "pending"]
+    assert [row.dispatched_at is None for row in rows] == [False, False, True, True, True]
+    assert file_db_session.get(EvaluationRun, uuid.UUID(run["id"])).resumed_at is not None
+
+    # Re-enqueued evaluations finish and complete the run
+    for evaluation_id in ids[2:]:
+        worker_module.evaluate.delay(str(evaluation_id))
+    progress = async_client.get(f"/api/evaluation-runs/{run['id']}").json()
+    assert (progress["completed"], progress["failed"], progress["pending"]) == (4, 1, 0)
+
+    assert async_client.post(f"/api/evaluation-runs/{run['id']}:resume").json()["requeued"] == 0
+    assert released == [True]
+
+
+def test_resume_completes_followers_of_finished_leaders(async_client, file_db_session, criteria, released):
+    run = create_run(async_client)
+    run_id = uuid.UUID(run["id"])
+    leader = Evaluation(
+        criteria_id=criteria.id, status="completed", agent_prompt="p", results=VERDICT,
+        completed_at=datetime.datetime.utcnow(),
+    )
+    file_db_session.add(leader)
+    file_db_session.flush()
+    waiting_leader = Evaluation(criteria_id=criteria.id, status="running", agent_prompt="q")
+    file_db_session.add(waiting_leader)
+    file_db_session.flush()
+    followers = [
+        Evaluation(criteria_id=criteria.id, agent_prompt="p", duplicate_of=leader.id, run_id=run_id),
+        Evaluation(criteria_id=criteria.id, agent_prompt="q", duplicate_of=waiting_leader.id, run_id=run_id),
+    ]
+    file_db_session.add_all(followers)
+    file_db_session.get(EvaluationRun, run_id).total = 2
+    file_db_session.commit()
+    follower_ids = [follower.id for follower in followers]
+
+    assert async_client.post(f"/api/evaluation-runs/{run['id']}:resume").json()["requeued"] == 1
+
+    file_db_session.expire_all()
+    finished, detached = (file_db_session.get(Evaluation, evaluation_id) for evaluation_id in follower_ids)
+    assert (finished.status, finished.results) == ("completed", VERDICT)
+    # The other follower is judged on its own rather than waiting on a leader that may be lost
+    assert (detached.status, detached.duplicate_of, detached.dispatched_at) == ("pending", None, None)
+    progress = async_client.get(f"/api/evaluation-runs/{run['id']}").json()
+    assert (progress["completed"], progress["pending"]) == (1, 1)
@@ -0,0 +1,116 @@
+"""Tests for the evaluation status endpoints and their ETags."""
+
+import datetime
+import uuid
+
+import pytest
+
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.models import Agent, Evaluation, EvaluationCriteria
+from aieb_evaluation_svc.services.evaluation_query import etag_matches
+from aieb_evaluation_svc.worker import celery_app
+from aieb_evaluation_svc.worker.celery_app import celery_config
+
+
+@pytest.fixture
+def evaluations(file_db_session):
+    agent = Agent(name=f"status-{uuid.uuid4()}")
+    file_db_session.add(agent)
+    file_db_session.flush()
+    criteria = EvaluationCriteria(agent_id=agent.id, version=1, criteria_content="Be correct.")
+    file_db_session.add(criteria)
+    file_db_session.flush()
+    rows = [
+        Evaluation(criteria_id=criteria.id, status="running", agent_prompt=f"p{i}", agent_output="o")
+        for i in range(3)
+    ]
+    file_db_session.add_all(rows)
+    file_db_session.commit()
+    return rows
+
+
+def complete(session, evaluation):
+    evaluation.status = "completed"
+    evaluation.results = {"scores": {"accuracy": 1.0}}
+    evaluation.completed_at = datetime.datetime(2026, 1, 1)
+    session.commit()
+
+
+def test_get_evaluation_revalidates_with_etag(async_client, file_db_session, evaluations):
+    evaluation = evaluations[0]
+    url = f"/api/evaluations/{evaluation.id}"
+
+    response = async_client.get(url)
+    assert response.status_code == 200
+    assert response.json()["status"] == "running"
+    etag = response.headers["ETag"]
+
+    unchanged = async_client.get(url, headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.headers["ETag"] == etag
+
+    complete(file_db_session, evaluation)
+    changed = async_client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["results"] == {"scores": {"accuracy": 1.0}}
+    assert changed.headers["ETag"] != etag
+
+
+def test_get_unknown_evaluation(async_client):
+    assert async_client.get(f"/api/evaluations/{uuid.uuid4()}").status_code == 404
+
+
+def test_bulk_status_lookup(async_client, file_db_session, evaluations):
+    unknown = uuid.uuid4()
+    ids = [str(evaluations[2].id), str(unknown), str(evaluations[0].id), str(evaluations[2].id)]
+
+    response = async_client.post("/api/evaluations:status", json={"ids": ids})
+    assert response.status_code == 200
+    data = response.json()
+    # Request order, without repeats
+    assert [item["id"] for item in data["items"]] == [ids[0], ids[2]]
+    assert data["missing"] == [str(unknown)]
+    assert data["items"][0]["results"] is None
+    etag = response.headers["ETag"]
+
+    assert async_client.post(
+        "/api/evaluations:status", json={"ids": ids}, headers={"If-None-Match": f'"other", W/{etag}'}
+    ).status_code == 304
+    # Results change the representation, so they get their own ETag
+    with_results = async_client.post(
+        "/api/evaluations:status", json={"ids": ids, "include_results": True}, headers={"If-None-Match": etag}
+    )
+    assert with_results.status_code == 200
+
+    complete(file_db_session, evaluations[0])
+    response = async_client.post("/api/evaluations:status", json={"ids": ids}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [item["status"] for item in response.json()["items"]] == ["running", "completed"]
+
+
+def test_bulk_status_limit(async_client, monkeypatch):
+    monkeypatch.setattr(settings, "EVALUATION_STATUS_MAX_IDS", 2)
+    ids = [str(uuid.uuid4()) for _ in range(3)]
+
+    assert async_client.post("/api/evaluations:status", json={"ids": ids}).status_code == 413
+    assert async_client.post("/api/evaluations:status", json={"ids": []}).status_code == 422
+
+
+def test_etag_matches():
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches('W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+
+def test_task_results_are_ignored_and_expire(monkeypatch):
+    monkeypatch.setattr(settings, "CELERY_RESULT_BACKEND_URL", "redis://results:6379/1")
+    monkeypatch.setattr(settings, "CELERY_RESULT_EXPIRES_SECONDS", 600)
+
+    config = celery_config()
+
+    assert config["result_backend"] == "redis://results:6379/1"
+    assert config["task_ignore_result"] is True
+    assert config["result_expires"] == 600
+    assert celery_app.tasks["aieb_evaluation_svc.evaluate"].ignore_result is True
@@ -0,0 +1,48 @@
+"""Import-time budget for the API and worker entry points."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Generous enough for a cold CI runner; a regression that connects or reads
+# settings at import usually fails the resource checks below first
+IMPORT_BUDGET_SECONDS = 3.0
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+from aieb_evaluation_svc.core import config
+from aieb_evaluation_svc.models import base
+worker = sys.modules["aieb_evaluation_svc.worker.celery_app"]
+print(json.dumps({{
+    "elapsed": elapsed,
+    "settings_loaded": config._settings is not None,
+    "engines": [base._engine is not None, base._async_engine is not None],
+    "celery_configured": worker.celery_app.configured,
+}}))
+"""
+
+
+@pytest.mark.parametrize("module", ["aieb_evaluation_svc.app", "aieb_evaluation_svc.worker.celery_app"])
+def test_import_is_fast_and_creates_no_resources(module):
+    # No OPENAI_* variables: importing must not read settings at all
+    env = {key: value for key, value in os.environ.items() if not key.startswith("OPENAI_")}
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [src, env.get("PYTHONPATH")]))
+
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module)],
+        env=env, capture_output=True, text=True, timeout=60,
+    )
+
+    assert result.returncode == 0, result.stderr
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    assert probe["settings_loaded"] is False
+    assert probe["engines"] == [False, False]
+    assert probe["celery_configured"] is False
+    assert probe["elapsed"] < IMPORT_BUDGET_SECONDS
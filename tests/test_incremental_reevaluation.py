@@ -0,0 +1,242 @@
+"""Tests for re-evaluating outputs against a new criteria version, item by changed item."""
+
+import importlib
+import threading
+import uuid
+
+import pytest
+
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.models import Agent, Evaluation, EvaluationCriteria, EvaluationRun
+from aieb_evaluation_svc.services.evaluation_service import load_previous_version, reevaluate_previous_version
+from aieb_evaluation_svc.services.criteria_cache import CachedCriteria
+from aieb_evaluation_svc.services.rubric import carry_verdicts, split_rubric, unchanged_items
+from aieb_evaluation_svc.worker import celery_app
+
+worker_module = importlib.import_module("aieb_evaluation_svc.worker.celery_app")
+rubric_module = importlib.import_module("aieb_evaluation_svc.worker.rubric")
+reevaluation_module = importlib.import_module("aieb_evaluation_svc.worker.reevaluation")
+
+V1 = """Judge the answer to a customer support question.
+
+## Accuracy
+The answer is factually correct.
+
+## Tone
+The answer is polite.
+
+## Brevity
+The answer is short.
+"""
+
+# Tone reworded, Safety added, Brevity moved first
+V2 = """Judge the answer to a customer support question.
+
+## Brevity
+The answer is short.
+
+## Accuracy
+The answer is factually correct.
+
+## Tone
+The answer is polite and warm.
+
+## Safety
+The answer gives no harmful advice.
+"""
+
+
+def verdict(title, score):
+    return {"scores": {title.lower(): score}, "rationale": title, "model": "stub"}
+
+
+def v1_results(score):
+    return {
+        "scores": {"accuracy": score, "tone": score, "brevity": score},
+        "rationale": "",
+        "model": "stub",
+        "items": {key: verdict(key, score) for key in ("accuracy", "tone", "brevity")},
+    }
+
+
+def test_unchanged_items_match_on_text():
+    v1, v2 = split_rubric(V1), split_rubric(V2)
+
+    assert unchanged_items(v1, v2) == {"brevity": "brevity", "accuracy": "accuracy"}
+    # The preamble is part of every item's judge input
+    assert unchanged_items(v1, split_rubric(V2.replace("customer support", "sales"))) == {}
+    assert carry_verdicts({"accuracy": "accuracy"}, v1_results(0.5)) == {"accuracy": verdict("accuracy", 0.5)}
+    assert carry_verdicts({"accuracy": "accuracy"}, {"error": "judge failed"}) == {}
+
+
+@pytest.fixture
+def versions(file_db_session):
+    """Versions 1 and 2 of an agent's criteria, with three finished evaluations of version 1."""
+    agent = Agent(name=f"reevaluation-{uuid.uuid4()}")
+    file_db_session.add(agent)
+    file_db_session.flush()
+    v1 = EvaluationCriteria(agent_id=agent.id, version=1, criteria_content=V1)
+    v2 = EvaluationCriteria(agent_id=agent.id, version=2, criteria_content=V2)
+    file_db_session.add_all([v1, v2])
+    file_db_session.flush()
+    file_db_session.add_all([
+        Evaluation(
+            criteria_id=v1.id, status="completed", agent_prompt="p0", agent_output="o0", results=v1_results(0.25)
+        ),
+        Evaluation(criteria_id=v1.id, status="failed", agent_prompt="p1", agent_output="o1", results={"error": "x"}),
+        # Not finished, so not re-evaluated
+        Evaluation(criteria_id=v1.id, status="pending", agent_prompt="p2", agent_output="o2"),
+    ])
+    file_db_session.commit()
+    return v1, v2
+
+
+@pytest.fixture
+def eager(monkeypatch, file_session_local):
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+    monkeypatch.setattr(settings, "JUDGE_CACHE_ENABLED", False)
+    monkeypatch.setattr(worker_module, "SessionLocal", file_session_local)
+    monkeypatch.setattr(rubric_module, "SessionLocal", file_session_local)
+
+
+def item_judge(monkeypatch):
+    """Replace the item judge with one scoring 1.0 and recording the judged headings."""
+    calls = []
+    lock = threading.Lock()
+
+    def fake_judge(criteria_content, agent_prompt, agent_output):
+        title = criteria_content.split("## ")[1].split("\n")[0]
+        with lock:
+            calls.append((agent_prompt, title))
+        return verdict(title, 1.0)
+
+    monkeypatch.setattr(rubric_module, "judge", fake_judge)
+    return calls
+
+
+def new_evaluations(session, criteria):
+    session.expire_all()
+    return {
+        evaluation.agent_prompt: evaluation
+        for evaluation in session.query(Evaluation).filter(Evaluation.criteria_id == criteria.id)
+    }
+
+
+def test_only_changed_items_are_judged(eager, file_db_session, versions, monkeypatch):
+    v1, v2 = versions
+    calls = item_judge(monkeypatch)
+
+    counts = reevaluate_previous_version(file_db_session, v2.id, batch_size=1)
+
+    assert counts == {"evaluations": 2, "completed": 0, "carried": 2, "judged": 6}
+    created = new_evaluations(file_db_session, v2)
+    assert sorted(created) == ["p0", "p1"]
+    assert created["p0"].carried_items == {"brevity": verdict("brevity", 0.25), "accuracy": verdict("accuracy", 0.25)}
+    # A failed evaluation has no verdicts to carry
+    assert created["p1"].carried_items is None
+    assert all(evaluation.dispatched_at is None for evaluation in created.values())
+
+    for evaluation in created.values():
+        worker_module.evaluate.delay(str(evaluation.id))
+
+    assert sorted(calls) == [
+        ("p0", "Safety"), ("p0", "Tone"),
+        ("p1", "Accuracy"), ("p1", "Brevity"), ("p1", "Safety"), ("p1", "Tone"),
+    ]
+    results = new_evaluations(file_db_session, v2)["p0"].results
+    assert results["scores"] == {"brevity": 0.25, "accuracy": 0.25, "tone": 1.0, "safety": 1.0}
+
+    # Already re-evaluated outputs are skipped
+    assert reevaluate_previous_version(file_db_session, v2.id)["evaluations"] == 0
+
+
+def test_unchanged_rubric_completes_without_judge(file_db_session, versions, status_events):
+    v1, _ = versions
+    # Items moved around but not reworded
+    accuracy = "## Accuracy\nThe answer is factually correct.\n"
+    content = V1.replace(accuracy + "\n", "") + "\n" + accuracy
+    reordered = EvaluationCriteria(agent_id=v1.agent_id, version=2, criteria_content=content)
+    file_db_session.query(EvaluationCriteria).filter(EvaluationCriteria.version == 2).delete()
+    file_db_session.add(reordered)
+    file_db_session.commit()
+    run = EvaluationRun(name="rerun")
+    file_db_session.add(run)
+    file_db_session.commit()
+
+    counts = reevaluate_previous_version(file_db_session, reordered.id, run_id=run.id)
+
+    assert counts == {"evaluations": 2, "completed": 1, "carried": 3, "judged": 3}
+    evaluation = new_evaluations(file_db_session, reordered)["p0"]
+    assert evaluation.status == "completed"
+    assert evaluation.results["scores"] == {"tone": 0.25, "brevity": 0.25, "accuracy": 0.25}
+    assert evaluation.results["items"]["accuracy"] == verdict("accuracy", 0.25)
+    file_db_session.refresh(run)
+    assert (run.total, run.completed) == (2, 1)
+    assert sorted(event.status for event in status_events) == ["completed", "pending"]
+
+
+def test_previous_version_skips_version_gaps(file_db_session, versions):
+    v1, v2 = versions
+    # Version 3 was never created
+    v4 = EvaluationCriteria(agent_id=v1.agent_id, version=4, criteria_content=V2 + "\n## Sources\nCites a source.\n")
+    file_db_session.add(v4)
+    file_db_session.commit()
+
+    assert load_previous_version(file_db_session, CachedCriteria.from_row(v4)).id == v2.id
+    assert load_previous_version(file_db_session, CachedCriteria.from_row(v1)) is None
+
+
+def test_evaluate_batch_skips_carried_items(eager, file_db_session, versions, monkeypatch):
+    _, v2 = versions
+    reevaluate_previous_version(file_db_session, v2.id)
+    evaluation = new_evaluations(file_db_session, v2)["p0"]
+    requests = []
+
+    class FakeExecutor:
+        def judge_many(self, batch):
+            titles = [criteria.split("## ")[1].split("\n")[0] for criteria, _, _ in batch]
+            requests.append(titles)
+            return [verdict(title, 0.75) for title in titles]
+
+    monkeypatch.setattr(worker_module, "get_async_executor", FakeExecutor)
+
+    assert worker_module.evaluate_batch.delay([str(evaluation.id)]).get() == {str(evaluation.id): "completed"}
+    assert requests == [["Tone", "Safety"]]
+    results = new_evaluations(file_db_session, v2)["p0"].results
+    assert results["scores"] == {"brevity": 0.25, "accuracy": 0.25, "tone": 0.75, "safety": 0.75}
+
+
+def test_reevaluate_endpoint(async_client, file_db_session, file_session_local, versions, monkeypatch):
+    v1, v2 = versions
+    from aieb_evaluation_svc.api import evaluation_runs as module
+
+    dispatched = []
+
+    def fake_delay(criteria_id, run_id):
+        dispatched.append((criteria_id, run_id))
+        return type("FakeAsyncResult", (), {"id": "task-1"})()
+
+    monkeypatch.setattr(module.reevaluate_criteria_task, "delay", fake_delay)
+
+    response = async_client.post(f"/api/evaluation-criteria/{v2.id}:reevaluate")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["task_id"] == "task-1"
+    assert data["previous_criteria_id"] == str(v1.id)
+    assert data["changed_items"] == ["tone", "safety"]
+    assert data["unchanged_items"] == ["brevity", "accuracy"]
+    assert dispatched == [(str(v2.id), data["run_id"])]
+
+    # The task fills the run and releases its evaluations from the bulk backlog
+    released = []
+    monkeypatch.setattr(reevaluation_module, "SessionLocal", file_session_local)
+    monkeypatch.setattr(reevaluation_module, "release_bulk_backlog", lambda session: released.append(True))
+    counts = reevaluation_module.reevaluate_criteria_task(*dispatched[0])
+    assert counts["evaluations"] == 2
+    assert released == [True]
+    progress = async_client.get(f"/api/evaluation-runs/{data['run_id']}").json()
+    assert (progress["total"], progress["pending"]) == (2, 2)
+
+    assert async_client.post(f"/api/evaluation-criteria/{v1.id}:reevaluate").status_code == 422
+    assert async_client.post(f"/api/evaluation-criteria/{uuid.uuid4()}:reevaluate").status_code == 404
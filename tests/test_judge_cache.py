@@ -0,0 +1,199 @@
+"""Tests for the content-addressed judge result cache."""
+
+import importlib
+import uuid
+
+import pytest
+import redis
+
+from aieb_evaluation_svc.models import Agent, Evaluation, EvaluationCriteria
+from aieb_evaluation_svc.services.judge_cache import (
+    JudgeResultCache,
+    LRUCache,
+    REDIS_KEY_PREFIX,
+    criteria_digest,
+    judge_cache_key,
+)
+from aieb_evaluation_svc.worker import celery_app
+
+worker_module = importlib.import_module("aieb_evaluation_svc.worker.celery_app")
+
+VERDICT = {"scores": {"accuracy": 1.0}, "rationale": "ok", "model": "stub"}
+
+
+class DummyGroup:
+    """Mock Celery GroupResult for testing."""
+    id = "group-123"
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the redis-py commands the cache uses."""
+    def __init__(self):
+        self.data = {}
+        self.expiries = {}
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value.encode()
+        self.expiries[key] = ex
+
+    def execute(self):
+        return []
+
+
+class BrokenRedis:
+    """Redis client whose every command fails."""
+    def mget(self, keys):
+        raise redis.ConnectionError("down")
+
+    def pipeline(self, transaction=True):
+        raise redis.ConnectionError("down")
+
+
+def test_cache_key_covers_every_input():
+    digest = criteria_digest("criteria")
+    base = judge_cache_key(digest, "prompt", "output", "model", {"temperature": 0})
+
+    assert base == judge_cache_key(digest, "prompt", "output", "model", {"temperature": 0})
+    assert base != judge_cache_key(criteria_digest("criteria v2"), "prompt", "output", "model", {"temperature": 0})
+    assert base != judge_cache_key(digest, "prompt2", "output", "model", {"temperature": 0})
+    assert base != judge_cache_key(digest, "prompt", "output2", "model", {"temperature": 0})
+    assert base != judge_cache_key(digest, "prompt", "output", "model2", {"temperature": 0})
+    assert base != judge_cache_key(digest, "prompt", "output", "model", {"temperature": 1})
+
+
+def test_lru_evicts_least_recently_used():
+    lru = LRUCache(2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.get("a")
+    lru.set("c", 3)
+
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+    assert lru.get("c") == 3
+    assert lru.evictions == 1
+
+
+def test_redis_tier_fills_local_tier():
+    fake_redis = FakeRedis()
+    writer = JudgeResultCache(maxsize=10, ttl_seconds=30, redis_client=fake_redis)
+    writer.set("key", VERDICT)
+    assert fake_redis.expiries[REDIS_KEY_PREFIX + "key"] == 30
+
+    reader = JudgeResultCache(maxsize=10, ttl_seconds=30, redis_client=fake_redis)
+    assert reader.get_many(["key", "other"]) == [VERDICT, None]
+    assert reader.get("key") == VERDICT
+
+    assert reader.stats() == {
+        "local_hits": 1,
+        "redis_hits": 1,
+        "misses": 1,
+        "evictions": 0,
+        "local_size": 1,
+        "local_maxsize": 10,
+    }
+
+
+def test_redis_errors_are_misses():
+    cache = JudgeResultCache(maxsize=10, ttl_seconds=30, redis_client=BrokenRedis())
+    cache.set("key", VERDICT)
+
+    assert cache.get("key") == VERDICT
+    assert cache.get("missing") is None
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.fixture
+def criteria(file_db_session):
+    agent = Agent(name=f"test-agent-{uuid.uuid4()}")
+    file_db_session.add(agent)
+    file_db_session.commit()
+    criteria = EvaluationCriteria(agent_id=agent.id, version=1, criteria_content="Be correct.")
+    file_db_session.add(criteria)
+    file_db_session.commit()
+    return criteria
+
+
+def test_batch_submission_serves_hits_without_dispatch(async_client, file_db_session, criteria, judge_cache, monkeypatch):
+    from aieb_evaluation_svc.api import evaluations as module
+
+    dispatched = []
+    monkeypatch.setattr(module, "dispatch_evaluations", lambda ids, batch_id=None: dispatched.append(list(ids)) or DummyGroup())
+
+    judge_cache.set(judge_cache_key(criteria_digest("Be correct."), "cached", "out"), VERDICT)
+    items = [
+        {"criteria_id": str(criteria.id), "agent_prompt": "cached", "agent_output": "out"},
+        {"criteria_id": str(criteria.id), "agent_prompt": "fresh", "agent_output": "out"},
+    ]
+
+    response = async_client.post("/api/evaluations:batch", json={"items": items})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["cached"] == 1
+    cached_id, fresh_id = data["evaluation_ids"]
+    assert [str(i) for i in dispatched[0]] == [fresh_id]
+
+    cached_row = file_db_session.get(Evaluation, uuid.UUID(cached_id))
+    assert cached_row.status == "completed"
+    assert cached_row.results == VERDICT
+    assert cached_row.completed_at is not None
+
+
+def test_batch_submission_all_cached_skips_broker(async_client, criteria, judge_cache, monkeypatch):
+    from aieb_evaluation_svc.api import evaluations as module
+
+    def fail_dispatch(ids, batch_id=None):
+        raise AssertionError("broker must not be used")
+
+    monkeypatch.setattr(module, "dispatch_evaluations", fail_dispatch)
+    judge_cache.set(judge_cache_key(criteria_digest("Be correct."), "cached", None), VERDICT)
+
+    response = async_client.post(
+        "/api/evaluations:batch",
+        json={"items": [{"criteria_id": str(criteria.id), "agent_prompt": "cached"}]},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["group_id"] is None
+
+
+def test_evaluate_task_uses_and_fills_cache(file_db_session, file_session_local, criteria, judge_cache, monkeypatch):
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+    monkeypatch.setattr(worker_module, "SessionLocal", file_session_local)
+
+    calls = []
+
+    def fake_judge(criteria_content, agent_prompt, agent_output):
+        calls.append(agent_prompt)
+        return VERDICT
+
+    monkeypatch.setattr(worker_module, "judge", fake_judge)
+
+    first = Evaluation(criteria_id=criteria.id, agent_prompt="p", agent_output="o")
+    second = Evaluation(criteria_id=criteria.id, agent_prompt="p", agent_output="o")
+    file_db_session.add_all([first, second])
+    file_db_session.commit()
+
+    worker_module.evaluate.delay(str(first.id))
+    worker_module.evaluate.delay(str(second.id))
+
+    assert calls == ["p"]
+    file_db_session.expire_all()
+    assert file_db_session.get(Evaluation, second.id).results == VERDICT
+    assert judge_cache.stats()["local_hits"] == 1
+
+
+def test_cache_stats_endpoint(async_client, judge_cache):
+    judge_cache.get("missing")
+
+    response = async_client.get("/api/admin/cache-stats")
+
+    assert response.status_code == 200
+    assert response.json()["judge_cache"]["misses"] == 1
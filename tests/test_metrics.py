@@ -0,0 +1,133 @@
+"""Tests for the Prometheus metrics surface."""
+
+import asyncio
+import importlib
+import json
+import time
+import types
+import uuid
+
+import httpx
+import pytest
+import redis
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+
+from aieb_evaluation_svc.api.metrics import get_metrics_registry
+from aieb_evaluation_svc.app import app
+from aieb_evaluation_svc.core.metrics import QueueDepthCollector, build_registry, observe_pools
+from aieb_evaluation_svc.services.judge import AsyncJudgeClient
+
+worker_module = importlib.import_module("aieb_evaluation_svc.worker.celery_app")
+
+
+class FakeBroker:
+    """Redis stand-in that answers pipelined LLEN calls from a dict of lists."""
+    def __init__(self, lengths=None, fail=False):
+        self.lengths = lengths or {}
+        self.fail = fail
+
+    def pipeline(self, transaction=True):
+        broker = self
+        calls = []
+
+        class Pipeline:
+            def llen(self, key):
+                calls.append(key)
+
+            def execute(self):
+                if broker.fail:
+                    raise redis.ConnectionError("broker down")
+                return [broker.lengths.get(key, 0) for key in calls]
+
+        return Pipeline()
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture
+def metrics_registry():
+    broker = FakeBroker({"celery": 3, "celery\x06\x169": 2})
+    registry = build_registry(QueueDepthCollector(broker, lambda: ["celery"]))
+    app.dependency_overrides[get_metrics_registry] = lambda: registry
+    yield registry
+    app.dependency_overrides.pop(get_metrics_registry, None)
+
+
+def test_metrics_endpoint_reports_requests_and_queue_depth(client, metrics_registry):
+    labels = {"method": "GET", "route": "/api/admin/cache-stats", "status": "200"}
+    before = sample("aieb_http_request_duration_seconds_count", **labels)
+
+    assert client.get("/api/admin/cache-stats").status_code == 200
+    assert client.get("/no-such-route").status_code == 404
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert sample("aieb_http_request_duration_seconds_count", **labels) == before + 1
+    assert sample(
+        "aieb_http_request_duration_seconds_count", method="GET", route="<unmatched>", status="404"
+    ) >= 1
+    assert 'aieb_celery_queue_depth{queue="celery"} 5.0' in response.text
+
+
+def test_observe_pools_reports_checked_out_connections(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+    with engine.connect():
+        observe_pools({"test": engine})
+        assert sample("aieb_db_pool_checked_out", engine="test") == 1
+    observe_pools({"test": engine})
+    assert sample("aieb_db_pool_checked_out", engine="test") == 0
+    engine.dispose()
+
+
+def test_queue_depth_is_skipped_when_broker_is_down():
+    collector = QueueDepthCollector(FakeBroker(fail=True), lambda: ["celery"])
+    (family,) = collector.collect()
+    assert family.samples == []
+
+
+def test_async_judge_records_latency_and_tokens():
+    def handler(request):
+        content = json.dumps({"scores": {"accuracy": 1.0}, "rationale": "ok"})
+        return httpx.Response(200, json={
+            "model": "stub",
+            "choices": [{"message": {"content": content}}],
+            "usage": {"prompt_tokens": 11, "completion_tokens": 4, "total_tokens": 15},
+        })
+
+    prompt_before = sample("aieb_judge_tokens_total", kind="prompt")
+    calls_before = sample("aieb_judge_request_duration_seconds_count", client="async", outcome="success")
+
+    async def run():
+        client = AsyncJudgeClient(transport=httpx.MockTransport(handler))
+        try:
+            await client.judge("criteria", "prompt", "output")
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+
+    assert sample("aieb_judge_tokens_total", kind="prompt") == prompt_before + 11
+    assert sample("aieb_judge_request_duration_seconds_count", client="async", outcome="success") == calls_before + 1
+
+
+def test_task_signals_record_queue_wait_and_run_time(monkeypatch):
+    monkeypatch.setattr(worker_module.celery_app.conf, "task_always_eager", True)
+    monkeypatch.setattr(worker_module.time, "sleep", lambda seconds: None)
+    task_name = worker_module.add.name
+    runs_before = sample("aieb_task_run_duration_seconds_count", task=task_name, state="SUCCESS")
+
+    assert worker_module.add.delay(1, 2).get() == 3
+    assert sample("aieb_task_run_duration_seconds_count", task=task_name, state="SUCCESS") == runs_before + 1
+
+    # Eager tasks skip the broker, so simulate a delivered message
+    task = types.SimpleNamespace(name="queued", request=types.SimpleNamespace(published_at=time.time() - 2, eta=None))
+    worker_module._start_task_timer(str(uuid.uuid4()), task)
+    assert sample("aieb_task_queue_wait_seconds_sum", task="queued") >= 2
+
+    headers = {}
+    worker_module._stamp_publish_time(headers=headers)
+    assert headers["published_at"] == pytest.approx(time.time(), abs=5)
@@ -0,0 +1,95 @@
+"""Tests that the Alembic migrations run on SQLite, the default database."""
+
+import datetime
+import json
+import os
+import uuid
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, text
+
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.models.compression import decode_payload
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def migration_db(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'migrations.db'}"
+    monkeypatch.setattr(settings, "DATABASE_URL", url)
+    # Built without alembic.ini so the test's logging configuration is left alone
+    config = Config()
+    config.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    engine = create_engine(url)
+    yield config, engine
+    engine.dispose()
+
+
+def test_upgrade_and_downgrade_on_sqlite(migration_db):
+    config, engine = migration_db
+
+    command.upgrade(config, "head")
+
+    columns = {column["name"] for column in inspect(engine).get_columns("evaluation")}
+    assert {"run_id", "duplicate_of", "carried_from", "carried_items"} <= columns
+    foreign_keys = inspect(engine).get_foreign_keys("evaluation")
+    assert "evaluation_run" in {foreign_key["referred_table"] for foreign_key in foreign_keys}
+
+    command.downgrade(config, "base")
+
+    assert set(inspect(engine).get_table_names()) == {"alembic_version"}
+
+
+def test_payload_compression_round_trip(migration_db):
+    config, engine = migration_db
+    command.upgrade(config, "9a4f2c6e1b73")
+    now = datetime.datetime(2026, 1, 1)
+    agent_id, criteria_id, evaluation_id = (uuid.uuid4().hex for _ in range(3))
+    long_output = "The refund is accepted. " * 40
+    with engine.begin() as connection:
+        connection.execute(
+            text("INSERT INTO agent (id, name, created_at) VALUES (:id, 'a', :now)"), {"id": agent_id, "now": now}
+        )
+        connection.execute(
+            text(
+                "INSERT INTO evaluation_criteria (id, agent_id, version, criteria_content, created_at)"
+                " VALUES (:id, :agent_id, 1, 'c', :now)"
+            ),
+            {"id": criteria_id, "agent_id": agent_id, "now": now},
+        )
+        connection.execute(
+            text(
+                "INSERT INTO evaluation (id, criteria_id, status, agent_prompt, agent_output, results, created_at)"
+                " VALUES (:id, :criteria_id, 'completed', 'p', :output, :results, :now)"
+            ),
+            {
+                "id": evaluation_id,
+                "criteria_id": criteria_id,
+                "output": long_output,
+                "results": json.dumps({"scores": {"accuracy": 1.0}}),
+                "now": now,
+            },
+        )
+
+    command.upgrade(config, "c3d8e5f0a217")
+
+    with engine.connect() as connection:
+        prompt, output, results = connection.execute(
+            text("SELECT agent_prompt, agent_output, results FROM evaluation")
+        ).one()
+    # Readable by the models' codec; the long output is compressed
+    assert decode_payload(prompt) == b"p"
+    assert output[0] == 1
+    assert decode_payload(output).decode() == long_output
+    assert json.loads(decode_payload(results)) == {"scores": {"accuracy": 1.0}}
+
+    command.downgrade(config, "9a4f2c6e1b73")
+
+    with engine.connect() as connection:
+        row = connection.execute(text("SELECT agent_prompt, agent_output, results FROM evaluation")).one()
+    assert (row.agent_prompt, row.agent_output, json.loads(row.results)) == (
+        "p", long_output, {"scores": {"accuracy": 1.0}},
+    )
@@ -0,0 +1,155 @@
+"""Tests for the judge rate limiter and adaptive concurrency."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.services.judge import AsyncJudgeClient, judge
+from aieb_evaluation_svc.services.rate_limit import (
+    AdaptiveConcurrency,
+    RateLimitTimeout,
+    TokenBucketLimiter,
+    set_judge_concurrency,
+    set_judge_rate_limiter,
+    take_budget,
+)
+from benchmarks.stub_judge import StubJudgeServer
+
+
+def test_take_budget_limits_requests_and_tokens():
+    state = {}
+    assert take_budget(state, 0.0, rpm=2, tpm=100, cost=40) == 0
+    assert take_budget(state, 0.0, rpm=2, tpm=100, cost=40) == 0
+    # Out of requests: one refills after half a minute
+    assert take_budget(state, 0.0, rpm=2, tpm=100, cost=10) == pytest.approx(30.0)
+    assert take_budget(state, 30.0, rpm=2, tpm=100, cost=40) == 0
+    # 30 tokens left plus 50 refilled: the missing 20 take another 12 seconds
+    assert take_budget(state, 60.0, rpm=2, tpm=100, cost=100) == pytest.approx(12.0)
+    assert take_budget({}, 0.0, rpm=0, tpm=0, cost=10 ** 6) == 0
+
+
+def test_limiter_reconcile_and_penalize():
+    limiter = TokenBucketLimiter(rpm=0, tpm=100, max_wait_seconds=0.5, key="test")
+    assert limiter.try_acquire(60) == 0
+    # The request used fewer tokens than estimated: the rest is refunded
+    limiter.reconcile(60, 20)
+    assert limiter.try_acquire(80) == 0
+
+    limiter.penalize(30)
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(1)
+
+
+def test_adaptive_concurrency_aimd():
+    concurrency = AdaptiveConcurrency(initial=4, minimum=1, maximum=8, latency_tolerance=1.5)
+    for _ in range(4):
+        concurrency.on_success(0.1)
+    assert concurrency.limit == pytest.approx(5.0, abs=0.1)
+
+    concurrency.on_overload()
+    assert concurrency.limit == pytest.approx(2.5, abs=0.1)
+    # Further throttling within the same round trip counts once
+    concurrency.on_overload()
+    assert concurrency.limit == pytest.approx(2.5, abs=0.1)
+
+    time.sleep(0.6)
+    # A round trip far above the usual latency is congestion too
+    concurrency.on_success(0.5)
+    assert concurrency.limit == pytest.approx(1.25, abs=0.1)
+    time.sleep(0.25)
+    concurrency.on_overload()
+    assert concurrency.limit == 1
+
+
+def test_adaptive_concurrency_bounds_threads_and_tasks():
+    concurrency = AdaptiveConcurrency(initial=3, minimum=1, maximum=3, latency_tolerance=2.0)
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+
+    def enter():
+        with lock:
+            in_flight.append(1)
+            peak.append(len(in_flight))
+
+    def leave():
+        with lock:
+            in_flight.pop()
+
+    def blocking_call(_):
+        with concurrency:
+            enter()
+            time.sleep(0.01)
+            leave()
+
+    async def async_call():
+        async with concurrency:
+            enter()
+            await asyncio.sleep(0.01)
+            leave()
+
+    async def async_calls():
+        await asyncio.gather(*(async_call() for _ in range(10)))
+
+    with ThreadPoolExecutor(6) as pool:
+        calls = pool.map(blocking_call, range(10))
+        asyncio.run(async_calls())
+        list(calls)
+
+    assert max(peak) <= 3
+    assert concurrency.in_flight == 0
+
+
+@pytest.fixture
+def judge_server(monkeypatch):
+    servers = []
+
+    def start(**limits):
+        server = StubJudgeServer(latency=0.005, **limits).__enter__()
+        servers.append(server)
+        monkeypatch.setattr(settings, "OPENAI_BASE_URL", server.base_url)
+        return server
+
+    yield start
+    for server in servers:
+        server.__exit__(None, None, None)
+
+
+def test_shared_limiter_avoids_throttling(judge_server):
+    server = judge_server(rpm=10, period=1.0)
+    # Configured a little under the provider's limit, as in production
+    set_judge_rate_limiter(TokenBucketLimiter(rpm=8, tpm=0, max_wait_seconds=10, key="test", period_seconds=1.0))
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(4) as pool:
+        verdicts = list(pool.map(lambda i: judge("Be correct.", f"p{i}", "o"), range(20)))
+
+    assert len(verdicts) == 20
+    assert server.throttled == 0
+    # 8 at once, then 8 per second
+    assert time.monotonic() - start >= 1.4
+
+
+def test_throttled_requests_retry_and_shrink_concurrency(judge_server, monkeypatch):
+    server = judge_server(rpm=5, period=0.5)
+    concurrency = AdaptiveConcurrency(initial=8, minimum=1, maximum=8, latency_tolerance=10.0)
+    set_judge_concurrency(concurrency)
+    monkeypatch.setattr(settings, "JUDGE_THROTTLE_MAX_RETRIES", 20)
+
+    async def run():
+        client = AsyncJudgeClient(max_connections=16)
+        try:
+            return await asyncio.gather(*(client.judge("Be correct.", f"p{i}", "o") for i in range(15)))
+        finally:
+            await client.aclose()
+
+    verdicts = asyncio.run(run())
+
+    assert len(verdicts) == 15
+    assert server.served == 15
+    assert server.throttled > 0
+    assert concurrency.limit < 8
@@ -0,0 +1,200 @@
+"""Tests for rubric splitting and the per-item judge fan-out."""
+
+import importlib
+import threading
+import uuid
+
+import pytest
+
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.models import Agent, Evaluation, EvaluationCriteria
+from aieb_evaluation_svc.services.rubric import RubricItem, aggregate_rubric, split_rubric
+from aieb_evaluation_svc.services.single_flight import InFlightRegistry, set_in_flight_registry
+from aieb_evaluation_svc.worker import celery_app
+
+worker_module = importlib.import_module("aieb_evaluation_svc.worker.celery_app")
+rubric_module = importlib.import_module("aieb_evaluation_svc.worker.rubric")
+
+RUBRIC = """Judge the answer to a customer support question.
+
+## Accuracy
+The answer is factually correct.
+
+## Tone
+The answer is polite.
+
+## Brevity
+The answer is short.
+"""
+
+
+def test_split_rubric_on_headings():
+    items = split_rubric(RUBRIC)
+
+    assert [item.key for item in items] == ["accuracy", "tone", "brevity"]
+    assert [item.title for item in items] == ["Accuracy", "Tone", "Brevity"]
+    # The preamble is shared context for every item
+    assert items[1].text == "Judge the answer to a customer support question.\n\n## Tone\nThe answer is polite."
+
+
+def test_split_rubric_on_list_items():
+    items = split_rubric("Score each point.\n- Correct facts\n  with sources\n- Correct facts\n1. No jargon")
+
+    assert [item.key for item in items] == ["correct_facts", "correct_facts_2", "no_jargon"]
+    assert items[0].text == "Score each point.\n\n- Correct facts\n  with sources"
+
+
+def test_split_rubric_single_item():
+    assert split_rubric("Be correct.") == (RubricItem("overall", "Overall", "Be correct."),)
+    assert split_rubric("## Only\nOne heading.")[0].key == "overall"
+
+
+def test_aggregate_rubric():
+    items = split_rubric(RUBRIC)
+    verdicts = [
+        {"scores": {"accuracy": 1.0, "sources": 0.5}, "rationale": "right", "model": "stub"},
+        {"scores": {"tone": 0.5}, "rationale": "fine", "model": "stub"},
+        {"scores": {}, "rationale": None, "model": "stub"},
+    ]
+
+    results = aggregate_rubric(items, verdicts)
+
+    assert results["scores"] == {"accuracy": 0.75, "tone": 0.5}
+    assert results["rationale"] == "Accuracy: right\n\nTone: fine\n\nBrevity: "
+    assert results["model"] == "stub"
+    assert results["items"]["tone"] == verdicts[1]
+
+
+@pytest.fixture
+def rubric_evaluation(file_db_session):
+    agent = Agent(name=f"rubric-{uuid.uuid4()}")
+    file_db_session.add(agent)
+    file_db_session.flush()
+    criteria = EvaluationCriteria(agent_id=agent.id, version=1, criteria_content=RUBRIC)
+    file_db_session.add(criteria)
+    file_db_session.flush()
+    evaluation = Evaluation(criteria_id=criteria.id, agent_prompt="p", agent_output="o")
+    file_db_session.add(evaluation)
+    file_db_session.commit()
+    return evaluation
+
+
+@pytest.fixture
+def eager(monkeypatch, file_session_local):
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+    monkeypatch.setattr(settings, "RUBRIC_ITEM_RETRY_BACKOFF_SECONDS", 0.0)
+    monkeypatch.setattr(worker_module, "SessionLocal", file_session_local)
+    monkeypatch.setattr(rubric_module, "SessionLocal", file_session_local)
+
+
+def item_judge(monkeypatch, failures):
+    """Replace the judge with one scoring each item by its heading, failing as told."""
+    calls = []
+    lock = threading.Lock()
+
+    def fake_judge(criteria_content, agent_prompt, agent_output):
+        title = criteria_content.split("## ")[1].split("\n")[0]
+        with lock:
+            calls.append(title)
+            if failures.get(title, 0) > 0:
+                failures[title] -= 1
+                raise RuntimeError(f"{title} timed out")
+        return {"scores": {title.lower(): 1.0}, "rationale": title, "model": "stub"}
+
+    monkeypatch.setattr(rubric_module, "judge", fake_judge)
+    monkeypatch.setattr(worker_module, "judge", lambda *args: pytest.fail("whole rubric judged"))
+    return calls
+
+
+def test_evaluate_fans_out_rubric_items(eager, file_db_session, rubric_evaluation, monkeypatch, status_events):
+    calls = item_judge(monkeypatch, {})
+
+    result = worker_module.evaluate.delay(str(rubric_evaluation.id)).get()
+
+    assert result == {"status": "running", "rubric_items": 3}
+    assert sorted(calls) == ["Accuracy", "Brevity", "Tone"]
+    file_db_session.expire_all()
+    evaluation = file_db_session.get(Evaluation, rubric_evaluation.id)
+    assert evaluation.status == "completed"
+    assert evaluation.results["scores"] == {"accuracy": 1.0, "tone": 1.0, "brevity": 1.0}
+    assert [event.status for event in status_events] == ["running", "completed"]
+
+
+def test_failed_rubric_item_is_retried_alone(eager, file_db_session, rubric_evaluation, monkeypatch):
+    calls = item_judge(monkeypatch, {"Tone": 2})
+
+    worker_module.evaluate.delay(str(rubric_evaluation.id))
+
+    assert sorted(calls) == ["Accuracy", "Brevity", "Tone", "Tone", "Tone"]
+    file_db_session.expire_all()
+    assert file_db_session.get(Evaluation, rubric_evaluation.id).status == "completed"
+
+
+def test_rubric_item_failing_every_attempt_fails_evaluation(
+    eager, file_db_session, rubric_evaluation, monkeypatch
+):
+    monkeypatch.setattr(settings, "RUBRIC_ITEM_MAX_RETRIES", 1)
+    calls = item_judge(monkeypatch, {"Brevity": 5})
+
+    worker_module.evaluate.delay(str(rubric_evaluation.id))
+
+    assert calls.count("Brevity") == 2
+    file_db_session.expire_all()
+    evaluation = file_db_session.get(Evaluation, rubric_evaluation.id)
+    assert evaluation.status == "failed"
+    assert evaluation.results == {"error": "Brevity: Brevity timed out"}
+
+
+def test_evaluate_batch_judges_rubric_items(eager, file_db_session, rubric_evaluation, monkeypatch):
+    failures = {"Accuracy": 1}
+    requests = []
+
+    class FakeExecutor:
+        def judge_many(self, batch):
+            requests.append([criteria.split("## ")[1].split("\n")[0] for criteria, _, _ in batch])
+            outcomes = []
+            for criteria, _, _ in batch:
+                title = criteria.split("## ")[1].split("\n")[0]
+                if failures.get(title):
+                    failures[title] -= 1
+                    outcomes.append(RuntimeError("boom"))
+                else:
+                    outcomes.append({"scores": {"score": 0.5}, "rationale": "ok", "model": "stub"})
+            return outcomes
+
+    monkeypatch.setattr(worker_module, "get_async_executor", FakeExecutor)
+
+    statuses = worker_module.evaluate_batch.delay([str(rubric_evaluation.id)]).get()
+
+    assert statuses == {str(rubric_evaluation.id): "completed"}
+    assert requests == [["Accuracy", "Tone", "Brevity"], ["Accuracy"]]
+    file_db_session.expire_all()
+    results = file_db_session.get(Evaluation, rubric_evaluation.id).results
+    assert results["scores"] == {"accuracy": 0.5, "tone": 0.5, "brevity": 0.5}
+
+
+def test_failed_fan_out_fails_evaluation_and_releases_claim(
+    eager, file_db_session, rubric_evaluation, monkeypatch, status_events
+):
+    released = []
+
+    class RecordingRegistry(InFlightRegistry):
+        def release_many(self, keys):
+            released.extend(keys)
+
+    set_in_flight_registry(RecordingRegistry(ttl_seconds=60))
+
+    def failing_fan_out(*args):
+        raise ConnectionError("broker unreachable")
+
+    monkeypatch.setattr(worker_module, "fan_out_rubric", failing_fan_out)
+
+    result = worker_module.evaluate.delay(str(rubric_evaluation.id))
+
+    assert result.failed()
+    file_db_session.expire_all()
+    evaluation = file_db_session.get(Evaluation, rubric_evaluation.id)
+    assert evaluation.status == "failed"
+    assert evaluation.results == {"error": "broker unreachable"}
+    assert len(released) == 1
+    assert [event.status for event in status_events] == ["running", "failed"]
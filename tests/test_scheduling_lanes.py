@@ -0,0 +1,204 @@
+"""Tests for the interactive/bulk lanes and per-agent fair-share release."""
+
+import base64
+import contextlib
+import importlib
+import json
+import threading
+import uuid
+
+import pytest
+from kombu import Connection
+from kombu.transport.memory import Channel
+
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.models import Agent, Evaluation, EvaluationCriteria
+from aieb_evaluation_svc.schemas.evaluation import EvaluationItem
+from aieb_evaluation_svc.services.evaluation_service import (
+    claim_bulk_backlog,
+    create_evaluations_bulk,
+    dispatch_evaluations,
+    release_bulk_backlog,
+    select_lane,
+)
+from aieb_evaluation_svc.worker import celery_app
+
+worker_module = importlib.import_module("aieb_evaluation_svc.worker.celery_app")
+bulk_lane_module = importlib.import_module("aieb_evaluation_svc.worker.bulk_lane")
+
+
+@pytest.fixture
+def agents(file_db_session):
+    criteria = []
+    for name in ("sweep", "other"):
+        agent = Agent(name=f"{name}-{uuid.uuid4()}")
+        file_db_session.add(agent)
+        file_db_session.flush()
+        criteria.append(EvaluationCriteria(agent_id=agent.id, version=1, criteria_content=f"{name} criteria"))
+    file_db_session.add_all(criteria)
+    file_db_session.commit()
+    return criteria
+
+
+def items(criteria, count, label):
+    return [
+        EvaluationItem(criteria_id=criteria.id, agent_prompt=f"{label} {i}", agent_output="output")
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def memory_broker(monkeypatch):
+    """Publish to kombu's in-memory transport and return its queues."""
+    connection = Connection("memory://")
+    Channel.queues.clear()
+    monkeypatch.setattr(
+        celery_app, "producer_or_acquire",
+        lambda producer=None: contextlib.nullcontext(producer or connection.Producer()),
+    )
+    # Keep results in memory too; the app caches its backend per thread
+    monkeypatch.setattr(celery_app.conf, "result_backend", "cache+memory://")
+    monkeypatch.setattr(celery_app, "_local", threading.local())
+    yield Channel.queues
+    Channel.queues.clear()
+    connection.release()
+
+
+def run_next(queues, queue_name):
+    """Execute the next message of a queue like a worker would; return its task args."""
+    queue = queues.get(queue_name)
+    if queue is None or queue.empty():
+        return None
+    message = queue.get_nowait()
+    body = message["body"]
+    if message["properties"].get("body_encoding") == "base64":
+        body = base64.b64decode(body)
+    args, kwargs, _ = json.loads(body)
+    headers = message["headers"]
+    celery_app.tasks[headers["task"]].apply(
+        args=args, kwargs=kwargs, headers={"lane": headers.get("lane")}, throw=True
+    )
+    return args
+
+
+def queue_size(queues, queue_name):
+    queue = queues.get(queue_name)
+    return 0 if queue is None else queue.qsize()
+
+
+def test_select_lane(monkeypatch):
+    monkeypatch.setattr(settings, "EVALUATION_INTERACTIVE_MAX_ITEMS", 10)
+    assert select_lane(10) == "interactive"
+    assert select_lane(11) == "bulk"
+    assert select_lane(1, "bulk") == "bulk"
+    assert select_lane(500, "interactive") == "interactive"
+
+
+def test_claim_bulk_backlog_is_fair_across_agents(file_db_session, agents):
+    sweep, other = agents
+    sweep_ids = create_evaluations_bulk(file_db_session, items(sweep, 50, "sweep"), lane="bulk")
+    other_ids = create_evaluations_bulk(file_db_session, items(other, 4, "other"), lane="bulk")
+    create_evaluations_bulk(file_db_session, items(other, 3, "interactive"))
+
+    claimed = [uuid.UUID(evaluation_id) for evaluation_id, _ in claim_bulk_backlog(file_db_session, 5)]
+
+    # The other agent already has 3 interactive evaluations in flight, leaving room for 2;
+    # agents alternate, the one with the oldest backlog first
+    owners = ["sweep" if evaluation_id in sweep_ids else "other" for evaluation_id in claimed]
+    assert owners == ["sweep", "other", "sweep", "other", "sweep", "sweep", "sweep"]
+    assert len(set(claimed)) == 7
+    assert claim_bulk_backlog(file_db_session, 5) == []
+
+    finished = file_db_session.get(Evaluation, claimed[0])
+    finished.status = 'completed'
+    file_db_session.commit()
+    (next_claim,) = claim_bulk_backlog(file_db_session, 5)
+    assert uuid.UUID(next_claim[0]) in set(sweep_ids) - set(claimed)
+
+
+def test_interactive_latency_bounded_during_bulk_sweep(
+    file_db_session, file_session_local, agents, memory_broker, monkeypatch
+):
+    sweep, other = agents
+    quota = 10
+    monkeypatch.setattr(settings, "BULK_MAX_IN_FLIGHT_PER_AGENT", quota)
+    monkeypatch.setattr(worker_module, "SessionLocal", file_session_local)
+    monkeypatch.setattr(bulk_lane_module, "SessionLocal", file_session_local)
+    monkeypatch.setattr(
+        worker_module, "judge", lambda content, prompt, output: {"scores": {"accuracy": 1.0}, "model": "stub"}
+    )
+    interactive, bulk = settings.CELERY_INTERACTIVE_QUEUE, settings.CELERY_BULK_QUEUE
+
+    sweep_ids = create_evaluations_bulk(file_db_session, items(sweep, 150, "sweep"), lane="bulk")
+    release_bulk_backlog(file_db_session)
+    assert queue_size(memory_broker, bulk) == quota
+
+    submitted_at = {}
+    finished_at = {}
+    other_ids = []
+    step = 0
+    turn = 0
+    while queue_size(memory_broker, interactive) or queue_size(memory_broker, bulk):
+        if step % 15 == 5 and step < 200:
+            # A single evaluation submitted while the sweep is running
+            (evaluation_id,) = create_evaluations_bulk(file_db_session, items(sweep, 1, f"single {step}"))
+            dispatch_evaluations([evaluation_id])
+            submitted_at[str(evaluation_id)] = step
+        if step == 20:
+            other_ids = create_evaluations_bulk(file_db_session, items(other, 5, "other"), lane="bulk")
+            release_bulk_backlog(file_db_session)
+
+        # A worker consuming both queues takes from them in turn
+        lanes = [interactive, bulk] if turn % 2 == 0 else [bulk, interactive]
+        args = run_next(memory_broker, lanes[0]) or run_next(memory_broker, lanes[1])
+        turn += 1
+        step += 1
+        finished_at[args[0]] = step
+        assert queue_size(memory_broker, bulk) <= 2 * quota
+        assert step < 1000
+
+    waits = [finished_at[evaluation_id] - submitted for evaluation_id, submitted in submitted_at.items()]
+    assert len(waits) >= 10
+    assert max(waits) <= 2
+
+    # The other agent's small bulk batch is not queued behind the whole sweep
+    assert max(finished_at[str(evaluation_id)] for evaluation_id in other_ids) - 20 <= 4 * quota
+    assert max(finished_at[str(evaluation_id)] for evaluation_id in sweep_ids) > 150
+
+    file_db_session.expire_all()
+    statuses = {evaluation.status for evaluation in file_db_session.query(Evaluation).all()}
+    assert statuses == {'completed'}
+
+
+def test_large_batch_goes_to_bulk_lane(async_client, file_db_session, agents, monkeypatch):
+    from aieb_evaluation_svc.api import evaluations as module
+
+    sweep, _ = agents
+    monkeypatch.setattr(settings, "EVALUATION_INTERACTIVE_MAX_ITEMS", 3)
+    dispatched = []
+    released = []
+
+    def fake_dispatch(evaluation_ids, batch_id=None):
+        dispatched.append(list(evaluation_ids))
+        return type("FakeGroupResult", (), {"id": "group-1"})()
+
+    monkeypatch.setattr(module, "dispatch_evaluations", fake_dispatch)
+    monkeypatch.setattr(
+        module, "release_bulk_backlog_task", type("FakeTask", (), {"delay": staticmethod(lambda: released.append(1))})
+    )
+    body = [{"criteria_id": str(sweep.id), "agent_prompt": f"p{i}"} for i in range(5)]
+
+    bulk = async_client.post("/api/evaluations:batch", json={"items": body})
+    assert bulk.status_code == 200
+    assert bulk.json()["lane"] == "bulk"
+    assert bulk.json()["group_id"] is None
+    assert (dispatched, released) == ([], [1])
+    rows = file_db_session.query(Evaluation).all()
+    assert {(row.dispatched_at, str(row.batch_id)) for row in rows} == {(None, bulk.json()["batch_id"])}
+
+    forced = async_client.post("/api/evaluations:batch", json={
+        "items": [{**item, "agent_prompt": f"forced {i}"} for i, item in enumerate(body)],
+        "lane": "interactive",
+    })
+    assert forced.json()["lane"] == "interactive"
+    assert len(dispatched) == 1
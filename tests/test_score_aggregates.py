@@ -0,0 +1,154 @@
+"""Tests for incrementally maintained score aggregates."""
+
+import importlib
+import uuid
+
+import numpy as np
+import pytest
+
+from aieb_evaluation_svc.models import Agent, Evaluation, EvaluationCriteria, ScoreAggregate
+from aieb_evaluation_svc.services.score_aggregates import (
+    extract_scores,
+    recompute_score_aggregates,
+    record_scores,
+    summarize_aggregates,
+)
+from aieb_evaluation_svc.services.score_sketch import QuantileSketch
+from aieb_evaluation_svc.worker import celery_app
+
+worker_module = importlib.import_module("aieb_evaluation_svc.worker.celery_app")
+
+
+def verdict(accuracy, style=None):
+    scores = {"accuracy": accuracy}
+    if style is not None:
+        scores["style"] = style
+    return {"scores": scores, "rationale": "ok", "model": "stub"}
+
+
+@pytest.fixture
+def agent_criteria(file_db_session):
+    agent = Agent(name=f"test-agent-{uuid.uuid4()}")
+    file_db_session.add(agent)
+    file_db_session.flush()
+    versions = [
+        EvaluationCriteria(agent_id=agent.id, version=version, criteria_content=f"v{version}")
+        for version in (1, 2)
+    ]
+    file_db_session.add_all(versions)
+    file_db_session.commit()
+    return agent, versions
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    values = np.random.default_rng(7).lognormal(mean=0.0, sigma=1.0, size=20000)
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    sketch.add_many(values)
+
+    for q in (0.5, 0.9, 0.95, 0.99):
+        exact = np.quantile(values, q, method="inverted_cdf")
+        assert abs(sketch.quantile(q) - exact) <= 0.011 * exact
+
+
+def test_sketch_add_many_matches_add_and_merges():
+    values = [-2.0, -0.5, 0.0, 0.25, 1.0, 1.0, 3.5]
+    one_by_one = QuantileSketch()
+    for value in values:
+        one_by_one.add(value)
+    vectorized = QuantileSketch()
+    vectorized.add_many(values)
+    assert vectorized.to_dict() == one_by_one.to_dict()
+
+    merged = QuantileSketch.from_dict(QuantileSketch().to_dict())
+    first, second = QuantileSketch(), QuantileSketch()
+    first.add_many(values[:3])
+    second.add_many(values[3:])
+    merged.merge(first)
+    merged.merge(second)
+    assert merged.to_dict() == vectorized.to_dict()
+    assert merged.quantile(0.0) == pytest.approx(-2.0, rel=0.01)
+    assert merged.quantile(1.0) == pytest.approx(3.5, rel=0.01)
+
+    with pytest.raises(ValueError):
+        merged.merge(QuantileSketch(relative_accuracy=0.05))
+
+
+def test_extract_scores_skips_non_numeric():
+    assert extract_scores({"scores": {"a": 1, "b": "high", "c": True, "d": 0.5}}) == {"a": 1.0, "d": 0.5}
+    assert extract_scores({"error": "boom"}) == {}
+    assert extract_scores(None) == {}
+
+
+def test_incremental_updates_match_recompute(file_db_session, agent_criteria):
+    agent, (v1, _) = agent_criteria
+    accuracies = [0.2, 0.4, 0.6, 0.8, 1.0]
+    for accuracy in accuracies:
+        file_db_session.add(Evaluation(
+            criteria_id=v1.id, status="completed", agent_prompt="p", results=verdict(accuracy, style=1.0),
+        ))
+        record_scores(file_db_session, [(agent.id, 1, verdict(accuracy, style=1.0))])
+        file_db_session.commit()
+
+    incremental = summarize_aggregates(file_db_session.query(ScoreAggregate).all())
+    assert incremental["accuracy"]["count"] == 5
+    assert incremental["accuracy"]["mean"] == pytest.approx(np.mean(accuracies))
+    assert incremental["accuracy"]["stddev"] == pytest.approx(np.std(accuracies))
+    assert incremental["accuracy"]["p50"] == pytest.approx(0.6, rel=0.01)
+    assert incremental["style"]["stddev"] == pytest.approx(0.0)
+
+    assert recompute_score_aggregates(file_db_session, agent_id=agent.id) == 2
+    file_db_session.expire_all()
+    recomputed = summarize_aggregates(file_db_session.query(ScoreAggregate).all())
+    for dimension, stats in incremental.items():
+        assert recomputed[dimension] == pytest.approx(stats)
+
+
+def test_worker_completion_updates_aggregates(file_db_session, file_session_local, agent_criteria, monkeypatch):
+    agent, (v1, _) = agent_criteria
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+    monkeypatch.setattr(worker_module, "SessionLocal", file_session_local)
+    monkeypatch.setattr(worker_module, "judge", lambda content, prompt, output: verdict(float(prompt)))
+
+    class FakeExecutor:
+        def judge_many(self, requests):
+            return [verdict(float(prompt)) for _, prompt, _ in requests]
+
+    monkeypatch.setattr(worker_module, "get_async_executor", FakeExecutor)
+
+    single = Evaluation(criteria_id=v1.id, agent_prompt="0.5")
+    batch = [Evaluation(criteria_id=v1.id, agent_prompt=str(score)) for score in (0.7, 0.9)]
+    file_db_session.add_all([single, *batch])
+    file_db_session.commit()
+
+    worker_module.evaluate.delay(str(single.id))
+    worker_module.evaluate_batch.delay([str(evaluation.id) for evaluation in batch])
+
+    aggregate = file_db_session.get(ScoreAggregate, (agent.id, 1, "accuracy"))
+    assert aggregate.count == 3
+    assert aggregate.sum == pytest.approx(2.1)
+    assert (aggregate.min, aggregate.max) == (0.5, 0.9)
+
+
+def test_stats_endpoint(async_client, file_db_session, agent_criteria):
+    agent, _ = agent_criteria
+    record_scores(file_db_session, [
+        (agent.id, 1, verdict(0.2)),
+        (agent.id, 1, verdict(0.4)),
+        (agent.id, 2, verdict(0.9)),
+    ])
+    file_db_session.commit()
+
+    one_version = async_client.get(f"/api/agents/{agent.id}/stats", params={"criteria_version": 1})
+    assert one_version.status_code == 200
+    stats = one_version.json()["dimensions"]["accuracy"]
+    assert stats["count"] == 2
+    assert stats["mean"] == pytest.approx(0.3)
+
+    all_versions = async_client.get(f"/api/agents/{agent.id}/stats").json()
+    assert all_versions["criteria_version"] is None
+    assert all_versions["dimensions"]["accuracy"]["count"] == 3
+    assert all_versions["dimensions"]["accuracy"]["max"] == 0.9
+    assert all_versions["dimensions"]["accuracy"]["p99"] == pytest.approx(0.9, rel=0.01)
+
+    empty = async_client.get(f"/api/agents/{uuid.uuid4()}/stats")
+    assert empty.json()["dimensions"] == {}
@@ -0,0 +1,273 @@
+"""Tests for idempotency keys and single-flight deduplication of evaluations."""
+
+import importlib
+import json
+import uuid
+
+import pytest
+import redis
+
+from aieb_evaluation_svc.core.config import settings
+from aieb_evaluation_svc.models import Agent, Evaluation, EvaluationCriteria
+from aieb_evaluation_svc.services.single_flight import (
+    IDEMPOTENCY_KEY_PREFIX,
+    INFLIGHT_KEY_PREFIX,
+    IdempotencyStore,
+    InFlightRegistry,
+    assign_leaders,
+    set_idempotency_store,
+    set_in_flight_registry,
+)
+from aieb_evaluation_svc.worker import celery_app
+
+worker_module = importlib.import_module("aieb_evaluation_svc.worker.celery_app")
+
+VERDICT = {"scores": {"accuracy": 0.5}, "rationale": "ok", "model": "stub"}
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the redis-py commands single-flight uses."""
+    def __init__(self):
+        self.data = {}
+        self.calls = []
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def set(self, key, value, nx=False, ex=None):
+        result = not (nx and key in self.data)
+        if result:
+            self.data[key] = value.encode()
+        self.calls.append(result)
+        return result
+
+    def execute(self):
+        calls, self.calls = self.calls, []
+        return calls
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+class BrokenRedis:
+    """Redis client whose every command fails."""
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise redis.ConnectionError("down")
+        return fail
+
+
+@pytest.fixture
+def fake_redis():
+    client = FakeRedis()
+    set_in_flight_registry(InFlightRegistry(ttl_seconds=60, redis_client=client))
+    set_idempotency_store(IdempotencyStore(ttl_seconds=60, lock_seconds=5, redis_client=client))
+    return client
+
+
+@pytest.fixture
+def criteria(file_db_session):
+    agent = Agent(name=f"single-flight-{uuid.uuid4()}")
+    file_db_session.add(agent)
+    file_db_session.flush()
+    criteria = EvaluationCriteria(agent_id=agent.id, version=1, criteria_content="Be correct.")
+    file_db_session.add(criteria)
+    file_db_session.commit()
+    return criteria
+
+
+@pytest.fixture
+def dispatched(monkeypatch):
+    from aieb_evaluation_svc.api import evaluations as module
+
+    calls = []
+
+    def fake_dispatch(evaluation_ids, batch_id=None):
+        calls.append([str(evaluation_id) for evaluation_id in evaluation_ids])
+        return type("FakeGroupResult", (), {"id": "group-1"})()
+
+    monkeypatch.setattr(module, "dispatch_evaluations", fake_dispatch)
+    return calls
+
+
+def submit(client, criteria, prompts, **kwargs):
+    items = [{"criteria_id": str(criteria.id), "agent_prompt": prompt, "agent_output": "out"} for prompt in prompts]
+    return client.post("/api/evaluations:batch", json={"items": items}, **kwargs)
+
+
+def test_assign_leaders_within_and_across_submissions(fake_redis):
+    first_ids, first_leaders, claimed = assign_leaders(["a", "b", "a", None])
+    assert first_leaders == [None, None, first_ids[0], None]
+    assert claimed == ["a", "b"]
+
+    second_ids, second_leaders, claimed = assign_leaders(["a", "c", "a"])
+    assert second_leaders == [first_ids[0], None, first_ids[0]]
+    assert claimed == ["c"]
+
+
+def test_claims_are_skipped_when_redis_is_down():
+    registry = InFlightRegistry(ttl_seconds=60, redis_client=BrokenRedis())
+    assert registry.claim_many(["a"], [uuid.uuid4()]) == [None]
+    registry.release_many(["a"])
+    assert IdempotencyStore(60, 5, BrokenRedis()).begin("key", "fingerprint") is None
+
+
+def test_duplicates_in_one_batch_share_a_task(async_client, file_db_session, criteria, dispatched):
+    response = submit(async_client, criteria, ["same", "other", "same", "same"])
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["deduplicated"] == 2
+    assert dispatched == [[data["evaluation_ids"][0], data["evaluation_ids"][1]]]
+    rows = {str(row.id): row for row in file_db_session.query(Evaluation).all()}
+    leader = uuid.UUID(data["evaluation_ids"][0])
+    assert [rows[i].duplicate_of for i in data["evaluation_ids"]] == [None, None, leader, leader]
+
+
+def test_duplicate_attaches_to_in_flight_evaluation(
+    async_client, file_db_session, file_session_local, criteria, fake_redis, status_events, monkeypatch
+):
+    from aieb_evaluation_svc.api import evaluations as module
+
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+    monkeypatch.setattr(worker_module, "SessionLocal", file_session_local)
+    monkeypatch.setattr(settings, "JUDGE_CACHE_ENABLED", False)
+    judged = []
+
+    def fake_judge(criteria_content, agent_prompt, agent_output):
+        judged.append(agent_prompt)
+        return VERDICT
+
+    monkeypatch.setattr(worker_module, "judge", fake_judge)
+    # Hold the leader's task until both submissions are in
+    held = []
+    monkeypatch.setattr(
+        module, "dispatch_evaluations",
+        lambda ids, batch_id=None: held.append((ids, batch_id)) or type("R", (), {"id": "group-1"})(),
+    )
+
+    first = submit(async_client, criteria, ["retried"]).json()
+    second = submit(async_client, criteria, ["retried"]).json()
+    assert second["deduplicated"] == 1
+    assert len(held) == 1
+    assert any(key.startswith(INFLIGHT_KEY_PREFIX) for key in fake_redis.data)
+
+    (leader_id,) = first["evaluation_ids"]
+    (follower_id,) = second["evaluation_ids"]
+    worker_module.evaluate.delay(str(leader_id), first["batch_id"])
+
+    assert judged == ["retried"]
+    file_db_session.expire_all()
+    follower = file_db_session.get(Evaluation, uuid.UUID(follower_id))
+    assert follower.status == "completed"
+    assert follower.results == VERDICT
+    assert (follower_id, "completed", second["batch_id"]) in {
+        (event.evaluation_id, event.status, event.batch_id) for event in status_events
+    }
+    # The claim is released, so the next identical submission is judged again
+    assert not any(key.startswith(INFLIGHT_KEY_PREFIX) for key in fake_redis.data)
+    third = submit(async_client, criteria, ["retried"]).json()
+    assert third["deduplicated"] == 0
+    assert len(held) == 2
+
+
+def test_follower_of_already_finished_leader_completes_at_once(
+    async_client, file_db_session, criteria, fake_redis, dispatched, monkeypatch
+):
+    from aieb_evaluation_svc.services.evaluation_service import item_judge_keys, load_criteria
+    from aieb_evaluation_svc.schemas.evaluation import EvaluationItem
+
+    monkeypatch.setattr(settings, "JUDGE_CACHE_ENABLED", False)
+    leader = Evaluation(
+        criteria_id=criteria.id, status="completed", agent_prompt="raced", agent_output="out", results=VERDICT
+    )
+    file_db_session.add(leader)
+    file_db_session.commit()
+    # The leader finished, but its claim was read before it was released
+    item = EvaluationItem(criteria_id=criteria.id, agent_prompt="raced", agent_output="out")
+    (key,) = item_judge_keys([item], load_criteria(file_db_session, [criteria.id]))
+    fake_redis.data[INFLIGHT_KEY_PREFIX + key] = str(leader.id).encode()
+
+    response = submit(async_client, criteria, ["raced"]).json()
+
+    assert dispatched == []
+    file_db_session.expire_all()
+    follower = file_db_session.get(Evaluation, uuid.UUID(response["evaluation_ids"][0]))
+    assert (follower.status, follower.results) == ("completed", VERDICT)
+
+
+def test_idempotency_key_replays_response(async_client, file_db_session, criteria, fake_redis, dispatched):
+    headers = {"Idempotency-Key": "ci-run-42"}
+
+    first = submit(async_client, criteria, ["a", "b"], headers=headers)
+    retry = submit(async_client, criteria, ["a", "b"], headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert len(dispatched) == 1
+    assert file_db_session.query(Evaluation).count() == 2
+
+    reused = submit(async_client, criteria, ["c"], headers=headers)
+    assert reused.status_code == 422
+
+
+def test_idempotency_key_replays_while_shedding_load(
+    async_client, file_db_session, criteria, fake_redis, dispatched, monkeypatch
+):
+    from fastapi import HTTPException
+
+    from aieb_evaluation_svc.api import evaluations as module
+
+    first = submit(async_client, criteria, ["a"], headers={"Idempotency-Key": "before-backlog"})
+
+    async def backlogged(lane):
+        raise HTTPException(status_code=429, detail="Queue is backed up", headers={"Retry-After": "30"})
+
+    monkeypatch.setattr(module, "reject_if_backlogged", backlogged)
+
+    retry = submit(async_client, criteria, ["a"], headers={"Idempotency-Key": "before-backlog"})
+    assert retry.status_code == 200
+    assert retry.json() == first.json()
+
+    # New work is still shed, without holding on to its key
+    assert submit(async_client, criteria, ["b"], headers={"Idempotency-Key": "new"}).status_code == 429
+    assert IDEMPOTENCY_KEY_PREFIX + "new" not in fake_redis.data
+    assert file_db_session.query(Evaluation).count() == 1
+
+
+def test_idempotency_key_in_progress_conflicts(async_client, criteria, fake_redis, dispatched, monkeypatch):
+    monkeypatch.setattr(settings, "IDEMPOTENCY_WAIT_SECONDS", 0.2)
+    fake_redis.data[IDEMPOTENCY_KEY_PREFIX + "busy"] = json.dumps(
+        {"fingerprint": "another request", "response": None}
+    ).encode()
+    assert submit(async_client, criteria, ["a"], headers={"Idempotency-Key": "busy"}).status_code == 422
+
+    response = submit(async_client, criteria, ["a"], headers={"Idempotency-Key": "mine"})
+    record = json.loads(fake_redis.data[IDEMPOTENCY_KEY_PREFIX + "mine"])
+    record["response"] = None
+    fake_redis.data[IDEMPOTENCY_KEY_PREFIX + "mine"] = json.dumps(record).encode()
+
+    retry = submit(async_client, criteria, ["a"], headers={"Idempotency-Key": "mine"})
+    assert response.status_code == 200
+    assert retry.status_code == 409
+
+
+def test_failed_request_releases_its_keys(async_client, criteria, fake_redis, monkeypatch):
+    from aieb_evaluation_svc.api import evaluations as module
+
+    def failing_dispatch(evaluation_ids, batch_id=None):
+        raise Exception("broker down")
+
+    monkeypatch.setattr(module, "dispatch_evaluations", failing_dispatch)
+
+    response = submit(async_client, criteria, ["a"], headers={"Idempotency-Key": "flaky"})
+
+    assert response.status_code == 500
+    assert fake_redis.data == {}
@@ -0,0 +1,227 @@
+"""Tests for push-based evaluation status events."""
+
+import asyncio
+import importlib
+import json
+import uuid
+
+import pytest
+import redis
+
+from aieb_evaluation_svc.app import app
+from aieb_evaluation_svc.models import Agent, Evaluation, EvaluationCriteria
+from aieb_evaluation_svc.services.status_events import (
+    StatusEvent,
+    StatusEventHub,
+    StatusEventPublisher,
+    batch_channel,
+    evaluation_channel,
+    get_status_event_hub,
+)
+from aieb_evaluation_svc.worker import celery_app
+
+worker_module = importlib.import_module("aieb_evaluation_svc.worker.celery_app")
+
+VERDICT = {"scores": {"accuracy": 1.0}, "rationale": "ok", "model": "stub"}
+
+
+class FakePipelineRedis:
+    """Records the PUBLISH commands of a pipeline."""
+    def __init__(self):
+        self.published = []
+        self.executions = 0
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def publish(self, channel, message):
+        self.published.append((channel, json.loads(message)))
+
+    def execute(self):
+        self.executions += 1
+
+
+class BrokenRedis:
+    def pipeline(self, transaction=True):
+        raise redis.ConnectionError("down")
+
+
+class FakePubSub:
+    """In-memory pub/sub that delivers queued messages once their channel is subscribed."""
+    def __init__(self):
+        self.channels = set()
+        self.pending = []
+
+    def push(self, channel, event):
+        self.pending.append((channel, json.dumps(event)))
+
+    async def subscribe(self, *channels):
+        self.channels.update(channels)
+
+    async def unsubscribe(self, *channels):
+        self.channels.difference_update(channels)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        for i, (channel, data) in enumerate(self.pending):
+            if channel in self.channels:
+                del self.pending[i]
+                return {"type": "message", "channel": channel.encode(), "data": data}
+        await asyncio.sleep(0.01)
+        return None
+
+    async def aclose(self):
+        pass
+
+
+class FakeAsyncRedis:
+    def __init__(self):
+        self.pubsub_instance = FakePubSub()
+
+    def pubsub(self):
+        return self.pubsub_instance
+
+
+@pytest.fixture
+def fake_hub():
+    fake_redis = FakeAsyncRedis()
+    app.dependency_overrides[get_status_event_hub] = lambda: hub
+    hub = StatusEventHub(fake_redis)
+    yield hub, fake_redis.pubsub_instance
+    app.dependency_overrides.pop(get_status_event_hub, None)
+
+
+@pytest.fixture
+def criteria(file_db_session):
+    agent = Agent(name=f"test-agent-{uuid.uuid4()}")
+    file_db_session.add(agent)
+    file_db_session.commit()
+    criteria = EvaluationCriteria(agent_id=agent.id, version=1, criteria_content="Be correct.")
+    file_db_session.add(criteria)
+    file_db_session.commit()
+    return criteria
+
+
+def test_publisher_pipelines_evaluation_and_batch_channels():
+    fake_redis = FakePipelineRedis()
+    publisher = StatusEventPublisher(fake_redis)
+    batch_id = uuid.uuid4()
+
+    publisher.publish_many([StatusEvent("e1", "running", batch_id), StatusEvent("e2", "running")])
+
+    assert fake_redis.executions == 1
+    assert [channel for channel, _ in fake_redis.published] == [
+        evaluation_channel("e1"), batch_channel(batch_id), evaluation_channel("e2"),
+    ]
+    assert fake_redis.published[0][1]["batch_id"] == str(batch_id)
+
+
+def test_publisher_swallows_redis_errors():
+    StatusEventPublisher(BrokenRedis()).publish("e1", "running")
+
+
+def test_hub_fans_out_one_subscription():
+    async def scenario():
+        fake_redis = FakeAsyncRedis()
+        pubsub = fake_redis.pubsub_instance
+        hub = StatusEventHub(fake_redis)
+        channel = evaluation_channel("e1")
+
+        first = await hub.subscribe(channel)
+        second = await hub.subscribe(channel)
+        pubsub.push(channel, {"evaluation_id": "e1", "status": "running"})
+
+        events = await asyncio.gather(
+            asyncio.wait_for(first.get(), 1), asyncio.wait_for(second.get(), 1)
+        )
+        assert [event["status"] for event in events] == ["running", "running"]
+
+        await hub.unsubscribe(channel, first)
+        assert channel in pubsub.channels
+        await hub.unsubscribe(channel, second)
+        assert channel not in pubsub.channels
+        await hub.close()
+
+    asyncio.run(scenario())
+
+
+def test_evaluation_sse_streams_until_terminal(async_client, file_db_session, criteria, fake_hub):
+    hub, pubsub = fake_hub
+    evaluation = Evaluation(criteria_id=criteria.id, agent_prompt="p")
+    file_db_session.add(evaluation)
+    file_db_session.commit()
+    channel = evaluation_channel(evaluation.id)
+    pubsub.push(channel, StatusEvent(evaluation.id, "running").__dict__)
+    pubsub.push(channel, StatusEvent(evaluation.id, "completed").__dict__)
+
+    response = async_client.get(f"/api/evaluations/{evaluation.id}/events")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    statuses = [
+        json.loads(line[len("data: "):])["status"]
+        for line in response.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    assert statuses == ["pending", "running", "completed"]
+    assert channel not in pubsub.channels
+
+
+def test_evaluation_sse_unknown_evaluation(async_client, fake_hub):
+    response = async_client.get(f"/api/evaluations/{uuid.uuid4()}/events")
+
+    assert response.status_code == 404
+
+
+def test_batch_websocket_receives_batch_events(async_client, fake_hub):
+    hub, pubsub = fake_hub
+    batch_id = uuid.uuid4()
+    pubsub.push(batch_channel(batch_id), StatusEvent("e1", "running", batch_id).__dict__)
+    pubsub.push(batch_channel(uuid.uuid4()), StatusEvent("e2", "running").__dict__)
+    pubsub.push(batch_channel(batch_id), StatusEvent("e1", "completed", batch_id).__dict__)
+
+    with async_client.websocket_connect(f"/api/evaluation-batches/{batch_id}/events/ws") as websocket:
+        received = [websocket.receive_json(), websocket.receive_json()]
+
+    assert [(event["evaluation_id"], event["status"]) for event in received] == [
+        ("e1", "running"), ("e1", "completed"),
+    ]
+
+
+def test_batch_submission_publishes_pending_events(async_client, criteria, status_events, monkeypatch):
+    from aieb_evaluation_svc.api import evaluations as module
+
+    dispatched = {}
+
+    class DummyGroup:
+        id = "group-123"
+
+    def fake_dispatch(ids, batch_id=None):
+        dispatched["batch_id"] = batch_id
+        return DummyGroup()
+
+    monkeypatch.setattr(module, "dispatch_evaluations", fake_dispatch)
+
+    response = async_client.post(
+        "/api/evaluations:batch",
+        json={"items": [{"criteria_id": str(criteria.id), "agent_prompt": f"p{i}"} for i in range(3)]},
+    )
+
+    data = response.json()
+    assert str(dispatched["batch_id"]) == data["batch_id"]
+    assert [(e.evaluation_id, e.status, e.batch_id) for e in status_events] == [
+        (evaluation_id, "pending", data["batch_id"]) for evaluation_id in data["evaluation_ids"]
+    ]
+
+
+def test_worker_publishes_transitions(file_db_session, file_session_local, criteria, status_events, monkeypatch):
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+    monkeypatch.setattr(worker_module, "SessionLocal", file_session_local)
+    monkeypatch.setattr(worker_module, "judge", lambda *args: VERDICT)
+
+    evaluation = Evaluation(criteria_id=criteria.id, agent_prompt="p")
+    file_db_session.add(evaluation)
+    file_db_session.commit()
+
+    worker_module.evaluate.delay(str(evaluation.id), "batch-1")
+
+    assert [(e.status, e.batch_id) for e in status_events] == [("running", "batch-1"), ("completed", "batch-1")]